@@ -1,8 +1,11 @@
 // Accessibility tree search and element interaction
 // Extracted from hammerspoon.mjs to create headroom for new features
+import { platform } from "node:os";
 import { hsCall } from "./hammerspoon.mjs";
 import { cdpEval, cdpConnected } from "./cdp.mjs";
 
+const IS_LINUX = platform() === "linux";
+
 // Short-lived cache for the a11y tree — reused within a single find→click sequence.
 const _axCache = new Map(); // key: app|"" → { tree, ts }
 const AX_CACHE_TTL = 1500;
@@ -75,6 +78,14 @@ export async function findElements({ role, title, app, limit }) {
 			return { app: "Google Chrome", count: cdpResults.length, elements: cdpResults, source: "cdp" };
 		}
 	}
+	// The Linux backend indexes elements server-side and returns press handles
+	if (IS_LINUX && (role || title)) {
+		const found = await hsCall("POST", "/find", { role, title, app, limit: max }, 30000);
+		if (Array.isArray(found.elements)) {
+			const elements = found.elements.map(e => ({ ...e, title: e.title || e.description || "" }));
+			return { app: found.app, count: elements.length, elements, source: "index" };
+		}
+	}
 	// Fallback to native a11y (pyatspi on Linux, AX on macOS)
 	const cached = _getCachedTree(app);
 	const tree = cached ?? await hsCall("POST", "/accessibility", { app, depth: 8 }, 30000);
@@ -101,8 +112,14 @@ export async function findElements({ role, title, app, limit }) {
 	return { app: tree.app, count: results.length, elements: results };
 }
 
-/** Find element by title/role and click its center. Fallback to AXPress. */
-export async function clickElement({ title, role, app, index }) {
+/** Find element by title/role and click its center. Fallback to AXPress.
+ *  A handle from findElements is pressed directly, with no search. */
+export async function clickElement({ title, role, app, index, handle }) {
+	if (handle) {
+		const r = await hsCall("POST", "/ax_press", { handle });
+		if (r.pressed) return { clicked: true, element: { title: r.title, role: r.role }, method: "AXPress" };
+		return { error: r.error || "AXPress failed", handle, method: "AXPress" };
+	}
 	const result = await findElements({ title, role, app, limit: 10 });
 	if (result.error) return { error: result.error };
 	const valid = result.elements.filter(e => e.frame && e.frame.w > 0 && e.frame.h > 0);
@@ -115,7 +132,9 @@ export async function clickElement({ title, role, app, index }) {
 		return { clicked: true, element: el, coords: { x, y }, candidates: valid.length };
 	}
 	if (result.count > 0) {
-		const r = await hsCall("POST", "/ax_press", { title, role, app, index: index || 0 });
+		const target = result.elements[index || 0];
+		const r = await hsCall("POST", "/ax_press", target?.handle
+			? { handle: target.handle } : { title, role, app, index: index || 0 });
 		if (r.pressed) return { clicked: true, element: { title: r.title, role: r.role }, method: "AXPress" };
 		return { error: r.error || "AXPress failed", found: result.count, method: "AXPress" };
 	}
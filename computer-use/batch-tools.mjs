@@ -0,0 +1,39 @@
+// Batch tool: run several computer-use actions in one /batch request (Linux server).
+// Each step is dispatched server-side with the same locks/deadlines as a single call.
+import { z } from "zod";
+import { hsCall, takeScreenshot, scaleFactor } from "./hammerspoon.mjs";
+
+const n = z.coerce.number();
+const COORD_KEYS = ["x", "y", "w", "h", "startX", "startY", "endX", "endY"];
+
+/** Scale screenshot-space coordinates to native pixels (relative moves stay as deltas). */
+function scaleStep(step) {
+	if (step.relative) return step;
+	const out = { ...step };
+	for (const k of COORD_KEYS) if (out[k] != null) out[k] = Math.round(out[k] * scaleFactor());
+	return out;
+}
+
+/** One line per step; inline images are dropped to keep the transcript small. */
+function summarize(r) {
+	const lines = (r.results || []).map((s, i) => {
+		const { image_base64, regions, ...rest } = s.result || {};
+		return `${i}. ${s.action} → ${s.status} (${s.ms}ms) ${JSON.stringify(rest)}`;
+	});
+	const head = r.error ? `Batch stopped: ${r.error}` : `Batch ok: ${r.completed} steps in ${r.total_ms}ms`;
+	return [head, ...lines].join("\n");
+}
+
+export function registerBatchTools(server) {
+	server.tool("batch", "Run several actions in one call, in order, stopping at the first error (Linux). Steps use endpoint names — click, type, scroll, drag, focus, launch, key_down, key_up, mouse_move, release_all, wait_stable, sleep {ms} — with that endpoint's params. Auto-returns screenshot.",
+		{ actions: z.array(z.object({
+			action: z.string().describe("Endpoint name, e.g. 'click', 'type', 'wait_stable', 'sleep'"),
+			delay_ms: n.optional().describe("Pause after this step"),
+		}).passthrough()).describe("Ordered steps, e.g. [{action:'focus',app:'firefox'},{action:'click',x:10,y:20},{action:'type',text:'hi'},{action:'type',key:'Return'}]") },
+		async ({ actions }) => {
+			const r = await hsCall("POST", "/batch", { actions: actions.map(scaleStep) }, 330000);
+			if (r.error && !r.results) return { content: [{ type: "text", text: JSON.stringify(r) }] };
+			return { content: [{ type: "text", text: summarize(r) }, ...await takeScreenshot(300)] };
+		}
+	);
+}
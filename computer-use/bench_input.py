@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Benchmark input endpoint latency: xdotool forks vs the in-process XTest backend.
+
+Usage: python3 bench_input.py [reps]
+Starts a private Xvfb (:97 by default, BENCH_DISPLAY to override) so it
+never touches the real desktop. Needs Xvfb, xdotool, libX11 and libXtst.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+DISPLAY = os.environ.get("BENCH_DISPLAY", ":97")
+os.environ["DISPLAY"] = DISPLAY
+
+import linux_held_input as held  # noqa: E402
+import linux_input as inp  # noqa: E402
+import linux_xtest  # noqa: E402
+
+CASES = [
+    ("click", inp.click, {"x": 200, "y": 200}),
+    ("click+mods", inp.click, {"x": 200, "y": 200, "modifiers": ["cmd", "shift"]}),
+    ("type 10ch", inp.type_input, {"text": "abcdefghij"}),
+    ("key combo", inp.type_input, {"key": "a", "modifiers": ["cmd"]}),
+    ("scroll", inp.scroll, {"amount": 3}),
+    ("drag 10", inp.drag, {"startX": 10, "startY": 10, "endX": 300, "endY": 300, "duration": 0}),
+    ("key_down/up", lambda p: (held.key_down(p), held.key_up(p)), {"key": "a"}),
+    ("release_all", held.release_all, {}),
+]
+
+
+def _use(backend: str) -> bool:
+    """Select the backend; False if it can't be used here."""
+    os.environ["RELAYGENT_INPUT_BACKEND"] = backend
+    linux_xtest._tried, linux_xtest._backend = False, None
+    return backend == "xdotool" or linux_xtest.get() is not None
+
+
+def _median_ms(fn, params, reps):
+    times = []
+    for _ in range(reps):
+        start = time.perf_counter()
+        fn(dict(params))
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)[len(times) // 2]
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for tool in ("Xvfb", "xdotool"):
+        if not shutil.which(tool):
+            sys.exit(f"{tool} not found")
+    xvfb = subprocess.Popen(["Xvfb", DISPLAY, "-screen", "0", "1280x800x24"],
+                            stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1)
+        results = {}
+        for backend in ("xdotool", "xtest"):
+            if not _use(backend):
+                print(f"{backend}: unavailable (libXtst or XTEST missing)")
+                continue
+            for name, fn, params in CASES:
+                results.setdefault(name, {})[backend] = _median_ms(fn, params, reps)
+    finally:
+        xvfb.terminate()
+        xvfb.wait()
+    print(f"{'endpoint':<13} {'xdotool ms':>11} {'xtest ms':>9}   (median of {reps})")
+    for name, row in results.items():
+        cols = [f"{row[b]:>{w}.2f}" if b in row else f"{'-':>{w}}"
+                for b, w in (("xdotool", 11), ("xtest", 9))]
+        print(f"{name:<13} {cols[0]} {cols[1]}")
+
+
+if __name__ == "__main__":
+    main()
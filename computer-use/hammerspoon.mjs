@@ -4,14 +4,16 @@
 import { execFile } from "node:child_process";
 import { platform } from "node:os";
 import http from "node:http";
-import { readScreenshot, readRawScreenshot, scaleFactor, SCREENSHOT_PATH } from "./screenshot-io.mjs";
+import { readScreenshot, readRawScreenshot, scaleFactor, screenshotImage, screenshotRegions, screenshotRequest, SCREENSHOT_PATH } from "./screenshot-io.mjs";
 
 // Re-export for consumers that import from hammerspoon.mjs
-export { readScreenshot, readRawScreenshot, scaleFactor, SCREENSHOT_PATH };
+export { readScreenshot, readRawScreenshot, scaleFactor, screenshotImage, screenshotRegions, screenshotRequest, SCREENSHOT_PATH };
 
 const IS_LINUX = platform() === "linux";
 const PORT = parseInt(process.env.HAMMERSPOON_PORT || "8097", 10);
-const agent = new http.Agent({ keepAlive: false, maxSockets: 3 });
+// linux-server.py speaks HTTP/1.1 keep-alive; Hammerspoon's server gets a fresh connection per call
+// Idle sockets are dropped after 60s, before the server's 120s idle timeout can race a reuse
+const agent = new http.Agent({ keepAlive: IS_LINUX, maxSockets: 3, timeout: 60000 });
 let tail = Promise.resolve();
 
 function hsCallOnce(method, path, body, timeoutMs) {
@@ -66,23 +68,22 @@ export function hsCall(method, path, body, timeoutMs = 15000) {
 /** Take screenshot after delay. Returns MCP content blocks. */
 export async function takeScreenshot(delayMs = 300, indicator) {
 	await new Promise(r => setTimeout(r, delayMs));
-	const body = { path: SCREENSHOT_PATH };
-	if (indicator) { body.indicator_x = indicator.x; body.indicator_y = indicator.y; }
+	const body = screenshotRequest(indicator ? { indicator_x: indicator.x, indicator_y: indicator.y } : {});
 	let r = await hsCall("POST", "/screenshot", body);
 	if (r.error) return [{ type: "text", text: `(screenshot failed: ${r.error})` }];
 	try {
-		let img = readScreenshot(r.width, r.pixelWidth);
+		let img = screenshotImage(r);
 		// Retry once on invalid screenshot (timing issue — scrot can capture during window transition)
 		if (!img) {
 			await new Promise(res => setTimeout(res, 500));
 			r = await hsCall("POST", "/screenshot", body);
-			if (!r.error) img = readScreenshot(r.width, r.pixelWidth);
+			if (!r.error) img = screenshotImage(r);
 		}
 		if (!img) return [{ type: "text", text: "(screenshot unavailable — image was invalid or too large)" }];
 		const sf = scaleFactor();
 		const sw = Math.round(r.width / sf), sh = Math.round(r.height / sf);
 		return [
-			{ type: "image", data: img, mimeType: "image/png" },
+			{ type: "image", data: img.data, mimeType: img.mimeType },
 			{ type: "text", text: `Screenshot: ${sw}x${sh}px (use these coords for clicks)` },
 		];
 	} catch (e) { return [{ type: "text", text: `(screenshot read failed: ${e.message})` }]; }
@@ -61,9 +61,12 @@ export function registerHeldInputTools(server) {
 		})).describe("Array of timed input actions") },
 		async ({ actions }) => {
 			const scaled = actions.map(a => ({ ...a, x: a.x != null && !a.relative ? sx(a.x) : a.x, y: a.y != null && !a.relative ? sx(a.y) : a.y }));
-			const r = await hsCall("POST", "/input_sequence", { actions: scaled });
 			const maxDelay = Math.max(...actions.map(a => a.delay || 0));
-			return actionRes(JSON.stringify(r), maxDelay + 200);
+			// wait: the Linux server replies once everything has run, with timing stats
+			const r = await hsCall("POST", "/input_sequence", { actions: scaled, wait: true }, maxDelay + 15000);
+			if (!r.executed) return actionRes(JSON.stringify(r), maxDelay + 200);
+			const j = r.jitter_ms || {};
+			return actionRes(`Ran ${r.executed.length} actions over ${r.duration_ms}ms (jitter p95 ${j.p95}ms, max ${j.max}ms)`, 100);
 		}
 	);
 }
@@ -1,15 +1,23 @@
 #!/usr/bin/env python3
 """Linux computer-use HTTP server — drop-in replacement for Hammerspoon.
 
-Same API on port 8097, backed by xdotool + scrot + pyatspi2.
+Same API on port 8097, backed by XTest (xdotool fallback) + XShm (scrot fallback) + pyatspi2.
 Install: apt install xdotool scrot wmctrl imagemagick python3-pyatspi at-spi2-core
+
+Threaded, HTTP/1.1 keep-alive. Routes that share a resource lock run one at
+a time (input events never interleave); everything else runs concurrently,
+so a slow a11y walk or long /type never blocks /health, /screenshot or
+/release_all. Each request has a deadline and gets a 504 when it passes.
 """
 from __future__ import annotations
 
 import json
 import os
 import sys
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qsl, urlsplit
 
 import linux_input as inp
 import linux_held_input as held
@@ -17,12 +25,74 @@ import linux_display as display
 import linux_a11y as a11y
 import linux_clipboard as clip
 import linux_window as win
+import linux_wait as wait
+import linux_batch as batch
+import linux_scheduler
 
 
 PORT = int(os.environ.get("HAMMERSPOON_PORT", "8097"))
 
+LOCKS = {name: threading.Lock() for name in ("input", "a11y", "window", "clipboard")}
+# /input_sequence only queues; the scheduler thread takes the input lock while it runs
+linux_scheduler.use_lock(LOCKS["input"])
+# /release_all deliberately takes no lock so it can unstick a drag mid-request
+ROUTE_LOCKS = {
+    **dict.fromkeys(("/click", "/type", "/drag", "/scroll", "/key_down", "/key_up",
+                     "/mouse_down", "/mouse_up", "/mouse_move", "/type_from_file"), "input"),
+    **dict.fromkeys(("/element_at", "/accessibility", "/find", "/ax_press"), "a11y"),
+    **dict.fromkeys(("/focus", "/launch", "/window_manage"), "window"),
+    "/clipboard": "clipboard",
+}
+REQUEST_TIMEOUT = float(os.environ.get("RELAYGENT_REQUEST_TIMEOUT", "30"))
+ROUTE_TIMEOUTS = {"/accessibility": 60.0, "/input_sequence": 60.0, "/type_from_file": 120.0,
+                  "/batch": batch.MAX_BATCH_SECS + 120}  # Steps keep their own deadlines
+
+
+def _timeout(path: str, params: dict) -> float:
+    if path == "/wait_stable":
+        try:
+            return int(params.get("timeout_ms", 10000)) / 1000 + 5
+        except (TypeError, ValueError):
+            pass  # The handler reports the bad parameter
+    return ROUTE_TIMEOUTS.get(path, REQUEST_TIMEOUT)
+
+
+def dispatch(path: str, handler, params: dict) -> tuple[dict, int]:
+    """Run handler under its route's lock, within the route's deadline.
+
+    Waiting for the lock counts against the deadline, and a request that
+    can't get it in time never runs (no stale clicks). A handler still
+    running at the deadline can't be killed; it finishes in the background,
+    holding its lock, while the client gets a 504."""
+    timeout = _timeout(path, params)
+    deadline = time.monotonic() + timeout
+    lock = LOCKS.get(ROUTE_LOCKS.get(path, ""))
+    result = []
+
+    def run():
+        if lock is not None and not lock.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            result.append(({"error": f"{path} busy: resource locked for {timeout:g}s"}, 503))
+            return
+        try:
+            result.append(handler(params))
+        except Exception as e:
+            result.append(({"error": str(e)}, 500))
+        finally:
+            if lock is not None:
+                lock.release()
+
+    worker = threading.Thread(target=run, name=f"request {path}", daemon=True)
+    worker.start()
+    worker.join(timeout + 0.1)
+    if not result:
+        return {"error": f"{path} timed out after {timeout:g}s"}, 504
+    return result[0]
+
 
 class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive: the MCP client reuses one connection
+    timeout = 120  # Close idle keep-alive connections
+
     def log_message(self, fmt, *args):
         pass
 
@@ -34,14 +104,21 @@ class Handler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(data)
 
-    def _read_body(self) -> dict:
+    def _read_body(self) -> dict | None:
+        """JSON object body ({} if empty or unparseable); None if it is JSON but not an object."""
         length = int(self.headers.get("Content-Length", 0))
         if length == 0:
             return {}
         try:
-            return json.loads(self.rfile.read(length))
+            body = json.loads(self.rfile.read(length))
         except (json.JSONDecodeError, UnicodeDecodeError):
             return {}
+        return body if isinstance(body, dict) else None
+
+    def _route(self) -> tuple[str, dict]:
+        """Path without query string, and query params (e.g. /screenshot?diff=1)."""
+        url = urlsplit(self.path)
+        return url.path, dict(parse_qsl(url.query))
 
     def do_GET(self):
         routes = {
@@ -50,20 +127,23 @@ class Handler(BaseHTTPRequestHandler):
             "/apps": display.apps,
             "/clipboard": clip.clipboard_read,
         }
-        handler = routes.get(self.path)
+        path, query = self._route()
+        handler = routes.get(path)
         if handler:
-            try:
-                body, code = handler({})
-            except Exception as e:
-                body, code = {"error": str(e)}, 500
-            self._respond(body, code)
+            self._respond(*dispatch(path, handler, query))
         else:
             self._respond({"error": "not found", "path": self.path}, 404)
 
     def do_POST(self):
-        params = self._read_body()
+        path, query = self._route()
+        body = self._read_body()
+        if body is None:
+            self._respond({"error": "request body must be a JSON object"}, 400)
+            return
+        params = {**query, **body}
         routes = {
             "/screenshot": display.screenshot,
+            "/wait_stable": wait.wait_stable,
             "/click": inp.click,
             "/type": inp.type_input,
             "/drag": inp.drag,
@@ -80,24 +160,22 @@ class Handler(BaseHTTPRequestHandler):
             "/launch": display.launch,
             "/element_at": a11y.element_at,
             "/accessibility": a11y.accessibility_tree,
+            "/find": a11y.find_elements,
             "/ax_press": a11y.ax_press,
             "/clipboard": clip.clipboard_write,
             "/window_manage": win.window_manage,
             "/reload": lambda _: ({"status": "ok", "note": "no-op on linux"}, 200),
         }
-        handler = routes.get(self.path)
+        routes["/batch"] = lambda p: batch.run_batch(p, routes, dispatch)
+        handler = routes.get(path)
         if handler:
-            try:
-                body, code = handler(params)
-            except Exception as e:
-                body, code = {"error": str(e)}, 500
-            self._respond(body, code)
+            self._respond(*dispatch(path, handler, params))
         else:
             self._respond({"error": "not found", "path": self.path}, 404)
 
 
 if __name__ == "__main__":
-    server = HTTPServer(("127.0.0.1", PORT), Handler)
+    server = ThreadingHTTPServer(("127.0.0.1", PORT), Handler)
     print(f"Linux computer-use API on localhost:{PORT}", file=sys.stderr)
     try:
         server.serve_forever()
@@ -74,10 +74,8 @@ def _attr(obj, attr, default=""):
         return default
 
 
-def _build_tree(obj, depth, max_depth, state):
-    if obj is None or depth > max_depth or state["count"] >= MAX_NODES:
-        return None
-    state["count"] += 1
+def _node_attrs(obj):
+    """(raw role, node dict without children) — the per-node D-Bus round trips."""
     role = _role(obj)
     name = _attr(obj, "name", "")
     desc = _attr(obj, "description", "")
@@ -93,6 +91,18 @@ def _build_tree(obj, depth, max_depth, state):
         node["value"] = str(obj.queryValue().currentValue)
     except (RuntimeError, AttributeError, NotImplementedError):
         pass
+    return role, node
+
+
+def _prunable(role, node):
+    return role.lower() in SKIP_ROLES and "title" not in node and "description" not in node
+
+
+def _build_tree(obj, depth, max_depth, state):
+    if obj is None or depth > max_depth or state["count"] >= MAX_NODES:
+        return None
+    state["count"] += 1
+    role, node = _node_attrs(obj)
     children = []
     if depth < max_depth and state["count"] < MAX_NODES:
         try:
@@ -106,17 +116,28 @@ def _build_tree(obj, depth, max_depth, state):
             pass
     if children:
         node["children"] = children
-    elif role.lower() in SKIP_ROLES and not name and not desc:
+    elif _prunable(role, node):
         return None
     return node
 
 
 def accessibility_tree(params):
+    """App tree (depth levels). Served from the event-invalidated cache when the
+    AT-SPI listener runs; since=<version> then returns only changed subtrees,
+    refresh=true forces a full walk."""
     app, err = _get_app(params.get("app"))
     if err:
         return {"error": err}, 404
+    try:
+        depth = int(params.get("depth", 4))
+        since = None if params.get("since") is None else int(params["since"])
+    except (TypeError, ValueError):
+        return {"error": "depth and since must be integers"}, 400
+    cached = _cache.serve(app, depth, since, bool(params.get("refresh")))
+    if cached is not None:
+        return cached, 200
     state = {"count": 0}
-    tree = _build_tree(app, 0, params.get("depth", 4), state)
+    tree = _build_tree(app, 0, depth, state)
     return {"app": app.name or "unknown", "tree": tree,
             "nodes": state["count"],
             "truncated": state["count"] >= MAX_NODES}, 200
@@ -143,5 +164,6 @@ def element_at(params):
     return {"error": "no element"}, 404
 
 
-# ax_press extracted to linux_a11y_press.py
-from linux_a11y_press import ax_press  # noqa: F401
+# find_elements / ax_press extracted to linux_a11y_press.py
+from linux_a11y_press import ax_press, find_elements  # noqa: F401,E402
+import linux_a11y_cache as _cache  # noqa: E402
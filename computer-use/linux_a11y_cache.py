@@ -0,0 +1,96 @@
+"""Event-invalidated AT-SPI tree cache for Linux /accessibility.
+
+Walking a tree costs several synchronous D-Bus calls per node, so trees are
+cached per (app, depth) and kept fresh by AT-SPI event listeners: an event
+marks the nearest cached ancestor of its source dirty, and the next request
+rebuilds only the dirty subtrees. Each rebuilt subtree is stamped with a new
+version, so since=<version> can return just the subtrees that changed.
+Each tree is walked under its own lock (linux_a11y_tree), so a rebuild
+blocks neither the event listener nor requests for other trees. Without a
+running listener (no pyatspi, RELAYGENT_A11Y_CACHE=0, or startup failure)
+serve() returns None and callers walk the tree from scratch.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import linux_a11y as _a11y
+from linux_a11y_tree import Tree
+
+logger = logging.getLogger(__name__)
+
+EVENTS = ("object:children-changed", "object:state-changed",
+          "object:property-change", "object:bounds-changed")
+MAX_TREES = 8
+
+_lock = threading.Lock()  # Guards _trees only; walks hold the tree's own lock
+_trees: OrderedDict[tuple, Tree] = OrderedDict()
+_listening = False
+_started = False
+
+
+def _on_event(event):
+    """Mark the nearest cached ancestor of the event source dirty (listener thread)."""
+    source = getattr(event, "source", None)
+    with _lock:
+        trees = list(_trees.values())
+    for tree in trees:
+        tree.mark(source)
+
+
+def _start() -> bool:
+    """Register listeners and run the AT-SPI event loop in a daemon thread, once."""
+    global _started, _listening
+    if _started:
+        return _listening
+    _started = True
+    if not _a11y.HAS_ATSPI or os.environ.get("RELAYGENT_A11Y_CACHE", "1") == "0":
+        return False
+    try:
+        _a11y.pyatspi.Registry.registerEventListener(_on_event, *EVENTS)
+        threading.Thread(target=_a11y.pyatspi.Registry.start, name="atspi-events",
+                         daemon=True).start()
+        _listening = True
+    except Exception as e:  # noqa: BLE001 — any failure just disables the cache
+        logger.warning("AT-SPI event listener unavailable (%s); a11y cache disabled", e)
+    return _listening
+
+
+def _tree(app, depth: int, refresh: bool = False) -> Tree:
+    """Cached tree for (app, depth), new if missing or refresh; call update() on it."""
+    with _lock:
+        tree = _trees.pop((app, depth), None)
+        if tree is None or refresh:
+            tree = Tree(app, depth)
+        _trees[(app, depth)] = tree
+        while len(_trees) > MAX_TREES:
+            _trees.popitem(last=False)
+    return tree
+
+
+def snapshot(app, depth: int):
+    """(version, root Node) of the up-to-date cached tree; None if uncached."""
+    if not _start():
+        return None
+    tree = _tree(app, depth)
+    with tree.lock:
+        tree.update()
+        return tree.latest, tree.root
+
+
+def serve(app, depth: int, since=None, refresh: bool = False) -> dict | None:
+    """Tree response from cache (full, or changes after `since`); None if uncached."""
+    if not _start():
+        return None
+    tree = _tree(app, depth, refresh)
+    with tree.lock:
+        tree.update()
+        body = {"app": app.name or "unknown", "version": tree.latest, "nodes": tree.count,
+                "truncated": tree.count >= _a11y.MAX_NODES, "cached": True}
+        if since is not None and tree.base <= int(since) <= body["version"]:
+            changes = tree.changes(int(since))
+            return {**body, "since": int(since), "unchanged": not changes, "changes": changes}
+        return {**body, "tree": tree.root.to_json() if tree.root else None}
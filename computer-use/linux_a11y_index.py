@@ -0,0 +1,152 @@
+"""Element index behind Linux /find and /ax_press (AT-SPI2).
+
+A search used to walk the app's tree over D-Bus on every call. Now one walk
+feeds an index keyed by AX role and by normalized title/description words,
+reused for as long as the screen state lasts: while the linux_a11y_cache
+tree's version is unchanged, or for UNCACHED_TTL seconds when there is no
+event listener to tell us. Either way the elements come from the same
+pruned linux_a11y_tree walk. Title words are found through their 1..GRAM
+character substrings, not a scan of the vocabulary. Every indexed element
+gets a handle that stays the same while its accessible object lives, so
+/ax_press can act on a /find result without searching again.
+"""
+from __future__ import annotations
+
+import itertools
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import linux_a11y_cache as _cache
+import linux_a11y_tree as _tree
+
+SEARCH_DEPTH = 8
+GRAM = 3  # Longest vocabulary substring indexed
+UNCACHED_TTL = 2.0  # Seconds a walk is reused without AT-SPI events
+MAX_HANDLES = 5000
+_WORD = re.compile(r"[^\W_]+")
+
+_lock = threading.Lock()
+_indexes: OrderedDict = OrderedDict()  # app -> (stamp, ElementIndex)
+_handles: OrderedDict[str, Element] = OrderedDict()
+_ids: dict = {}  # accessible -> handle
+_counter = itertools.count(1)
+
+
+def words(text: str) -> list[str]:
+    """Lowercase alphanumeric runs — the normalized tokens the index is keyed by."""
+    return _WORD.findall(text.lower())
+
+
+def _grams(word: str, n: int) -> set[str]:
+    return {word[i:i + n] for i in range(len(word) - n + 1)}
+
+
+class Element:
+    __slots__ = ("obj", "data", "texts", "handle")
+
+    def __init__(self, obj, data: dict):
+        self.obj, self.data = obj, data
+        self.texts = (data.get("title", "").lower(), data.get("description", "").lower())
+        self.handle = _register(self)
+
+    def to_json(self) -> dict:
+        return {"handle": self.handle, **self.data}
+
+
+def _register(el: Element) -> str:
+    """Handle for el's accessible, reusing the one it already has (hold _lock)."""
+    handle = _ids.get(el.obj)
+    if handle is None:
+        handle = _ids[el.obj] = f"e{next(_counter)}"
+    _handles.pop(handle, None)
+    _handles[handle] = el
+    while len(_handles) > MAX_HANDLES:
+        _, old = _handles.popitem(last=False)
+        _ids.pop(old.obj, None)
+    return handle
+
+
+def resolve(handle: str) -> Element | None:
+    """The element a handle was issued for, or None once it has been evicted."""
+    with _lock:
+        return _handles.get(handle)
+
+
+class ElementIndex:
+    """Elements in document order, posted by AX role and by title/description word."""
+
+    def __init__(self, entries):
+        self.elements: list[Element] = []
+        self.by_role: dict[str, list[int]] = {}
+        self.by_word: dict[str, list[int]] = {}
+        for obj, data in entries:
+            el, pos = Element(obj, data), len(self.elements)
+            self.elements.append(el)
+            self.by_role.setdefault(data["role"], []).append(pos)
+            for w in set(words(" ".join(el.texts))):
+                self.by_word.setdefault(w, []).append(pos)
+        self.by_gram: dict[str, set[str]] = {}  # 1..GRAM-char substring -> words containing it
+        for w in self.by_word:
+            for n in range(1, GRAM + 1):
+                for g in _grams(w, n):
+                    self.by_gram.setdefault(g, set()).add(w)
+
+    def _vocab(self, w: str):
+        """Indexed words containing w."""
+        if len(w) <= GRAM:
+            return self.by_gram.get(w, ())
+        found = set.intersection(*(self.by_gram.get(g, set()) for g in _grams(w, GRAM)))
+        return [v for v in found if w in v]
+
+    def find(self, role: str = "", title: str = "") -> list[Element]:
+        """Matches in document order: exact role, and title a case-insensitive
+        substring of the element's title or description (ax_press's rules)."""
+        if not role and not title:
+            return []
+        title = title.lower()
+        hits = set(self.by_role.get(role, ())) if role else None
+        for w in set(words(title)):
+            # Every word of a substring lies inside one word of the matched text
+            found = {p for vocab in self._vocab(w) for p in self.by_word[vocab]}
+            hits = found if hits is None else hits & found
+        order = sorted(hits) if hits is not None else range(len(self.elements))
+        return [self.elements[p] for p in order
+                if any(title in t for t in self.elements[p].texts)]
+
+
+def _entries(app, snap):
+    """(accessible, node dict) in document order from the cached tree, or from
+    a walk built and pruned the same way when there is no listener."""
+    if snap is None:
+        root = _tree.build(app, 0, SEARCH_DEPTH, {"count": 0}, None, 0)
+    else:
+        root = snap[1]
+    return ((n.obj, n.data) for n in _tree.walk(root)) if root else ()
+
+
+def get(app) -> ElementIndex:
+    """Index of the app's current screen state, built at most once per state."""
+    snap = _cache.snapshot(app, SEARCH_DEPTH)
+    now = time.monotonic()
+    with _lock:
+        stamp, index = _indexes.pop(app, (None, None))
+        if snap is not None:
+            fresh = stamp == ("version", snap[0])
+        else:
+            fresh = stamp is not None and stamp[0] == "walked" and now - stamp[1] < UNCACHED_TTL
+        if not fresh:
+            index = ElementIndex(_entries(app, snap))
+            stamp = ("version", snap[0]) if snap is not None else ("walked", now)
+        _indexes[app] = stamp, index
+        while len(_indexes) > _cache.MAX_TREES:
+            _indexes.popitem(last=False)
+        return index
+
+
+def expire_walks():
+    """Drop indexes no event listener keeps fresh (after a press changed the UI)."""
+    with _lock:
+        for app in [a for a, (stamp, _) in _indexes.items() if stamp[0] == "walked"]:
+            del _indexes[app]
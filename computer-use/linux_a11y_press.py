@@ -1,59 +1,70 @@
 """Accessibility element search + press for Linux (AT-SPI2).
 
-Extracted from linux_a11y.py — find_elements / click_element handlers.
+Extracted from linux_a11y.py — /find and /ax_press handlers, both served
+from the element index in linux_a11y_index.py.
 """
 from __future__ import annotations
 
 import linux_a11y as _a11y
+import linux_a11y_index as _index
 
+DEFAULT_LIMIT = 30
 
-def _search_press(obj, depth, target, state):
-    if obj is None or depth > 8 or state["count"] >= _a11y.MAX_NODES:
-        return None
-    state["count"] += 1
-    role = _a11y._role(obj)
-    name = _a11y._attr(obj, "name", "")
-    desc = _a11y._attr(obj, "description", "")
-    rs = _a11y._axrole(role)
-    match_r = not target["role"] or rs == target["role"]
-    match_t = not target["title"] or (
-        target["title"] in name.lower() or target["title"] in desc.lower())
-    if match_r and match_t and (target["role"] or target["title"]):
-        state["mi"] += 1
-        if state["mi"] == target["index"]:
-            title = name or desc
-            try:
-                ai = obj.queryAction()
-                for ta in _a11y.TRY_ACTIONS:
-                    for i in range(ai.nActions):
-                        if ai.getName(i) == ta:
-                            ai.doAction(i)
-                            return {"pressed": True, "action": ta,
-                                    "title": title, "role": rs}
-                return {"pressed": False, "title": title, "role": rs,
-                        "error": "no supported action"}
-            except (RuntimeError, AttributeError, NotImplementedError):
-                return {"pressed": False, "title": title, "role": rs,
-                        "error": "no action interface"}
+
+def _press(el) -> dict:
+    title, rs = el.data.get("title") or el.data.get("description", ""), el.data["role"]
+    try:
+        ai = el.obj.queryAction()
+        for ta in _a11y.TRY_ACTIONS:
+            for i in range(ai.nActions):
+                if ai.getName(i) == ta:
+                    ai.doAction(i)
+                    _index.expire_walks()
+                    return {"pressed": True, "action": ta, "title": title, "role": rs}
+        return {"pressed": False, "title": title, "role": rs, "error": "no supported action"}
+    except (RuntimeError, AttributeError, NotImplementedError):
+        return {"pressed": False, "title": title, "role": rs, "error": "no action interface"}
+
+
+def _int_param(params, key, default):
     try:
-        for i in range(obj.childCount):
-            r = _search_press(obj.getChildAtIndex(i), depth + 1, target, state)
-            if r:
-                return r
-    except (RuntimeError, AttributeError):
-        pass
-    return None
+        return int(params.get(key) if params.get(key) is not None else default), None
+    except (TypeError, ValueError):
+        return None, {"error": f"{key} must be an integer"}
+
+
+def find_elements(params):
+    """Every element matching role/title, with frames and press handles."""
+    role, title = params.get("role") or "", params.get("title") or ""
+    if not role and not title:
+        return {"error": "role or title required"}, 400
+    limit, err = _int_param(params, "limit", DEFAULT_LIMIT)
+    if err:
+        return err, 400
+    app, err = _a11y._get_app(params.get("app"))
+    if err:
+        return {"error": err}, 404
+    index = _index.get(app)
+    matches = index.find(role, title)
+    return {"app": app.name or "unknown", "count": len(matches), "searched": len(index.elements),
+            "elements": [el.to_json() for el in matches[:max(0, limit)]]}, 200
 
 
 def ax_press(params):
+    """Press the element behind a /find handle, or the index-th role/title match."""
+    if params.get("handle"):
+        el = _index.resolve(str(params["handle"]))
+        if el is None:
+            return {"error": "unknown or expired handle", "handle": params["handle"]}, 404
+        return _press(el), 200
+    nth, err = _int_param(params, "index", 0)
+    if err:
+        return err, 400
     app, err = _a11y._get_app(params.get("app"))
     if err:
         return {"error": err}, 404
-    target = {"title": (params.get("title") or "").lower(),
-              "role": params.get("role", ""),
-              "index": params.get("index", 0)}
-    state = {"count": 0, "mi": -1}
-    result = _search_press(app, 0, target, state)
-    if result:
-        return result, 200
-    return {"error": "element not found", "searched": state["count"]}, 404
+    index = _index.get(app)
+    matches = index.find(params.get("role") or "", params.get("title") or "")
+    if 0 <= nth < len(matches):
+        return _press(matches[nth]), 200
+    return {"error": "element not found", "searched": len(index.elements)}, 404
@@ -0,0 +1,160 @@
+"""Versioned AT-SPI node trees behind the Linux a11y cache (linux_a11y_cache).
+
+Extracted from linux_a11y_cache.py to keep it under 200 lines. A Tree is
+built with linux_a11y's limits and pruning, indexed by accessible, and
+rebuilds its dirty subtrees in place, stamping each with a new version.
+Walks run under the tree's own lock; the event listener only ever takes a
+short lock around the dirty marks, so it never waits on D-Bus.
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+
+import linux_a11y as _a11y
+
+MAX_PARENT_HOPS = 64
+
+_versions = itertools.count(1)  # Global, so versions never repeat across trees
+
+
+class Node:
+    __slots__ = ("obj", "parent", "depth", "data", "children", "version", "size")
+
+    def __init__(self, obj, parent, depth, data, version):
+        self.obj, self.parent, self.depth, self.data = obj, parent, depth, data
+        self.children: list[Node] = []
+        self.version, self.size = version, 0
+
+    def to_json(self) -> dict:
+        if not self.children:
+            return dict(self.data)
+        return {**self.data, "children": [c.to_json() for c in self.children]}
+
+
+def build(obj, depth, max_depth, state, parent, version):
+    """_a11y._build_tree, producing Nodes (same limits and pruning)."""
+    if obj is None or depth > max_depth or state["count"] >= _a11y.MAX_NODES:
+        return None
+    before = state["count"]
+    state["count"] += 1
+    role, data = _a11y._node_attrs(obj)
+    node = Node(obj, parent, depth, data, version)
+    if depth < max_depth and state["count"] < _a11y.MAX_NODES:
+        try:
+            for i in range(obj.childCount):
+                if state["count"] >= _a11y.MAX_NODES:
+                    break
+                child = build(obj.getChildAtIndex(i), depth + 1, max_depth, state, node, version)
+                if child:
+                    node.children.append(child)
+        except (RuntimeError, AttributeError):
+            pass
+    node.size = state["count"] - before
+    if not node.children and _a11y._prunable(role, data):
+        return None
+    return node
+
+
+def walk(node):
+    yield node
+    for child in node.children:
+        yield from walk(child)
+
+
+class Tree:
+    """Cached tree of one (app, depth). Hold `lock` to update or read its nodes."""
+
+    def __init__(self, app, depth: int):
+        self.app, self.depth = app, depth
+        self.lock = threading.Lock()
+        self._marks = threading.Lock()  # Guards dirty and pending
+        self.base = self.latest = next(_versions)
+        self.root, self.count, self.index, self.dirty = None, 0, {}, set()
+        self.pending: set | None = set()  # Event sources seen before the first build ended
+
+    def update(self):
+        """Walk the app the first time, afterwards rebuild what events marked dirty."""
+        if self.pending is None:
+            self.refresh()
+            return
+        state = {"count": 0}
+        self.root = build(self.app, 0, self.depth, state, None, self.base)
+        self.count = state["count"]
+        self.index = {n.obj: n for n in walk(self.root)} if self.root else {}
+        with self._marks:
+            pending, self.pending = self.pending, None
+        for source in pending:  # Changed while we walked: the walk may have missed it
+            self.mark(source)
+
+    def mark(self, source):
+        """Mark the nearest indexed ancestor of an event source dirty (listener thread)."""
+        with self._marks:
+            if self.pending is not None:
+                self.pending.add(source)
+                return
+        obj, hops = source, 0
+        while obj is not None and hops < MAX_PARENT_HOPS and obj not in self.index:
+            obj, hops = _a11y._attr(obj, "parent", None), hops + 1
+        node = self.index.get(obj) if obj is not None else None
+        if node is not None:
+            with self._marks:
+                self.dirty.add(node)
+
+    def _current(self, node):
+        """The node now standing for node's accessible, or for its nearest ancestor's."""
+        while node is not None:
+            current = self.index.get(node.obj)
+            if current is not None:
+                return current
+            node = node.parent
+        return None
+
+    def _rebuild(self, node: Node):
+        version = self.latest = next(_versions)
+        state = {"count": self.count - node.size}
+        new = build(node.obj, node.depth, self.depth, state, node.parent, version)
+        if new is None and node.parent is not None:
+            return self._rebuild(node.parent)  # Pruned away: the parent's children shift
+        for old in walk(node):
+            self.index.pop(old.obj, None)
+        if node.parent is None:
+            self.root = new
+        else:
+            siblings = node.parent.children
+            siblings[next(i for i, c in enumerate(siblings) if c is node)] = new
+        delta = (new.size if new else 0) - node.size
+        ancestor = node.parent
+        while ancestor is not None:
+            ancestor.size += delta
+            ancestor = ancestor.parent
+        if new:
+            self.index.update((n.obj, n) for n in walk(new))
+        self.count = state["count"]
+
+    def refresh(self):
+        """Rebuild the topmost dirty subtrees.
+
+        A mark made while a rebuild was walking may name a node that rebuild
+        then replaced; it carries over to the replacement (or the nearest
+        ancestor still in the tree) instead of being dropped."""
+        with self._marks:
+            marked, self.dirty = self.dirty, set()
+        dirty = {n for n in map(self._current, marked) if n is not None}
+        for node in dirty:
+            ancestor = node.parent
+            while ancestor is not None and ancestor not in dirty:
+                ancestor = ancestor.parent
+            if ancestor is None and self.index.get(node.obj) is node:
+                self._rebuild(node)
+
+    def changes(self, since: int) -> list[dict]:
+        """Topmost subtrees rebuilt after `since`, with child-index paths from the root."""
+        out, stack = [], [(self.root, [])] if self.root else []
+        while stack:
+            node, path = stack.pop()
+            if node.version > since:
+                out.append({"path": path, "node": node.to_json()})
+            else:
+                stack.extend((c, path + [i]) for i, c in reversed(list(enumerate(node.children))))
+        return out
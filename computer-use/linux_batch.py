@@ -0,0 +1,76 @@
+"""/batch for Linux computer-use: run an ordered list of actions in one request.
+
+Each step names a POST route ("click", "type", "screenshot", "wait_stable",
+...) plus that route's params, and is dispatched exactly like a standalone
+request: same per-resource lock, same deadline. Every step is validated
+before any runs. Steps run in order with an optional delay_ms after each,
+and "sleep" pauses for ms. The batch stops at the first failing step and
+reports per-step results and timings.
+"""
+from __future__ import annotations
+
+import time
+
+MAX_STEPS = 100
+MAX_BATCH_SECS = 300.0
+_NOT_BATCHABLE = {"/batch", "/reload"}
+
+
+def _sleep_ms(params: dict) -> float:
+    """A sleep step's ms; ValueError/TypeError unless a number of ms within 0..MAX_BATCH_SECS."""
+    ms = float(params.get("ms", 0))
+    if not 0 <= ms <= MAX_BATCH_SECS * 1000:
+        raise ValueError(f"ms out of range: {ms}")
+    return ms
+
+
+def _sleep(params: dict) -> tuple[dict, int]:
+    time.sleep(params["ms"] / 1000)
+    return {"slept_ms": params["ms"]}, 200
+
+
+def run_batch(params: dict, routes: dict, dispatch) -> tuple[dict, int]:
+    """Execute params["actions"] via dispatch(path, handler, params)."""
+    actions = params.get("actions")
+    if not isinstance(actions, list) or not actions:
+        return {"error": "actions must be a non-empty list"}, 400
+    if len(actions) > MAX_STEPS:
+        return {"error": f"at most {MAX_STEPS} actions per batch"}, 400
+    steps = []
+    for i, step in enumerate(actions):
+        name = str(step.get("action", "")).lstrip("/") if isinstance(step, dict) else ""
+        path = f"/{name}"
+        if name != "sleep" and (path not in routes or path in _NOT_BATCHABLE):
+            return {"error": f"step {i}: unknown action {name or step!r}"}, 400
+        try:
+            delay_ms = float(step.get("delay_ms") or 0)
+        except (TypeError, ValueError):
+            return {"error": f"step {i}: delay_ms must be a number"}, 400
+        step_params = {k: v for k, v in step.items() if k not in ("action", "delay_ms")}
+        if name == "sleep":
+            try:
+                step_params["ms"] = _sleep_ms(step_params)
+            except (TypeError, ValueError):
+                return {"error": f"step {i}: ms must be a number from 0 to "
+                                 f"{MAX_BATCH_SECS * 1000:g}"}, 400
+        steps.append((name, path, step_params, delay_ms))
+    start = time.monotonic()
+    results, body, code = [], {}, 200
+    for i, (name, path, step_params, delay_ms) in enumerate(steps):
+        if time.monotonic() - start > MAX_BATCH_SECS:
+            body, code = {"error": f"batch exceeded {MAX_BATCH_SECS:g}s before step {i}"}, 504
+            break
+        t0 = time.monotonic()
+        if name == "sleep":
+            result, status = _sleep(step_params)
+        else:
+            result, status = dispatch(path, routes[path], step_params)
+        results.append({"action": name, "status": status, "ms": round((time.monotonic() - t0) * 1000),
+                        "result": result})
+        if status >= 400:
+            body, code = {"error": f"step {i} ({name}) failed: {result.get('error', status)}"}, status
+            break
+        if delay_ms > 0:
+            time.sleep(min(delay_ms, MAX_BATCH_SECS * 1000) / 1000)
+    return {**body, "ok": code == 200, "completed": sum(r["status"] < 400 for r in results),
+            "results": results, "total_ms": round((time.monotonic() - start) * 1000)}, code
@@ -0,0 +1,165 @@
+"""In-memory screen capture for Linux computer-use via MIT-SHM (XShmGetImage).
+
+One persistent X connection and one shared-memory segment sized to the
+screen: a capture is a single XShmGetImage into memory we already own,
+with no scrot, temp file or PNG round trip. The screen size is cached and
+re-read only when the root window reports a ConfigureNotify (RandR
+resize). get() returns None when libXext / MIT-SHM / the display is
+unavailable, or RELAYGENT_CAPTURE_BACKEND=scrot, so callers use scrot.
+"""
+from __future__ import annotations
+
+import ctypes
+import logging
+import os
+import threading
+
+import linux_xlib
+
+logger = logging.getLogger(__name__)
+
+_ZPIXMAP = 2
+_ALL_PLANES = 0xFFFFFFFF
+_STRUCTURE_NOTIFY_MASK = 1 << 17
+_CONFIGURE_NOTIFY = 22
+_IPC_PRIVATE, _IPC_CREAT, _IPC_RMID = 0, 0o1000, 0
+
+
+class XImage(ctypes.Structure):
+    _fields_ = [(n, ctypes.c_int) for n in ("width", "height", "xoffset", "format")] + [
+        ("data", ctypes.c_void_p)] + [(n, ctypes.c_int) for n in (
+            "byte_order", "bitmap_unit", "bitmap_bit_order", "bitmap_pad", "depth",
+            "bytes_per_line", "bits_per_pixel")] + [
+        (n, ctypes.c_ulong) for n in ("red_mask", "green_mask", "blue_mask")]
+
+
+class ShmSegmentInfo(ctypes.Structure):
+    _fields_ = [("shmseg", ctypes.c_ulong), ("shmid", ctypes.c_int),
+                ("shmaddr", ctypes.c_void_p), ("readOnly", ctypes.c_int)]
+
+
+def _libc():
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+    libc.shmat.restype = ctypes.c_void_p
+    libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    libc.shmdt.argtypes = [ctypes.c_void_p]
+    libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+    return libc
+
+
+class ShmCapture:
+    def __init__(self, x11, xext, display, libc):
+        self.x11, self.xext, self.dpy, self.libc = x11, xext, display, libc
+        self.lock = threading.Lock()
+        screen = x11.XDefaultScreen(display)
+        self.visual = x11.XDefaultVisual(display, screen)
+        self.depth = x11.XDefaultDepth(display, screen)
+        self.root = x11.XDefaultRootWindow(display)
+        x11.XSelectInput(display, self.root, _STRUCTURE_NOTIFY_MASK)
+        self._event = ctypes.create_string_buffer(192)  # sizeof(XEvent)
+        self._size = self._query_size()
+        self._image, self._shm = None, None
+
+    def _query_size(self) -> tuple[int, int]:
+        root, x, y = ctypes.c_ulong(), ctypes.c_int(), ctypes.c_int()
+        w, h, border, depth = (ctypes.c_uint() for _ in range(4))
+        self.x11.XGetGeometry(self.dpy, self.root, *map(ctypes.byref, (
+            root, x, y, w, h, border, depth)))
+        return w.value, h.value
+
+    def _size_locked(self) -> tuple[int, int]:
+        changed = False
+        while self.x11.XCheckTypedWindowEvent(self.dpy, self.root, _CONFIGURE_NOTIFY, self._event):
+            changed = True
+        if changed:
+            self._size = self._query_size()
+        return self._size
+
+    def size(self) -> tuple[int, int]:
+        """Cached screen size, refreshed after a RandR/root resize."""
+        with self.lock:
+            return self._size_locked()
+
+    def _release(self):
+        if self._image is not None:
+            self.xext.XShmDetach(self.dpy, ctypes.byref(self._shm))
+            self.x11.XSync(self.dpy, False)
+            self.libc.shmdt(self._shm.shmaddr)
+            self.x11.XFree(self._image)  # The struct only; data is the shm segment
+            self._image, self._shm = None, None
+
+    def _ensure_image(self, w: int, h: int) -> XImage:
+        if self._image is not None:
+            img = XImage.from_address(self._image)
+            if (img.width, img.height) == (w, h):
+                return img
+            self._release()
+        shm = ShmSegmentInfo()
+        ptr = self.xext.XShmCreateImage(self.dpy, self.visual, self.depth, _ZPIXMAP, None,
+                                        ctypes.byref(shm), w, h)
+        if not ptr:
+            raise OSError("XShmCreateImage failed")
+        img = XImage.from_address(ptr)
+        shm.shmid = self.libc.shmget(_IPC_PRIVATE, img.bytes_per_line * h, _IPC_CREAT | 0o600)
+        if shm.shmid < 0:
+            self.x11.XFree(ptr)
+            raise OSError(ctypes.get_errno(), "shmget failed")
+        addr = self.libc.shmat(shm.shmid, None, 0)
+        if addr in (None, ctypes.c_void_p(-1).value):
+            self.libc.shmctl(shm.shmid, _IPC_RMID, None)
+            self.x11.XFree(ptr)
+            raise OSError(ctypes.get_errno(), "shmat failed")
+        shm.shmaddr = img.data = addr
+        self.xext.XShmAttach(self.dpy, ctypes.byref(shm))
+        self.x11.XSync(self.dpy, False)
+        self.libc.shmctl(shm.shmid, _IPC_RMID, None)  # Freed once both sides detach
+        self._image, self._shm = ptr, shm
+        return img
+
+    def grab(self) -> tuple[int, int, bytes]:
+        """(width, height, BGRX pixels) of the whole screen."""
+        with self.lock:
+            w, h = self._size_locked()
+            img = self._ensure_image(w, h)
+            if not self.xext.XShmGetImage(self.dpy, self.root, self._image, 0, 0, _ALL_PLANES):
+                raise OSError("XShmGetImage failed")
+            if img.bits_per_pixel != 32 or img.red_mask != 0xFF0000 or img.byte_order != 0:
+                raise OSError(f"unsupported pixel format ({img.bits_per_pixel}bpp)")
+            data = ctypes.string_at(img.data, img.bytes_per_line * h)
+        if img.bytes_per_line != w * 4:
+            stride = img.bytes_per_line
+            data = b"".join(data[r * stride:r * stride + w * 4] for r in range(h))
+        return w, h, data
+
+
+_lock = threading.Lock()
+_backend: ShmCapture | None = None
+_tried = False
+
+
+def _connect() -> ShmCapture | None:
+    if os.environ.get("RELAYGENT_CAPTURE_BACKEND", "").lower() == "scrot":
+        return None
+    opened = linux_xlib.open_display("Xext")
+    if opened is None:
+        return None
+    x11, xext, display = opened
+    if not xext.XShmQueryExtension(display):
+        logger.info("MIT-SHM unavailable; using scrot for screenshots")
+        return None
+    try:
+        return ShmCapture(x11, xext, display, _libc())
+    except (OSError, AttributeError) as e:
+        logger.info("XShm capture unavailable (%s); using scrot", e)
+        return None
+
+
+def get() -> ShmCapture | None:
+    """Shared capture backend, or None to use scrot. Connects once."""
+    global _backend, _tried
+    with _lock:
+        if not _tried:
+            _tried = True
+            _backend = _connect()
+        return _backend
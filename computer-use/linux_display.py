@@ -13,53 +13,6 @@ def _run(args, timeout=5):
     return r.stdout.strip()
 
 
-def screen_size() -> tuple[int, int]:
-    try:
-        out = _run(["xdpyinfo"])
-        for line in out.splitlines():
-            if "dimensions:" in line:
-                w, h = line.split()[1].split("x")
-                return int(w), int(h)
-    except (subprocess.SubprocessError, FileNotFoundError, ValueError):
-        pass
-    try:
-        out = _run(["xrandr", "--current"])
-        for line in out.splitlines():
-            if " connected" in line:
-                for part in line.split():
-                    if "x" in part and "+" in part:
-                        w, h = part.split("+")[0].split("x")
-                        return int(w), int(h)
-    except (subprocess.SubprocessError, FileNotFoundError, ValueError):
-        pass
-    return 1920, 1080
-
-def screenshot(params: dict) -> tuple[dict, int]:
-    path = params.get("path", "/tmp/claude-screenshot.png")
-    x, y = params.get("x"), params.get("y")
-    w, h = params.get("w"), params.get("h")
-
-    if x is not None and y is not None and w is not None and h is not None:
-        _run(["scrot", "-o", path])
-        crop = f"{int(w)}x{int(h)}+{int(x)}+{int(y)}"
-        _run(["convert", path, "-crop", crop, "+repage", path])
-        return {"path": path, "width": int(w), "height": int(h),
-                "crop": {"x": x, "y": y, "w": w, "h": h}}, 200
-
-    _run(["scrot", "-o", path])
-
-    ix, iy = params.get("indicator_x"), params.get("indicator_y")
-    if ix is not None and iy is not None:
-        _run(["convert", path,
-              "-fill", "none", "-stroke", "red", "-strokewidth", "3",
-              "-draw", f"circle {int(ix)},{int(iy)} {int(ix)+18},{int(iy)}",
-              "-fill", "red", "-stroke", "none",
-              "-draw", f"circle {int(ix)},{int(iy)} {int(ix)+3},{int(iy)}",
-              path])
-
-    sw, sh = screen_size()
-    return {"path": path, "width": sw, "height": sh}, 200
-
 def windows(_params: dict) -> tuple[dict, int]:
     wins = []
     wm_classes: dict[str, str] = {}
@@ -139,4 +92,6 @@ def focus(params: dict) -> tuple[dict, int]:
     except (subprocess.SubprocessError, FileNotFoundError): pass
     return {"error": "not found"}, 404
 
-from linux_launch import launch  # noqa: F401 — re-exported for linux-server.py
+# Re-exported for linux-server.py
+from linux_launch import launch  # noqa: F401,E402
+from linux_screenshot import screen_size, screenshot  # noqa: F401,E402
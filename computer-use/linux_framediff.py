@@ -0,0 +1,86 @@
+"""Frame diffing for Linux screenshots: return only what changed since a client's last frame.
+
+The previous raw BGRX frame is kept in memory per client. Frames are
+compared row by row (bytes equality is a memcmp), then only changed rows
+are compared tile by tile; dirty tiles are grouped into bounding boxes.
+Every FULL_EVERY calls a full frame is forced so the client never drifts.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+
+TILE = 32
+FULL_EVERY = int(os.environ.get("RELAYGENT_DIFF_FULL_EVERY", "10"))
+MAX_CLIENTS = 4  # Each frame is a full screen buffer (~8 MB at 1080p)
+
+_lock = threading.Lock()
+_frames: OrderedDict[str, tuple[int, int, bytes, int]] = OrderedDict()
+
+
+def changed_tiles(prev: bytes, cur: bytes, width: int, height: int,
+                  tile: int = TILE) -> set[tuple[int, int]]:
+    """(column, row) indices of tiles whose pixels differ."""
+    stride, dirty = width * 4, set()
+    for y in range(height):
+        start = y * stride
+        if prev[start:start + stride] == cur[start:start + stride]:
+            continue
+        ty = y // tile
+        for tx in range((width + tile - 1) // tile):
+            if (tx, ty) not in dirty:
+                a, b = start + tx * tile * 4, start + min((tx + 1) * tile, width) * 4
+                if prev[a:b] != cur[a:b]:
+                    dirty.add((tx, ty))
+    return dirty
+
+
+def regions(tiles: set[tuple[int, int]], width: int, height: int,
+            tile: int = TILE) -> list[dict]:
+    """Bounding boxes (screen px) of 8-connected groups of dirty tiles."""
+    boxes, seen = [], set()
+    for first in sorted(tiles, key=lambda t: (t[1], t[0])):
+        if first in seen:
+            continue
+        seen.add(first)
+        stack, x0, y0, x1, y1 = [first], first[0], first[1], first[0], first[1]
+        while stack:
+            tx, ty = stack.pop()
+            x0, y0, x1, y1 = min(x0, tx), min(y0, ty), max(x1, tx), max(y1, ty)
+            for n in ((tx + dx, ty + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)):
+                if n in tiles and n not in seen:
+                    seen.add(n)
+                    stack.append(n)
+        x, y = x0 * tile, y0 * tile
+        boxes.append({"x": x, "y": y, "w": min((x1 + 1) * tile, width) - x,
+                      "h": min((y1 + 1) * tile, height) - y})
+    return boxes
+
+
+def diff(client: str, width: int, height: int, pixels: bytes,
+         full_every: int = FULL_EVERY) -> list[dict] | None:
+    """Changed regions since this client's last frame ([] if unchanged), or None
+    when a full frame is due (first call, resize, or every full_every calls)."""
+    pixels = bytes(pixels)
+    with _lock:
+        prev = _frames.pop(client, None)
+        since_full = prev[3] + 1 if prev else 0
+        if prev is None or prev[:2] != (width, height) or since_full >= max(1, full_every):
+            since_full, prev = 0, None
+        _frames[client] = (width, height, pixels, since_full)
+        while len(_frames) > MAX_CLIENTS:
+            _frames.popitem(last=False)
+    if prev is None:
+        return None
+    if prev[2] == pixels:
+        return []
+    return regions(changed_tiles(prev[2], pixels, width, height), width, height)
+
+
+def reset(client: str | None = None) -> None:
+    with _lock:
+        if client is None:
+            _frames.clear()
+        else:
+            _frames.pop(client, None)
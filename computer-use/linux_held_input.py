@@ -1,12 +1,14 @@
 """Held input handlers for Linux: key_down/up, mouse_down/up, mouse_move, release_all, input_sequence.
 
-Extracted from linux_input.py to keep it under 200 lines.
+Extracted from linux_input.py to keep it under 200 lines. Shares its XTest-or-xdotool
+primitives; with XTest, release_all only releases keys and buttons actually held.
+input_sequence runs on the shared deadline scheduler (linux_scheduler).
 """
 from __future__ import annotations
 
-import threading
-
-from linux_input import _xdotool, _mod_flags, KEY_MAP
+import linux_scheduler
+import linux_xtest
+from linux_input import _xdotool, _mod_flags, _key, _button, _move, KEY_MAP
 
 
 def key_down(params: dict) -> tuple[dict, int]:
@@ -16,8 +18,8 @@ def key_down(params: dict) -> tuple[dict, int]:
     xkey = KEY_MAP.get(key.lower(), key)
     mods = _mod_flags(params.get("modifiers"))
     for m in mods:
-        _xdotool("keydown", m)
-    _xdotool("keydown", xkey)
+        _key(m, True)
+    _key(xkey, True)
     label = ("+".join(mods) + "+" if mods else "") + key
     return {"held": label}, 200
 
@@ -27,9 +29,9 @@ def key_up(params: dict) -> tuple[dict, int]:
         return {"error": "key required"}, 400
     xkey = KEY_MAP.get(key.lower(), key)
     mods = _mod_flags(params.get("modifiers"))
-    _xdotool("keyup", xkey)
+    _key(xkey, False)
     for m in reversed(mods):
-        _xdotool("keyup", m)
+        _key(m, False)
     label = ("+".join(mods) + "+" if mods else "") + key
     return {"released": label}, 200
 
@@ -37,28 +39,33 @@ def key_up(params: dict) -> tuple[dict, int]:
 def mouse_down(params: dict) -> tuple[dict, int]:
     btn = str(params.get("button", 1))
     if params.get("x") is not None and params.get("y") is not None:
-        _xdotool("mousemove", "--sync", str(int(params["x"])), str(int(params["y"])))
-    _xdotool("mousedown", btn)
+        _move(params["x"], params["y"])
+    _button(btn, True)
     return {"held": f"mouse{btn}"}, 200
 
 def mouse_up(params: dict) -> tuple[dict, int]:
     btn = str(params.get("button", 1))
     if params.get("x") is not None and params.get("y") is not None:
-        _xdotool("mousemove", "--sync", str(int(params["x"])), str(int(params["y"])))
-    _xdotool("mouseup", btn)
+        _move(params["x"], params["y"])
+    _button(btn, False)
     return {"released": f"mouse{btn}"}, 200
 
 def mouse_move(params: dict) -> tuple[dict, int]:
     x, y = params.get("x"), params.get("y")
     if x is None or y is None:
         return {"error": "x,y required"}, 400
-    _xdotool("mousemove", "--sync", str(int(x)), str(int(y)))
+    _move(x, y)
     return {"moved": {"x": int(x), "y": int(y)}}, 200
 
 _RELEASE_KEYS = "Up Down Left Right space Return shift ctrl alt".split() + list("abcdefghijklmnopqrstuvwxyz")
 
 
 def release_all(_params: dict) -> tuple[dict, int]:
+    xt = linux_xtest.get()
+    if xt:  # Only what the server reports as actually held
+        keycodes, buttons = xt.held_keycodes(), xt.held_buttons()
+        xt.release(keycodes, buttons)
+        return {"released": "all", "count": len(keycodes) + len(buttons)}, 200
     for key in _RELEASE_KEYS:
         try: _xdotool("keyup", key)
         except Exception: pass
@@ -68,16 +75,24 @@ def release_all(_params: dict) -> tuple[dict, int]:
     return {"released": "all", "count": len(_RELEASE_KEYS) + 3}, 200
 
 def input_sequence(params: dict) -> tuple[dict, int]:
+    """Run actions at `delay` ms from now, in (delay, list) order. wait=true blocks
+    until all have run and returns actual timestamps and jitter stats."""
     actions = params.get("actions", [])
     if not actions:
         return {"error": "actions array required"}, 400
     dispatch = {"key_down": key_down, "key_up": key_up, "mouse_down": mouse_down,
                 "mouse_up": mouse_up, "mouse_move": mouse_move, "release_all": release_all,
                 "key_press": lambda a: (key_down(a), key_up(a))}
-    for a in actions:
-        fn = dispatch.get(a.get("action"))
-        if not fn: continue
-        delay = (a.get("delay") or 0) / 1000.0
-        if delay > 0: threading.Timer(delay, fn, args=[a]).start()
-        else: fn(a)
-    return {"queued": len(actions), "duration_ms": max((a.get("delay") or 0) for a in actions)}, 200
+    try:
+        items = [(float(a.get("delay") or 0) / 1000.0, dispatch[a["action"]], a, a["action"])
+                 for a in actions if a.get("action") in dispatch]
+    except (TypeError, ValueError):
+        return {"error": "delay must be a number of ms"}, 400
+    duration = max((d for d, *_ in items), default=0.0)
+    batch = linux_scheduler.submit(items)
+    summary = {"queued": len(actions), "duration_ms": round(duration * 1000)}
+    if str(params.get("wait", "")).lower() not in ("1", "true"):
+        return summary, 200
+    if not batch.wait(duration + 10):
+        return {**summary, **batch.report(), "error": "sequence did not finish"}, 504
+    return {**summary, "skipped": len(actions) - len(items), **batch.report()}, 200
@@ -0,0 +1,124 @@
+"""In-process image helpers for Linux screenshots: crop, indicator, scale, encode.
+
+Work directly on the 32-bit BGRX buffer an XShm capture returns, so a
+screenshot is scaled and encoded once with no temp files, decoders or
+subprocesses. Pillow, when installed, supplies Lanczos scaling and JPEG/WebP;
+without it frames are scaled nearest-neighbour and always encoded as PNG.
+Channel shuffles use extended slices, which run in C.
+"""
+from __future__ import annotations
+
+import io
+import os
+import struct
+import tempfile
+import zlib
+from array import array
+from operator import itemgetter
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+PNG_LEVEL = 1  # zlib level: local files, so favour speed over a few % of size
+INDICATOR_RADIUS = 18
+INDICATOR_STROKE = 3
+INDICATOR_DOT = 3
+_RED = b"\x00\x00\xff\x00"  # BGRX
+FORMATS = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+DEFAULT_QUALITY = 80
+
+
+def crop(pixels: bytes, width: int, height: int, x: int, y: int, w: int, h: int):
+    """Slice a BGRX region (clamped to the screen). Returns (bytes, w, h)."""
+    x0, y0 = max(0, min(x, width)), max(0, min(y, height))
+    x1, y1 = max(x0, min(x + w, width)), max(y0, min(y + h, height))
+    stride, start, end = width * 4, x0 * 4, x1 * 4
+    rows = [pixels[r * stride + start:r * stride + end] for r in range(y0, y1)]
+    return b"".join(rows), x1 - x0, y1 - y0
+
+
+def draw_indicator(pixels: bytearray, width: int, height: int, cx: int, cy: int) -> None:
+    """Red ring (radius 18, stroke 3) with a red centre dot, drawn in place."""
+    outer = INDICATOR_RADIUS + INDICATOR_STROKE / 2
+    inner = INDICATOR_RADIUS - INDICATOR_STROKE / 2
+    reach = int(outer) + 1
+    for py in range(max(0, cy - reach), min(height, cy + reach + 1)):
+        dy2 = (py - cy) ** 2
+        for px in range(max(0, cx - reach), min(width, cx + reach + 1)):
+            d2 = dy2 + (px - cx) ** 2
+            if d2 <= INDICATOR_DOT ** 2 or inner ** 2 <= d2 <= outer ** 2:
+                i = (py * width + px) * 4
+                pixels[i:i + 4] = _RED
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return (struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+
+def encode_png(pixels: bytes, width: int, height: int, level: int = PNG_LEVEL) -> bytes:
+    """Encode a BGRX buffer as an 8-bit RGB PNG."""
+    count = width * height
+    rgb = bytearray(count * 3)
+    rgb[0::3] = pixels[2:count * 4:4]
+    rgb[1::3] = pixels[1:count * 4:4]
+    rgb[2::3] = pixels[0:count * 4:4]
+    row = width * 3
+    raw = bytearray((row + 1) * height)  # Filter type 0 (None) byte per row
+    for r in range(height):
+        raw[r * (row + 1) + 1:(r + 1) * (row + 1)] = rgb[r * row:(r + 1) * row]
+    return (b"\x89PNG\r\n\x1a\n"
+            + _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + _chunk(b"IDAT", zlib.compress(bytes(raw), level))
+            + _chunk(b"IEND", b""))
+
+
+def scale(pixels: bytes, width: int, height: int, max_width: int):
+    """Nearest-neighbour downscale of BGRX to at most max_width, keeping aspect.
+    Returns (bytes, w, h); frames already narrow enough are returned as is."""
+    if not max_width or width <= max_width:
+        return pixels, width, height
+    nw, nh = max_width, max(1, round(height * max_width / width))
+    src = memoryview(pixels).cast("I")
+    pick = itemgetter(*((2 * x + 1) * width // (2 * nw) for x in range(nw)))
+    out = array("I")
+    for y in range(nh):
+        row = (2 * y + 1) * height // (2 * nh) * width
+        out.extend(pick(src[row:row + width]))
+    return out.tobytes(), nw, nh
+
+
+def encode(pixels: bytes, width: int, height: int, max_width: int | None = None,
+           fmt: str = "png", quality: int | None = None):
+    """Scale and encode a BGRX frame in one pass. Returns (data, fmt, w, h);
+    fmt falls back to png when Pillow isn't available for jpeg/webp."""
+    if not HAS_PIL:
+        pixels, width, height = scale(pixels, width, height, max_width)
+        return encode_png(pixels, width, height), "png", width, height
+    img = Image.frombuffer("RGB", (width, height), bytes(pixels), "raw", "BGRX", 0, 1)
+    if max_width and width > max_width:
+        img = img.resize((max_width, max(1, round(height * max_width / width))), Image.LANCZOS)
+    buf = io.BytesIO()
+    if fmt == "png":
+        img.save(buf, "PNG", compress_level=PNG_LEVEL)
+    else:
+        img.save(buf, fmt.upper(), quality=int(quality or DEFAULT_QUALITY))
+    return buf.getvalue(), fmt, img.width, img.height
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write via temp file + rename so readers never see a partial PNG."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".png.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
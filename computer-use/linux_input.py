@@ -1,9 +1,15 @@
-"""Input handlers for Linux computer-use: click, type, scroll, drag via xdotool."""
+"""Input handlers for Linux computer-use: click, type, scroll, drag.
+
+Uses the in-process XTest backend (linux_xtest) when available, otherwise
+one xdotool call per primitive.
+"""
 from __future__ import annotations
 
 import subprocess
 import time
 
+import linux_xtest
+
 # xdotool modifier key mapping (macOS names -> X11 names)
 MOD_MAP = {"cmd": "ctrl", "alt": "alt", "ctrl": "ctrl", "shift": "shift"}
 
@@ -34,30 +40,75 @@ def _mod_flags(modifiers: list[str] | None) -> list[str]:
     return [MOD_MAP.get(m.lower(), m.lower()) for m in modifiers]
 
 
+def _move(x, y) -> None:
+    xt = linux_xtest.get()
+    if xt:
+        xt.move(int(x), int(y))
+    else:
+        _xdotool("mousemove", "--sync", str(int(x)), str(int(y)))
+
+def _button(btn, down: bool) -> None:
+    xt = linux_xtest.get()
+    if xt:
+        xt.button(int(btn), down)
+    else:
+        _xdotool("mousedown" if down else "mouseup", str(btn))
+
+def _click(btn: int, repeat: int | None = None, delay_ms: int = 50) -> None:
+    xt = linux_xtest.get()
+    if xt:
+        xt.click(btn, repeat or 1, delay_ms / 1000)
+    elif repeat is None:
+        _xdotool("click", str(btn))
+    else:
+        _xdotool("click", "--repeat", str(repeat), "--delay", str(delay_ms), str(btn))
+
+def _key(xkey: str, down: bool) -> None:
+    xt = linux_xtest.get()
+    if xt:
+        xt.key(xkey, down)
+    else:
+        _xdotool("keydown" if down else "keyup", xkey)
+
+def _key_combo(mods: list[str], xkey: str) -> None:
+    xt = linux_xtest.get()
+    if xt:
+        xt.tap(xkey, mods)
+    else:
+        _xdotool("key", "--clearmodifiers", "+".join(mods + [xkey]))
+
+def _type(text: str) -> None:
+    xt = linux_xtest.get()
+    if xt:
+        xt.type_text(text)
+    else:
+        _xdotool("type", "--clearmodifiers", "--delay", "12", text)
+
+
 def click(params: dict) -> tuple[dict, int]:
     x, y = params.get("x"), params.get("y")
     if x is None or y is None:
         return {"error": "x,y required"}, 400
 
-    _xdotool("mousemove", "--sync", str(int(x)), str(int(y)))
+    _move(x, y)
 
     mods = _mod_flags(params.get("modifiers"))
     for m in mods:
-        _xdotool("keydown", m)
+        _key(m, True)
 
     if params.get("right"):
-        _xdotool("click", "3")
+        _click(3)
     elif params.get("middle"):
-        _xdotool("click", "2")
+        _click(2)
     elif params.get("triple"):
-        _xdotool("click", "--repeat", "3", "--delay", "50", "1")
+        _click(1, 3)
     elif params.get("double"):
-        _xdotool("click", "--repeat", "2", "--delay", "50", "1")
+        _click(1, 2)
     else:
-        _xdotool("click", "1")
+        _click(1)
 
     for m in reversed(mods):
-        _xdotool("keyup", m)
+        _key(m, False)
 
     return {"clicked": {"x": x, "y": y, "modifiers": params.get("modifiers")}}, 200
 
@@ -68,16 +119,11 @@ def type_input(params: dict) -> tuple[dict, int]:
     modifiers = params.get("modifiers")
 
     if text:
-        _xdotool("type", "--clearmodifiers", "--delay", "12", text)
+        _type(text)
         return {"typed": len(text)}, 200
     elif key:
         xkey = KEY_MAP.get(key.lower(), key)
-        mods = _mod_flags(modifiers)
-        if mods:
-            combo = "+".join(mods + [xkey])
-            _xdotool("key", "--clearmodifiers", combo)
-        else:
-            _xdotool("key", "--clearmodifiers", xkey)
+        _key_combo(_mod_flags(modifiers), xkey)
         return {"key": key}, 200
 
     return {"error": "text or key required"}, 400
@@ -88,15 +134,14 @@ def scroll(params: dict) -> tuple[dict, int]:
     reps = params.get("repeat", 1)
 
     if params.get("x") is not None and params.get("y") is not None:
-        _xdotool("mousemove", "--sync",
-                 str(int(params["x"])), str(int(params["y"])))
+        _move(params["x"], params["y"])
 
-    # xdotool: button 4=up, 5=down; positive amount = scroll down
-    button = "5" if amount > 0 else "4"
+    # X buttons: 4=up, 5=down; positive amount = scroll down
+    button = 5 if amount > 0 else 4
     clicks = abs(amount)
 
     for _ in range(int(reps)):
-        _xdotool("click", "--repeat", str(clicks), "--delay", "20", button)
+        _click(button, clicks, 20)
         if reps > 1:
             time.sleep(0.05)
 
@@ -110,13 +155,13 @@ def drag(params: dict) -> tuple[dict, int]:
         return {"error": "startX, startY, endX, endY required"}, 400
     steps = params.get("steps", 10)
     step_delay = params.get("duration", 0.3) / max(steps, 1)
-    _xdotool("mousemove", "--sync", str(int(sx)), str(int(sy)))
-    _xdotool("mousedown", "1")
+    _move(sx, sy)
+    _button(1, True)
     for i in range(1, steps + 1):
         t = i / steps
-        _xdotool("mousemove", "--sync", str(int(sx + (ex - sx) * t)), str(int(sy + (ey - sy) * t)))
+        _move(sx + (ex - sx) * t, sy + (ey - sy) * t)
         time.sleep(step_delay)
-    _xdotool("mouseup", "1")
+    _button(1, False)
     return {"dragged": {"from": {"x": sx, "y": sy}, "to": {"x": ex, "y": ey}}}, 200
 
 
@@ -128,5 +173,5 @@ def type_from_file(params: dict) -> tuple[dict, int]:
         with open(path) as f: text = f.read().rstrip()
     except FileNotFoundError:
         return {"error": "file not found"}, 404
-    _xdotool("type", "--clearmodifiers", "--delay", "12", text)
+    _type(text)
     return {"typed": len(text), "source": path}, 200
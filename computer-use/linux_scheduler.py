@@ -0,0 +1,124 @@
+"""Monotonic-deadline input scheduler for Linux input_sequence.
+
+One daemon thread owns a heap of (deadline, submission order) entries. It
+sleeps on a condition until just before the earliest deadline, spins the
+last SPIN_SECS for precision, then runs the action. Actions due at the same
+time run in submission order, one at a time, so a sequence replays
+deterministically; each run is recorded so callers can wait for the actual
+timestamps and lateness. With a lock set (the server's input lock), the
+thread holds it from a batch's first action to its last, so other input
+routes never land in the middle of a sequence.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+
+SPIN_SECS = 0.002  # Busy-wait this close to a deadline; Condition.wait wakes late
+
+
+class Batch:
+    """Actions submitted together; wait() blocks until all have run."""
+
+    def __init__(self, start: float, count: int):
+        self.start, self.records = start, [None] * count
+        self._left, self._done = count, threading.Event()
+        self._lock = threading.Lock()
+        if not count:
+            self._done.set()
+
+    def _record(self, index: int, label: str, deadline: float, started: float, finished: float,
+                error: str | None) -> bool:
+        """Store one action's timing; True once the whole batch has run."""
+        ms = lambda t: round((t - self.start) * 1000, 3)  # noqa: E731
+        rec = {"index": index, "action": label, "due_ms": ms(deadline), "at_ms": ms(started),
+               "done_ms": ms(finished), "jitter_ms": round((finished - deadline) * 1000, 3)}
+        if error:
+            rec["error"] = error
+        with self._lock:
+            self.records[index] = rec
+            self._left -= 1
+            if not self._left:
+                self._done.set()
+            return not self._left
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def report(self) -> dict:
+        """Per-action execution records plus statistics (ms) of jitter: how
+        late each action finished relative to its deadline."""
+        done = [r for r in self.records if r is not None]
+        jitter = sorted(r["jitter_ms"] for r in done)
+        stats = {}
+        if jitter:
+            pick = lambda q: jitter[min(len(jitter) - 1, int(q * len(jitter)))]  # noqa: E731
+            stats = {"mean": round(sum(jitter) / len(jitter), 3), "p50": pick(0.5),
+                     "p95": pick(0.95), "max": jitter[-1]}
+        return {"executed": done, "jitter_ms": stats}
+
+
+class Scheduler:
+    def __init__(self, lock=None):
+        self.lock = lock  # Held while any batch is part-way through
+        self._heap: list = []
+        self._cond = threading.Condition()
+        self._order = itertools.count()
+        self._thread: threading.Thread | None = None
+        self._running: set[Batch] = set()  # Batches with some, not all, actions run
+
+    def submit(self, items: list[tuple[float, object, object, str]]) -> Batch:
+        """Schedule (delay_secs, fn, arg, label) items relative to now."""
+        start = time.monotonic()
+        batch = Batch(start, len(items))
+        with self._cond:
+            for index, (delay, fn, arg, label) in enumerate(items):
+                heapq.heappush(self._heap, (start + max(0.0, delay), next(self._order),
+                                            fn, arg, label, batch, index))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="input-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.monotonic()
+                if wait > SPIN_SECS:
+                    self._cond.wait(wait - SPIN_SECS)
+                    continue  # Re-check: an earlier action may have arrived
+                deadline, _, fn, arg, label, batch, index = heapq.heappop(self._heap)
+            if batch not in self._running:
+                if not self._running and self.lock is not None:
+                    self.lock.acquire()  # Waits out an input route already running
+                self._running.add(batch)
+            while time.monotonic() < deadline:
+                pass
+            started, error = time.monotonic(), None
+            try:
+                fn(arg)
+            except Exception as e:  # One bad action must not kill the scheduler
+                error = str(e)
+            if batch._record(index, label, deadline, started, time.monotonic(), error):
+                self._running.discard(batch)
+                if not self._running and self.lock is not None:
+                    self.lock.release()
+
+
+_scheduler = Scheduler()
+
+
+def submit(items: list[tuple[float, object, object, str]]) -> Batch:
+    """Schedule items on the shared scheduler thread."""
+    return _scheduler.submit(items)
+
+
+def use_lock(lock):
+    """Hold `lock` on the shared scheduler thread while a batch is running."""
+    _scheduler.lock = lock
@@ -0,0 +1,182 @@
+"""Screenshot handler for Linux: XShm capture (scrot fallback), crop, click
+indicator, server-side scaling / format negotiation in one pass, and
+diff=1 frames that carry only the regions changed since the last call."""
+from __future__ import annotations
+
+import base64
+import logging
+import os
+import subprocess
+
+import linux_capture
+import linux_framediff as framediff
+import linux_image as image
+
+logger = logging.getLogger(__name__)
+_ENV = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":99")}
+_EXT = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+
+def _run(args, timeout=5):
+    r = subprocess.run(args, capture_output=True, text=True, timeout=timeout, env=_ENV)
+    return r.stdout.strip()
+
+
+def screen_size() -> tuple[int, int]:
+    cap = linux_capture.get()
+    if cap is not None:
+        return cap.size()
+    try:
+        out = _run(["xdpyinfo"])
+        for line in out.splitlines():
+            if "dimensions:" in line:
+                w, h = line.split()[1].split("x")
+                return int(w), int(h)
+    except (subprocess.SubprocessError, FileNotFoundError, ValueError):
+        pass
+    try:
+        out = _run(["xrandr", "--current"])
+        for line in out.splitlines():
+            if " connected" in line:
+                for part in line.split():
+                    if "x" in part and "+" in part:
+                        w, h = part.split("+")[0].split("x")
+                        return int(w), int(h)
+    except (subprocess.SubprocessError, FileNotFoundError, ValueError):
+        pass
+    return 1920, 1080
+
+
+def _options(params: dict) -> tuple[str, int | None, int | None]:
+    """Validated (format, max_width, quality); raises ValueError."""
+    fmt = str(params.get("format") or "png").lower().replace("jpg", "jpeg")
+    if fmt not in image.FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(image.FORMATS)}")
+    max_width, quality = params.get("max_width"), params.get("quality")
+    max_width = None if max_width is None else int(max_width)
+    quality = None if quality is None else int(quality)
+    if max_width is not None and max_width < 1:
+        raise ValueError("max_width must be positive")
+    if quality is not None and not 1 <= quality <= 100:
+        raise ValueError("quality must be 1-100")
+    return fmt, max_width, quality
+
+
+def _finish(body: dict, fmt: str, src_w: int, iw: int, ih: int, data: bytes | None):
+    """Add the encoded image's format, size and scale (source px per image px)."""
+    body.update(format=fmt, mimeType=image.FORMATS[fmt], image_width=iw, image_height=ih,
+                scale=round(src_w / iw, 4) if iw else 1)
+    if data is not None:
+        body["image_base64"] = base64.b64encode(data).decode()
+    return body, 200
+
+
+def _screenshot_shm(frame, params: dict, path: str | None, opts) -> tuple[dict, int]:
+    sw, sh, pixels = frame
+    x, y, w, h = (params.get(k) for k in ("x", "y", "w", "h"))
+    if None not in (x, y, w, h):
+        pixels, sw, sh = image.crop(pixels, sw, sh, int(x), int(y), int(w), int(h))
+        body = {"path": path, "width": sw, "height": sh, "crop": {"x": x, "y": y, "w": w, "h": h}}
+    else:
+        ix, iy = params.get("indicator_x"), params.get("indicator_y")
+        if ix is not None and iy is not None:
+            pixels = bytearray(pixels)
+            image.draw_indicator(pixels, sw, sh, int(ix), int(iy))
+        body = {"path": path, "width": sw, "height": sh}
+    fmt, max_width, quality = opts
+    data, fmt, iw, ih = image.encode(pixels, sw, sh, max_width, fmt, quality)
+    if path:
+        image.write_atomic(path, data)
+    return _finish(body, fmt, sw, iw, ih, data if params.get("inline") else None)
+
+
+def _screenshot_diff(frame, params: dict, path: str | None, opts) -> tuple[dict, int]:
+    """Changed regions (inline crops) since this client's last frame, or a full frame."""
+    sw, sh, pixels = frame
+    every = int(params.get("full_every") or framediff.FULL_EVERY)
+    boxes = framediff.diff(str(params.get("client") or "default"), sw, sh, pixels, every)
+    if boxes is None or sum(b["w"] * b["h"] for b in boxes) > sw * sh // 2:
+        body, code = _screenshot_shm(frame, params, path, opts)
+        return {**body, "full": True}, code
+    ix, iy = params.get("indicator_x"), params.get("indicator_y")
+    if boxes and ix is not None and iy is not None:
+        pixels = bytearray(pixels)
+        image.draw_indicator(pixels, sw, sh, int(ix), int(iy))
+    fmt, max_width, quality = opts
+    ratio = max_width / sw if max_width and sw > max_width else 1
+    body = {"width": sw, "height": sh, "unchanged": not boxes, "regions": [],
+            "format": fmt, "mimeType": image.FORMATS[fmt], "scale": round(1 / ratio, 4)}
+    for box in boxes:
+        crop, w, h = image.crop(pixels, sw, sh, box["x"], box["y"], box["w"], box["h"])
+        region_width = max(1, round(w * ratio)) if ratio < 1 else None
+        data, body["format"], iw, ih = image.encode(crop, w, h, region_width, fmt, quality)
+        body["regions"].append({**box, "image_width": iw, "image_height": ih,
+                                "image_base64": base64.b64encode(data).decode()})
+    body["mimeType"] = image.FORMATS[body["format"]]
+    return body, 200
+
+
+def screenshot(params: dict) -> tuple[dict, int]:
+    """Capture the screen (or a crop) to `path`. max_width downscales, format
+    picks png/jpeg/webp and quality sets lossy quality, all server-side.
+    inline=true also returns image_base64; with no path nothing touches disk.
+    diff=1 returns {"unchanged": true} or changed regions per `client`, with a
+    full frame ("full": true) first, after a resize and every `full_every` calls."""
+    try:
+        opts = _options(params)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}, 400
+    default = f"/tmp/claude-screenshot.{_EXT[opts[0]]}"
+    path = params.get("path", None if params.get("inline") else default)
+    diff = str(params.get("diff", "")).lower() in ("1", "true")
+    cap = linux_capture.get()
+    if cap is not None:
+        handler = _screenshot_diff if diff else _screenshot_shm
+        try:
+            return handler(cap.grab(), params, path, opts)
+        except OSError as e:
+            logger.warning("XShm screenshot failed (%s); falling back to scrot", e)
+    path = path or default
+    body, code = _screenshot_cli(params, path)
+    fmt, max_width, quality = opts
+    w, h = body["width"], body["height"]
+    iw = min(w, max_width or w)
+    ih = max(1, round(h * iw / w))
+    if iw != w or fmt != "png":
+        args = ["convert", path] + (["-resize", f"{iw}x{ih}!"] if iw != w else [])
+        if fmt != "png":
+            args += ["-quality", str(quality or image.DEFAULT_QUALITY)]
+        _run(args + [f"{fmt}:{path}"])
+    data = None
+    if params.get("inline"):
+        with open(path, "rb") as f:
+            data = f.read()
+    if diff:
+        body["full"] = True  # No raw frame to compare without XShm
+    return _finish(body, fmt, w, iw, ih, data)
+
+
+def _screenshot_cli(params: dict, path: str) -> tuple[dict, int]:
+    x, y = params.get("x"), params.get("y")
+    w, h = params.get("w"), params.get("h")
+
+    if x is not None and y is not None and w is not None and h is not None:
+        _run(["scrot", "-o", path])
+        crop = f"{int(w)}x{int(h)}+{int(x)}+{int(y)}"
+        _run(["convert", path, "-crop", crop, "+repage", path])
+        return {"path": path, "width": int(w), "height": int(h),
+                "crop": {"x": x, "y": y, "w": w, "h": h}}, 200
+
+    _run(["scrot", "-o", path])
+
+    ix, iy = params.get("indicator_x"), params.get("indicator_y")
+    if ix is not None and iy is not None:
+        _run(["convert", path,
+              "-fill", "none", "-stroke", "red", "-strokewidth", "3",
+              "-draw", f"circle {int(ix)},{int(iy)} {int(ix)+18},{int(iy)}",
+              "-fill", "red", "-stroke", "none",
+              "-draw", f"circle {int(ix)},{int(iy)} {int(ix)+3},{int(iy)}",
+              path])
+
+    sw, sh = screen_size()
+    return {"path": path, "width": sw, "height": sh}, 200
@@ -0,0 +1,78 @@
+"""/wait_stable for Linux: block until the screen (or a region) stops changing.
+
+Frames are sampled every interval_ms and compared with the previous one
+(bytes equality over the raw XShm buffer, a memcmp). The call returns once
+nothing has changed for quiet_ms, or after timeout_ms, so agents wait in a
+cheap local loop instead of spending sleep/screenshot turns.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import time
+
+import linux_capture
+import linux_image as image
+
+_ENV = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":99")}
+DEFAULTS = {"interval_ms": 100, "quiet_ms": 500, "timeout_ms": 10000}
+MAX_TIMEOUT_MS = 60000
+CLI_MIN_INTERVAL_MS = 250  # Each scrot sample is a fork + PNG encode
+_CLI_PATH = "/tmp/claude-wait-stable.png"
+
+
+def _region(params: dict) -> tuple[int, int, int, int] | None:
+    box = [params.get(k) for k in ("x", "y", "w", "h")]
+    return None if None in box else tuple(int(v) for v in box)
+
+
+def _sampler(region):
+    """Callable returning comparable bytes for the current frame (or region)."""
+    cap = linux_capture.get()
+    if cap is not None:
+        def sample() -> bytes:
+            sw, sh, pixels = cap.grab()
+            return image.crop(pixels, sw, sh, *region)[0] if region else pixels
+        return sample, 0
+
+    args = ["scrot", "-o"] + (["-a", ",".join(map(str, region))] if region else []) + [_CLI_PATH]
+
+    def sample_cli() -> bytes:
+        subprocess.run(args, capture_output=True, timeout=5, env=_ENV)
+        try:
+            with open(_CLI_PATH, "rb") as f:
+                return f.read()
+        except OSError:
+            return b""
+    return sample_cli, CLI_MIN_INTERVAL_MS
+
+
+def wait_stable(params: dict) -> tuple[dict, int]:
+    """Sample every interval_ms until unchanged for quiet_ms or timeout_ms passes.
+    Optional x/y/w/h limits the check to a region."""
+    try:
+        interval, quiet, timeout = (int(params.get(k, d)) for k, d in DEFAULTS.items())
+        region = _region(params)
+    except (TypeError, ValueError) as e:
+        return {"error": f"invalid parameter: {e}"}, 400
+    if interval < 1 or quiet < 0 or not 0 <= timeout <= MAX_TIMEOUT_MS:
+        return {"error": f"need interval_ms >= 1, quiet_ms >= 0, timeout_ms <= {MAX_TIMEOUT_MS}"}, 400
+    sample, min_interval = _sampler(region)
+    interval = max(interval, min_interval) / 1000
+    start = time.monotonic()
+    last, last_change, frames, changes = sample(), time.monotonic(), 1, 0
+    while True:
+        now = time.monotonic()
+        if now - last_change >= quiet / 1000 or now - start >= timeout / 1000:
+            break
+        time.sleep(max(0.0, min(interval, start + timeout / 1000 - now,
+                                last_change + quiet / 1000 - now)))
+        frame = sample()
+        frames += 1
+        if frame != last:
+            last, last_change, changes = frame, time.monotonic(), changes + 1
+    end = time.monotonic()
+    return {"stable": end - last_change >= quiet / 1000,
+            "waited_ms": round((end - start) * 1000),
+            "quiet_ms": round((end - last_change) * 1000),
+            "frames": frames, "changes": changes}, 200
@@ -0,0 +1,89 @@
+"""ctypes bindings to libX11 and its extension libraries for Linux computer-use.
+
+open_display() loads libX11 plus one extension library — Xtst (XTest
+input, linux_xtest) or Xext (MIT-SHM capture, linux_capture) — declares
+the signatures the in-process backends use, and opens the display
+(DISPLAY, default :99 like linux_display). Returns None when anything is
+missing so callers fall back to the command-line tools.
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+
+_ulong, _int, _uint, _ptr = ctypes.c_ulong, ctypes.c_int, ctypes.c_uint, ctypes.c_void_p
+_pint = ctypes.POINTER(_int)
+_ERROR_HANDLER = ctypes.CFUNCTYPE(_int, _ptr, _ptr)
+
+
+def _ignore_x_error(_display, _event):
+    return 0  # Xlib's default handler exits the process on e.g. BadValue
+
+
+_error_handler = _ERROR_HANDLER(_ignore_x_error)
+
+
+def _declare_x11(x11):
+    x11.XOpenDisplay.restype = _ptr
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XStringToKeysym.restype = _ulong
+    x11.XStringToKeysym.argtypes = [ctypes.c_char_p]
+    x11.XGetKeyboardMapping.restype = ctypes.POINTER(_ulong)
+    x11.XGetKeyboardMapping.argtypes = [_ptr, ctypes.c_ubyte, _int, _pint]
+    x11.XChangeKeyboardMapping.argtypes = [_ptr, _int, _int, ctypes.POINTER(_ulong), _int]
+    x11.XDisplayKeycodes.argtypes = [_ptr, _pint, _pint]
+    x11.XDefaultRootWindow.restype = _ulong
+    x11.XDefaultRootWindow.argtypes = [_ptr]
+    x11.XQueryPointer.argtypes = [_ptr, _ulong, ctypes.POINTER(_ulong), ctypes.POINTER(_ulong),
+                                  _pint, _pint, _pint, _pint, ctypes.POINTER(_uint)]
+    x11.XQueryKeymap.argtypes = [_ptr, ctypes.c_char_p]
+    x11.XSync.argtypes = [_ptr, _int]
+    x11.XFree.argtypes = [_ptr]
+    x11.XSetErrorHandler.argtypes = [_ERROR_HANDLER]
+    x11.XDefaultScreen.argtypes = [_ptr]
+    x11.XDefaultVisual.restype = _ptr
+    x11.XDefaultVisual.argtypes = [_ptr, _int]
+    x11.XDefaultDepth.argtypes = [_ptr, _int]
+    x11.XSelectInput.argtypes = [_ptr, _ulong, ctypes.c_long]
+    x11.XCheckTypedWindowEvent.argtypes = [_ptr, _ulong, _int, _ptr]
+    x11.XGetGeometry.argtypes = [_ptr, _ulong, ctypes.POINTER(_ulong), _pint, _pint,
+                                 ctypes.POINTER(_uint), ctypes.POINTER(_uint),
+                                 ctypes.POINTER(_uint), ctypes.POINTER(_uint)]
+
+
+def _declare_xtst(xtst):
+    xtst.XTestQueryExtension.argtypes = [_ptr, _pint, _pint, _pint, _pint]
+    xtst.XTestFakeMotionEvent.argtypes = [_ptr, _int, _int, _int, _ulong]
+    xtst.XTestFakeButtonEvent.argtypes = [_ptr, _uint, _int, _ulong]
+    xtst.XTestFakeKeyEvent.argtypes = [_ptr, _uint, _int, _ulong]
+
+
+def _declare_xext(xext):
+    xext.XShmQueryExtension.argtypes = [_ptr]
+    xext.XShmCreateImage.restype = _ptr
+    xext.XShmCreateImage.argtypes = [_ptr, _ptr, _uint, _int, _ptr, _ptr, _uint, _uint]
+    xext.XShmAttach.argtypes = [_ptr, _ptr]
+    xext.XShmDetach.argtypes = [_ptr, _ptr]
+    xext.XShmGetImage.argtypes = [_ptr, _ulong, _ptr, _int, _int, _ulong]
+
+
+_DECLARE = {"Xtst": _declare_xtst, "Xext": _declare_xext}
+
+
+def open_display(extension: str):
+    """(libX11, extension lib, Display*) on a fresh connection, or None."""
+    names = [ctypes.util.find_library(n) for n in ("X11", extension)]
+    if not all(names):
+        return None
+    try:
+        x11, ext = (ctypes.CDLL(n) for n in names)
+        _declare_x11(x11)
+        _DECLARE[extension](ext)
+    except (OSError, AttributeError):
+        return None
+    display = x11.XOpenDisplay(os.environ.get("DISPLAY", ":99").encode())
+    if not display:
+        return None
+    x11.XSetErrorHandler(_error_handler)
+    return x11, ext, display
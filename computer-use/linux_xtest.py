@@ -0,0 +1,199 @@
+"""In-process XTest input for Linux computer-use (ctypes against libX11 + libXtst).
+
+One persistent X connection replaces an xdotool fork per action. get()
+returns the shared backend, or None when libXtst / the XTEST extension /
+the display is unavailable (or RELAYGENT_INPUT_BACKEND=xdotool) so callers
+fall back to xdotool. All X calls are serialized by one lock.
+"""
+from __future__ import annotations
+
+import ctypes
+import logging
+import os
+import threading
+import time
+
+import linux_xlib
+
+logger = logging.getLogger(__name__)
+
+# xdotool-style names that aren't X keysym names
+KEYSYM_ALIASES = {"ctrl": "Control_L", "control": "Control_L", "alt": "Alt_L",
+                  "shift": "Shift_L", "super": "Super_L", "meta": "Meta_L",
+                  "\n": "Return", "\t": "Tab"}
+MODIFIER_KEYSYMS = ("Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R",
+                    "Super_L", "Super_R", "Meta_L", "Meta_R")
+_BUTTON1_MASK = 1 << 8  # Button1Mask; Button2..5 follow
+
+_ulong, _int, _uint = ctypes.c_ulong, ctypes.c_int, ctypes.c_uint
+
+
+class XTest:
+    def __init__(self, x11, xtst, display):
+        self.x11, self.xtst, self.dpy = x11, xtst, display
+        self.lock = threading.Lock()
+        lo, hi = _int(), _int()
+        x11.XDisplayKeycodes(display, ctypes.byref(lo), ctypes.byref(hi))
+        self.min_keycode, self.max_keycode = lo.value, hi.value
+        self._load_keymap()
+
+    def _load_keymap(self):
+        """keysym -> (keycode, needs_shift) from the first two columns, plus a spare keycode."""
+        per = _int()
+        count = self.max_keycode - self.min_keycode + 1
+        syms = self.x11.XGetKeyboardMapping(self.dpy, self.min_keycode, count, ctypes.byref(per))
+        self.keymap, self.spare = {}, None
+        for i in range(count):
+            row = [syms[i * per.value + j] for j in range(per.value)]
+            for col in (1, 0):
+                if col < len(row) and row[col]:
+                    self.keymap[row[col]] = (self.min_keycode + i, col == 1)
+            if not any(row) and self.spare is None:
+                self.spare = self.min_keycode + i
+        self.x11.XFree(syms)
+
+    def _keysym(self, name: str) -> int:
+        name = KEYSYM_ALIASES.get(name.lower() if len(name) > 1 else name, name)
+        sym = self.x11.XStringToKeysym(name.encode())
+        if not sym and len(name) == 1:
+            code = ord(name)  # Latin-1 keysyms are the code point; others 0x01000000 + it
+            sym = code if 0x20 <= code <= 0x7E or 0xA0 <= code <= 0xFF else 0x01000000 | code
+        if not sym:
+            raise ValueError(f"unknown key: {name}")
+        return sym
+
+    def _keycode(self, sym: int) -> tuple[int, bool]:
+        """Keycode for a keysym, binding it to the spare keycode when unmapped."""
+        if sym in self.keymap:
+            return self.keymap[sym]
+        if self.spare is None:
+            raise ValueError(f"no keycode for keysym {sym:#x}")
+        arr = (_ulong * 1)(sym)
+        self.x11.XChangeKeyboardMapping(self.dpy, self.spare, 1, arr, 1)
+        self.x11.XSync(self.dpy, False)
+        self.keymap = {s: kc for s, kc in self.keymap.items() if kc[0] != self.spare}
+        self.keymap[sym] = (self.spare, False)
+        return self.spare, False
+
+    def _fake_key(self, keycode: int, down: bool):
+        self.xtst.XTestFakeKeyEvent(self.dpy, keycode, down, 0)
+
+    def move(self, x: int, y: int):
+        with self.lock:
+            self.xtst.XTestFakeMotionEvent(self.dpy, -1, int(x), int(y), 0)
+            self.x11.XSync(self.dpy, False)
+
+    def button(self, btn: int, down: bool):
+        with self.lock:
+            self.xtst.XTestFakeButtonEvent(self.dpy, int(btn), down, 0)
+            self.x11.XSync(self.dpy, False)
+
+    def click(self, btn: int, repeat: int = 1, delay: float = 0.05):
+        for i in range(repeat):
+            if i:
+                time.sleep(delay)
+            with self.lock:
+                self.xtst.XTestFakeButtonEvent(self.dpy, int(btn), True, 0)
+                self.xtst.XTestFakeButtonEvent(self.dpy, int(btn), False, 0)
+                self.x11.XSync(self.dpy, False)
+
+    def key(self, name: str, down: bool):
+        """Press or release one key by xdotool/X keysym name (no implicit shift)."""
+        with self.lock:
+            self._fake_key(self._keycode(self._keysym(name))[0], down)
+            self.x11.XSync(self.dpy, False)
+
+    def tap(self, name: str, modifiers: list[str] | None = None):
+        """Press modifiers + key and release in reverse order, like `xdotool key a+b`."""
+        names = list(modifiers or []) + [name]
+        with self.lock:
+            codes = [self._keycode(self._keysym(n))[0] for n in names]
+            for kc in codes:
+                self._fake_key(kc, True)
+            for kc in reversed(codes):
+                self._fake_key(kc, False)
+            self.x11.XSync(self.dpy, False)
+
+    def type_text(self, text: str, delay: float = 0.012):
+        """Type characters, shifting where needed; held modifiers are lifted meanwhile."""
+        held = [kc for kc in self.held_keycodes() if kc in self._modifier_keycodes()]
+        with self.lock:
+            shift_kc = self._keycode(self._keysym("Shift_L"))[0]
+            for kc in held:
+                self._fake_key(kc, False)
+        try:
+            for ch in text:
+                with self.lock:
+                    keycode, shift = self._keycode(self._keysym(ch))
+                    if shift:
+                        self._fake_key(shift_kc, True)
+                    self._fake_key(keycode, True)
+                    self._fake_key(keycode, False)
+                    if shift:
+                        self._fake_key(shift_kc, False)
+                    self.x11.XSync(self.dpy, False)
+                time.sleep(delay)
+        finally:
+            with self.lock:
+                for kc in held:
+                    self._fake_key(kc, True)
+                self.x11.XSync(self.dpy, False)
+
+    def _modifier_keycodes(self) -> set[int]:
+        return {self.keymap[s][0] for s in map(self.x11.XStringToKeysym,
+                                               (m.encode() for m in MODIFIER_KEYSYMS))
+                if s in self.keymap}
+
+    def held_keycodes(self) -> list[int]:
+        """Keycodes the server currently reports as down (XQueryKeymap)."""
+        bits = ctypes.create_string_buffer(32)
+        with self.lock:
+            self.x11.XQueryKeymap(self.dpy, bits)
+        return [i * 8 + b for i, byte in enumerate(bits.raw) for b in range(8) if byte >> b & 1]
+
+    def held_buttons(self) -> list[int]:
+        root, child = _ulong(), _ulong()
+        ints = [_int() for _ in range(4)]
+        mask = _uint()
+        with self.lock:
+            self.x11.XQueryPointer(self.dpy, self.x11.XDefaultRootWindow(self.dpy),
+                                   ctypes.byref(root), ctypes.byref(child),
+                                   *map(ctypes.byref, ints), ctypes.byref(mask))
+        return [b for b in range(1, 6) if mask.value & (_BUTTON1_MASK << (b - 1))]
+
+    def release(self, keycodes: list[int], buttons: list[int]):
+        with self.lock:
+            for kc in keycodes:
+                self._fake_key(kc, False)
+            for btn in buttons:
+                self.xtst.XTestFakeButtonEvent(self.dpy, btn, False, 0)
+            self.x11.XSync(self.dpy, False)
+
+
+_lock = threading.Lock()
+_backend: XTest | None = None
+_tried = False
+
+
+def _connect() -> XTest | None:
+    if os.environ.get("RELAYGENT_INPUT_BACKEND", "").lower() == "xdotool":
+        return None
+    opened = linux_xlib.open_display("Xtst")
+    if opened is None:
+        return None
+    x11, xtst, display = opened
+    ints = [_int() for _ in range(4)]
+    if not xtst.XTestQueryExtension(display, *map(ctypes.byref, ints)):
+        logger.info("XTEST extension unavailable; using xdotool for input")
+        return None
+    return XTest(x11, xtst, display)
+
+
+def get() -> XTest | None:
+    """Shared XTest backend, or None to use xdotool. Connects once."""
+    global _backend, _tried
+    with _lock:
+        if not _tried:
+            _tried = True
+            _backend = _connect()
+        return _backend
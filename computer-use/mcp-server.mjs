@@ -16,6 +16,7 @@ import { registerBrowserDialogTools } from "./browser-dialog.mjs";
 import { registerNativeTools } from "./native-tools.mjs";
 import { registerClipboardTools } from "./clipboard-tools.mjs";
 import { registerHeldInputTools } from "./held-input-tools.mjs";
+import { registerBatchTools } from "./batch-tools.mjs";
 const IS_LINUX = platform() === "linux";
 
 const server = new McpServer({ name: "computer-use", version: "1.0.0" });
@@ -139,6 +140,7 @@ registerBrowserDialogTools(server);
 registerNativeTools(server);
 registerClipboardTools(server);
 registerHeldInputTools(server);
+registerBatchTools(server);
 await checkHealth();
 const transport = new StdioServerTransport();
 await server.connect(transport);
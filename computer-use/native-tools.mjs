@@ -20,9 +20,10 @@ export function registerNativeTools(server) {
 		async (p) => jsonRes(await hsCall("POST", "/element_at", { x: sx(p.x), y: sx(p.y) })));
 	server.tool("accessibility_tree", "Get accessibility tree of focused or named app",
 		{ app: z.string().optional().describe("App name (default: frontmost)"),
-			depth: n.optional().describe("Max tree depth (default: 4)") },
+			depth: n.optional().describe("Max tree depth (default: 4)"),
+			since: n.optional().describe("Linux: only subtrees changed after this tree version (from a previous call)") },
 		async (p) => jsonRes(await hsCall("POST", "/accessibility", p, 30000)));
-	server.tool("find_elements", "Search UI elements by role/title in accessibility tree",
+	server.tool("find_elements", "Search UI elements by role/title in accessibility tree (Linux results carry press handles)",
 		{ role: z.string().optional().describe("AX role (e.g. AXButton)"),
 			title: z.string().optional().describe("Title substring (case-insensitive)"),
 			app: z.string().optional().describe("App name (default: frontmost)"),
@@ -33,7 +34,8 @@ export function registerNativeTools(server) {
 		{ title: z.string().optional().describe("Title substring"),
 			role: z.string().optional().describe("AX role (e.g. AXButton)"),
 			app: z.string().optional().describe("App name (default: frontmost)"),
-			index: n.optional().describe("Which match to click (default: 0)") },
+			index: n.optional().describe("Which match to click (default: 0)"),
+			handle: z.string().optional().describe("Element handle from find_elements (Linux); pressed directly") },
 		async (p) => {
 			const r = await clickElement(p);
 			if (r.error) return jsonRes(r);
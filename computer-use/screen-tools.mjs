@@ -1,6 +1,6 @@
 // Screenshot and zoom tools for computer-use MCP
 import { z } from "zod";
-import { hsCall, readScreenshot, readRawScreenshot, scaleFactor, SCREENSHOT_PATH } from "./hammerspoon.mjs";
+import { hsCall, takeScreenshot, readRawScreenshot, scaleFactor, screenshotImage, screenshotRegions, screenshotRequest, SCREENSHOT_PATH } from "./hammerspoon.mjs";
 
 const n = z.coerce.number();
 const sx = (v) => Math.round(v * scaleFactor());
@@ -8,25 +8,45 @@ const sx = (v) => Math.round(v * scaleFactor());
 export function registerScreenTools(server) {
 	server.tool("screenshot", "Capture screenshot. Use find_elements for precise coordinates.",
 		{ x: n.optional().describe("Crop X"), y: n.optional().describe("Crop Y"),
-			w: n.optional().describe("Crop width"), h: n.optional().describe("Crop height") },
-		async ({ x, y, w, h }) => {
-			const body = { path: SCREENSHOT_PATH };
-			if (x !== null && y !== null && w !== null && h !== null) Object.assign(body, { x: sx(x), y: sx(y), w: sx(w), h: sx(h) });
+			w: n.optional().describe("Crop width"), h: n.optional().describe("Crop height"),
+			diff: z.boolean().optional().describe("Linux: only return regions changed since the last diff screenshot") },
+		async ({ x, y, w, h, diff }) => {
+			const crop = x !== null && y !== null && w !== null && h !== null;
+			const body = screenshotRequest(crop ? { x: sx(x), y: sx(y), w: sx(w), h: sx(h) } : {});
+			if (diff) body.diff = true;
 			const r = await hsCall("POST", "/screenshot", body);
 			if (r.error) return { content: [{ type: "text", text: JSON.stringify(r) }] };
+			if (r.unchanged) return { content: [{ type: "text", text: "(screen unchanged since last screenshot)" }] };
+			if (r.regions) return { content: screenshotRegions(r) };
 			try {
-				const img = readScreenshot(r.width, r.pixelWidth);
+				const img = screenshotImage(r);
 				if (!img) return { content: [{ type: "text", text: "(screenshot unavailable — image was invalid or too large)" }] };
 				const sf = scaleFactor();
 				const sw = Math.round(r.width / sf), sh = Math.round(r.height / sf);
 				return { content: [
-					{ type: "image", data: img, mimeType: "image/png" },
+					{ type: "image", data: img.data, mimeType: img.mimeType },
 					{ type: "text", text: `Screenshot: ${sw}x${sh}px (use these coords for clicks)` },
 				] };
 			} catch { return { content: [{ type: "text", text: JSON.stringify(r) }] }; }
 		}
 	);
 
+	server.tool("wait_stable", "Wait until the screen (or a region) stops changing — use instead of sleep + screenshot while pages load. Linux only. Auto-returns screenshot.",
+		{ quiet_ms: n.optional().describe("Unchanged this long counts as stable (default 500)"),
+			timeout_ms: n.optional().describe("Give up after this long (default 10000, max 60000)"),
+			x: n.optional().describe("Region X"), y: n.optional().describe("Region Y"),
+			w: n.optional().describe("Region width"), h: n.optional().describe("Region height") },
+		async ({ quiet_ms, timeout_ms, x, y, w, h }) => {
+			const body = { quiet_ms, timeout_ms };
+			if (x != null && y != null && w != null && h != null) Object.assign(body, { x: sx(x), y: sx(y), w: sx(w), h: sx(h) });
+			const r = await hsCall("POST", "/wait_stable", body, (timeout_ms ?? 10000) + 5000);
+			if (r.error) return { content: [{ type: "text", text: JSON.stringify(r) }] };
+			const text = r.stable ? `Screen stable after ${r.waited_ms}ms (${r.changes} changes seen)`
+				: `Still changing after ${r.waited_ms}ms — timed out (${r.changes} changes seen)`;
+			return { content: [{ type: "text", text }, ...await takeScreenshot(0)] };
+		}
+	);
+
 	server.tool("zoom", "Zoom in on a screen region at native resolution for better detail. Does NOT return clickable coords — use screenshot for that.",
 		{ x: n.describe("Left X in screenshot coords"), y: n.describe("Top Y in screenshot coords"),
 			w: n.describe("Width to crop"), h: n.describe("Height to crop") },
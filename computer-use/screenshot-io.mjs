@@ -11,6 +11,8 @@ export const SCREENSHOT_PATH = "/tmp/claude-screenshot.png";
 const SCALED_PATH = "/tmp/claude-screenshot-scaled.png";
 const MAX_BYTES = 5 * 1024 * 1024; // 5MB — well under Claude's 20MB base64 limit
 const SCALED_WIDTH = 1024; // Downscale to Anthropic's recommended XGA width
+// Linux only: png, jpeg or webp, encoded by linux-server.py (jpeg/webp need Pillow there)
+const SCREENSHOT_FORMAT = process.env.RELAYGENT_SCREENSHOT_FORMAT || "png";
 
 // Scale factor: native screen pixels / scaled image pixels.
 // Set after first screenshot — click coords are multiplied by this before execution.
@@ -18,6 +20,7 @@ let _scaleFactor = 1;
 export function scaleFactor() { return _scaleFactor; }
 
 const PNG_MAGIC = Buffer.from([0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a]);
+const MAGIC = { "image/png": PNG_MAGIC, "image/jpeg": Buffer.from([0xff, 0xd8, 0xff]), "image/webp": Buffer.from("RIFF") };
 
 /** Validate a PNG file: check magic bytes, non-empty. Size check optional. */
 function validatePng(path, checkSize = true) {
@@ -59,6 +62,40 @@ export function readScreenshot(logicalWidth, pixelWidth) {
 	}
 }
 
+/** /screenshot request body. On Linux the server crops, scales and encodes in one
+ * pass and returns the image inline, so nothing is re-read or re-encoded here. */
+export function screenshotRequest(extra = {}) {
+	if (!IS_LINUX) return { path: SCREENSHOT_PATH, ...extra };
+	return { ...extra, inline: true, max_width: SCALED_WIDTH, format: SCREENSHOT_FORMAT };
+}
+
+/** Image from a /screenshot response: the server-scaled inline image when present,
+ * else the file read via readScreenshot. Returns { data, mimeType } or null. */
+export function screenshotImage(r) {
+	if (!r.image_base64) {
+		const data = readScreenshot(r.width, r.pixelWidth);
+		return data ? { data, mimeType: "image/png" } : null;
+	}
+	const buf = Buffer.from(r.image_base64, "base64"), magic = MAGIC[r.mimeType];
+	let err = null;
+	if (!magic) err = `unknown type ${r.mimeType}`;
+	else if (buf.length > MAX_BYTES) err = `too large (${(buf.length / 1024 / 1024).toFixed(1)}MB)`;
+	else if (!buf.subarray(0, magic.length).equals(magic)) err = `not a valid ${r.format}`;
+	if (err) { process.stderr.write(`[computer-use] Bad screenshot: ${err}\n`); return null; }
+	_scaleFactor = r.scale || 1;
+	return { data: r.image_base64, mimeType: r.mimeType };
+}
+
+/** MCP content for a diff=1 response: an image + caption per changed region, in screenshot coords. */
+export function screenshotRegions(r) {
+	_scaleFactor = r.scale || 1;
+	const s = (v) => Math.round(v / _scaleFactor);
+	return r.regions.flatMap(g => [
+		{ type: "image", data: g.image_base64, mimeType: r.mimeType },
+		{ type: "text", text: `Changed region at (${s(g.x)},${s(g.y)}) ${s(g.w)}x${s(g.h)}` },
+	]);
+}
+
 /** Read screenshot at native pixel resolution (no downscaling). For zoom/inspect use. */
 export function readRawScreenshot() {
 	const err = validatePng(SCREENSHOT_PATH);
@@ -1,17 +1,21 @@
 #!/usr/bin/env node
 /**
  * Gmail email poller — checks for new emails every 2 minutes.
- * Writes non-automated emails to a cache file read by the notifications service.
+ * Appends non-automated emails to a JSONL cache (one record per line) read by
+ * the notifications service from a saved byte offset; the file is compacted to
+ * the newest KEEP_RECORDS once it passes COMPACT_BYTES. The records are kept in
+ * memory, so a write never re-reads the file unless something else changed it.
+ * A legacy JSON cache ({ emails: [...] }) is converted on the next write.
  * Skips bulk/automated mail (newsletters, digests, notification emails).
  *
  * Reads credentials from ~/.relaygent/gmail/ (same as email MCP).
  * Tracks last-check timestamp in ~/.relaygent/gmail/.last_check_ts.
- * Cache: RELAYGENT_EMAIL_CACHE env var or /tmp/relaygent-email-cache.json
+ * Cache: RELAYGENT_EMAIL_CACHE env var or /tmp/relaygent-email-cache.json (JSONL)
  *
  * Usage: node email-poller.mjs
  */
 import { getGmailClient } from "./gmail-client.mjs";
-import { readFileSync, writeFileSync, existsSync, mkdirSync } from "fs";
+import { readFileSync, writeFileSync, appendFileSync, renameSync, statSync, existsSync, mkdirSync } from "fs";
 import { join } from "path";
 import { homedir } from "os";
 import { fileURLToPath } from "url";
@@ -36,15 +40,66 @@ export function saveTs(ts) {
 	try { mkdirSync(gmailDir(), { recursive: true }); writeFileSync(lastCheckFile(), String(ts)); } catch {}
 }
 
+export const KEEP_RECORDS = 50;
+export const COMPACT_BYTES = 64 * 1024;
+
+/** Emails (newest first) if text is the legacy { emails } JSON cache, else null. */
+function legacyEmails(text) {
+	try { const data = JSON.parse(text); return Array.isArray(data?.emails) ? data.emails : null; } catch { return null; }
+}
+
+/** Records in a cache file's text, oldest first (JSONL or the legacy JSON cache). */
+function parseCache(text) {
+	const legacy = legacyEmails(text);
+	if (legacy) return [...legacy].reverse();
+	return text.split("\n").filter(Boolean).flatMap(line => {
+		try { return [JSON.parse(line)]; } catch { return []; }
+	});
+}
+
+/** Cached records, oldest first. Reads both JSONL and the legacy JSON cache. */
+export function readEmailCache() {
+	try { return parseCache(readFileSync(cacheFile(), "utf-8")); } catch { return []; }
+}
+
+/** Atomically rewrite the cache as JSONL (new inode, so readers reset their offset). */
+function rewriteCache(records) {
+	const tmp = `${cacheFile()}.tmp`;
+	writeFileSync(tmp, records.map(r => JSON.stringify(r) + "\n").join(""));
+	renameSync(tmp, cacheFile());
+}
+
+// The poller's copy of the cache file, so writes append and compact from memory.
+// The file is only read again when its path, inode or size isn't what we last wrote.
+let memo = null; // { file, ino, size, records }
+
+function loadCache() {
+	const file = cacheFile();
+	let st = null;
+	try { st = statSync(file); } catch {}
+	if (memo && memo.file === file && st && st.ino === memo.ino && st.size === memo.size) return memo;
+	let text = "";
+	try { text = readFileSync(file, "utf-8"); } catch {}
+	const legacy = legacyEmails(text);
+	memo = { file, records: legacy ? [...legacy].reverse().slice(-KEEP_RECORDS) : parseCache(text) };
+	if (legacy) rewriteCache(memo.records);
+	return memo;
+}
+
 export function writeEmailCache(emails) {
 	try {
-		let existing = [];
-		if (existsSync(cacheFile())) {
-			try { existing = JSON.parse(readFileSync(cacheFile(), "utf-8")).emails || []; } catch {}
+		const cache = loadCache();
+		appendFileSync(cache.file, emails.map(e => JSON.stringify(e) + "\n").join(""));
+		cache.records.push(...emails);
+		let st = statSync(cache.file);
+		if (st.size > COMPACT_BYTES) {
+			cache.records = cache.records.slice(-KEEP_RECORDS);
+			rewriteCache(cache.records);
+			st = statSync(cache.file);
 		}
-		const data = { last_updated: Date.now() / 1000, emails: [...emails, ...existing].slice(0, 50) };
-		writeFileSync(cacheFile(), JSON.stringify(data));
-	} catch (e) { log(`Cache write error: ${e.message}`); }
+		cache.ino = st.ino;
+		cache.size = st.size;
+	} catch (e) { memo = null; log(`Cache write error: ${e.message}`); }
 }
 
 const AUTOMATED_HEADERS = ["auto-submitted", "list-unsubscribe", "x-autoreply"];
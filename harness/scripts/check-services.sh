@@ -20,6 +20,38 @@ if curl -sf --max-time 2 "http://127.0.0.1:${NOTIF_PORT}/health" >/dev/null 2>&1
     ck_ok "Notifications" "running on :$NOTIF_PORT"
 else ck_fail "Notifications" "not responding on :$NOTIF_PORT — run: relaygent start"; fi
 
+# Collector health from the notifications /metrics endpoint
+# 429 counters are cumulative; warn on the increase since the previous check
+LIMITED_PREV="$DATA_DIR/collector-rate-limited.prev"
+METRICS=$(curl -sf --max-time 2 "http://127.0.0.1:${NOTIF_PORT}/metrics" 2>/dev/null)
+if [ -n "$METRICS" ]; then
+    HAVE_PREV=0; [ -f "$LIMITED_PREV" ] && HAVE_PREV=1
+    : > "$LIMITED_PREV.new"
+    COLLECTOR_ISSUES=$(echo "$METRICS" | awk -v prev="$LIMITED_PREV" -v have_prev="$HAVE_PREV" \
+        -v next_prev="$LIMITED_PREV.new" '
+        BEGIN { while ((getline line < prev) > 0) { split(line, f, " "); before[f[1]] = f[2] } }
+        /^relaygent_collector_(calls_total|last_success_age_seconds|rate_limited_total)\{/ {
+            match($1, /source="[^"]*"/); src = substr($1, RSTART + 8, RLENGTH - 9)
+            if ($1 ~ /^relaygent_collector_calls_total/) calls[src] = 1
+            else if ($1 ~ /^relaygent_collector_rate_limited_total/) limited[src] = $2
+            else age[src] = $2
+        }
+        END {
+            for (s in limited) print s, limited[s] > next_prev
+            for (s in calls) {
+                if (!(s in age)) out = out s " (never succeeded) "
+                else if (age[s] > 3600) out = out s " (" int(age[s] / 60) "m since success) "
+                delta = limited[s] - before[s]
+                if (delta < 0) delta = limited[s]  # Server restarted, counter reset
+                if (have_prev && delta > 0) out = out s " (" delta " rate-limited since last check) "
+            }
+            print out
+        }')
+    mv "$LIMITED_PREV.new" "$LIMITED_PREV"
+    if [ -n "$COLLECTOR_ISSUES" ]; then ck_warn "Collectors" "$COLLECTOR_ISSUES— see :$NOTIF_PORT/metrics"
+    else ck_ok "Collectors" "all healthy ($(echo "$METRICS" | grep -c '^relaygent_collector_calls_total{') sources)"; fi
+fi
+
 CU_NAME="Hammerspoon"; [ "$(uname)" = "Linux" ] && CU_NAME="Computer-use"
 if curl -sf --max-time 2 "http://127.0.0.1:${HS_PORT}/health" >/dev/null 2>&1; then
     ck_ok "$CU_NAME" "running on :$HS_PORT"
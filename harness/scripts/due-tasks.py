@@ -1,61 +1,41 @@
 #!/usr/bin/env python3
 """Parse tasks.md and print due items with overdue severity indicators."""
-import re
+import os
 import sys
-from datetime import datetime, timedelta
+import time
+from pathlib import Path
 
-if len(sys.argv) < 2:
+sys.path.append(str(Path(__file__).resolve().parents[2] / "notifications"))
+import task_model  # noqa: E402
+
+if len(sys.argv) < 2 or not os.path.isfile(sys.argv[1]):
     sys.exit(0)
-tasks_file = sys.argv[1]
-freqs = {'6h': 0.25, '12h': 0.5, 'daily': 1, '2d': 2, '3d': 3, 'weekly': 7, 'monthly': 30}
-now = datetime.now()
+now = time.time()
 due = []  # (severity_ratio, display_string)
-try:
-    with open(tasks_file) as f: lines = f.readlines()
-except OSError:
-    sys.exit(0)
-for line in lines:
-    m = re.match(r'- \[ \] (.+?)(?:\s*\|(.*))?$', line.strip())
-    if not m:
+for t in task_model.parse_file(sys.argv[1]):
+    if t['checked']:
         continue
-    desc = m.group(1).strip()
-    meta = {}
-    for p in (m.group(2) or '').split('|'):
-        kv = re.match(r'\s*(\w+):\s*(.+)', p.strip())
-        if kv:
-            meta[kv.group(1)] = kv.group(2).strip()
-    ttype = meta.get('type', 'one-off')
-    freq = meta.get('freq', '')
-    last = meta.get('last', '')
-    if ttype == 'one-off':
+    desc = t['description']
+    if t['type'] == 'one-off':
         due.append((1.0, desc))
-    elif ttype == 'recurring' and freq:
-        freq_days = freqs.get(freq, 1)
-        if not last or last == 'never':
-            due.append((99.0, desc))
+    elif t['next_due'] == 0:  # Recurring, never done
+        due.append((99.0, desc))
+    elif t['next_due'] is not None and t['next_due'] <= now:
+        overdue = now - t['next_due']
+        ratio = overdue / task_model.freq_secs(t['freq'])
+        # Format how overdue: "2d overdue" or "14d overdue"
+        if overdue < 86400:
+            tag = f'{int(overdue / 3600)}h overdue'
+        else:
+            tag = f'{int(overdue // 86400)}d overdue'
+        # Red for >3x frequency, yellow for >1x
+        if ratio >= 3:
+            label = f'\033[1;31m{desc} ({tag})\033[0m'
+        elif ratio >= 1:
+            label = f'\033[1;33m{desc} ({tag})\033[0m'
         else:
-            try:
-                last_dt = datetime.strptime(last, '%Y-%m-%d %H:%M')
-                overdue = now - last_dt - timedelta(days=freq_days)
-                if overdue >= timedelta(0):
-                    ratio = overdue / timedelta(days=freq_days) if freq_days > 0 else 1
-                    # Format how overdue: "2d overdue" or "14d overdue"
-                    days_over = overdue.days
-                    hours_over = overdue.total_seconds() / 3600
-                    if hours_over < 24:
-                        tag = f'{int(hours_over)}h overdue'
-                    else:
-                        tag = f'{days_over}d overdue'
-                    # Red for >3x frequency, yellow for >1x
-                    if ratio >= 3:
-                        label = f'\033[1;31m{desc} ({tag})\033[0m'
-                    elif ratio >= 1:
-                        label = f'\033[1;33m{desc} ({tag})\033[0m'
-                    else:
-                        label = f'{desc} ({tag})'
-                    due.append((ratio, label))
-            except ValueError:
-                pass
+            label = f'{desc} ({tag})'
+        due.append((ratio, label))
 # Sort by severity (most overdue first)
 due.sort(key=lambda x: -x[0])
 if due:
@@ -0,0 +1,71 @@
+#!/usr/bin/env bash
+# relaygent notifications — query the notification history log.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+source "$SCRIPT_DIR/lib.sh"
+load_config_soft 2>/dev/null || true
+
+NOTIF_PORT="${NOTIF_PORT:-8083}"
+
+usage() {
+    echo -e "${CYAN}Usage:${NC} relaygent notifications search [query] [options]"
+    echo "  Full-text search of notification history (newest first)."
+    echo "  --source S     Only this source (slack channel name, chat, email, ...)"
+    echo "  --type T       Only this type (message, slack, reminder, task, ...)"
+    echo "  --since DATE   On or after DATE (UTC, e.g. 2026-03-03 or 2026-03-03T09:00)"
+    echo "  --until DATE   Before DATE"
+    echo "  -n NUM         Max results (default 20, max 200)"
+    echo "  --before ID    Continue from a previous page"
+    echo "  --json         Output raw JSON"
+    exit 0
+}
+
+[ "${1:-}" = "search" ] || usage
+shift
+QUERY="" JSON_OUT=false LIMIT=20
+PARAMS=()
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --help|-h) usage ;;
+        --source) PARAMS+=(--data-urlencode "source=$2"); shift ;;
+        --type) PARAMS+=(--data-urlencode "type=$2"); shift ;;
+        --since) PARAMS+=(--data-urlencode "since=$2"); shift ;;
+        --until) PARAMS+=(--data-urlencode "until=$2"); shift ;;
+        -n) LIMIT="$2"; shift ;;
+        --before) PARAMS+=(--data-urlencode "before_id=$2"); shift ;;
+        --json) JSON_OUT=true ;;
+        *) QUERY="$QUERY $1" ;;
+    esac
+    shift
+done
+QUERY="${QUERY## }"
+PARAMS+=(--data-urlencode "limit=$LIMIT")
+[ -n "$QUERY" ] && PARAMS+=(--data-urlencode "q=$QUERY")
+
+RESPONSE=$(curl -sfG --max-time 5 "${PARAMS[@]}" "http://127.0.0.1:${NOTIF_PORT}/notifications/history" 2>/dev/null) || {
+    echo -e "${RED}Notifications service not reachable at port ${NOTIF_PORT}${NC}" >&2; exit 1
+}
+
+if $JSON_OUT; then echo "$RESPONSE"; exit 0; fi
+
+python3 - "$RESPONSE" "$QUERY" <<'PYEOF'
+import json, sys
+
+data = json.loads(sys.argv[1])
+query = sys.argv[2]
+entries = data.get("entries", [])
+
+C = "\033[0;36m"; D = "\033[0;90m"; B = "\033[1m"; NC = "\033[0m"
+
+if not entries:
+    print(f"No notifications{' for ' + B + query + NC if query else ''}")
+    sys.exit(0)
+
+for e in entries:
+    summary = " ".join(e.get("summary", "").split())[:120]
+    print(f"{D}{e.get('timestamp', '')}{NC} {C}{e.get('type', '')}/{e.get('source', '')}{NC} {summary}")
+
+nxt = data.get("next_before_id")
+print(f"\n{D}{len(entries)} result(s){f' — more: --before {nxt}' if nxt else ''}{NC}")
+PYEOF
@@ -5,7 +5,11 @@ from __future__ import annotations
 import os
 import re
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "notifications"))
+import task_model  # noqa: E402
 
 CYAN = "\033[0;36m"
 GREEN = "\033[0;32m"
@@ -14,45 +18,21 @@ RED = "\033[0;31m"
 DIM = "\033[2m"
 NC = "\033[0m"
 
-TASK_RE = re.compile(
-    r"^- \[[ x]\] (.+?)\s*\|\s*type:\s*(\w[\w-]*)"
-    r"\s*\|\s*freq:\s*(\w+)"
-    r"\s*\|\s*last:\s*(.+)$"
-)
-ONEOFF_RE = re.compile(r"^- \[ \] (.+?)\s*\|\s*type:\s*one-off\s*$")
-FREQ_MAP = {
-    "6h": timedelta(hours=6), "12h": timedelta(hours=12),
-    "daily": timedelta(days=1), "2d": timedelta(days=2),
-    "3d": timedelta(days=3), "weekly": timedelta(weeks=1),
-    "monthly": timedelta(days=30),
-}
-
 
 def parse_tasks(path: str) -> list[dict]:
+    """Tasks from tasks.md via the shared task_model parser, in CLI form."""
     tasks = []
-    with open(path, errors="replace") as f:
-        for i, line in enumerate(f):
-            stripped = line.strip()
-            m = TASK_RE.match(stripped)
-            if not m:
-                m_one = ONEOFF_RE.match(stripped)
-                if m_one:
-                    tasks.append({"desc": m_one.group(1), "type": "one-off",
-                                  "freq": "-", "last": None, "due": datetime.min, "line": i})
-                continue
-            desc, ttype, freq, last_str = m.groups()
-            last_str = last_str.strip()
-            try:
-                last = datetime.strptime(last_str, "%Y-%m-%d %H:%M")
-            except ValueError:
-                try:
-                    last = datetime.strptime(last_str, "%Y-%m-%d")
-                except ValueError:
-                    last = None
-            delta = FREQ_MAP.get(freq)
-            due = (last + delta) if (last and delta) else None
-            tasks.append({"desc": desc, "type": ttype, "freq": freq,
-                          "last": last, "due": due, "line": i})
+    for t in task_model.parse_file(path):
+        if t["type"] == "one-off":
+            if not t["checked"]:
+                tasks.append({"desc": t["description"], "type": "one-off",
+                              "freq": "-", "last": None, "due": datetime.min, "line": t["line"]})
+            continue
+        next_due = t["next_due"]
+        due = None if next_due is None else (
+            datetime.fromtimestamp(next_due) if next_due else datetime.min)  # 0 = never done
+        tasks.append({"desc": t["description"], "type": t["type"], "freq": t["freq"] or "-",
+                      "last": t["last_dt"], "due": due, "line": t["line"]})
     return tasks
 
 
@@ -72,7 +52,10 @@ def show_tasks(tasks: list[dict], only_due: bool = False):
         else:
             status = f"{GREEN}ok{NC}"
         last_str = t["last"].strftime("%m-%d %H:%M") if t["last"] else "never"
-        due_str = t["due"].strftime("%m-%d %H:%M") if (t["due"] and not is_oneoff) else "-"
+        if is_oneoff or not t["due"]:
+            due_str = "-"
+        else:
+            due_str = "now" if t["due"] == datetime.min else t["due"].strftime("%m-%d %H:%M")
         print(f"  [{status}] {t['desc']}")
         print(f"       {DIM}freq: {t['freq']}  last: {last_str}  due: {due_str}{NC}")
     if shown == 0:
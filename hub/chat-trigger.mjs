@@ -1,21 +1,30 @@
 /**
- * Chat trigger file watcher — broadcasts new chat messages via WebSocket.
- * Watches TRIGGER_FILE for changes and broadcasts parsed JSON to all clients.
+ * Chat trigger file watcher — broadcasts chat changes via WebSocket.
+ * Watches TRIGGER_FILE for changes. A new message is broadcast as
+ * `message`; every change (new message or read_ids from PATCH) is followed
+ * by an authoritative `unread` snapshot so subscribers never need to poll.
  */
 import fs from 'fs';
 import path from 'path';
+import { getUnreadHumanMessages } from './src/lib/chat.js';
 
 const TRIGGER_FILE = process.env.HUB_CHAT_TRIGGER_FILE || '/tmp/hub-chat-new.json';
 
-export function watchChatTrigger(broadcast) {
+export function watchChatTrigger(broadcast, getUnread = getUnreadHumanMessages) {
 	let lastTrigger = '';
 	function handleChange() {
+		let data;
 		try {
 			const raw = fs.readFileSync(TRIGGER_FILE, 'utf-8');
 			if (raw === lastTrigger) return;
 			lastTrigger = raw;
-			broadcast({ type: 'message', data: JSON.parse(raw) });
-		} catch { /* mid-write or missing */ }
+			data = JSON.parse(raw);
+		} catch { return; /* mid-write or missing */ }
+		if (!data.read_ids) broadcast({ type: 'message', data });
+		try {
+			const messages = getUnread();
+			broadcast({ type: 'unread', count: messages.length, messages });
+		} catch { /* db unavailable — subscribers fall back to HTTP */ }
 	}
 	try {
 		fs.watch(path.dirname(TRIGGER_FILE), (event, filename) => {
@@ -48,6 +48,10 @@ export async function PATCH({ request }) {
 		return json({ error: 'ids must be a non-empty array' }, { status: 400 });
 	}
 	const validIds = ids.slice(0, MAX_MARK_READ).filter(id => Number.isInteger(id) && id > 0);
-	if (validIds.length) markAsRead(validIds);
+	if (validIds.length) {
+		markAsRead(validIds);
+		// Wakes chat-trigger.mjs to push an updated unread snapshot
+		try { fs.writeFileSync(TRIGGER_FILE, JSON.stringify({ read_ids: validIds, ts: Date.now() })); } catch {}
+	}
 	return json({ ok: true });
 }
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark SQLite access before and after the shared connection pool.
+
+Usage: python3 bench_db.py [ops] [clients]   (runs against a temp database)
+Measures notification_log inserts/s and queries/s from concurrent threads,
+and GET /upcoming requests/s through werkzeug's threaded server, which
+(like Flask's default) starts a new thread per request. "before" swaps
+db's pool for the pre-pool path: sqlite3.connect + journal_mode=WAL per
+operation, closed afterwards, with none of the pool's other PRAGMAs.
+"""
+
+import contextlib
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+import notif_config
+import db
+import reminders  # noqa: F401 — registers /upcoming
+
+
+@contextlib.contextmanager
+def _connect_per_op(op="other"):
+    """The pre-pool get_db: a new connection + WAL pragma, closed on exit."""
+    conn = sqlite3.connect(notif_config.DB_PATH, timeout=5)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _insert(i):
+    with db.get_db("bench_insert") as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO notification_log (type, source, summary, content, dedup_key) "
+            "VALUES ('message', 'bench', ?, '{}', ?)", (f"msg {i}", f"bench-{time.time_ns()}-{i}"))
+        conn.commit()
+
+
+def _query(_i):
+    with db.get_db("bench_query") as conn:
+        conn.execute("SELECT id, summary FROM notification_log ORDER BY id DESC LIMIT 50").fetchall()
+
+
+def _serve():
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # No per-request access log
+    server = make_server("127.0.0.1", 0, notif_config.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/upcoming"
+
+
+def _rate(fn, ops, clients):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(fn, range(ops)))
+    return ops / (time.perf_counter() - start)
+
+
+def _run(url, ops, clients):
+    def request(_i):
+        with urllib.request.urlopen(url) as resp:
+            resp.read()
+    return {"insert": _rate(_insert, ops, clients), "query": _rate(_query, ops, clients),
+            "GET /upcoming": _rate(request, ops, clients)}
+
+
+def main():
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as tmp:
+        notif_config.DB_PATH = os.path.join(tmp, "bench.db")
+        db.init_db()
+        with db.get_db("bench_seed") as conn:
+            conn.executemany("INSERT INTO reminders (trigger_time, message) VALUES (?, ?)",
+                             [(f"2099-01-01T09:{i % 60:02d}:00", f"r{i}") for i in range(50)])
+            conn.commit()
+        server, url = _serve()
+        pooled = db._pooled
+        try:
+            db._pooled = _connect_per_op
+            before = _run(url, ops, clients)
+            db._pooled = pooled
+            after = _run(url, ops, clients)
+        finally:
+            db._pooled = pooled
+            server.shutdown()
+            db.close_db()
+    print(f"{ops} ops per row, {clients} client threads")
+    print(f"{'':<15} {'before':>12} {'pooled':>12}")
+    for op in before:
+        print(f"{op:<15} {before[op]:>10,.0f}/s {after[op]:>10,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
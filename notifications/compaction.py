@@ -0,0 +1,194 @@
+"""Relaygent Notifications — tiered retention for notification history.
+
+Rows older than the hot window are rolled up into notification_daily
+(counts per source/type plus top senders), exported raw to gzip JSONL
+files partitioned by date (<data>/notification-archive/YYYY/MM/DAY.jsonl.gz),
+then deleted, a bounded chunk per transaction. The hot table stays small;
+analytics cover months.
+start() runs the pass on a background thread every COMPACT_INTERVAL_SECS,
+so no request ever pays for the gzip and DELETE work.
+"""
+
+import collections
+import gzip
+import json
+import logging
+import os
+import threading
+from datetime import date, timedelta
+
+import notif_config
+from db import get_db, transaction
+
+logger = logging.getLogger(__name__)
+
+TOP_SENDERS = 5
+COMPACT_INTERVAL_SECS = 3600
+CHUNK_ROWS = 500  # Rows archived and deleted per write transaction
+_SENDER_KEYS = ("user_name", "user", "from", "sender", "author")
+
+_stop = threading.Event()
+_thread = None
+
+
+def init_rollups(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS notification_daily (
+            day TEXT NOT NULL,
+            source TEXT NOT NULL,
+            type TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            top_senders TEXT NOT NULL DEFAULT '[]',
+            PRIMARY KEY (day, source, type)
+        )
+    """)
+
+
+def archive_dir():
+    return os.path.join(os.path.dirname(notif_config.DB_PATH), "notification-archive")
+
+
+def _archive_path(day):
+    year, month, _ = day.split("-")
+    return os.path.join(archive_dir(), year, month, f"{day}.jsonl.gz")
+
+
+def _sender(content):
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    for key in _SENDER_KEYS:
+        if data.get(key):
+            return str(data[key])
+    return None
+
+
+def _write_archive(day, rows):
+    """Append rows to the day's gzip file (multi-member gzip reads back as one)."""
+    path = _archive_path(day)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in rows)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+            gz.write(data.encode())
+        raw.flush()
+        os.fsync(raw.fileno())  # Archive must be durable before the rows are deleted
+
+
+def _merge_rollup(conn, day, source, ntype, count, senders):
+    row = conn.execute(
+        "SELECT count, top_senders FROM notification_daily "
+        "WHERE day = ? AND source = ? AND type = ?", (day, source, ntype)).fetchone()
+    if row:
+        count += row["count"]
+        senders.update(dict(json.loads(row["top_senders"])))
+    conn.execute(
+        "INSERT OR REPLACE INTO notification_daily (day, source, type, count, top_senders) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (day, source, ntype, count, json.dumps(senders.most_common(TOP_SENDERS))))
+
+
+def _compact_chunk(day, start, end, rows):
+    """Archive, roll up and delete one chunk of a day's rows (ascending ids)."""
+    _write_archive(day, rows)
+    counts = collections.Counter()
+    senders = collections.defaultdict(collections.Counter)
+    for r in rows:
+        key = (r["source"], r["type"])
+        counts[key] += 1
+        sender = _sender(r["content"])
+        if sender:
+            senders[key][sender] += 1
+    with transaction("compact_day") as conn:
+        for (source, ntype), count in counts.items():
+            _merge_rollup(conn, day, source, ntype, count, senders[(source, ntype)])
+        conn.execute(
+            "DELETE FROM notification_log WHERE timestamp >= ? AND timestamp < ? "
+            "AND id BETWEEN ? AND ?", (start, end, rows[0]["id"], rows[-1]["id"]))
+
+
+def compact_day(day):
+    """Archive, roll up and delete one day's rows, CHUNK_ROWS per write
+    transaction so the reminders table never waits long. Returns rows compacted."""
+    start = f"{day} 00:00:00"
+    end = f"{date.fromisoformat(day) + timedelta(days=1)} 00:00:00"
+    total, after = 0, 0
+    while True:
+        with get_db("compact_day") as conn:
+            rows = [dict(r) for r in conn.execute(
+                "SELECT id, timestamp, type, source, summary, content, dedup_key "
+                "FROM notification_log WHERE timestamp >= ? AND timestamp < ? AND id > ? "
+                "ORDER BY id LIMIT ?", (start, end, after, CHUNK_ROWS))]
+        if not rows:
+            return total
+        _compact_chunk(day, start, end, rows)
+        total += len(rows)
+        after = rows[-1]["id"]
+
+
+def compact_history(max_age_days=7):
+    """Compact every whole day older than max_age_days. Returns rows compacted."""
+    with get_db("compact_history") as conn:
+        days = [r[0] for r in conn.execute(
+            "SELECT DISTINCT date(timestamp) FROM notification_log "
+            "WHERE timestamp < date('now', ?) ORDER BY 1", (f"-{max_age_days} days",))]
+    total = 0
+    for day in days:
+        total += compact_day(day)
+    if total:
+        logger.info("Compacted %d notification log rows across %d day(s)", total, len(days))
+    return total
+
+
+def daily_rollups(days=30, source=None):
+    """Return notification_daily rows for the last `days` days, newest first."""
+    sql = ("SELECT day, source, type, count, top_senders FROM notification_daily "
+           "WHERE day >= date('now', ?)")
+    params = [f"-{days} days"]
+    if source:
+        sql += " AND source = ?"
+        params.append(source)
+    with get_db("daily_rollups") as conn:
+        rows = conn.execute(sql + " ORDER BY day DESC, count DESC", params).fetchall()
+    return [{**dict(r), "top_senders": json.loads(r["top_senders"])} for r in rows]
+
+
+def read_archive(day):
+    """Yield archived rows for a day (empty if nothing was archived)."""
+    path = _archive_path(day)
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _run(interval):
+    while True:
+        try:
+            compact_history()
+        except Exception:
+            logger.warning("Failed to compact notification log", exc_info=True)
+        if _stop.wait(interval):
+            return
+
+
+def start(interval=COMPACT_INTERVAL_SECS):
+    """Compact now and every `interval` seconds on a background thread (idempotent)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_run, args=(interval,), name="history-compaction",
+                               daemon=True)
+    _thread.start()
+
+
+def stop(timeout=5):
+    """Stop the compaction thread and wait for it to exit."""
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout)
@@ -2,27 +2,113 @@
 
 import contextlib
 import os
+import queue
 import sqlite3
+import threading
+import time
 
+import metrics
 import notif_config
 
+# Per-connection settings. cache_size is in KiB when negative.
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -8192",
+    "PRAGMA mmap_size = 67108864",
+    "PRAGMA temp_store = MEMORY",
+)
+_STATEMENT_CACHE = 128
+POOL_SIZE = 8  # Idle connections kept per database; extras are closed on release
 
-@contextlib.contextmanager
-def get_db():
-    """Yield a SQLite connection that is closed when the context exits."""
-    db_path = notif_config.DB_PATH
+_pools = {}  # db_path -> LifoQueue of idle connections, shared by all threads
+_pools_lock = threading.Lock()
+
+
+def _connect(db_path):
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path, timeout=5)
+    conn = sqlite3.connect(db_path, timeout=5, cached_statements=_STATEMENT_CACHE,
+                           check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode = WAL")
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _pool(db_path):
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = _pools[db_path] = queue.LifoQueue(maxsize=POOL_SIZE)
+        return pool
+
+
+def _release(pool, conn):
+    try:
+        pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+@contextlib.contextmanager
+def get_db(op="other"):
+    """Yield a pooled SQLite connection for DB_PATH.
+
+    Connections are checked out of a pool shared by all threads (Flask
+    serves each request on a new thread), so a request reuses a warm
+    connection instead of paying for connect + PRAGMAs. Any transaction
+    left open by the caller (e.g. after an exception) is rolled back on
+    release. The hold time is recorded in /metrics under `op`.
+    """
+    with _pooled(op) as conn:
+        yield conn
+
+
+@contextlib.contextmanager
+def _pooled(op):
+    start = time.perf_counter()
+    db_path = notif_config.DB_PATH
+    pool = _pool(db_path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _connect(db_path)
     try:
         yield conn
     finally:
-        conn.close()
+        if conn.in_transaction:
+            conn.rollback()
+        _release(pool, conn)
+        metrics.observe("relaygent_sqlite_op_duration_seconds", time.perf_counter() - start, op=op)
+
+
+@contextlib.contextmanager
+def transaction(op="other", immediate=True):
+    """Yield a pooled connection inside BEGIN ... COMMIT (ROLLBACK on error)."""
+    with _pooled(op) as conn:
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def close_db():
+    """Close every idle pooled connection (ones in use return to the pool)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
 
 
 def init_db():
-    with get_db() as conn:
+    with get_db("init_db") as conn:
         conn.execute("""
             CREATE TABLE IF NOT EXISTS reminders (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -44,6 +130,18 @@ def init_db():
                 dedup_key TEXT UNIQUE
             )
         """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_notification_log_timestamp "
+            "ON notification_log (timestamp)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_notification_log_source_type "
+            "ON notification_log (source, type)"
+        )
+        from compaction import init_rollups  # both import get_db from here
+        from history import init_fts
+        init_fts(conn)
+        init_rollups(conn)
         with contextlib.suppress(sqlite3.OperationalError):
             conn.execute(
                 "ALTER TABLE reminders ADD COLUMN recurrence TEXT DEFAULT NULL"
@@ -51,37 +149,21 @@ def init_db():
         conn.commit()
 
 
-def log_notification(notif_type, source, summary, content_json, dedup_key):
-    """Log a notification to history. Silently skips duplicates."""
-    with get_db() as conn:
-        try:
-            conn.execute(
+def log_notifications_batch(rows):
+    """Log many (type, source, summary, content_json, dedup_key) rows in one transaction.
+
+    Returns False if the write failed.
+    """
+    if not rows:
+        return True
+    try:
+        with transaction("log_notifications_batch") as conn:
+            conn.executemany(
                 "INSERT OR IGNORE INTO notification_log "
                 "(type, source, summary, content, dedup_key) "
                 "VALUES (?, ?, ?, ?, ?)",
-                (notif_type, source, summary, content_json, dedup_key),
+                rows,
             )
-            conn.commit()
-        except sqlite3.Error:
-            pass
-
-
-def get_notification_history(limit=50, offset=0):
-    """Return recent notification log entries, newest first."""
-    with get_db() as conn:
-        rows = conn.execute(
-            "SELECT id, timestamp, type, source, summary, content "
-            "FROM notification_log ORDER BY id DESC LIMIT ? OFFSET ?",
-            (limit, offset),
-        ).fetchall()
-        return [dict(r) for r in rows]
-
-
-def prune_notification_log(max_age_days=7):
-    """Delete notification log entries older than max_age_days."""
-    with get_db() as conn:
-        conn.execute(
-            "DELETE FROM notification_log WHERE timestamp < datetime('now', ?)",
-            (f"-{max_age_days} days",),
-        )
-        conn.commit()
+    except sqlite3.Error:
+        return False
+    return True
@@ -1,8 +1,11 @@
 """Email notification collector — reads cache written by email-poller.mjs.
 
-The poller writes non-automated emails to a JSON cache file. This module
-reads that cache and surfaces unacked emails as notifications. Auto-advances
-the ack timestamp when emails are returned so they fire exactly once.
+The poller appends non-automated emails to a JSONL cache file. This module
+reads only the records appended since the byte offset saved next to the ack
+timestamp, and surfaces unacked ones as notifications. Auto-advances the ack
+timestamp when emails are returned so they fire exactly once. The offset is
+dropped when the poller compacts the file (new inode or shorter file); the
+legacy single-document JSON cache is still read in full.
 """
 from __future__ import annotations
 
@@ -20,6 +23,10 @@ CACHE_FILE = os.environ.get("RELAYGENT_EMAIL_CACHE", "/tmp/relaygent-email-cache
 _ACK_FILE = os.path.join(os.path.expanduser("~"), ".relaygent", "gmail", ".email_ack_ts")
 
 
+def _offset_file() -> str:
+    return os.path.join(os.path.dirname(_ACK_FILE), ".email_cache_offset")
+
+
 def _get_ack_ts() -> float:
     try:
         if os.path.exists(_ACK_FILE):
@@ -38,18 +45,72 @@ def _advance_ack(ts: float) -> None:
         logger.warning("Failed to write email ack: %s", e)
 
 
-def collect(notifications: list) -> None:
-    """Add unacked emails from the poller cache to notifications."""
+def _load_offset() -> dict:
     try:
-        if not os.path.exists(CACHE_FILE):
-            return
-        with open(CACHE_FILE) as f:
-            data = json.load(f)
-    except (OSError, json.JSONDecodeError):
-        return
+        with open(_offset_file()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_offset(inode: int, offset: int) -> None:
+    try:
+        os.makedirs(os.path.dirname(_ACK_FILE), exist_ok=True)
+        with open(_offset_file(), "w") as f:
+            json.dump({"inode": inode, "offset": offset}, f)
+    except OSError as e:
+        logger.warning("Failed to write email cache offset: %s", e)
 
+
+def _legacy_emails(chunk: bytes) -> list | None:
+    """Emails from a legacy {"emails": [...]} cache document, else None."""
+    if not chunk.startswith(b"{"):
+        return None
+    try:
+        data = json.loads(chunk.split(b"\n", 1)[0])
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or "emails" not in data:
+        return None
+    return data["emails"] or []
+
+
+def _read_new() -> list:
+    """Cache records appended since the saved offset, newest first."""
+    try:
+        st = os.stat(CACHE_FILE)
+    except OSError:
+        return []
+    saved = _load_offset()
+    offset = saved.get("offset", 0)
+    if saved.get("inode") != st.st_ino or offset > st.st_size:
+        offset = 0  # Compacted or replaced — rescan; the ack timestamp filters repeats
+    if offset == st.st_size:
+        return []
+    try:
+        with open(CACHE_FILE, "rb") as f:
+            f.seek(offset)
+            chunk = f.read()
+    except OSError:
+        return []
+    legacy = _legacy_emails(chunk) if offset == 0 else None
+    if legacy is not None:
+        return legacy
+    end = chunk.rfind(b"\n") + 1  # A partially written last line waits for next poll
+    records = []
+    for line in chunk[:end].splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    _save_offset(st.st_ino, offset + end)
+    return [r for r in reversed(records) if isinstance(r, dict)]
+
+
+def collect(notifications: list) -> None:
+    """Add unacked emails appended to the poller cache to notifications."""
     ack_ts = _get_ack_ts()
-    emails = [e for e in data.get("emails", []) if e.get("received_at", 0) > ack_ts]
+    emails = [e for e in _read_new() if e.get("received_at", 0) > ack_ts]
     if not emails:
         return
 
@@ -0,0 +1,75 @@
+"""GitHub token discovery for github_collector — read once, not per poll.
+
+Order: GH_TOKEN / GITHUB_TOKEN, the oauth_token gh stores in hosts.yml,
+then `gh auth token` (for keyring-backed gh logins). A token is cached
+until reset() (e.g. after a 401); finding none is cached for MISSING_TTL_SECS
+so an unconfigured machine doesn't spawn gh on every poll.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import time
+
+HOST = "github.com"
+MISSING_TTL_SECS = 300
+
+_token = None
+_missing_until = 0.0  # time.monotonic() before which a failed lookup isn't retried
+
+
+def hosts_file():
+    """Path of gh's hosts.yml, honouring GH_CONFIG_DIR and XDG_CONFIG_HOME."""
+    config_dir = os.environ.get("GH_CONFIG_DIR") or os.path.join(
+        os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config"),
+        "gh")
+    return os.path.join(config_dir, "hosts.yml")
+
+
+def hosts_token(path):
+    """oauth_token for github.com from a hosts.yml (minimal YAML scan), or None."""
+    host = None
+    try:
+        with open(path) as f:
+            for line in f:
+                stripped = line.strip()
+                if not stripped or stripped.startswith("#"):
+                    continue
+                key, _, value = stripped.partition(":")
+                if not line[0].isspace():
+                    host = key
+                elif host == HOST and key == "oauth_token" and value.strip():
+                    return value.strip().strip("\"'")
+    except OSError:
+        pass
+    return None
+
+
+def _gh_auth_token():
+    try:
+        result = subprocess.run(["gh", "auth", "token"], capture_output=True,
+                                text=True, timeout=5)
+    except (FileNotFoundError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def token():
+    """The GitHub token, or None if gh isn't logged in."""
+    global _token, _missing_until
+    if not _token and time.monotonic() >= _missing_until:
+        _token = (os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+                  or hosts_token(hosts_file()) or _gh_auth_token())
+        if not _token:
+            _missing_until = time.monotonic() + MISSING_TTL_SECS
+    return _token
+
+
+def reset():
+    """Forget the cached token (or its absence) so the next call re-reads it."""
+    global _token, _missing_until
+    _token = None
+    _missing_until = 0.0
@@ -1,12 +1,18 @@
-"""GitHub notification collector — checks for PR reviews, comments, mentions."""
+"""GitHub notification collector — checks for PR reviews, comments, mentions.
+
+Calls the REST API directly over the shared keep-alive client; the token is
+read once from the environment or gh's config rather than spawning gh per poll.
+"""
 
 from __future__ import annotations
 
-import json
 import logging
 import os
-import subprocess
 import time
+import urllib.parse
+
+import github_auth
+import http_client
 
 from notif_config import app
 from flask import jsonify
@@ -17,6 +23,12 @@ _LAST_CHECK_FILE = os.path.join(
     os.path.expanduser("~"), ".relaygent", "github", ".last_check_ts"
 )
 
+_API_BASE = "https://api.github.com"
+
+_etag = None
+_last_modified = None
+_next_poll = 0.0  # monotonic time before which polls are skipped (X-Poll-Interval)
+
 # Notification reasons that are worth waking the agent for
 _WAKE_REASONS = {
     "review_requested", "author", "comment", "mention",
@@ -24,35 +36,43 @@ _WAKE_REASONS = {
 }
 
 
-def _gh_available():
-    """Check if gh CLI is installed and authenticated."""
-    try:
-        result = subprocess.run(
-            ["gh", "auth", "status"],
-            capture_output=True, timeout=5,
-        )
-        return result.returncode == 0
-    except (FileNotFoundError, subprocess.SubprocessError):
-        return False
-
-
-def _gh_api(endpoint, params=None):
-    """Call GitHub API via gh CLI. Returns parsed JSON or None."""
-    cmd = ["gh", "api", endpoint]
+def _request(method, endpoint, params=None, headers=None):
+    """Call the GitHub REST API over the pooled client. Returns a Response or None."""
+    token = github_auth.token()
+    if not token:
+        return None
+    url = f"{_API_BASE}/{endpoint}"
     if params:
-        for k, v in params.items():
-            cmd.extend(["-f", f"{k}={v}"])
+        url += "?" + urllib.parse.urlencode(params)
+    hdrs = {"Authorization": f"Bearer {token}", "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28", "User-Agent": "relaygent"}
     try:
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=10,
-        )
-        if result.returncode != 0:
-            logger.debug("gh api %s failed: %s", endpoint, result.stderr.strip()[:200])
-            return None
-        return json.loads(result.stdout)
-    except (subprocess.SubprocessError, json.JSONDecodeError) as e:
-        logger.warning("gh api %s error: %s", endpoint, e)
+        resp = http_client.request(method, url, headers={**hdrs, **(headers or {})},
+                                   timeout=10)
+    except http_client.ERRORS as e:
+        logger.warning("GitHub %s %s error: %s", method, endpoint, e)
         return None
+    if resp.status == 401:
+        github_auth.reset()
+    elif resp.status >= 400:
+        logger.debug("GitHub %s %s: HTTP %s", method, endpoint, resp.status)
+    return resp
+
+
+def _apply_poll_headers(resp):
+    """Respect X-Poll-Interval, and back off until reset when rate limited."""
+    global _next_poll
+    delay = _safe_int(resp.headers.get("x-poll-interval"))
+    if resp.status in (403, 429) and resp.headers.get("x-ratelimit-remaining") == "0":
+        delay = max(delay, _safe_int(resp.headers.get("x-ratelimit-reset")) - time.time())
+    _next_poll = time.monotonic() + delay
+
+
+def _safe_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
 
 
 def _load_last_check():
@@ -66,11 +86,10 @@ def _load_last_check():
     return None
 
 
-def _save_last_check():
-    """Save current time as last check timestamp."""
+def _save_last_check(ts):
+    """Save ts (GitHub's updated_at of the newest notification seen) as last check."""
     try:
         os.makedirs(os.path.dirname(_LAST_CHECK_FILE), exist_ok=True)
-        ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
         with open(_LAST_CHECK_FILE, "w") as f:
             f.write(ts)
     except OSError as e:
@@ -100,28 +119,53 @@ def _format_notification(notif):
 
 
 def collect(notifications):
-    """Check GitHub for unread notifications since last check."""
-    if not _gh_available():
+    """Check GitHub for unread notifications since last check.
+
+    Conditional requests (ETag / Last-Modified) let unchanged polls come
+    back 304, which GitHub doesn't count against the rate limit. `since`
+    is the updated_at of the newest notification already seen, so the URL
+    (and its ETag) only changes when new notifications arrive; failed
+    polls leave it alone, so nothing updated during an outage is skipped.
+    """
+    global _etag, _last_modified
+    if time.monotonic() < _next_poll or not github_auth.token():
         return
 
     last_check = _load_last_check()
-    params = {}
-    if last_check:
-        params["since"] = last_check
-
-    data = _gh_api("notifications", params)
-    if not data or not isinstance(data, list):
-        _save_last_check()
+    params = {"since": last_check} if last_check else {}
+    conditional = {}
+    if _etag:
+        conditional["If-None-Match"] = _etag
+    if _last_modified:
+        conditional["If-Modified-Since"] = _last_modified
+
+    resp = _request("GET", "notifications", params, conditional)
+    if resp is None:
+        return
+    _apply_poll_headers(resp)
+    if resp.status == 304 or not resp.ok:
+        return
+    try:
+        data = resp.json()
+    except ValueError:
         return
+    if not isinstance(data, list):
+        return
+    _etag, _last_modified = resp.headers.get("etag"), resp.headers.get("last-modified")
+
+    fresh = [n for n in data if not last_check or (n.get("updated_at") or "") > last_check]
+    newest = max((n.get("updated_at") or "" for n in fresh), default="")
+    if newest:
+        _save_last_check(newest)
+        _etag = _last_modified = None  # They belong to the old `since` URL
 
     # Filter for actionable notifications
     relevant = [
-        n for n in data
+        n for n in fresh
         if n.get("reason") in _WAKE_REASONS and n.get("unread", True)
     ]
 
     if not relevant:
-        _save_last_check()
         return
 
     messages = []
@@ -137,18 +181,11 @@ def collect(notifications):
         "count": len(relevant),
         "messages": messages,
     })
-    _save_last_check()
 
 
 def ack():
     """Mark all GitHub notifications as read."""
-    try:
-        subprocess.run(
-            ["gh", "api", "-X", "PUT", "notifications"],
-            capture_output=True, timeout=10,
-        )
-    except (FileNotFoundError, subprocess.SubprocessError):
-        pass
+    _request("PUT", "notifications")
 
 
 @app.route("/notifications/ack-github", methods=["POST"])
@@ -0,0 +1,99 @@
+"""Relaygent Notifications — searchable notification history.
+
+An FTS5 index over notification_log.summary/content (external content,
+kept in sync by triggers) plus source/type/time filters and keyset
+pagination on id, so deep pages cost the same as the first.
+"""
+
+import sqlite3
+
+from db import get_db
+
+_FTS_SCHEMA = (
+    """CREATE VIRTUAL TABLE notification_log_fts USING fts5(
+        summary, content, content='notification_log', content_rowid='id')""",
+    """CREATE TRIGGER IF NOT EXISTS notification_log_ai AFTER INSERT ON notification_log BEGIN
+        INSERT INTO notification_log_fts(rowid, summary, content)
+        VALUES (new.id, new.summary, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notification_log_ad AFTER DELETE ON notification_log BEGIN
+        INSERT INTO notification_log_fts(notification_log_fts, rowid, summary, content)
+        VALUES ('delete', old.id, old.summary, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notification_log_au AFTER UPDATE ON notification_log BEGIN
+        INSERT INTO notification_log_fts(notification_log_fts, rowid, summary, content)
+        VALUES ('delete', old.id, old.summary, old.content);
+        INSERT INTO notification_log_fts(rowid, summary, content)
+        VALUES (new.id, new.summary, new.content);
+    END""",
+)
+
+
+def init_fts(conn):
+    """Create the FTS index and triggers; backfill existing rows on first run.
+
+    Returns False if this SQLite build lacks FTS5 (search then falls back to LIKE).
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'notification_log_fts'"
+    ).fetchone()
+    if exists:
+        return True
+    try:
+        for stmt in _FTS_SCHEMA:
+            conn.execute(stmt)
+        conn.execute("INSERT INTO notification_log_fts(notification_log_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def _fts_query(text):
+    """Turn free text into an FTS5 query: every word must match (as a quoted term)."""
+    return " ".join('"%s"' % w.replace('"', '""') for w in text.split())
+
+
+def _normalize_time(value):
+    """Accept ISO ('2026-03-01T09:00') or SQLite ('2026-03-01 09:00') timestamps."""
+    return value.replace("T", " ") if value else value
+
+
+def search_history(query=None, source=None, notif_type=None, since=None, until=None,
+                   before_id=None, limit=50):
+    """Return matching log entries newest first, with keyset pagination.
+
+    Pass the smallest id from a page as before_id to fetch the next one.
+    Timestamps are UTC ('YYYY-MM-DD HH:MM:SS'); since is inclusive, until exclusive.
+    """
+    where, params = [], []
+    if source:
+        where.append("source = ?")
+        params.append(source)
+    if notif_type:
+        where.append("type = ?")
+        params.append(notif_type)
+    if since:
+        where.append("timestamp >= ?")
+        params.append(_normalize_time(since))
+    if until:
+        where.append("timestamp < ?")
+        params.append(_normalize_time(until))
+    if before_id:
+        where.append("id < ?")
+        params.append(before_id)
+    with get_db("search_history") as conn:
+        if query and query.split():
+            if conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'notification_log_fts'"
+            ).fetchone():
+                where.append("id IN (SELECT rowid FROM notification_log_fts "
+                             "WHERE notification_log_fts MATCH ?)")
+                params.append(_fts_query(query))
+            else:
+                where.append("(summary LIKE ? OR content LIKE ?)")
+                params += [f"%{query}%"] * 2
+        sql = "SELECT id, timestamp, type, source, summary, content FROM notification_log"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = conn.execute(sql + " ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+        return [dict(r) for r in rows]
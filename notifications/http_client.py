@@ -0,0 +1,199 @@
+"""Relaygent Notifications — shared keep-alive HTTP client for collectors.
+
+Per-host pools of persistent http.client connections (one TLS handshake
+per connection, not per call), gzip responses, a per-host concurrency cap,
+retry with backoff that honours Retry-After (policy in http_retry.py), and
+per-host call and latency counters.
+"""
+
+import contextvars
+import gzip
+import http.client
+import json
+import logging
+import ssl
+import threading
+import time
+import urllib.parse
+
+import http_retry
+
+logger = logging.getLogger(__name__)
+
+MAX_PER_HOST = 4  # Concurrent requests (and idle pooled connections) per host
+REPLAYABLE_METHODS = {"GET", "HEAD", "OPTIONS"}  # Resent after a network error by default
+# What callers should catch from request(): network failures and protocol errors
+ERRORS = (OSError, http.client.HTTPException)
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError,
+                 http.client.BadStatusLine)
+
+_lock = threading.Lock()
+_idle = {}  # (scheme, host, port) -> [HTTPConnection]
+_limits = {}  # (scheme, host, port) -> BoundedSemaphore
+_stats = {}  # host -> counters
+# {"errors", "rate_limited"} for the collector running in this context, set by
+# metrics.run_collector. Worker threads share it only when they are started
+# with contextvars.copy_context().run.
+upstream_tally = contextvars.ContextVar("upstream_tally", default=None)
+_default_ctx = None
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers  # lower-cased names
+        self.body = body
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def json(self):
+        return json.loads(self.body.decode() or "null")
+
+
+def stats():
+    """Snapshot of per-host counters (calls, errors, retries, rate_limited, latency ms)."""
+    with _lock:
+        return {h: dict(s) for h, s in _stats.items()}
+
+
+def _record(host, elapsed_ms, error=False, rate_limited=False, retry=False):
+    with _lock:
+        s = _stats.setdefault(host, {"calls": 0, "errors": 0, "retries": 0,
+                                     "rate_limited": 0, "total_ms": 0.0, "max_ms": 0.0})
+        s["calls"] += 1
+        s["total_ms"] += elapsed_ms
+        s["max_ms"] = max(s["max_ms"], elapsed_ms)
+        s["errors"] += error
+        s["rate_limited"] += rate_limited
+        s["retries"] += retry
+        tally = upstream_tally.get()
+        if tally is not None:
+            tally["errors"] += error
+            tally["rate_limited"] += rate_limited
+
+
+def _key(url):
+    parts = urllib.parse.urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    return (parts.scheme, parts.hostname, port), path
+
+
+def _checkout(key, timeout, context):
+    with _lock:
+        idle = _idle.get(key)
+        if idle:
+            conn = idle.pop()
+            conn.timeout = timeout
+            if conn.sock:
+                conn.sock.settimeout(timeout)
+            return conn, True
+    scheme, host, port = key
+    if scheme == "https":
+        global _default_ctx
+        if context is None:
+            _default_ctx = _default_ctx or ssl.create_default_context()
+            context = _default_ctx
+        return http.client.HTTPSConnection(host, port, timeout=timeout, context=context), False
+    return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+
+def _checkin(key, conn):
+    with _lock:
+        idle = _idle.setdefault(key, [])
+        if len(idle) < MAX_PER_HOST:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+def _limit(key):
+    with _lock:
+        if key not in _limits:
+            _limits[key] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return _limits[key]
+
+
+def _send(key, method, path, headers, body, timeout, context):
+    """One request on a pooled connection; retries once if a reused socket was stale."""
+    for attempt in range(2):
+        conn, reused = _checkout(key, timeout, context)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except _STALE_ERRORS:
+            conn.close()
+            if reused and attempt == 0:
+                continue
+            raise
+        except BaseException:
+            conn.close()
+            raise
+        resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+        if resp.will_close:
+            conn.close()
+        else:
+            _checkin(key, conn)
+        if resp_headers.get("content-encoding") == "gzip":
+            data = gzip.decompress(data)
+        return Response(resp.status, resp_headers, data)
+
+
+def request(method, url, headers=None, body=None, json_body=None, timeout=10,
+            retries=2, max_retry_delay=10, context=None, idempotent=None):
+    """Perform an HTTP request and return a Response (any status).
+
+    Retries 429/503 up to `retries` times, sleeping for Retry-After (capped
+    at max_retry_delay) or exponential backoff. Network errors and 502/504
+    are retried only for REPLAYABLE_METHODS, or when the caller passes
+    idempotent=True: a write may have landed before the failure. Raises
+    OSError or http.client.HTTPException once retries run out.
+    """
+    replay = method.upper() in REPLAYABLE_METHODS if idempotent is None else idempotent
+    key, path = _key(url)
+    hdrs = {"Accept-Encoding": "gzip", "Connection": "keep-alive", **(headers or {})}
+    if json_body is not None:
+        body = json.dumps(json_body).encode()
+        hdrs.setdefault("Content-Type", "application/json")
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        resp, err = None, None
+        try:
+            with _limit(key):
+                resp = _send(key, method, path, hdrs, body, timeout, context)
+        except ERRORS as e:
+            err = e
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        will_retry = http_retry.should_retry(resp, err, replay) and attempt < retries
+        _record(key[1], elapsed_ms, error=err is not None or resp.status >= 500,
+                rate_limited=resp is not None and resp.status == 429, retry=will_retry)
+        if not will_retry:
+            if err is not None:
+                raise err
+            return resp
+        delay = http_retry.delay(resp, attempt, max_retry_delay)
+        logger.info("%s %s: %s, retrying in %.1fs", method, key[1],
+                    err or f"HTTP {resp.status}", delay)
+        time.sleep(delay)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def close_all():
+    """Close every idle pooled connection."""
+    with _lock:
+        conns = [c for idle in _idle.values() for c in idle]
+        _idle.clear()
+    for conn in conns:
+        conn.close()
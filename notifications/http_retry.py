@@ -0,0 +1,40 @@
+"""Relaygent Notifications — retry policy for http_client.
+
+Which responses are retried (replays only when a request is idempotent or
+the server never saw it), and how long to wait before the next attempt:
+Retry-After when the server sends one (seconds or an HTTP date), otherwise
+exponential backoff, always capped at the caller's max delay.
+"""
+
+import email.utils
+import time
+
+RETRY_STATUSES = {429, 502, 503, 504}
+# Gateway failures that may come after the upstream already applied the request
+UNCERTAIN_STATUSES = {502, 504}
+BASE_DELAY_SECS = 0.5
+
+
+def should_retry(resp, err, idempotent=True):
+    """True for retryable statuses. Network errors and 502/504 leave it unknown
+    whether the server acted, so they are retried only for idempotent requests."""
+    if err is not None or resp.status in UNCERTAIN_STATUSES:
+        return idempotent
+    return resp.status in RETRY_STATUSES
+
+
+def delay(resp, attempt, max_delay):
+    """Seconds to sleep before retry number `attempt + 1`."""
+    value = resp.headers.get("retry-after") if resp else None
+    if value:
+        try:
+            return min(max(float(value), 0.0), max_delay)
+        except ValueError:
+            pass
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):  # Garbage: 3.10+ raises instead of returning None
+            when = None
+        if when is not None:
+            return min(max(when.timestamp() - time.time(), 0.0), max_delay)
+    return min(BASE_DELAY_SECS * 2 ** attempt, max_delay)
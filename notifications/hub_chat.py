@@ -0,0 +1,114 @@
+"""Relaygent Notifications — live hub chat state over the hub's /ws WebSocket.
+
+A background thread holds one WebSocket subscription to the hub. Each
+(re)connect reconciles with a full GET /api/chat?mode=unread; after that
+the unread list changes only from pushed events — `unread` snapshots (sent
+by the hub whenever chat changes, including reads) and `message` events —
+so the fast poll reads memory instead of calling the hub every second.
+unread() returns None while not subscribed; callers then fall back to HTTP.
+"""
+
+import json
+import logging
+import threading
+
+import http_client
+import ws_client
+
+logger = logging.getLogger(__name__)
+
+PING_SECS = 30  # Ping after this long without traffic; reconnect after twice that
+RECONNECT_MIN_SECS = 1.0
+RECONNECT_MAX_SECS = 30.0
+
+_lock = threading.Lock()
+_unread = None  # list of unread human messages while subscribed, else None
+_stop = threading.Event()
+_thread = None
+_ws = None  # live connection, so stop() can interrupt a blocked recv
+
+
+def fetch_unread(base_url, context=None, timeout=2):
+    """Unread human messages via GET /api/chat?mode=unread.
+
+    Raises http_client.ERRORS or ValueError on failure.
+    """
+    resp = http_client.get(f"{base_url}/api/chat?mode=unread", timeout=timeout,
+                           retries=0, context=context)
+    data = resp.json() if resp.ok else {}
+    return data.get("messages") or []
+
+
+def unread():
+    """Unread messages from the live subscription, or None if not subscribed."""
+    with _lock:
+        return None if _unread is None else list(_unread)
+
+
+def _set_unread(messages):
+    global _unread
+    with _lock:
+        _unread = None if messages is None else list(messages)
+
+
+def apply_event(event):
+    """Update unread state from one hub /ws event."""
+    global _unread
+    with _lock:
+        if _unread is None:
+            return
+        if event.get("type") == "unread":
+            _unread = list(event.get("messages") or [])
+        elif event.get("type") == "message":
+            msg = event.get("data") or {}
+            if (msg.get("role") == "human" and not msg.get("read")
+                    and all(m.get("id") != msg.get("id") for m in _unread)):
+                _unread.append(msg)
+
+
+def _run(base_url, context):
+    global _ws
+    delay = RECONNECT_MIN_SECS
+    while not _stop.is_set():
+        ws = None
+        try:
+            ws = _ws = ws_client.WebSocket(f"{base_url}/ws", context)
+            _set_unread(fetch_unread(base_url, context))  # After subscribing: no gap
+            delay = RECONNECT_MIN_SECS
+            logger.info("Subscribed to hub chat at %s/ws", base_url)
+            while not _stop.is_set():
+                try:
+                    event = json.loads(ws.recv(PING_SECS))
+                except ValueError:
+                    continue
+                if isinstance(event, dict):
+                    apply_event(event)
+        except (*http_client.ERRORS, ValueError) as e:
+            logger.debug("Hub chat subscription lost: %s", e)
+        finally:
+            _set_unread(None)
+            _ws = None
+            if ws:
+                ws.close()
+        _stop.wait(delay)
+        delay = min(delay * 2, RECONNECT_MAX_SECS)
+
+
+def start(base_url, context=None):
+    """Start the subscription thread (idempotent)."""
+    global _thread
+    if _thread and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_run, args=(base_url, context),
+                               name="hub-chat", daemon=True)
+    _thread.start()
+
+
+def stop(timeout=5):
+    _stop.set()
+    ws = _ws
+    if ws:
+        ws.close()
+    if _thread:
+        _thread.join(timeout)
@@ -1,36 +1,58 @@
-"""Linear notification acknowledgment — mark notifications as read."""
+"""Linear notification acknowledgment — mark notifications as read.
+
+Unread IDs are paged in with a lightweight id-only query, then marked read
+with aliased notificationUpdate mutations, one GraphQL request per
+ACK_BATCH IDs instead of one round trip each.
+"""
 from __future__ import annotations
 
 import time
 
 from notif_config import app
 from flask import jsonify
-from linear_collector import _graphql, _NOTIF_QUERY
+from linear_collector import _graphql, fetch_pages
+
+ACK_BATCH = 100
+MAX_PAGES = 10
+
+_UNREAD_IDS_QUERY = """
+query($after: String) {
+  notifications(filter: { readAt: { null: true } }, first: 100, after: $after) {
+    nodes { id }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+
+
+def _mark_read_mutation(count):
+    """Mutation marking `count` notifications ($id0..) read at $readAt."""
+    params = ", ".join(f"$id{i}: String!" for i in range(count))
+    fields = "\n".join(
+        f"  m{i}: notificationUpdate(id: $id{i}, input: {{ readAt: $readAt }}) {{ success }}"
+        for i in range(count))
+    return f"mutation($readAt: DateTime!, {params}) {{\n{fields}\n}}"
 
 
 def _mark_read_ids(notif_ids):
-    """Mark specific Linear notifications as read."""
-    mutation = """
-    mutation($id: String!) {
-        notificationUpdate(id: $id, input: { readAt: "%s" }) {
-            notification { id }
-        }
-    }
-    """ % time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    for nid in notif_ids[:20]:
-        _graphql(mutation, {"id": nid})
+    """Mark Linear notifications as read, ACK_BATCH per request. Returns success."""
+    read_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    ok = True
+    for start in range(0, len(notif_ids), ACK_BATCH):
+        batch = notif_ids[start:start + ACK_BATCH]
+        variables = {"readAt": read_at, **{f"id{i}": nid for i, nid in enumerate(batch)}}
+        ok = _graphql(_mark_read_mutation(len(batch)), variables) is not None and ok
+    return ok
 
 
 @app.route("/notifications/ack-linear", methods=["POST"])
 def ack_linear():
-    """HTTP endpoint — mark recent Linear notifications as read."""
+    """HTTP endpoint — mark unread Linear notifications as read."""
     from linear_collector import _get_api_key
     if not _get_api_key():
         return jsonify({"status": "skipped", "reason": "no api key"})
-    data = _graphql(_NOTIF_QUERY, {})
-    if data:
-        nodes = data.get("notifications", {}).get("nodes", [])
-        ids = [n["id"] for n in nodes if n.get("id")]
-        if ids:
-            _mark_read_ids(ids)
+    nodes, _ = fetch_pages(_UNREAD_IDS_QUERY, {}, max_pages=MAX_PAGES)
+    ids = [n["id"] for n in nodes or [] if n.get("id")]
+    if ids:
+        _mark_read_ids(ids)
     return jsonify({"status": "ok"})
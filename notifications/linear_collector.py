@@ -2,12 +2,11 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 import time
-import urllib.request
 
+import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -18,19 +17,18 @@ _LAST_CHECK_FILE = os.path.join(
 _API_URL = "https://api.linear.app/graphql"
 
 # Notification types worth waking the agent for
-_WAKE_TYPES = {
-    "issueAssignedToYou",
-    "issueNewComment",
-    "issueMention",
-    "issueStatusChanged",
-    "issuePriorityChanged",
-}
+_WAKE_TYPES = {"issueAssignedToYou", "issueNewComment", "issueMention",
+               "issueStatusChanged", "issuePriorityChanged"}
+
+PAGE_SIZE = 50
+MAX_PAGES = 5  # Per poll; a longer backlog resumes from the saved cursor next poll
 
 _NOTIF_QUERY = """
-query($createdAfter: DateTime) {
+query($createdAfter: DateTime, $after: String) {
   notifications(
     filter: { readAt: { null: true }, createdAt: { gte: $createdAfter } }
-    first: 20
+    first: %d
+    after: $after
     orderBy: createdAt
   ) {
     nodes {
@@ -40,9 +38,10 @@ query($createdAfter: DateTime) {
         comment { body createdAt user { name } }
       }
     }
+    pageInfo { hasNextPage endCursor }
   }
 }
-"""
+""" % PAGE_SIZE
 
 
 def _get_api_key():
@@ -59,32 +58,70 @@ def _graphql(query, variables=None):
     key = _get_api_key()
     if not key:
         return None
-    body = json.dumps({"query": query, "variables": variables or {}}).encode()
-    req = urllib.request.Request(
-        _API_URL, data=body, method="POST",
-        headers={"Content-Type": "application/json", "Authorization": key},
-    )
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
-        if data.get("errors"):
-            logger.warning("Linear API error: %s", data["errors"][0].get("message"))
-            return None
-        return data.get("data")
-    except (urllib.error.URLError, json.JSONDecodeError, OSError) as e:
+        resp = http_client.post(
+            _API_URL, json_body={"query": query, "variables": variables or {}},
+            headers={"Authorization": key}, timeout=10,
+            idempotent=not query.lstrip().startswith("mutation"),  # Queries are read-only
+        )
+        data = resp.json()
+    except (*http_client.ERRORS, ValueError) as e:
         logger.warning("Linear API request failed: %s", e)
         return None
+    if not isinstance(data, dict):
+        logger.warning("Linear API HTTP %d", resp.status)
+        return None
+    if data.get("errors"):
+        logger.warning("Linear API error: %s", data["errors"][0].get("message"))
+        return None
+    return data.get("data")
 
 
-def _load_last_check():
-    """Read last check timestamp. Returns ISO string or None."""
+def fetch_pages(query, variables, after=None, max_pages=1):
+    """Page a notifications query via pageInfo.endCursor.
+
+    Returns (nodes, cursor): cursor is where to resume when pages remain
+    (max_pages hit or a page failed), else None. nodes is None if the first
+    page failed, and cursor is then the incoming `after`.
+    """
+    nodes = None
+    for _ in range(max_pages):
+        data = _graphql(query, {**variables, "after": after})
+        if not data:
+            return nodes, after
+        conn = data.get("notifications") or {}
+        nodes = (nodes or []) + (conn.get("nodes") or [])
+        info = conn.get("pageInfo") or {}
+        if not info.get("hasNextPage") or not info.get("endCursor"):
+            return nodes, None
+        after = info["endCursor"]
+    return nodes, after
+
+
+def _cursor_file():
+    return os.path.join(os.path.dirname(_LAST_CHECK_FILE), ".cursor")
+
+
+def _save_cursor(cursor):
     try:
-        if os.path.exists(_LAST_CHECK_FILE):
-            with open(_LAST_CHECK_FILE) as f:
-                return f.read().strip() or None
+        os.makedirs(os.path.dirname(_LAST_CHECK_FILE), exist_ok=True)
+        with open(_cursor_file(), "w") as f:
+            f.write(cursor or "")
+    except OSError as e:
+        logger.warning("Failed to write Linear cursor: %s", e)
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
     except OSError:
-        pass
-    return None
+        return None
+
+
+def _load_last_check():
+    """Read last check timestamp. Returns ISO string or None."""
+    return _read(_LAST_CHECK_FILE)
 
 
 def _save_last_check():
@@ -124,25 +161,25 @@ def _format_notification(notif):
 
 
 def collect(notifications):
-    """Check Linear for unread notifications since last check."""
+    """Check Linear for unread notifications since last check.
+
+    If pages remain, the cursor is saved and last-check held back so the
+    next poll resumes there with the same filter.
+    """
     if not _get_api_key():
         return
-
     last_check = _load_last_check()
-    variables = {}
-    if last_check:
-        variables["createdAfter"] = last_check
-
-    data = _graphql(_NOTIF_QUERY, variables)
-    if not data:
+    variables = {"createdAfter": last_check} if last_check else {}
+    resume = _read(_cursor_file())
+    nodes, cursor = fetch_pages(_NOTIF_QUERY, variables, resume, MAX_PAGES)
+    if nodes is None:
+        return  # Nothing fetched: keep the cursor and last-check for the retry
+    if cursor != resume:
+        _save_cursor(cursor)
+    if cursor is None:
         _save_last_check()
-        return
-
-    nodes = data.get("notifications", {}).get("nodes", [])
-    relevant = [n for n in nodes if n.get("type") in _WAKE_TYPES]
-
+    relevant = [n for n in nodes or [] if n.get("type") in _WAKE_TYPES]
     if not relevant:
-        _save_last_check()
         return
 
     messages = []
@@ -158,7 +195,6 @@ def collect(notifications):
         "count": len(relevant),
         "messages": messages,
     })
-    _save_last_check()
 
 
 # ack endpoint extracted to linear_ack.py (imported in routes.py)
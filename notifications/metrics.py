@@ -0,0 +1,159 @@
+"""Relaygent Notifications — in-process metrics and the /metrics endpoint.
+
+Counters, gauges and fixed-bucket histograms kept in plain dicts behind one
+lock; recording is a dict update, so instrumenting the 1s fast poll costs
+microseconds. GET /metrics renders them in the Prometheus text exposition
+format, together with http_client's per-host upstream counters.
+"""
+
+import bisect
+import threading
+import time
+
+from flask import Response, request
+
+import http_client
+from notif_config import app
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_HELP = {
+    "relaygent_collector_duration_seconds": ("histogram", "Collector run time"),
+    "relaygent_collector_calls_total": ("counter", "Collector runs"),
+    "relaygent_collector_errors_total": ("counter", "Collector runs that raised or hit upstream errors"),
+    "relaygent_collector_rate_limited_total": ("counter", "Upstream 429 responses seen by a collector"),
+    "relaygent_collector_last_success_age_seconds": ("gauge", "Seconds since a collector last ran cleanly"),
+    "relaygent_http_request_duration_seconds": ("histogram", "Notifications server request latency per route"),
+    "relaygent_sqlite_op_duration_seconds": ("histogram", "SQLite connection hold time per operation"),
+    "relaygent_pending_notifications": ("gauge", "Notifications in the last /notifications/pending snapshot"),
+    "relaygent_upstream_requests_total": ("counter", "Outbound HTTP requests per host"),
+    "relaygent_upstream_errors_total": ("counter", "Outbound HTTP failures and 5xx per host"),
+    "relaygent_upstream_rate_limited_total": ("counter", "Outbound HTTP 429 responses per host"),
+    "relaygent_upstream_retries_total": ("counter", "Outbound HTTP retries per host"),
+    "relaygent_upstream_duration_seconds_total": ("counter", "Total outbound HTTP latency per host"),
+}
+
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> float
+_gauges = {}  # (name, labels) -> float
+_histograms = {}  # (name, labels) -> [per-bucket counts..., +Inf count, sum]
+_last_success = {}  # source -> time.time() of last clean run
+
+
+def inc(name, amount=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _gauges[(name, tuple(sorted(labels.items())))] = value
+
+
+def observe(name, secs, **labels):
+    """Add one observation (seconds) to a histogram."""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        h[bisect.bisect_left(BUCKETS, secs)] += 1
+        h[-1] += secs
+
+
+def run_collector(source, collector, notifications):
+    """Run one collector, recording latency, errors, 429s and last success.
+
+    Re-raises whatever the collector raises; the caller keeps its own
+    exception handling.
+    """
+    tally = {"errors": 0, "rate_limited": 0}
+    token = http_client.upstream_tally.set(tally)
+    start = time.perf_counter()
+    ok = False
+    try:
+        collector(notifications)
+        ok = True
+    finally:
+        observe("relaygent_collector_duration_seconds", time.perf_counter() - start, source=source)
+        http_client.upstream_tally.reset(token)
+        ok = ok and not tally["errors"]
+        inc("relaygent_collector_calls_total", source=source)
+        if not ok:
+            inc("relaygent_collector_errors_total", source=source)
+        if tally["rate_limited"]:
+            inc("relaygent_collector_rate_limited_total", tally["rate_limited"], source=source)
+        if ok:
+            with _lock:
+                _last_success[source] = time.time()
+
+
+def reset():
+    with _lock:
+        for store in (_counters, _gauges, _histograms, _last_success):
+            store.clear()
+
+
+def _fmt_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')
+                                .replace("\n", "\\n")) for k, v in pairs)
+    return "{" + body + "}"
+
+
+def render(now=None):
+    """All metrics in Prometheus text exposition format (version 0.0.4)."""
+    now = time.time() if now is None else now
+    with _lock:
+        series = [(n, lb, v) for (n, lb), v in _counters.items()]
+        series += [(n, lb, v) for (n, lb), v in _gauges.items()]
+        series += [("relaygent_collector_last_success_age_seconds", (("source", s),), now - t)
+                   for s, t in _last_success.items()]
+        hists = [(n, lb, list(h)) for (n, lb), h in _histograms.items()]
+    for host, s in http_client.stats().items():
+        labels = (("host", host),)
+        series += [("relaygent_upstream_requests_total", labels, s["calls"]),
+                   ("relaygent_upstream_errors_total", labels, s["errors"]),
+                   ("relaygent_upstream_rate_limited_total", labels, s["rate_limited"]),
+                   ("relaygent_upstream_retries_total", labels, s["retries"]),
+                   ("relaygent_upstream_duration_seconds_total", labels, s["total_ms"] / 1000)]
+    by_name = {}
+    for name, labels, value in sorted(series):
+        by_name.setdefault(name, []).append(f"{name}{_fmt_labels(labels)} {value:g}")
+    for name, labels, h in sorted(hists):
+        lines = by_name.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), h[:-1]):
+            cumulative += count
+            le = bound if isinstance(bound, str) else f"{bound:g}"
+            lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', le)])} {cumulative}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {h[-1]:g}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {cumulative}")
+    out = []
+    for name in sorted(by_name):
+        kind, help_text = _HELP.get(name, ("untyped", name))
+        out += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"] + by_name[name]
+    return "\n".join(out) + "\n"
+
+
+@app.before_request
+def _start_timer():
+    request.environ["relaygent.start"] = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    start = request.environ.get("relaygent.start")
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        observe("relaygent_http_request_duration_seconds", time.perf_counter() - start,
+                route=route, method=request.method)
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(render(), mimetype="text/plain; version=0.0.4")
@@ -1,53 +1,92 @@
 """Notification history logger — converts notifications to log entries."""
 
+import collections
+import hashlib
 import json
 import logging
+import threading
+import time
 
-from db import log_notification, prune_notification_log
+import notif_config
+import task_model
+from db import log_notifications_batch
 
 logger = logging.getLogger(__name__)
 
+RECENT_KEYS_MAX = 4096
+# dedup keys already written to the DB at _recent_db — repeat polls skip the round-trip
+_recent = collections.OrderedDict()
+_recent_db = None
+_lock = threading.Lock()  # Guards _recent/_recent_db; request threads share them
+
+
+def stable_digest(value):
+    """Deterministic short digest of a JSON-able value (stable across restarts)."""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=12).hexdigest()
+
 
 def log_notifications(notifications):
-    """Persist non-empty notifications to the history log."""
+    """Persist notifications to the history log in one transaction."""
+    global _recent_db
     if not notifications:
         return
-    for n in notifications:
-        ntype = n.get("type", "unknown")
-        if ntype == "reminder":
-            log_notification(
-                "reminder", "reminder", n.get("message", "")[:200],
-                json.dumps(n), f"reminder-{n.get('id', '')}")
-        elif ntype == "message":
-            source = n.get("source", "chat")
-            msgs = n.get("messages", [])
-            for m in msgs:
-                log_notification(
-                    "message", source, m.get("content", "")[:200],
-                    json.dumps(m), f"chat-{m.get('timestamp', '')}")
-        elif ntype == "slack":
-            for m in n.get("messages", [n]):
-                ts = m.get("ts", m.get("timestamp", ""))
-                log_notification(
-                    "slack", n.get("channel_name", "slack"),
-                    m.get("text", "")[:200], json.dumps(m), f"slack-{ts}")
-        elif ntype == "task":
-            desc = n.get("description", "")[:200]
-            overdue = n.get("overdue", "")
-            summary = f"{desc} ({overdue})" if overdue else desc
-            log_notification(
-                "task", "task", summary,
-                json.dumps(n), f"task-{hash(desc)}")
-        elif ntype in ("email", "github", "linear"):
-            key = n.get("id", n.get("url", ""))
-            log_notification(
-                ntype, ntype, n.get("title", n.get("message", ""))[:200],
-                json.dumps(n), f"{ntype}-{key}")
-        else:
-            log_notification(
-                ntype, ntype, str(n)[:200],
-                json.dumps(n), f"{ntype}-{hash(json.dumps(n, sort_keys=True))}")
-    try:
-        prune_notification_log()
-    except Exception:
-        logger.debug("Failed to prune notification log", exc_info=True)
+    candidates = [row for n in notifications for row in _entries(n)]
+    rows = []
+    with _lock:
+        if _recent_db != notif_config.DB_PATH:
+            _recent.clear()
+            _recent_db = notif_config.DB_PATH
+        for row in candidates:
+            if row[4] in _recent:
+                _recent.move_to_end(row[4])
+            else:
+                rows.append(row)
+    if not rows or not log_notifications_batch(rows):
+        return
+    with _lock:
+        for row in rows:
+            _recent[row[4]] = None
+        while len(_recent) > RECENT_KEYS_MAX:
+            _recent.popitem(last=False)
+
+
+def _entries(n):
+    """Yield (type, source, summary, content_json, dedup_key) rows for one notification."""
+    ntype = n.get("type", "unknown")
+    if ntype == "reminder":
+        yield (
+            "reminder", "reminder", n.get("message", "")[:200],
+            json.dumps(n), f"reminder-{n.get('id', '')}")
+    elif ntype == "message":
+        source = n.get("source", "chat")
+        msgs = n.get("messages", [])
+        for m in msgs:
+            yield (
+                "message", source, m.get("content", "")[:200],
+                json.dumps(m), f"chat-{m.get('timestamp', '')}")
+    elif ntype == "slack":
+        for m in n.get("messages", [n]):
+            ts = m.get("ts", m.get("timestamp", ""))
+            yield (
+                "slack", n.get("channel_name", "slack"),
+                m.get("text", "")[:200], json.dumps(m), f"slack-{ts}")
+    elif ntype == "task":
+        desc = n.get("description", "")[:200]
+        overdue = n.get("overdue", "")
+        summary = f"{desc} ({overdue})" if overdue else desc
+        # A recurring task notifies at most once per freq period, so the period
+        # (and the last completion) tell its occurrences apart
+        period = int(time.time() // task_model.freq_secs(n.get("freq", "")))
+        yield (
+            "task", "task", summary, json.dumps(n),
+            f"task-{stable_digest([desc, n.get('last', ''), period])}")
+    elif ntype in ("email", "github", "linear"):
+        key = n.get("id", n.get("url", ""))
+        yield (
+            ntype, ntype, n.get("title", n.get("message", ""))[:200],
+            json.dumps(n), f"{ntype}-{key}")
+    else:
+        yield (
+            ntype, ntype, str(n)[:200],
+            json.dumps(n), f"{ntype}-{stable_digest(n)}")
@@ -0,0 +1,200 @@
+"""Relaygent Notifications — in-process reminder dispatcher.
+
+A min-heap of upcoming fire times (loaded from SQLite, kept in sync by
+reminders.py) and a thread that sleeps until the next deadline. Fired
+reminders go to an in-memory buffer drained by /notifications/pending and
+to long-poll waiters. SQLite stays the source of truth: missed-while-down
+reminders fire on start under the usual one-hour stale cutoff.
+"""
+
+import collections
+import heapq
+import logging
+import threading
+from datetime import datetime
+
+from notif_config import CRONITER_AVAILABLE
+from db import get_db
+
+if CRONITER_AVAILABLE:
+    from croniter import croniter
+
+logger = logging.getLogger(__name__)
+
+RESYNC_SECS = 60  # Max sleep before re-reading the table (external edits, clock jumps)
+RETRY_SECS = 5  # Pause after a failed dispatch pass before trying again
+MAX_PENDING = 5000  # Undrained firings kept for /notifications/pending
+
+_cond = threading.Condition()
+_heap = []  # (deadline, reminder_id)
+_deadlines = {}  # reminder_id -> deadline; heap entries not matching are stale
+_events = collections.deque(maxlen=200)  # (seq, notification) replay window for waiters
+_pending = []  # Fired, not yet drained; only dropped (with a warning) past MAX_PENDING
+_seq = 0
+EPOCH = int(datetime.now().timestamp() * 1e6)  # Per-process: _seq restarts at 0 on boot
+_thread = None
+_stopping = False
+
+
+def local_time(value):
+    """Parse ISO as naive local time (offsets converted, so deadlines always
+    compare with each other and datetime.now()), or None if unparseable."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def next_deadline(trigger_time, recurrence=None):
+    """Return the naive local datetime a reminder should next fire, or None."""
+    trigger = local_time(trigger_time)
+    if trigger is None:
+        return None
+    if not recurrence:
+        return trigger
+    if not CRONITER_AVAILABLE:
+        return None
+    try:
+        return croniter(recurrence, trigger).get_next(datetime)
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def schedule(reminder_id, trigger_time, recurrence=None):
+    """Add or move a reminder on the heap and wake the dispatcher."""
+    deadline = next_deadline(trigger_time, recurrence)
+    with _cond:
+        if deadline is None:
+            _deadlines.pop(reminder_id, None)
+        else:
+            _deadlines[reminder_id] = deadline
+            heapq.heappush(_heap, (deadline, reminder_id))
+        _cond.notify_all()
+
+
+def cancel(reminder_id):
+    """Drop a reminder from the heap (its heap entry is discarded lazily)."""
+    with _cond:
+        _deadlines.pop(reminder_id, None)
+        _cond.notify_all()
+
+
+def load():
+    """Rebuild the heap from all unfired reminders in SQLite."""
+    with get_db("load_reminders") as conn:
+        rows = conn.execute(
+            "SELECT id, trigger_time, recurrence FROM reminders WHERE fired = 0"
+        ).fetchall()
+    deadlines = {}
+    for r in rows:
+        deadline = next_deadline(r["trigger_time"], r["recurrence"])
+        if deadline is not None:
+            deadlines[r["id"]] = deadline
+    with _cond:
+        _deadlines.clear()
+        _deadlines.update(deadlines)
+        _heap[:] = [(d, rid) for rid, d in deadlines.items()]
+        heapq.heapify(_heap)
+        _cond.notify_all()
+
+
+def _publish(fired):
+    global _seq
+    with _cond:
+        for n in fired:
+            _seq += 1
+            _events.append((_seq, n))
+        _pending.extend(fired)
+        if len(_pending) > MAX_PENDING:
+            logger.warning("Dropping %d undrained reminders", len(_pending) - MAX_PENDING)
+            del _pending[:-MAX_PENDING]
+        _cond.notify_all()
+
+
+def drain():
+    """Return reminders fired since the last drain (for /notifications/pending)."""
+    with _cond:
+        out = _pending[:]
+        _pending.clear()
+    return out
+
+
+def wait(since, timeout):
+    """Block until a reminder fires after sequence `since` or timeout.
+
+    Returns (latest_seq, notifications, gap); gap is True when firings after
+    `since` have already left the replay window, so the caller missed some.
+    """
+    with _cond:
+        _cond.wait_for(lambda: _seq > since, timeout=timeout)
+        oldest = _events[0][0] if _events else _seq + 1
+        return _seq, [n for seq, n in _events if seq > since], since + 1 < oldest
+
+
+def running():
+    return _thread is not None and _thread.is_alive()
+
+
+def _pop_due(now):
+    """Pop due ids off the heap; return (due_ids, seconds until next deadline)."""
+    due = []
+    while _heap:
+        deadline, rid = _heap[0]
+        if _deadlines.get(rid) != deadline:
+            heapq.heappop(_heap)  # cancelled or rescheduled
+        elif deadline <= now:
+            heapq.heappop(_heap)
+            del _deadlines[rid]
+            due.append(rid)
+        else:
+            return due, (deadline - now).total_seconds()
+    return due, RESYNC_SECS
+
+
+def _run():
+    from reminders import collect_due_reminders  # reminders imports this module
+    collect_on_start = True
+    while True:
+        try:
+            if collect_on_start:
+                load()
+            with _cond:
+                if _stopping:
+                    return
+                due, delay = _pop_due(datetime.now())
+                if not due and not collect_on_start:
+                    if _cond.wait(timeout=min(delay, RESYNC_SECS)):
+                        continue  # Woken by schedule/cancel/stop: re-check the heap
+                    due = None  # Timed out with nothing due: resync below
+            collect_on_start = False
+            fired = []
+            collect_due_reminders(fired)
+            _publish(fired)
+            if fired or due is None:
+                load()  # Pick up advanced recurring deadlines / external edits
+        except Exception:
+            logger.exception("Reminder dispatch failed")
+            with _cond:
+                _cond.wait(timeout=RETRY_SECS)  # Don't spin on a persistent error
+
+
+def start():
+    """Start the dispatcher thread (idempotent)."""
+    global _thread, _stopping
+    if running():
+        return
+    _stopping = False
+    _thread = threading.Thread(target=_run, name="reminder-dispatch", daemon=True)
+    _thread.start()
+
+
+def stop(timeout=5):
+    """Stop the dispatcher thread and wait for it to exit."""
+    global _stopping
+    with _cond:
+        _stopping = True
+        _cond.notify_all()
+    if _thread is not None:
+        _thread.join(timeout)
+
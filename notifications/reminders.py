@@ -1,16 +1,18 @@
 """Relaygent Notifications — reminder routes and recurring logic."""
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from notif_config import CRONITER_AVAILABLE, app
 from db import get_db
 from flask import jsonify, request
+import reminder_dispatch
 
 if CRONITER_AVAILABLE:
     from croniter import croniter
 
 
 MAX_MESSAGE_LEN = 2000
+STALE_AFTER = timedelta(hours=1)
 
 
 def _validate_iso(value):
@@ -52,7 +54,7 @@ def create_reminder():
         if not isinstance(recurrence, str) or not _validate_cron(recurrence):
             return jsonify({"error": "recurrence must be valid cron expression"}), 400
 
-    with get_db() as conn:
+    with get_db("create_reminder") as conn:
         cursor = conn.execute(
             "INSERT INTO reminders (trigger_time, message, recurrence) "
             "VALUES (?, ?, ?)",
@@ -60,6 +62,7 @@ def create_reminder():
         )
         conn.commit()
         reminder_id = cursor.lastrowid
+    reminder_dispatch.schedule(reminder_id, trigger_time, recurrence)
 
     result = {"id": reminder_id, "status": "created"}
     if recurrence:
@@ -70,7 +73,7 @@ def create_reminder():
 @app.route("/upcoming", methods=["GET"])
 def list_reminders():
     """List unfired reminders (used by hub dashboard)."""
-    with get_db() as conn:
+    with get_db("list_reminders") as conn:
         rows = conn.execute(
             "SELECT id, trigger_time, message, created_at, recurrence "
             "FROM reminders WHERE fired = 0 ORDER BY trigger_time"
@@ -81,11 +84,12 @@ def list_reminders():
 @app.route("/reminder/<int:reminder_id>", methods=["DELETE"])
 def delete_reminder(reminder_id):
     """Cancel a reminder by id."""
-    with get_db() as conn:
+    with get_db("delete_reminder") as conn:
         cur = conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
         conn.commit()
     if cur.rowcount == 0:
         return jsonify({"error": "not found"}), 404
+    reminder_dispatch.cancel(reminder_id)
     return jsonify({"ok": True})
 
 
@@ -107,8 +111,52 @@ def is_recurring_reminder_due(recurrence, last_trigger_time):
 
     # Only fire if this occurrence hasn't been fired yet
     if last_trigger_time:
-        last_trigger_dt = datetime.fromisoformat(last_trigger_time)
-        if last_trigger_dt >= prev_occurrence:
+        last_trigger_dt = reminder_dispatch.local_time(last_trigger_time)
+        if last_trigger_dt is not None and last_trigger_dt >= prev_occurrence:
             return False, ""
 
     return True, prev_occurrence.isoformat()
+
+
+def collect_due_reminders(notifications):
+    """Fire due reminders in SQLite and append them to notifications.
+
+    One-offs are marked fired (and skipped if older than STALE_AFTER);
+    recurring reminders advance trigger_time to the occurrence that fired.
+    """
+    now = datetime.now()
+    stale_cutoff = now - STALE_AFTER
+
+    with get_db("collect_due_reminders") as conn:
+        rows = conn.execute(
+            "SELECT id, trigger_time, message, created_at, recurrence "
+            "FROM reminders WHERE fired = 0 ORDER BY trigger_time"
+        ).fetchall()
+
+        for r in rows:
+            if r["recurrence"]:
+                is_due, prev_occ = is_recurring_reminder_due(
+                    r["recurrence"], r["trigger_time"]
+                )
+                if is_due:
+                    conn.execute(
+                        "UPDATE reminders SET trigger_time = ? WHERE id = ?",
+                        (prev_occ, r["id"]),
+                    )
+                    conn.commit()
+                    notifications.append(_notification(r, prev_occ))
+                continue
+            trigger = reminder_dispatch.local_time(r["trigger_time"])
+            if trigger is not None and trigger <= now:
+                conn.execute(
+                    "UPDATE reminders SET fired = 1 WHERE id = ?",
+                    (r["id"],),
+                )
+                conn.commit()
+                if trigger >= stale_cutoff:
+                    notifications.append(_notification(r, r["trigger_time"]))
+
+
+def _notification(row, trigger_time):
+    return {"type": "reminder", "id": row["id"], "message": row["message"],
+            "trigger_time": trigger_time, "created_at": row["created_at"]}
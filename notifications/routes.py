@@ -2,16 +2,20 @@
 
 import json
 import logging
+import math
 import os
 import ssl
-import urllib.request
-from datetime import datetime, timedelta
 
+import http_client
+import hub_chat
+import metrics  # also registers /metrics and per-route request timing
 from notif_config import app
-from db import get_db, get_notification_history
+from compaction import daily_rollups
+from history import search_history
 from flask import jsonify, request
-from reminders import is_recurring_reminder_due
 from notif_logger import log_notifications
+from reminders import collect_due_reminders
+import reminder_dispatch
 import tasks_collector
 
 logger = logging.getLogger(__name__)
@@ -25,6 +29,7 @@ try:
         _HUB_PROTO = "https"
 except Exception:
     pass
+_MAX_WAIT_SECS = 60
 _SSL_CTX = ssl.create_default_context() if _HUB_PROTO == "http" else ssl._create_unverified_context()
 
 
@@ -41,15 +46,15 @@ def get_notifications():
     skip_sources = set(request.args.get("skip", "").split(",")) - {""}
     notifications = []
     try:
-        _collect_due_reminders(notifications)
+        metrics.run_collector("reminders", _collect_due_reminders, notifications)
     except Exception:
         logger.exception("Failed to collect due reminders")
     try:
-        _collect_chat_messages(notifications)
+        metrics.run_collector("chat", _collect_chat_messages, notifications)
     except Exception:
         logger.exception("Failed to collect chat messages")
     try:
-        tasks_collector.collect(notifications)
+        metrics.run_collector("tasks", tasks_collector.collect, notifications)
     except Exception:
         logger.exception("Failed to collect due tasks")
     if not fast_mode:
@@ -57,9 +62,10 @@ def get_notifications():
             if name in skip_sources:
                 continue
             try:
-                collector(notifications)
+                metrics.run_collector(name, collector, notifications)
             except Exception:
                 logger.exception(f"Failed in {name}")
+    metrics.set_gauge("relaygent_pending_notifications", len(notifications))
     log_notifications(notifications)
     return jsonify(notifications)
 
@@ -70,73 +76,52 @@ _slow_collectors = []
 
 
 def _collect_due_reminders(notifications):
-    """Add due reminders (one-off and recurring) to notifications list."""
-    now = datetime.now()
-    now_iso = now.isoformat()
-    stale_cutoff = (now - timedelta(hours=1)).isoformat()
-
-    with get_db() as conn:
-        rows = conn.execute(
-            "SELECT id, trigger_time, message, created_at, recurrence "
-            "FROM reminders WHERE fired = 0 ORDER BY trigger_time"
-        ).fetchall()
-
-        for r in rows:
-            if r["recurrence"]:
-                is_due, prev_occ = is_recurring_reminder_due(
-                    r["recurrence"], r["trigger_time"]
-                )
-                if is_due:
-                    conn.execute(
-                        "UPDATE reminders SET trigger_time = ? WHERE id = ?",
-                        (prev_occ, r["id"]),
-                    )
-                    conn.commit()
-                    notifications.append({
-                        "type": "reminder",
-                        "id": r["id"],
-                        "message": r["message"],
-                        "trigger_time": prev_occ,
-                        "created_at": r["created_at"],
-                    })
-            elif r["trigger_time"] <= now_iso:
-                conn.execute(
-                    "UPDATE reminders SET fired = 1 WHERE id = ?",
-                    (r["id"],),
-                )
-                conn.commit()
-                if r["trigger_time"] >= stale_cutoff:
-                    notifications.append({
-                        "type": "reminder",
-                        "id": r["id"],
-                        "message": r["message"],
-                        "trigger_time": r["trigger_time"],
-                        "created_at": r["created_at"],
-                    })
+    """Add due reminders (one-off and recurring) to notifications list.
+
+    When the dispatcher thread is running it has already fired reminders at
+    their deadlines; we only drain its buffer. Otherwise scan SQLite.
+    """
+    if reminder_dispatch.running():
+        notifications.extend(reminder_dispatch.drain())
+    else:
+        collect_due_reminders(notifications)
+
+
+def hub_base_url():
+    return f"{_HUB_PROTO}://{HUB_HOST}:{HUB_PORT}"
+
+
+def start_chat_subscription():
+    """Hold a /ws subscription to the hub so chat checks read memory."""
+    hub_chat.start(hub_base_url(), _SSL_CTX)
 
 
 def _collect_chat_messages(notifications):
-    """Check hub chat for unread messages."""
-    try:
-        url = f"{_HUB_PROTO}://{HUB_HOST}:{HUB_PORT}/api/chat?mode=unread"
-        req = urllib.request.Request(url, method="GET")
-        with urllib.request.urlopen(req, timeout=2, context=_SSL_CTX) as resp:
-            data = json.loads(resp.read().decode())
-        if data.get("count", 0) > 0:
-            messages = []
-            for m in data.get("messages", []):
-                messages.append({
-                    "timestamp": m.get("created_at", ""),
-                    "content": m.get("content", ""),
-                })
-            notifications.append({
-                "type": "message",
-                "source": "chat",
-                "count": data["count"],
-                "messages": messages,
+    """Check hub chat for unread messages.
+
+    Reads the live subscription's state; falls back to GET /api/chat only
+    while the subscription is down.
+    """
+    unread = hub_chat.unread()
+    if unread is None:
+        try:
+            unread = hub_chat.fetch_unread(hub_base_url(), _SSL_CTX)
+        except (*http_client.ERRORS, ValueError):
+            logger.warning("Failed to check hub chat for unread messages", exc_info=True)
+            return
+    if unread:
+        messages = []
+        for m in unread:
+            messages.append({
+                "timestamp": m.get("created_at", ""),
+                "content": m.get("content", ""),
             })
-    except (urllib.error.URLError, json.JSONDecodeError, OSError):
-        logger.warning("Failed to check hub chat for unread messages", exc_info=True)
+        notifications.append({
+            "type": "message",
+            "source": "chat",
+            "count": len(unread),
+            "messages": messages,
+        })
 
 
 import slack_collector  # noqa: E402
@@ -153,11 +138,52 @@ _slow_collectors.append(("linear", linear_collector.collect))
 
 @app.route("/notifications/history", methods=["GET"])
 def notification_history():
-    """Return notification history, newest first."""
+    """Return notification history, newest first.
+
+    Query params: q (full-text), source, type, since, until (UTC timestamps),
+    before_id (keyset cursor — pass the previous page's next_before_id), limit.
+    """
     limit = min(int(request.args.get("limit", 50)), 200)
-    offset = int(request.args.get("offset", 0))
-    entries = get_notification_history(limit, offset)
-    return jsonify({"entries": entries, "limit": limit, "offset": offset})
+    before_id = request.args.get("before_id", type=int)
+    entries = search_history(
+        query=request.args.get("q"), source=request.args.get("source"),
+        notif_type=request.args.get("type"), since=request.args.get("since"),
+        until=request.args.get("until"), before_id=before_id, limit=limit)
+    next_before_id = entries[-1]["id"] if len(entries) == limit else None
+    return jsonify({"entries": entries, "limit": limit, "next_before_id": next_before_id})
+
+
+@app.route("/notifications/daily", methods=["GET"])
+def notification_daily():
+    """Return daily rollups of compacted history (?days=30&source=)."""
+    days = min(int(request.args.get("days", 30)), 3660)
+    return jsonify({"days": daily_rollups(days, request.args.get("source"))})
+
+
+@app.route("/notifications/reminders/wait", methods=["GET"])
+def wait_for_reminders():
+    """Long-poll: return reminders fired after ?since=<seq> (blocks up to ?timeout=s).
+
+    Clients pass back ?epoch= from the last reply. seq restarts at 0 when the
+    server does, so on an epoch mismatch we answer at once with gap=true and
+    the new epoch/seq. gap=true otherwise means reminders after `since` had
+    already left the replay window; either way they are still delivered once
+    through /notifications/pending.
+    """
+    try:
+        since = int(request.args.get("since", 0))
+        epoch = int(request.args.get("epoch", reminder_dispatch.EPOCH))
+        timeout = float(request.args.get("timeout", 30))
+    except ValueError:
+        return jsonify({"error": "since and epoch must be integers and timeout a number"}), 400
+    if math.isnan(timeout) or timeout < 0:
+        return jsonify({"error": "timeout must be a non-negative number"}), 400
+    if epoch != reminder_dispatch.EPOCH:  # `since` counted another process's firings
+        seq, fired, _ = reminder_dispatch.wait(0, 0)
+        gap = True
+    else:
+        seq, fired, gap = reminder_dispatch.wait(since, min(timeout, _MAX_WAIT_SECS))
+    return jsonify({"epoch": reminder_dispatch.EPOCH, "seq": seq, "reminders": fired, "gap": gap})
 
 
 @app.route("/health", methods=["GET"])
@@ -6,6 +6,8 @@ Aggregates reminders and optional messaging sources into a unified endpoint.
 
 import os
 
+import compaction
+import reminder_dispatch
 import reminders  # noqa: F401 — /pending, /upcoming, /reminder routes
 import routes  # noqa: F401 — /notifications/pending, /health routes
 from notif_config import app
@@ -13,6 +15,9 @@ from db import init_db
 
 if __name__ == "__main__":
     init_db()
+    reminder_dispatch.start()
+    compaction.start()
+    routes.start_chat_subscription()
     port = int(os.environ.get("RELAYGENT_NOTIFICATIONS_PORT", "8083"))
     host = os.environ.get("RELAYGENT_BIND_HOST", "127.0.0.1")
     app.run(host=host, port=port, debug=False)
@@ -0,0 +1,160 @@
+"""Slack channel scanning for slack_collector — incremental and rate-limited.
+
+Each channel's `latest.ts` from conversations.list and the unread messages
+last fetched for it are persisted. Channels whose `latest` hasn't moved
+reuse that result instead of calling conversations.history; the rest
+(including every channel listed without `latest` — `updated` doesn't move
+on new messages) are fetched concurrently under a token bucket, least
+recently fetched first so none is starved, following cursors for both
+endpoints.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+LIST_PAGES_MAX = 10
+HISTORY_PAGES_MAX = 3
+HISTORY_WORKERS = 4
+REFRESH_SECS = 300  # Re-fetch even unchanged channels this often
+POLL_BUDGET_SECS = 8  # Channels still waiting for a token after this are left for next poll
+SKIP_SUBTYPES = {"channel_join", "joiner_notification_for_inviter"}
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens/second, holding at most `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate, self.burst = rate, burst
+        self.tokens, self.stamp = float(burst), time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, deadline):
+        """Take a token, waiting until monotonic `deadline` at most. Returns success."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# conversations.history is Slack Tier 3 (~50 calls/minute)
+history_bucket = TokenBucket(rate=50 / 60, burst=20)
+
+
+def load_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path, state):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Failed to save Slack channel state: %s", e)
+
+
+def list_channels(api):
+    """All non-archived conversations, following next_cursor. None on failure."""
+    channels, cursor = [], None
+    for _ in range(LIST_PAGES_MAX):
+        params = {"limit": 200, "types": "public_channel,private_channel,im,mpim",
+                  "exclude_archived": "true"}
+        if cursor:
+            params["cursor"] = cursor
+        result = api("conversations.list", params)
+        if not result:
+            return channels or None
+        channels += result.get("channels") or []
+        cursor = (result.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            break
+    return channels
+
+
+def _signal(ch):
+    latest = ch.get("latest")
+    if isinstance(latest, dict) and latest.get("ts"):
+        return latest["ts"]
+    return None
+
+
+def _fetch_history(api, channel_id, last_ts, self_uid):
+    """Messages newer than last_ts from others, newest first. None on failure."""
+    msgs, cursor = [], None
+    for _ in range(HISTORY_PAGES_MAX):
+        params = {"channel": channel_id, "limit": 100, "oldest": last_ts}
+        if cursor:
+            params["cursor"] = cursor
+        hist = api("conversations.history", params)
+        if not hist:
+            return msgs or None
+        msgs += [{"user": m.get("user", ""), "text": m.get("text", ""), "ts": m.get("ts", "")}
+                 for m in hist.get("messages") or []
+                 if m.get("subtype") not in SKIP_SUBTYPES and m.get("user") != self_uid]
+        cursor = (hist.get("response_metadata") or {}).get("next_cursor")
+        if not hist.get("has_more") or not cursor:
+            break
+    return msgs
+
+
+def new_messages(api, channels, last_ts, self_uid, state):
+    """Return [(channel, msgs newest-first)] with unread messages; updates state in place."""
+    now = time.time()
+    deadline = time.monotonic() + POLL_BUDGET_SECS
+    stale = []
+    for ch in channels:
+        cached = state.get(ch["id"])
+        sig = _signal(ch)
+        if not (cached and sig and cached.get("signal") == sig
+                and now - cached.get("fetched_at", 0) < REFRESH_SECS
+                and float(cached.get("oldest", "0")) <= float(last_ts)):
+            stale.append(ch)
+    # Tokens go out least recently fetched first; whatever the budget doesn't
+    # reach now is at the front of the next poll
+    stale.sort(key=lambda ch: (state.get(ch["id"]) or {}).get("fetched_at", 0))
+
+    # Each worker runs in a copy of this context so http_client credits its
+    # calls to the collector that metrics.run_collector is timing
+    futures = {}
+    with ThreadPoolExecutor(max_workers=HISTORY_WORKERS) as pool:
+        for ch in stale:
+            if not history_bucket.acquire(deadline):
+                break
+            futures[ch["id"]] = pool.submit(contextvars.copy_context().run, _fetch_history,
+                                            api, ch["id"], last_ts, self_uid)
+    for ch in stale:
+        msgs = futures[ch["id"]].result() if ch["id"] in futures else None
+        if msgs is not None:
+            state[ch["id"]] = {"signal": _signal(ch), "fetched_at": now,
+                               "oldest": last_ts, "messages": msgs}
+
+    results = []
+    for ch in channels:
+        msgs = [m for m in (state.get(ch["id"]) or {}).get("messages", [])
+                if float(m.get("ts") or 0) > float(last_ts)]
+        if msgs:
+            results.append((ch, msgs))
+    return results
@@ -6,10 +6,11 @@ import json
 import logging
 import os
 import time
-import urllib.error
 import urllib.parse
-import urllib.request
 
+import http_client
+import slack_channels
+import slack_users
 from notif_config import app
 from flask import jsonify
 
@@ -23,6 +24,7 @@ _LAST_CHECK_FILE = os.path.join(
 )
 
 
+_API_BASE = "https://slack.com/api"
 _SELF_UID = None
 _USER_CACHE = {}
 
@@ -44,45 +46,48 @@ def _resolve_username(token, uid):
 
 
 def _get_self_uid(token):
-    """Get our own Slack user ID (cached)."""
+    """Get our own Slack user ID (cached in memory and in the user directory file)."""
     global _SELF_UID
+    if _SELF_UID:
+        return _SELF_UID
+    _SELF_UID = slack_users.cached_self_uid(_directory_file(), token)
     if _SELF_UID:
         return _SELF_UID
     result = _slack_api(token, "auth.test")
     if result:
         _SELF_UID = result.get("user_id")
+        if _SELF_UID:
+            slack_users.save_self_uid(_directory_file(), token, _SELF_UID)
     return _SELF_UID
 
 
+def _directory_file():
+    return os.path.join(os.path.dirname(_LAST_CHECK_FILE), ".user_directory.json")
+
+
 def _slack_api(token, method, params=None, _retries=2):
     """Call a Slack Web API method. Returns parsed JSON or None.
 
-    Retries on 429 (rate limit) up to _retries times, capped at 10s.
+    Goes through the pooled keep-alive client, which retries 429s up to
+    _retries times, honouring Retry-After capped at 10s.
     """
-    url = f"https://slack.com/api/{method}"
+    url = f"{_API_BASE}/{method}"
     if params:
         url += "?" + urllib.parse.urlencode(params)
-    req = urllib.request.Request(
-        url, headers={"Authorization": f"Bearer {token}"}
-    )
     try:
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            data = json.loads(resp.read().decode())
-        if not data.get("ok"):
-            logger.debug("Slack API %s returned ok=false: %s",
-                         method, data.get("error", "unknown"))
-        return data if data.get("ok") else None
-    except urllib.error.HTTPError as e:
-        if e.code == 429 and _retries > 0:
-            retry_after = min(int(e.headers.get("Retry-After", "5")), 10)
-            logger.info("Slack rate limited, waiting %ds", retry_after)
-            time.sleep(retry_after)
-            return _slack_api(token, method, params, _retries - 1)
-        logger.warning("Slack API %s HTTP %d", method, e.code)
-        return None
-    except (urllib.error.URLError, OSError) as e:
+        resp = http_client.get(url, headers={"Authorization": f"Bearer {token}"},
+                               timeout=5, retries=_retries)
+        if not resp.ok:
+            logger.warning("Slack API %s HTTP %d", method, resp.status)
+            return None
+        data = resp.json()
+    except (*http_client.ERRORS, ValueError) as e:
         logger.warning("Slack API %s network error: %s", method, e)
         return None
+    if not data.get("ok"):
+        logger.debug("Slack API %s returned ok=false: %s",
+                     method, data.get("error", "unknown"))
+    return data if data.get("ok") else None
 
 
 def _load_token():
@@ -97,11 +102,12 @@ def _load_token():
 
 
 def collect(notifications):
-    """Check all Slack channels for new messages since last check.
+    """Check Slack channels for new messages since last check.
 
     Uses conversations.history per-channel with timestamp tracking,
     because conversations.list doesn't return unread_count_display
-    for user (xoxp) tokens.
+    for user (xoxp) tokens. Channels with no new activity since the last
+    poll are served from persisted state (see slack_channels).
     """
     token = _load_token()
     if not token:
@@ -114,43 +120,38 @@ def collect(notifications):
     except OSError as e:
         logger.warning("Failed to read Slack last-check timestamp: %s", e)
 
+    def api(method, params=None):
+        return _slack_api(token, method, params)
+
     self_uid = _get_self_uid(token)
-    result = _slack_api(token, "conversations.list", {
-        "limit": 50,
-        "types": "public_channel,private_channel,im,mpim",
-        "exclude_archived": "true",
-    })
-    if not result:
+    slack_users.warm(api, _directory_file(), _USER_CACHE)
+    channels = slack_channels.list_channels(api)
+    if not channels:
         return
 
-    skip_subtypes = {"channel_join", "joiner_notification_for_inviter"}
+    state_file = os.path.join(os.path.dirname(_LAST_CHECK_FILE), ".channel_state.json")
+    state = slack_channels.load_state(state_file)
+    unread = slack_channels.new_messages(api, channels, last_ts, self_uid, state)
+    slack_channels.save_state(state_file, state)
+
     unread_channels = []
-    for ch in result.get("channels") or []:
-        hist = _slack_api(token, "conversations.history", {
-            "channel": ch["id"], "limit": 10, "oldest": last_ts,
+    for ch, msgs in unread:
+        # Include message previews (newest-first → reverse for chronological)
+        previews = [
+            {
+                "user": m.get("user", ""),
+                "user_name": _resolve_username(token, m.get("user", "")),
+                "text": m.get("text", ""),
+                "ts": m.get("ts", ""),
+            }
+            for m in reversed(msgs[:5])
+        ]
+        unread_channels.append({
+            "id": ch["id"],
+            "name": ch.get("name", ch["id"]),
+            "unread": len(msgs),
+            "messages": previews,
         })
-        if not hist:
-            continue
-        msgs = [m for m in (hist.get("messages") or [])
-                if m.get("subtype") not in skip_subtypes
-                and m.get("user") != self_uid]
-        if msgs and msgs[0].get("ts", "0") > last_ts:
-            # Include message previews (newest-first → reverse for chronological)
-            previews = [
-                {
-                    "user": m.get("user", ""),
-                    "user_name": _resolve_username(token, m.get("user", "")),
-                    "text": m.get("text", ""),
-                    "ts": m.get("ts", ""),
-                }
-                for m in reversed(msgs[:5])
-            ]
-            unread_channels.append({
-                "id": ch["id"],
-                "name": ch.get("name", ch["id"]),
-                "unread": len(msgs),
-                "messages": previews,
-            })
 
     if unread_channels:
         notifications.append({
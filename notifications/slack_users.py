@@ -0,0 +1,164 @@
+"""Persistent Slack user directory for slack_collector name resolution.
+
+The whole directory is fetched with paginated users.list and saved to disk
+(with our own user id, keyed by a token fingerprint). Restarts load the
+file instead of calling users.info per unknown user; once older than
+TTL_SECS it is refreshed on a background thread while the stale copy
+keeps serving.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TTL_SECS = 24 * 3600
+PAGE_LIMIT = 200
+MAX_PAGES = 100
+RETRY_SECS = 600  # Min gap between fetch attempts, doubled after each failure...
+MAX_RETRY_SECS = 6 * 3600  # ...up to this
+
+_lock = threading.Lock()
+_refreshing = set()  # paths with a background refresh in flight
+_loaded = {}  # path -> (mtime, fetched_at) last merged into the in-memory cache
+_attempted = {}  # path -> (time of the last fetch attempt, failures in a row)
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update(path, **fields):
+    with _lock:
+        data = _load(path)
+        data.update(fields)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Failed to save Slack user directory: %s", e)
+
+
+def _display_name(member):
+    profile = member.get("profile") or {}
+    return (member.get("real_name") or profile.get("real_name")
+            or member.get("name") or member.get("id"))
+
+
+def fetch_directory(api):
+    """All workspace users as {uid: display name}, following cursors. None on failure."""
+    users, cursor = {}, None
+    for _ in range(MAX_PAGES):
+        params = {"limit": PAGE_LIMIT}
+        if cursor:
+            params["cursor"] = cursor
+        result = api("users.list", params)
+        if not result:
+            return users or None
+        for m in result.get("members") or []:
+            if m.get("id"):
+                users[m["id"]] = _display_name(m)
+        cursor = (result.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            break
+    return users
+
+
+def refresh(api, path, cache):
+    """Fetch the directory now and persist it. Returns True on success."""
+    users = fetch_directory(api)
+    if not users:
+        return False
+    cache.update(users)
+    _update(path, fetched_at=time.time(), users=users)
+    return True
+
+
+def _due(path):
+    """Whether the backoff since the last fetch attempt has run out."""
+    last, failures = _attempted.get(path, (0, 0))
+    return time.time() - last > min(RETRY_SECS * 2 ** max(failures - 1, 0), MAX_RETRY_SECS)
+
+
+def _attempt(api, path, cache):
+    """refresh(), recording the attempt time and the run of failures."""
+    with _lock:
+        failures = _attempted.get(path, (0, 0))[1]
+        _attempted[path] = (time.time(), failures)
+    ok = False
+    try:
+        ok = refresh(api, path, cache)
+    finally:
+        with _lock:
+            _attempted[path] = (time.time(), 0 if ok else failures + 1)
+    return ok
+
+
+def _refresh_in_background(api, path, cache):
+    with _lock:
+        if path in _refreshing:
+            return
+        _refreshing.add(path)
+
+    def run():
+        try:
+            _attempt(api, path, cache)
+        except Exception:
+            logger.warning("Slack user directory refresh failed", exc_info=True)
+        finally:
+            with _lock:
+                _refreshing.discard(path)
+
+    threading.Thread(target=run, name="slack-users-refresh", daemon=True).start()
+
+
+def warm(api, path, cache):
+    """Make sure `cache` holds the directory.
+
+    Re-reads the file only when it changes; fetches synchronously only when
+    there is no directory yet, otherwise refreshes a stale one in the
+    background. Either way a failed fetch backs off from RETRY_SECS.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    meta = _loaded.get(path)
+    if mtime is not None and (meta is None or meta[0] != mtime or not cache):
+        data = _load(path)
+        cache.update(data.get("users") or {})
+        meta = _loaded[path] = (mtime, data.get("fetched_at", 0))
+    fetched_at = meta[1] if meta else 0
+    if (cache and time.time() - fetched_at <= TTL_SECS) or not _due(path):
+        return
+    if not cache:
+        _attempt(api, path, cache)
+    else:
+        _refresh_in_background(api, path, cache)
+
+
+def _fingerprint(token):
+    return hashlib.blake2b(token.encode(), digest_size=8).hexdigest()
+
+
+def cached_self_uid(path, token):
+    """Our user id for this token as saved on disk, or None."""
+    entry = _load(path).get("self") or {}
+    return entry.get("uid") if entry.get("token") == _fingerprint(token) else None
+
+
+def save_self_uid(path, token, uid):
+    _update(path, self={"token": _fingerprint(token), "uid": uid})
@@ -0,0 +1,157 @@
+"""Relaygent Notifications — canonical tasks.md model.
+
+One parser for every Python consumer (tasks_collector, `relaygent tasks`,
+orient's due-tasks.py). TaskFile caches the parsed file keyed on mtime and
+size, with recurring tasks kept in next-due order so "is anything due?" is
+a single comparison until the earliest deadline passes.
+
+Task line format:
+    - [ ] Description | type: recurring | freq: daily | last: 2026-02-20 10:00
+"""
+
+import bisect
+import os
+import re
+import time
+from datetime import datetime
+
+FREQ_HOURS = {"6h": 6, "12h": 12, "daily": 24, "2d": 48, "3d": 72, "weekly": 168, "monthly": 720}
+DEFAULT_FREQ_HOURS = 24
+
+_TASK_RE = re.compile(r"^-\s+\[([x ])\]\s+(.+)$", re.IGNORECASE)
+_META_RE = re.compile(r"^(\w+):\s*(.+)$")
+
+
+def freq_secs(freq):
+    """Period of a freq label in seconds (unknown labels count as daily)."""
+    return FREQ_HOURS.get(freq, DEFAULT_FREQ_HOURS) * 3600
+
+
+def parse_last(last):
+    """Parse a `last:` value. Returns a datetime, None for never/empty, or raises ValueError."""
+    if not last or last == "never":
+        return None
+    return datetime.fromisoformat(last)
+
+
+def parse_line(line, lineno=None):
+    """Parse one tasks.md line into a task dict, or None if it isn't a task.
+
+    next_due (epoch seconds) is set for recurring tasks with a freq: 0 when
+    never done, None when `last` can't be parsed.
+    """
+    m = _TASK_RE.match(line.strip())
+    if not m:
+        return None
+    parts = m.group(2).split("|")
+    meta = {}
+    for p in parts[1:]:
+        kv = _META_RE.match(p.strip())
+        if kv:
+            meta[kv.group(1)] = kv.group(2).strip()
+    task = {
+        "description": parts[0].strip(),
+        "checked": m.group(1).lower() == "x",
+        "type": meta.get("type", "one-off"),
+        "freq": meta.get("freq", ""),
+        "last": meta.get("last", ""),
+        "last_dt": None,
+        "next_due": None,
+        "line": lineno,
+    }
+    if task["type"] == "recurring" and task["freq"]:
+        try:
+            task["last_dt"] = parse_last(task["last"])
+        except ValueError:
+            return task
+        task["next_due"] = (task["last_dt"].timestamp() + freq_secs(task["freq"])
+                            if task["last_dt"] else 0.0)
+    return task
+
+
+def parse_text(text):
+    tasks = []
+    for i, line in enumerate(text.splitlines()):
+        task = parse_line(line, i)
+        if task is not None:
+            tasks.append(task)
+    return tasks
+
+
+def parse_file(path):
+    """Parse a tasks.md file; [] if it can't be read."""
+    try:
+        with open(path, errors="replace") as f:
+            return parse_text(f.read())
+    except OSError:
+        return []
+
+
+def overdue_label(secs_late):
+    mins_late = int(secs_late / 60)
+    if mins_late < 60:
+        return f"{mins_late}m overdue"
+    if mins_late < 1440:
+        return f"{round(mins_late / 60)}h overdue"
+    return f"{round(mins_late / 1440)}d overdue"
+
+
+class TaskFile:
+    """tasks.md parsed once per change (mtime, size), with a next-due index.
+
+    refresh() stats the file at most every `stat_interval` seconds; between
+    stats nothing touches the disk. `version` increments on every re-parse.
+    """
+
+    def __init__(self, path, stat_interval=0.0):
+        self.path = str(path)
+        self.stat_interval = stat_interval
+        self.tasks = []
+        self.version = 0
+        self._signature = None
+        self._checked_at = None
+        self._due_times = []  # sorted next_due of recurring tasks
+        self._due_tasks = []  # tasks in the same order
+
+    def refresh(self, now=None):
+        """Re-parse if the file changed. Returns True when it did."""
+        now = time.monotonic() if now is None else now
+        if self._checked_at is not None and now - self._checked_at < self.stat_interval:
+            return False
+        self._checked_at = now
+        try:
+            st = os.stat(self.path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        if signature == self._signature and self.version:
+            return False
+        self._signature = signature
+        self.tasks = parse_file(self.path) if signature else []
+        indexed = sorted((t["next_due"], i) for i, t in enumerate(self.tasks)
+                         if t["next_due"] is not None)
+        self._due_times = [d for d, _ in indexed]
+        self._due_tasks = [self.tasks[i] for _, i in indexed]
+        self.version += 1
+        return True
+
+    def next_due(self):
+        """Earliest next_due (epoch seconds) of any recurring task, or None."""
+        return self._due_times[0] if self._due_times else None
+
+    def due(self, now=None):
+        """Recurring tasks whose next_due has passed, earliest first."""
+        now = time.time() if now is None else now
+        return self._due_tasks[:bisect.bisect_right(self._due_times, now)]
+
+
+_files = {}
+
+
+def load(path, stat_interval=0.0):
+    """Shared, refreshed TaskFile for `path`."""
+    tf = _files.get(str(path))
+    if tf is None:
+        tf = _files[str(path)] = TaskFile(path, stat_interval)
+    tf.refresh()
+    return tf
@@ -1,45 +1,31 @@
 """Relaygent Notifications — overdue task collector.
 
-Reads tasks.md and surfaces overdue recurring tasks as notifications.
+Surfaces overdue recurring tasks from tasks.md as notifications.
 Deduplicates using a JSON sidecar so the agent is only woken once per
 freq period per task (not on every poll while the task stays overdue).
+
+The parsed file and the sidecar are held in memory (task_model.TaskFile),
+and the collector remembers when the next task could fire, so polls do no
+file I/O while nothing is due and the file is unchanged (it is stat'ed at
+most every STAT_INTERVAL_SECS).
 """
 
 import json
 import logging
 import os
-import re
-from datetime import datetime
+import time
 from pathlib import Path
 
+import task_model
 from notif_config import DATA_DIR
 
 logger = logging.getLogger(__name__)
 
-FREQ_HOURS = {"6h": 6, "12h": 12, "daily": 24, "2d": 48, "3d": 72, "weekly": 168, "monthly": 720}
 NOTIFIED_FILE = Path(DATA_DIR) / "task-notified.json"
+STAT_INTERVAL_SECS = 5.0
 
-
-def _freq_ms(freq):
-    return FREQ_HOURS.get(freq, 24) * 3600000
-
-
-def _parse_task_line(line):
-    m = re.match(r'^-\s+\[([x ])\]\s+(.+)$', line, re.IGNORECASE)
-    if not m:
-        return None
-    parts = m.group(2).split("|")
-    meta = {}
-    for p in parts[1:]:
-        kv = re.match(r'^(\w+):\s*(.+)$', p.strip())
-        if kv:
-            meta[kv.group(1)] = kv.group(2).strip()
-    return {
-        "description": parts[0].strip(),
-        "type": meta.get("type", "one-off"),
-        "freq": meta.get("freq", ""),
-        "last": meta.get("last", ""),
-    }
+_notified = {}  # NOTIFIED_FILE path -> {description: last notified ms}
+_wake_at = {}  # tasks.md path -> (TaskFile.version, earliest time anything can fire)
 
 
 def _load_notified():
@@ -59,65 +45,47 @@ def _save_notified(data):
         logger.warning("Failed to save task-notified.json")
 
 
+def _cached_notified():
+    key = str(NOTIFIED_FILE)
+    if key not in _notified:
+        _notified[key] = _load_notified()
+    return _notified[key]
+
+
+def _fire_time(task, notified):
+    """When the task may next notify: due, and one freq period after the last notice."""
+    return max(task["next_due"], notified.get(task["description"], 0) / 1000
+               + task_model.freq_secs(task["freq"]))
+
+
 def collect(notifications):
     """Add overdue recurring tasks to notifications list."""
     kb_dir = os.environ.get("RELAYGENT_KB_DIR", "")
     if not kb_dir:
         return
 
-    tasks_file = Path(kb_dir) / "tasks.md"
-    try:
-        raw = tasks_file.read_text()
-    except OSError:
+    tasks = task_model.load(Path(kb_dir) / "tasks.md", STAT_INTERVAL_SECS)
+    now = time.time()
+    version, wake_at = _wake_at.get(tasks.path, (None, 0.0))
+    if version == tasks.version and now < wake_at:
         return
 
-    now = datetime.now()
-    now_ms = now.timestamp() * 1000
-    notified = _load_notified()
+    notified = _cached_notified()
     updated = False
-
-    for line in raw.splitlines():
-        t = _parse_task_line(line)
-        if not t or t["type"] != "recurring" or not t["freq"]:
-            continue
-
-        last = t["last"]
-        if not last or last == "never":
-            next_due = datetime.fromtimestamp(0)
-        else:
-            try:
-                last_ms = datetime.fromisoformat(last).timestamp() * 1000
-                next_due = datetime.fromtimestamp((last_ms + _freq_ms(t["freq"])) / 1000)
-            except (ValueError, OSError):
-                continue
-
-        if next_due > now:
-            continue  # not overdue
-
-        # Dedup: only notify if we haven't notified within one freq period
-        desc = t["description"]
-        freq_ms = _freq_ms(t["freq"])
-        last_notified_ms = notified.get(desc, 0)
-        if now_ms - last_notified_ms < freq_ms:
-            continue
-
-        mins_late = int((now - next_due).total_seconds() / 60)
-        if mins_late < 60:
-            overdue_str = f"{mins_late}m overdue"
-        elif mins_late < 1440:
-            overdue_str = f"{round(mins_late / 60)}h overdue"
-        else:
-            overdue_str = f"{round(mins_late / 1440)}d overdue"
-
+    for t in tasks.due(now):
+        if _fire_time(t, notified) > now:
+            continue  # Already notified within one freq period
         notifications.append({
             "type": "task",
-            "description": desc,
+            "description": t["description"],
             "freq": t["freq"],
-            "overdue": overdue_str,
-            "last": last,
+            "overdue": task_model.overdue_label(now - t["next_due"]),
+            "last": t["last"],
         })
-        notified[desc] = now_ms
+        notified[t["description"]] = now * 1000
         updated = True
 
     if updated:
         _save_notified(notified)
+    fire_times = [_fire_time(t, notified) for t in tasks.tasks if t["next_due"] is not None]
+    _wake_at[tasks.path] = (tasks.version, min(fire_times, default=float("inf")))
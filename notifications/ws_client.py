@@ -0,0 +1,133 @@
+"""Relaygent Notifications — minimal WebSocket client for collectors.
+
+Just enough RFC 6455 for long-lived subscriptions: upgrade handshake
+(ws:// or wss:// given as http(s) URLs), text messages with fragmentation,
+ping/pong keepalive, close. Failures raise ConnectionError / OSError, so
+callers can catch http_client.ERRORS.
+"""
+
+import base64
+import hashlib
+import os
+import select
+import socket
+import ssl
+import struct
+import urllib.parse
+
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_CLOSE, _PING, _PONG = 0x8, 0x9, 0xA
+
+
+class WebSocket:
+    """Minimal RFC 6455 client: text messages in, masked control frames out."""
+
+    def __init__(self, url, context=None, timeout=10):
+        parts = urllib.parse.urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.sock = socket.create_connection((parts.hostname, port), timeout=timeout)
+        if parts.scheme == "https":
+            ctx = context or ssl.create_default_context()
+            self.sock = ctx.wrap_socket(self.sock, server_hostname=parts.hostname)
+        self.buf = b""
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.sock.sendall((
+            f"GET {parts.path or '/'} HTTP/1.1\r\nHost: {parts.hostname}:{port}\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n").encode())
+        status = self._readline()
+        headers = {}
+        line = self._readline()
+        while line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+            line = self._readline()
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        if " 101 " not in status or headers.get("sec-websocket-accept") != accept:
+            raise ConnectionError(f"WebSocket upgrade refused: {status}")
+
+    def _fill(self):
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("WebSocket closed by server")
+        self.buf += chunk
+
+    def _readline(self):
+        while b"\r\n" not in self.buf:
+            self._fill()
+        line, self.buf = self.buf.split(b"\r\n", 1)
+        return line.decode("latin-1")
+
+    def _read(self, n):
+        while len(self.buf) < n:
+            self._fill()
+        data, self.buf = self.buf[:n], self.buf[n:]
+        return data
+
+    def _readable(self, timeout):
+        if self.buf or (isinstance(self.sock, ssl.SSLSocket) and self.sock.pending()):
+            return True
+        return bool(select.select([self.sock], [], [], timeout)[0])
+
+    def send(self, opcode, payload=b""):
+        mask = os.urandom(4)
+        header = bytes([0x80 | opcode])
+        n = len(payload)
+        if n < 126:
+            header += bytes([0x80 | n])
+        elif n < 65536:
+            header += bytes([0x80 | 126]) + struct.pack(">H", n)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack(">Q", n)
+        body = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self.sock.sendall(header + mask + body)
+
+    def _frame(self):
+        b0, b1 = self._read(2)
+        n = b1 & 0x7F
+        if n == 126:
+            n = struct.unpack(">H", self._read(2))[0]
+        elif n == 127:
+            n = struct.unpack(">Q", self._read(8))[0]
+        if n > MAX_MESSAGE_BYTES:
+            raise ConnectionError("WebSocket frame too large")
+        mask = self._read(4) if b1 & 0x80 else None
+        payload = self._read(n)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return bool(b0 & 0x80), b0 & 0x0F, payload
+
+    def recv(self, idle_secs):
+        """Next text message. Pings once after idle_secs of silence; raises if still silent."""
+        parts, pinged = [], False
+        while True:
+            if not self._readable(idle_secs):
+                if pinged:
+                    raise ConnectionError("WebSocket went quiet")
+                self.send(_PING)
+                pinged = True
+                continue
+            fin, opcode, payload = self._frame()
+            pinged = False
+            if opcode == _PING:
+                self.send(_PONG, payload)
+            elif opcode == _CLOSE:
+                raise ConnectionError("WebSocket closed by server")
+            elif opcode != _PONG:
+                parts.append(payload)
+                if sum(map(len, parts)) > MAX_MESSAGE_BYTES:
+                    raise ConnectionError("WebSocket message too large")
+                if fin:
+                    return b"".join(parts).decode("utf-8", "replace")
+
+    def close(self):
+        """Close; safe from another thread, where it wakes a blocked recv()."""
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
@@ -4,7 +4,7 @@
 #   eval "$(relaygent completions)"        # add to ~/.bashrc or ~/.zshrc
 #   relaygent completions >> ~/.bashrc     # or append directly
 
-_relaygent_commands="setup start stop restart status stats tasks bg history recap session test logs orient check doctor health kb-lint update backup restore cleanup clean-logs changelog digest discover install-services set-password setup-tls config mcp archive-linear open search chat version help"
+_relaygent_commands="setup start stop restart status stats tasks bg history recap session test logs orient check doctor health kb-lint update backup restore cleanup clean-logs changelog digest discover install-services set-password setup-tls config mcp archive-linear open search notifications chat version help"
 _relaygent_mcp_commands="list add remove test"
 _relaygent_test_suites="harness hub notifications email slack setup secrets computer-use"
 _relaygent_logs_flags="--list -f -n"
@@ -45,6 +45,7 @@ if [ -n "$ZSH_VERSION" ]; then
             'recap:Aggregate stats across sessions (-d DAYS, --json)'
             'session:Live session stats (--json)'
             'search:Search KB, sessions, and chat'
+            'notifications:Search notification history'
             'chat:Send a message to the agent (--read to view)'
             'open:Open hub dashboard in browser'
             'archive-linear:Archive old Linear issues'
@@ -71,6 +72,7 @@ if [ -n "$ZSH_VERSION" ]; then
                 set-password) compadd -- --remove ;;
                 config) compadd -- get set unset path ;;
                 search) compadd -- --type --json ;;
+                notifications) compadd -- search --source --type --since --until --before --json ;;
                 chat) compadd -- --read --follow ;;
                 open) compadd -- intent kb tasks sessions logs files search notifications settings help ;;
             esac
@@ -115,6 +117,8 @@ else
                 COMPREPLY=($(compgen -W "get set unset path" -- "$cur")) ;;
             search)
                 COMPREPLY=($(compgen -W "--type --json" -- "$cur")) ;;
+            notifications)
+                COMPREPLY=($(compgen -W "search --source --type --since --until --before --json" -- "$cur")) ;;
             chat)
                 COMPREPLY=($(compgen -W "--read" -- "$cur")) ;;
             open)
@@ -1,4 +1,9 @@
+import os
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "computer-use"))
+
+# Tests assert xdotool/scrot argv; never drive a real display via XTest or XShm
+os.environ["RELAYGENT_INPUT_BACKEND"] = "xdotool"
+os.environ["RELAYGENT_CAPTURE_BACKEND"] = "scrot"
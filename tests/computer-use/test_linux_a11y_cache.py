@@ -0,0 +1,164 @@
+"""Tests for linux_a11y_cache.py — cached trees, event invalidation, since=<version> diffs."""
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import linux_a11y as a11y
+import linux_a11y_cache as cache
+
+
+class Acc:
+    """Fake pyatspi Accessible; counts role lookups as a proxy for D-Bus walks."""
+    walks = 0
+
+    def __init__(self, role, name="", children=()):
+        self.role, self.name, self.description, self.parent = role, name, "", None
+        self.children = []
+        for c in children:
+            self.add(c)
+
+    def add(self, child, at=None):
+        child.parent = self
+        self.children.insert(len(self.children) if at is None else at, child)
+        return child
+
+    def getRoleName(self):
+        Acc.walks += 1
+        return self.role
+
+    @property
+    def childCount(self):
+        return len(self.children)
+
+    def getChildAtIndex(self, i):
+        return self.children[i]
+
+    def queryValue(self):
+        raise NotImplementedError
+
+    def queryComponent(self):
+        raise NotImplementedError
+
+
+@pytest.fixture()
+def app():
+    cache._trees.clear()
+    Acc.walks = 0
+    ok = Acc("push button", "OK")
+    dialog = Acc("dialog", "Save", [Acc("label", "File name"), Acc("panel", "", [ok])])
+    root = Acc("application", "editor", [dialog])
+    with patch.object(cache, "_start", return_value=True), \
+            patch.object(a11y, "_get_app", return_value=(root, None)):
+        yield SimpleNamespace(root=root, dialog=dialog, ok=ok)
+    cache._trees.clear()
+
+
+def _event(source):
+    cache._on_event(SimpleNamespace(source=source, type="object:children-changed"))
+
+
+class TestCache:
+    def test_matches_uncached_walk(self, app):
+        body, code = a11y.accessibility_tree({"depth": 5})
+        assert code == 200 and body["cached"]
+        assert body["tree"] == a11y._build_tree(app.root, 0, 5, {"count": 0})
+        assert body["nodes"] == 5
+
+    def test_repeat_request_served_from_memory(self, app):
+        a11y.accessibility_tree({})
+        walks = Acc.walks
+        body, _ = a11y.accessibility_tree({})
+        assert Acc.walks == walks
+        assert a11y.accessibility_tree({"refresh": True})[0]["version"] > body["version"]
+        assert Acc.walks == 2 * walks
+
+    def test_event_rebuilds_only_the_changed_subtree(self, app):
+        first, _ = a11y.accessibility_tree({})
+        app.ok.name = "Save"
+        app.ok.parent.add(Acc("push button", "Cancel"))
+        _event(app.ok.parent)  # children-changed on the unnamed panel
+        Acc.walks = 0
+        body, _ = a11y.accessibility_tree({"since": first["version"]})
+        assert Acc.walks == 3  # panel + its two buttons
+        assert body["version"] > first["version"] and not body["unchanged"]
+        [change] = body["changes"]
+        assert change["path"] == [0, 1]
+        assert [c["title"] for c in change["node"]["children"]] == ["Save", "Cancel"]
+        assert a11y.accessibility_tree({})[0]["tree"] == a11y._build_tree(app.root, 0, 4, {"count": 0})
+
+    def test_event_on_uncached_descendant_marks_nearest_ancestor(self, app):
+        a11y.accessibility_tree({"depth": 1})  # Dialog children are below the cached depth
+        _event(app.ok)
+        assert cache._trees[(app.root, 1)].dirty == {cache._trees[(app.root, 1)].root.children[0]}
+
+    def test_since_unchanged(self, app):
+        first, _ = a11y.accessibility_tree({})
+        body, _ = a11y.accessibility_tree({"since": first["version"]})
+        assert body["unchanged"] and body["changes"] == [] and "tree" not in body
+
+    def test_pruned_subtree_escalates_to_parent(self, app):
+        first, _ = a11y.accessibility_tree({})
+        app.ok.parent.children.clear()  # The panel is now empty and unnamed: pruned
+        _event(app.ok.parent)
+        body, _ = a11y.accessibility_tree({"since": first["version"]})
+        [change] = body["changes"]
+        assert change["path"] == [0]
+        assert [c["title"] for c in change["node"]["children"]] == ["File name"]
+        assert body["nodes"] == 4
+
+    def test_unknown_since_returns_full_tree(self, app):
+        body, _ = a11y.accessibility_tree({"since": 10 ** 9})
+        assert "tree" in body and "changes" not in body
+
+    def test_bad_since(self, app):
+        assert a11y.accessibility_tree({"since": "x"})[1] == 400
+
+    def test_falls_back_to_walk_without_listener(self, app):
+        with patch.object(cache, "_start", return_value=False):
+            body, _ = a11y.accessibility_tree({})
+        assert "cached" not in body and body["tree"]["title"] == "editor"
+
+
+def _buttons():
+    panel = a11y.accessibility_tree({})[0]["tree"]["children"][0]["children"][1]
+    return [c["title"] for c in panel["children"]]
+
+
+class TestEventsDuringWalks:
+    def _change_ok_while_walking(self, app):
+        """Rename OK, and report it, while the walk is at a later sibling."""
+        def walked():
+            app.ok.name = "Changed"
+            _event(app.ok)
+            return "push button"
+        cancel = app.ok.parent.add(Acc("push button", "Cancel"))
+        return patch.object(cancel, "getRoleName", side_effect=walked)
+
+    def test_event_during_rebuild_carries_over(self, app):
+        a11y.accessibility_tree({})
+        with self._change_ok_while_walking(app):
+            _event(app.ok.parent)
+            a11y.accessibility_tree({})  # Rebuilds the panel, replacing the node marked dirty
+        assert _buttons() == ["Changed", "Cancel"]
+
+    def test_event_during_first_build_marks_the_tree(self, app):
+        with self._change_ok_while_walking(app):
+            a11y.accessibility_tree({})
+        assert _buttons() == ["Changed", "Cancel"]
+
+    def test_listener_not_blocked_by_a_walk(self, app):
+        delivered = []
+
+        def walked():
+            listener = threading.Thread(target=_event, args=(app.ok,))
+            listener.start()
+            listener.join(1)
+            delivered.append(not listener.is_alive())
+            return "label"
+        with patch.object(app.dialog.children[0], "getRoleName", side_effect=walked):
+            a11y.accessibility_tree({})
+        assert delivered == [True]
@@ -0,0 +1,193 @@
+"""Tests for linux_a11y_index.py + linux_a11y_press.py — indexed /find, ax_press, handles."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import linux_a11y as a11y
+import linux_a11y_cache as cache
+import linux_a11y_index as index
+
+
+class Action:
+    def __init__(self, owner, names):
+        self.owner, self.names = owner, names
+        self.nActions = len(names)
+
+    def getName(self, i):
+        return self.names[i]
+
+    def doAction(self, i):
+        self.owner.pressed.append(self.names[i])
+
+
+class Acc:
+    """Fake pyatspi Accessible; counts role lookups as a proxy for D-Bus walks."""
+    walks = 0
+
+    def __init__(self, role, name="", children=(), desc="", actions=("click",)):
+        self.role, self.name, self.description, self.parent = role, name, desc, None
+        self.children, self.actions, self.pressed = list(children), actions, []
+        for c in self.children:
+            c.parent = self
+
+    def getRoleName(self):
+        Acc.walks += 1
+        return self.role
+
+    @property
+    def childCount(self):
+        return len(self.children)
+
+    def getChildAtIndex(self, i):
+        return self.children[i]
+
+    def queryAction(self):
+        if self.actions is None:
+            raise NotImplementedError
+        return Action(self, self.actions)
+
+    def queryValue(self):
+        raise NotImplementedError
+
+    def queryComponent(self):
+        raise NotImplementedError
+
+
+def _reset():
+    index._indexes.clear()
+    index._handles.clear()
+    index._ids.clear()
+    cache._trees.clear()
+
+
+@pytest.fixture()
+def app():
+    _reset()
+    Acc.walks = 0
+    save = Acc("push button", "Save", desc="Write the file")
+    autosave = Acc("check box", "Autosave")
+    save_as = Acc("push button", "Save As…")
+    label = Acc("label", "File name", actions=None)
+    root = Acc("application", "editor", [
+        Acc("dialog", "Save", [label, Acc("filler", "", [save, save_as]), autosave])])
+    with patch.object(cache, "_start", return_value=False), \
+            patch.object(a11y, "_get_app", return_value=(root, None)):
+        yield SimpleNamespace(root=root, save=save, autosave=autosave, save_as=save_as,
+                              label=label)
+    _reset()
+
+
+def _titles(matches):
+    return [m.data.get("title") for m in matches]
+
+
+class TestElementIndex:
+    def test_substring_rules_match_a_linear_scan(self, app):
+        idx = index.get(app.root)
+        assert _titles(idx.find(title="save")) == ["Save", "Save", "Save As…", "Autosave"]
+        assert _titles(idx.find(title="ave")) == ["Save", "Save", "Save As…", "Autosave"]
+        assert _titles(idx.find(title="save as")) == ["Save As…"]
+        assert _titles(idx.find(title="the file")) == ["Save"]  # Description
+        assert _titles(idx.find(role="AXpushbutton", title="SAVE")) == ["Save", "Save As…"]
+        assert _titles(idx.find(role="AXlabel")) == ["File name"]
+        assert _titles(idx.find(title="e n")) == ["File name"]  # Spans two words
+        assert idx.find() == [] and idx.find(title="nope") == []
+
+    def test_word_lookup_matches_a_vocabulary_scan(self, app):
+        idx = index.get(app.root)
+        for w in ("a", "sa", "ave", "autosave", "utosa", "ilen", "xyz", "savez"):
+            assert sorted(idx._vocab(w)) == sorted(v for v in idx.by_word if w in v), w
+
+    def test_same_elements_with_and_without_listener(self, app):
+        app.root.children[0].children.append(Acc("panel", ""))  # Unnamed and empty: pruned
+        walked = index.get(app.root).elements
+        with patch.object(cache, "_start", return_value=True):
+            cached = index.get(app.root).elements
+        assert [e.obj for e in cached] == [e.obj for e in walked]
+        assert index.get(app.root).find(role="AXpanel") == []
+
+    def test_index_reused_until_ttl_without_listener(self, app):
+        first = index.get(app.root)
+        walks = Acc.walks
+        assert index.get(app.root) is first and Acc.walks == walks
+        with patch.object(index.time, "monotonic", return_value=index.time.monotonic() + 60):
+            assert index.get(app.root) is not first
+        assert Acc.walks == 2 * walks
+
+    def test_index_follows_cached_tree_version(self, app):
+        with patch.object(cache, "_start", return_value=True):
+            first = index.get(app.root)
+            assert index.get(app.root) is first
+            app.save.name = "Store"
+            cache._on_event(SimpleNamespace(source=app.save))
+            second = index.get(app.root)
+        assert second is not first
+        assert _titles(second.find(title="store")) == ["Store"]
+
+    def test_handles_are_stable_across_rebuilds(self, app):
+        handle = index.get(app.root).find(title="autosave")[0].handle
+        index.expire_walks()
+        rebuilt = index.get(app.root).find(title="autosave")[0]
+        assert rebuilt.handle == handle and index.resolve(handle) is rebuilt
+
+    def test_handles_evicted_past_limit(self, app):
+        with patch.object(index, "MAX_HANDLES", 2):
+            idx = index.get(app.root)
+        assert len(index._handles) == 2
+        assert index.resolve(idx.elements[0].handle) is None
+        assert index.resolve(idx.elements[-1].handle) is idx.elements[-1]
+
+
+class TestFind:
+    def test_returns_all_matches_with_handles(self, app):
+        body, code = a11y.find_elements({"title": "save", "role": "AXpushbutton"})
+        assert code == 200
+        assert body["count"] == 2 and body["searched"] == 7 and body["app"] == "editor"
+        assert [e["title"] for e in body["elements"]] == ["Save", "Save As…"]
+        assert all(e["handle"].startswith("e") for e in body["elements"])
+
+    def test_limit(self, app):
+        body, _ = a11y.find_elements({"title": "save", "limit": 1})
+        assert body["count"] == 4 and len(body["elements"]) == 1
+
+    def test_requires_a_query(self, app):
+        assert a11y.find_elements({})[1] == 400
+        assert a11y.find_elements({"title": "x", "limit": "many"})[1] == 400
+
+    def test_app_not_found(self):
+        with patch.object(a11y, "_get_app", return_value=(None, "app 'x' not found")):
+            assert a11y.find_elements({"title": "x"})[1] == 404
+
+
+class TestPress:
+    def test_press_by_handle_skips_the_search(self, app):
+        body, _ = a11y.find_elements({"title": "save as"})
+        walks = Acc.walks
+        result, code = a11y.ax_press({"handle": body["elements"][0]["handle"]})
+        assert code == 200 and result == {"pressed": True, "action": "click",
+                                          "title": "Save As…", "role": "AXpushbutton"}
+        assert app.save_as.pressed == ["click"] and Acc.walks == walks
+
+    def test_unknown_handle(self, app):
+        body, code = a11y.ax_press({"handle": "e999"})
+        assert code == 404 and body["handle"] == "e999"
+
+    def test_press_by_title_and_index(self, app):
+        result, code = a11y.ax_press({"title": "save", "role": "AXpushbutton", "index": 1})
+        assert code == 200 and result["title"] == "Save As…"
+        assert app.save_as.pressed == ["click"] and app.save.pressed == []
+
+    def test_press_expires_uncached_index(self, app):
+        first = index.get(app.root)
+        a11y.ax_press({"title": "autosave"})
+        assert index.get(app.root) is not first
+
+    def test_not_found_and_no_action(self, app):
+        body, code = a11y.ax_press({"title": "save", "index": 9})
+        assert code == 404 and body["searched"] == 7
+        result, code = a11y.ax_press({"title": "file name"})
+        assert code == 200 and result["error"] == "no action interface"
+        assert a11y.ax_press({"title": "save", "index": "x"})[1] == 400
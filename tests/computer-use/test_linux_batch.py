@@ -0,0 +1,72 @@
+"""Tests for linux_batch.py — ordered steps, delays, first-error stop, validation."""
+
+import time
+
+import pytest
+
+import linux_batch as batch
+
+
+def _dispatch(path, handler, params):
+    return handler(params)
+
+
+@pytest.fixture()
+def routes():
+    calls = []
+
+    def record(name, code=200):
+        def handler(params):
+            calls.append((name, params, time.monotonic()))
+            return ({"ok": name} if code == 200 else {"error": f"{name} broke"}), code
+        return handler
+    table = {"/click": record("click"), "/type": record("type"), "/screenshot": record("shot"),
+             "/focus": record("focus", 404), "/reload": record("reload")}
+    table["/batch"] = lambda p: batch.run_batch(p, table, _dispatch)
+    return table, calls
+
+
+class TestRunBatch:
+    def test_runs_steps_in_order_with_params(self, routes):
+        table, calls = routes
+        body, code = batch.run_batch({"actions": [
+            {"action": "click", "x": 1, "y": 2}, {"action": "/type", "text": "hi"},
+            {"action": "screenshot"}]}, table, _dispatch)
+        assert code == 200 and body["ok"] and body["completed"] == 3
+        assert [(n, p) for n, p, _ in calls] == [("click", {"x": 1, "y": 2}),
+                                                 ("type", {"text": "hi"}), ("shot", {})]
+        assert [r["result"] for r in body["results"]][2] == {"ok": "shot"}
+        assert all(r["ms"] >= 0 for r in body["results"])
+
+    def test_stops_at_first_error(self, routes):
+        table, calls = routes
+        body, code = batch.run_batch({"actions": [
+            {"action": "click"}, {"action": "focus", "app": "x"}, {"action": "type"}]}, table, _dispatch)
+        assert code == 404 and not body["ok"]
+        assert body["completed"] == 1 and len(body["results"]) == 2
+        assert "step 1 (focus) failed: focus broke" == body["error"]
+        assert [n for n, _, _ in calls] == ["click", "focus"]
+
+    def test_delay_and_sleep(self, routes):
+        table, calls = routes
+        body, _ = batch.run_batch({"actions": [
+            {"action": "click", "delay_ms": 50}, {"action": "sleep", "ms": 50},
+            {"action": "type"}]}, table, _dispatch)
+        assert calls[1][2] - calls[0][2] >= 0.1
+        assert body["results"][1] == {"action": "sleep", "status": 200, "ms": body["results"][1]["ms"],
+                                      "result": {"slept_ms": 50.0}}
+
+    @pytest.mark.parametrize("actions", [None, [], [{"action": "nope"}], [{"action": "batch"}],
+                                         [{"action": "reload"}], ["click"],
+                                         [{"action": "click", "delay_ms": "soon"}],
+                                         [{"action": "click"}, {"action": "sleep", "ms": "x"}],
+                                         [{"action": "click"}, {"action": "sleep", "ms": None}],
+                                         [{"action": "click"}, {"action": "sleep", "ms": -1}],
+                                         [{"action": "click"},
+                                          {"action": "sleep", "ms": batch.MAX_BATCH_SECS * 1000 + 1}],
+                                         [{"action": "click"}] * (batch.MAX_STEPS + 1)])
+    def test_rejected_before_running_anything(self, routes, actions):
+        table, calls = routes
+        body, code = batch.run_batch({"actions": actions}, table, _dispatch)
+        assert code == 400 and "error" in body
+        assert calls == []
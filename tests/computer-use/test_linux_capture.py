@@ -0,0 +1,329 @@
+"""Tests for linux_capture.py / linux_image.py — XShm capture against a fake libX11/libXext."""
+
+import base64
+import ctypes
+import struct
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+import linux_capture
+import linux_display as disp
+import linux_framediff as framediff
+import linux_image as image
+
+
+def _bgrx(width, height, fn):
+    return b"".join(bytes((*fn(x, y), 0)) for y in range(height) for x in range(width))
+
+
+def _decode_png(data):
+    """(width, height, RGB rows) of an unfiltered 8-bit RGB PNG."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, chunks = 8, {}
+    while pos < len(data):
+        n, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + n]
+        assert struct.unpack(">I", data[pos + 8 + n:pos + 12 + n])[0] == zlib.crc32(kind + body)
+        chunks[kind] = chunks.get(kind, b"") + body
+        pos += 12 + n
+    w, h, depth, ctype = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert (depth, ctype) == (8, 2)
+    raw = zlib.decompress(chunks[b"IDAT"])
+    rows = [raw[r * (w * 3 + 1):(r + 1) * (w * 3 + 1)] for r in range(h)]
+    assert all(row[0] == 0 for row in rows)
+    return w, h, [row[1:] for row in rows]
+
+
+class TestImage:
+    def test_png_round_trip_swaps_to_rgb(self):
+        pixels = _bgrx(3, 2, lambda x, y: (x, y, 200))  # B, G, R
+        w, h, rows = _decode_png(image.encode_png(pixels, 3, 2))
+        assert (w, h) == (3, 2)
+        assert rows[1][3:6] == bytes((200, 1, 1))
+
+    def test_crop_clamps_to_screen(self):
+        pixels = _bgrx(10, 10, lambda x, y: (x, y, 0))
+        out, w, h = image.crop(pixels, 10, 10, 8, 7, 5, 5)
+        assert (w, h) == (2, 3)
+        assert out[:4] == bytes((8, 7, 0, 0))
+        assert image.crop(pixels, 10, 10, 20, 20, 5, 5)[1:] == (0, 0)
+
+    def test_indicator_ring_and_dot(self):
+        pixels = bytearray(100 * 100 * 4)
+        image.draw_indicator(pixels, 100, 100, 50, 50)
+        px = lambda x, y: bytes(pixels[(y * 100 + x) * 4:(y * 100 + x) * 4 + 4])  # noqa: E731
+        assert px(50, 50) == image._RED
+        assert px(68, 50) == image._RED
+        assert px(60, 50) == b"\x00\x00\x00\x00"
+        assert px(90, 50) == b"\x00\x00\x00\x00"
+
+    def test_indicator_near_edge(self):
+        pixels = bytearray(20 * 20 * 4)
+        image.draw_indicator(pixels, 20, 20, 0, 0)
+        assert pixels[:4] == image._RED
+
+    def test_scale_nearest_keeps_aspect(self):
+        pixels = _bgrx(8, 4, lambda x, y: (x, y, 0))
+        out, w, h = image.scale(pixels, 8, 4, 4)
+        assert (w, h) == (4, 2)
+        assert [out[i * 4] for i in range(4)] == [1, 3, 5, 7]
+        assert out[16 + 1] == 3  # Second output row samples source row 3
+
+    def test_scale_noop_when_narrow(self):
+        pixels = _bgrx(4, 2, lambda x, y: (x, y, 0))
+        assert image.scale(pixels, 4, 2, 1024) == (pixels, 4, 2)
+
+    def test_encode_without_pillow_falls_back_to_png(self, monkeypatch):
+        monkeypatch.setattr(image, "HAS_PIL", False)
+        data, fmt, w, h = image.encode(_bgrx(8, 4, lambda x, y: (x, y, 0)), 8, 4, 4, "jpeg", 50)
+        assert (fmt, w, h) == ("png", 4, 2)
+        assert _decode_png(data)[:2] == (4, 2)
+
+    def test_write_atomic_leaves_no_temp(self, tmp_path):
+        path = tmp_path / "shot.png"
+        image.write_atomic(str(path), b"png")
+        assert path.read_bytes() == b"png"
+        assert [p.name for p in tmp_path.iterdir()] == ["shot.png"]
+
+
+class FakeX11:
+    def __init__(self):
+        self.size, self.events = (4, 2), 0
+
+    def XDefaultScreen(self, _d): return 0
+    def XDefaultVisual(self, _d, _s): return 1
+    def XDefaultDepth(self, _d, _s): return 24
+    def XDefaultRootWindow(self, _d): return 7
+    def XSelectInput(self, _d, _w, _mask): pass
+    def XSync(self, _d, _discard): pass
+    def XFree(self, _p): pass
+
+    def XGetGeometry(self, _d, _w, _root, _x, _y, w, h, _border, _depth):
+        w._obj.value, h._obj.value = self.size
+
+    def XCheckTypedWindowEvent(self, _d, _w, _kind, _ev):
+        if self.events:
+            self.events -= 1
+            return True
+        return False
+
+
+class FakeXext:
+    def __init__(self):
+        self.images, self.buffers, self.detached = [], {}, 0
+
+    def XShmCreateImage(self, _d, _v, _depth, _fmt, _data, _shm, w, h):
+        img = linux_capture.XImage(width=w, height=h, bits_per_pixel=32, byte_order=0,
+                                   red_mask=0xFF0000, bytes_per_line=w * 4 + 8)
+        self.images.append(img)
+        return ctypes.addressof(img)
+
+    def XShmAttach(self, _d, _shm): pass
+
+    def XShmDetach(self, _d, _shm):
+        self.detached += 1
+
+    def XShmGetImage(self, _d, _w, ptr, _x, _y, _planes):
+        img = linux_capture.XImage.from_address(ptr)
+        row = bytes(range(img.width * 4)) + b"\xee" * 8  # Padding past the visible row
+        ctypes.memmove(img.data, row * img.height, len(row) * img.height)
+        return True
+
+
+class FakeLibc:
+    def __init__(self):
+        self.segments = {}
+
+    def shmget(self, _key, size, _flags):
+        shmid = len(self.segments) + 1
+        self.segments[shmid] = ctypes.create_string_buffer(size)
+        return shmid
+
+    def shmat(self, shmid, _addr, _flags):
+        return ctypes.addressof(self.segments[shmid])
+
+    def shmdt(self, _addr): pass
+    def shmctl(self, _id, _cmd, _buf): pass
+
+
+@pytest.fixture()
+def fakes():
+    x11, xext = FakeX11(), FakeXext()
+    return x11, xext, linux_capture.ShmCapture(x11, xext, object(), FakeLibc())
+
+
+class TestShmCapture:
+    def test_grab_strips_row_padding(self, fakes):
+        _x11, _xext, cap = fakes
+        w, h, data = cap.grab()
+        assert (w, h) == (4, 2)
+        assert data == bytes(range(16)) * 2
+
+    def test_size_cached_until_configure_notify(self, fakes):
+        x11, xext, cap = fakes
+        cap.grab()
+        x11.size = (6, 3)
+        assert cap.size() == (4, 2)
+        x11.events = 2
+        assert cap.size() == (6, 3)
+        assert cap.grab()[:2] == (6, 3)
+        assert xext.detached == 1 and len(xext.images) == 2
+
+    def test_image_reused_between_grabs(self, fakes):
+        _x11, xext, cap = fakes
+        cap.grab()
+        cap.grab()
+        assert len(xext.images) == 1
+
+    def test_unsupported_format_raises(self, fakes):
+        _x11, xext, cap = fakes
+        cap.grab()
+        xext.images[0].bits_per_pixel = 16
+        with pytest.raises(OSError):
+            cap.grab()
+
+    def test_env_forces_scrot(self, monkeypatch):
+        monkeypatch.setenv("RELAYGENT_CAPTURE_BACKEND", "scrot")
+        with patch("linux_xlib.open_display") as opened:
+            assert linux_capture._connect() is None
+        opened.assert_not_called()
+
+
+class FakeCapture:
+    def __init__(self, width=40, height=30):
+        self.width, self.height, self.dot = width, height, None
+
+    def size(self):
+        return self.width, self.height
+
+    def grab(self):
+        return self.width, self.height, _bgrx(self.width, self.height, lambda x, y: (
+            (255, 255, 255) if (x, y) == self.dot else (x, y, 9)))
+
+
+@pytest.fixture()
+def shm():
+    with patch("linux_capture.get", return_value=FakeCapture()), \
+            patch("subprocess.run") as mock_run:
+        yield mock_run
+
+
+class TestDisplayShm:
+    def test_screenshot_writes_png_without_subprocess(self, shm, tmp_path):
+        path = str(tmp_path / "s.png")
+        body, code = disp.screenshot({"path": path})
+        assert code == 200 and body["path"] == path
+        assert (body["width"], body["height"], body["scale"]) == (40, 30, 1)
+        with open(path, "rb") as f:
+            assert _decode_png(f.read())[:2] == (40, 30)
+        shm.assert_not_called()
+
+    def test_crop(self, shm, tmp_path):
+        path = str(tmp_path / "c.png")
+        body, _ = disp.screenshot({"path": path, "x": 5, "y": 6, "w": 10, "h": 4})
+        assert (body["width"], body["height"]) == (10, 4)
+        with open(path, "rb") as f:
+            _w, _h, rows = _decode_png(f.read())
+        assert rows[0][:3] == bytes((9, 6, 5))
+
+    def test_indicator(self, shm, tmp_path):
+        path = str(tmp_path / "i.png")
+        disp.screenshot({"path": path, "indicator_x": 20, "indicator_y": 15})
+        with open(path, "rb") as f:
+            rows = _decode_png(f.read())[2]
+        assert rows[15][60:63] == bytes((255, 0, 0))
+
+    def test_inline_without_path_writes_nothing(self, shm):
+        with patch("linux_image.write_atomic") as write:
+            body, code = disp.screenshot({"inline": True})
+        write.assert_not_called()
+        assert code == 200 and body["path"] is None
+        assert _decode_png(base64.b64decode(body["image_base64"]))[:2] == (40, 30)
+
+    def test_max_width_scales_in_one_pass(self, shm):
+        with patch.object(image, "HAS_PIL", False):
+            body, code = disp.screenshot({"inline": True, "max_width": 20})
+        assert code == 200
+        assert (body["width"], body["image_width"], body["image_height"]) == (40, 20, 15)
+        assert body["scale"] == 2 and body["mimeType"] == "image/png"
+        assert _decode_png(base64.b64decode(body["image_base64"]))[:2] == (20, 15)
+
+    def test_bad_options_rejected(self, shm):
+        assert disp.screenshot({"format": "gif"})[1] == 400
+        assert disp.screenshot({"quality": 0, "format": "jpeg"})[1] == 400
+        assert disp.screenshot({"max_width": "wide"})[1] == 400
+
+    def test_screen_size_uses_cached_size(self, shm):
+        assert disp.screen_size() == (40, 30)
+        shm.assert_not_called()
+
+    def test_grab_failure_falls_back_to_scrot(self, shm):
+        with patch.object(FakeCapture, "grab", side_effect=OSError("bad format")):
+            body, code = disp.screenshot({})
+        assert code == 200 and body["path"] == "/tmp/claude-screenshot.png"
+        assert shm.call_args_list[0][0][0][:2] == ["scrot", "-o"]
+
+
+class TestDisplayDiff:
+    @pytest.fixture()
+    def cap(self):
+        framediff.reset()
+        cap = FakeCapture(128, 96)
+        with patch("linux_capture.get", return_value=cap), patch("subprocess.run"):
+            yield cap
+        framediff.reset()
+
+    def test_full_then_unchanged_then_region(self, cap):
+        body, _ = disp.screenshot({"diff": "1", "inline": True})
+        assert body["full"] and "image_base64" in body
+        body, _ = disp.screenshot({"diff": True})
+        assert body["unchanged"] and body["regions"] == []
+        cap.dot = (70, 40)
+        body, _ = disp.screenshot({"diff": 1, "max_width": 64})
+        assert not body["unchanged"] and body["scale"] == 2
+        [region] = body["regions"]
+        assert (region["x"], region["y"], region["w"], region["h"]) == (64, 32, 32, 32)
+        w, h, rows = _decode_png(base64.b64decode(region["image_base64"]))
+        assert (w, h) == (region["image_width"], region["image_height"]) == (16, 16)
+
+    def test_resize_sends_full_frame(self, cap):
+        disp.screenshot({"diff": 1, "client": "x"})
+        cap.width = 129  # Resized screen
+        body, _ = disp.screenshot({"diff": 1, "client": "x", "inline": True})
+        assert body["full"] and body["width"] == 129
+
+
+class TestCliInline:
+    @patch("subprocess.run")
+    def test_inline_reads_scrot_output(self, mock_run, tmp_path):
+        path = tmp_path / "x.png"
+        path.write_bytes(b"fakepng")
+        body, code = disp.screenshot({"path": str(path), "inline": True})
+        assert code == 200
+        assert base64.b64decode(body["image_base64"]) == b"fakepng"
+
+    @patch("subprocess.run")
+    def test_scale_and_format_via_convert(self, mock_run):
+        mock_run.return_value.stdout = "dimensions:    2048x1152 pixels"
+        body, code = disp.screenshot({"max_width": 1024, "format": "jpg", "quality": 70})
+        assert code == 200 and body["path"] == "/tmp/claude-screenshot.jpg"
+        assert (body["image_width"], body["image_height"], body["scale"]) == (1024, 576, 2)
+        assert body["format"] == "jpeg"
+        assert mock_run.call_args_list[-1][0][0] == [
+            "convert", body["path"], "-resize", "1024x576!", "-quality", "70",
+            "jpeg:/tmp/claude-screenshot.jpg"]
+
+    @patch("subprocess.run")
+    def test_diff_without_xshm_is_full_frame(self, mock_run):
+        mock_run.return_value.stdout = "dimensions:    800x600 pixels"
+        body, _ = disp.screenshot({"diff": "1"})
+        assert body["full"] is True
+
+    @patch("subprocess.run")
+    def test_png_at_native_size_skips_convert(self, mock_run):
+        mock_run.return_value.stdout = "dimensions:    800x600 pixels"
+        body, _ = disp.screenshot({"max_width": 1024})
+        assert body["scale"] == 1
+        assert not any(c[0][0][0] == "convert" for c in mock_run.call_args_list)
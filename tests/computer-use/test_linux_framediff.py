@@ -0,0 +1,67 @@
+"""Tests for linux_framediff.py — tile diffing, region grouping, per-client frame state."""
+
+import pytest
+
+import linux_framediff as fd
+
+
+def _frame(width, height, changes=()):
+    """Black BGRX frame with the given (x, y) pixels set white."""
+    pixels = bytearray(width * height * 4)
+    for x, y in changes:
+        pixels[(y * width + x) * 4:(y * width + x) * 4 + 3] = b"\xff\xff\xff"
+    return bytes(pixels)
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    fd.reset()
+    yield
+    fd.reset()
+
+
+class TestTiles:
+    def test_single_pixel_marks_one_tile(self):
+        assert fd.changed_tiles(_frame(100, 80), _frame(100, 80, [(70, 40)]), 100, 80) == {(2, 1)}
+
+    def test_identical_frames(self):
+        assert fd.changed_tiles(_frame(64, 64), _frame(64, 64), 64, 64) == set()
+
+    def test_partial_edge_tile(self):
+        assert fd.changed_tiles(_frame(70, 10), _frame(70, 10, [(69, 9)]), 70, 10) == {(2, 0)}
+
+
+class TestRegions:
+    def test_adjacent_tiles_merge_and_clamp(self):
+        boxes = fd.regions({(0, 0), (1, 1), (3, 0)}, 100, 50)
+        assert boxes == [{"x": 0, "y": 0, "w": 64, "h": 50},
+                         {"x": 96, "y": 0, "w": 4, "h": 32}]
+
+    def test_empty(self):
+        assert fd.regions(set(), 100, 100) == []
+
+
+class TestDiff:
+    def test_first_call_is_full_then_unchanged(self):
+        assert fd.diff("a", 64, 64, _frame(64, 64)) is None
+        assert fd.diff("a", 64, 64, _frame(64, 64)) == []
+
+    def test_changed_region_relative_to_previous_frame(self):
+        fd.diff("a", 96, 64, _frame(96, 64))
+        assert fd.diff("a", 96, 64, _frame(96, 64, [(40, 5)])) == [{"x": 32, "y": 0, "w": 32, "h": 32}]
+        assert fd.diff("a", 96, 64, _frame(96, 64, [(40, 5)])) == []
+
+    def test_clients_are_independent(self):
+        fd.diff("a", 64, 64, _frame(64, 64))
+        assert fd.diff("b", 64, 64, _frame(64, 64)) is None
+        assert fd.diff("a", 64, 64, _frame(64, 64)) == []
+
+    def test_full_frame_forced_every_n_and_on_resize(self):
+        results = [fd.diff("a", 32, 32, _frame(32, 32), full_every=3) for _ in range(7)]
+        assert [r is None for r in results] == [True, False, False, True, False, False, True]
+        assert fd.diff("a", 64, 32, _frame(64, 32), full_every=3) is None
+
+    def test_oldest_client_evicted(self):
+        for i in range(fd.MAX_CLIENTS + 1):
+            fd.diff(str(i), 32, 32, _frame(32, 32))
+        assert fd.diff("0", 32, 32, _frame(32, 32)) is None
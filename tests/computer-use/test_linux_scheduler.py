@@ -0,0 +1,99 @@
+"""Tests for linux_scheduler.py and the scheduled input_sequence in linux_held_input.py."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import linux_held_input as held
+import linux_scheduler as sched
+
+
+class TestScheduler:
+    def test_same_deadline_runs_in_submission_order(self):
+        ran = []
+        batch = sched.Scheduler().submit([(0.02, ran.append, i, f"a{i}") for i in range(20)])
+        assert batch.wait(2)
+        assert ran == list(range(20))
+
+    def test_runs_by_deadline_not_list_order(self):
+        ran = []
+        batch = sched.Scheduler().submit([(0.04, ran.append, "late", "late"),
+                                          (0.0, ran.append, "now", "now"),
+                                          (0.02, ran.append, "mid", "mid")])
+        assert batch.wait(2)
+        assert ran == ["now", "mid", "late"]
+
+    def test_records_timestamps_and_jitter(self):
+        batch = sched.Scheduler().submit([(0.03, lambda _: None, None, "a"),
+                                          (0.06, lambda _: None, None, "b")])
+        assert batch.wait(2)
+        report = batch.report()
+        a, b = report["executed"]
+        assert (a["action"], a["due_ms"]) == ("a", 30.0) and b["due_ms"] == 60.0
+        assert 0 <= a["jitter_ms"] < 20 and a["at_ms"] >= 30
+        assert set(report["jitter_ms"]) == {"mean", "p50", "p95", "max"}
+
+    def test_jitter_measured_after_the_action(self):
+        batch = sched.Scheduler().submit([(0.01, lambda _: time.sleep(0.03), None, "slow")])
+        assert batch.wait(2)
+        rec = batch.report()["executed"][0]
+        assert rec["done_ms"] - rec["at_ms"] >= 30 and rec["jitter_ms"] >= 30
+
+    def test_lock_held_from_first_to_last_action(self):
+        lock, seen = threading.Lock(), []
+        batch = sched.Scheduler(lock).submit([(0, lambda _: seen.append(lock.locked()), None, "a"),
+                                              (0.1, lambda _: None, None, "b")])
+        time.sleep(0.05)
+        assert seen == [True] and lock.locked()  # Between actions
+        assert batch.wait(2)
+        time.sleep(0.01)
+        assert not lock.locked()
+
+    def test_waits_for_a_route_holding_the_lock(self):
+        lock, ran = threading.Lock(), []
+        lock.acquire()
+        batch = sched.Scheduler(lock).submit([(0, ran.append, "a", "a")])
+        time.sleep(0.05)
+        assert ran == []
+        lock.release()
+        assert batch.wait(2) and ran == ["a"]
+        assert batch.report()["executed"][0]["jitter_ms"] >= 50
+
+    def test_error_recorded_and_scheduler_survives(self):
+        s = sched.Scheduler()
+        batch = s.submit([(0, lambda _: 1 / 0, None, "boom")])
+        assert batch.wait(2)
+        assert "division" in batch.report()["executed"][0]["error"]
+        assert s.submit([(0, lambda _: None, None, "ok")]).wait(2)
+
+    def test_earlier_submission_preempts_sleep(self):
+        s, ran = sched.Scheduler(), []
+        s.submit([(0.5, ran.append, "slow", "slow")])
+        time.sleep(0.02)
+        start = time.monotonic()
+        assert s.submit([(0, ran.append, "fast", "fast")]).wait(2)
+        assert time.monotonic() - start < 0.2 and ran == ["fast"]
+
+
+class TestInputSequence:
+    def test_async_returns_before_running(self):
+        with patch.object(held, "_key") as key:
+            body, code = held.input_sequence({"actions": [{"action": "key_down", "key": "a", "delay": 100}]})
+            assert code == 200 and body == {"queued": 1, "duration_ms": 100}
+            key.assert_not_called()
+            time.sleep(0.3)
+        key.assert_called_once_with("a", True)
+
+    def test_wait_returns_execution_report(self):
+        with patch.object(held, "_key") as key:
+            body, code = held.input_sequence({"wait": True, "actions": [
+                {"action": "key_press", "key": "a", "delay": 20},
+                {"action": "bogus"},
+                {"action": "key_down", "key": "b", "delay": 20}]})
+        assert code == 200 and body["skipped"] == 1
+        assert [r["action"] for r in body["executed"]] == ["key_press", "key_down"]
+        assert [c[0] for c in key.call_args_list] == [("a", True), ("a", False), ("b", True)]
+        assert body["jitter_ms"]["max"] < 50
+
+    def test_bad_delay(self):
+        assert held.input_sequence({"actions": [{"action": "key_down", "key": "a", "delay": "x"}]})[1] == 400
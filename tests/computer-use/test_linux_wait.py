@@ -0,0 +1,64 @@
+"""Tests for linux_wait.py — /wait_stable sampling loop against a fake capture."""
+
+from unittest.mock import patch
+
+import pytest
+
+import linux_wait as wait
+
+
+class ChangingCapture:
+    """4x2 screen whose top-left pixel changes on each of the first `changes` grabs;
+    the bottom-right pixel always flickers when `flicker` is set."""
+
+    def __init__(self, changes=0, flicker=False):
+        self.changes, self.flicker, self.grabs = changes, flicker, 0
+
+    def grab(self):
+        self.grabs += 1
+        pixels = bytearray(4 * 2 * 4)
+        pixels[0] = min(self.grabs, self.changes + 1)
+        if self.flicker:
+            pixels[-4] = self.grabs % 256
+        return 4, 2, bytes(pixels)
+
+
+def _wait(cap, **params):
+    with patch("linux_capture.get", return_value=cap):
+        return wait.wait_stable({"interval_ms": 2, "quiet_ms": 20, **params})
+
+
+class TestWaitStable:
+    def test_already_stable_returns_after_quiet_period(self):
+        body, code = _wait(ChangingCapture())
+        assert code == 200 and body["stable"] and body["changes"] == 0
+        assert 20 <= body["waited_ms"] < 500
+
+    def test_waits_through_changes(self):
+        body, _ = _wait(ChangingCapture(changes=3))
+        assert body["stable"] and body["changes"] == 3
+        assert body["quiet_ms"] >= 20 and body["frames"] >= 4
+
+    def test_timeout_when_never_stable(self):
+        body, _ = _wait(ChangingCapture(flicker=True), timeout_ms=50)
+        assert not body["stable"]
+        assert 50 <= body["waited_ms"] < 500
+        assert body["changes"] == body["frames"] - 1
+
+    def test_region_ignores_changes_elsewhere(self):
+        body, _ = _wait(ChangingCapture(flicker=True), timeout_ms=200, x=0, y=0, w=2, h=1)
+        assert body["stable"] and body["changes"] == 0
+
+    @pytest.mark.parametrize("params", [{"timeout_ms": 10 ** 6}, {"interval_ms": 0},
+                                        {"quiet_ms": "soon"}, {"x": 1, "y": 1, "w": "a", "h": 1}])
+    def test_bad_params(self, params):
+        assert _wait(ChangingCapture(), **params)[1] == 400
+
+    @patch("subprocess.run")
+    def test_scrot_fallback_samples_region(self, mock_run, tmp_path, monkeypatch):
+        monkeypatch.setattr(wait, "_CLI_PATH", str(tmp_path / "w.png"))
+        (tmp_path / "w.png").write_bytes(b"same")
+        with patch("linux_capture.get", return_value=None):
+            body, _ = wait.wait_stable({"quiet_ms": 300, "x": 1, "y": 2, "w": 3, "h": 4})
+        assert body["stable"]
+        assert mock_run.call_args[0][0] == ["scrot", "-o", "-a", "1,2,3,4", str(tmp_path / "w.png")]
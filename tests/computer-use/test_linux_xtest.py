@@ -0,0 +1,163 @@
+"""Tests for linux_xtest.py — in-process XTest backend against a fake libX11/libXtst."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import linux_held_input as held
+import linux_input as inp
+import linux_xtest
+
+# keycode -> (unshifted, shifted) keysyms; keycode 60 is unmapped (the spare)
+KEYSYMS = {"a": 0x61, "A": 0x41, "Return": 0xFF0D, "Shift_L": 0xFFE1,
+           "Control_L": 0xFFE3, "exclam": 0x21, "1": 0x31}
+LAYOUT = {38: (0x61, 0x41), 36: (0xFF0D, 0), 50: (0xFFE1, 0), 37: (0xFFE3, 0),
+          10: (0x31, 0x21)}
+
+
+class FakeX11:
+    def __init__(self):
+        self.held = set()
+        self.buttons_mask = 0
+        self.changes = []
+
+    def XDisplayKeycodes(self, _d, lo, hi):
+        lo._obj.value, hi._obj.value = 8, 64
+
+    def XGetKeyboardMapping(self, _d, first, count, per):
+        per._obj.value = 2
+        return [s for kc in range(first, first + count) for s in LAYOUT.get(kc, (0, 0))]
+
+    def XFree(self, _p):
+        pass
+
+    def XStringToKeysym(self, name):
+        return KEYSYMS.get(name.decode(), 0)
+
+    def XChangeKeyboardMapping(self, _d, keycode, _per, syms, _n):
+        self.changes.append((keycode, syms[0]))
+
+    def XSync(self, _d, _discard):
+        pass
+
+    def XQueryKeymap(self, _d, bits):
+        for kc in self.held:
+            bits[kc // 8] = bits.raw[kc // 8] | (1 << kc % 8)
+
+    def XDefaultRootWindow(self, _d):
+        return 1
+
+    def XQueryPointer(self, _d, _root, *refs):
+        refs[-1]._obj.value = self.buttons_mask
+
+
+class FakeXTst:
+    def __init__(self, x11):
+        self.x11, self.events = x11, []
+
+    def XTestFakeKeyEvent(self, _d, keycode, down, _delay):
+        self.events.append(("key", keycode, bool(down)))
+        (self.x11.held.add if down else self.x11.held.discard)(keycode)
+
+    def XTestFakeButtonEvent(self, _d, btn, down, _delay):
+        self.events.append(("button", btn, bool(down)))
+
+    def XTestFakeMotionEvent(self, _d, _screen, x, y, _delay):
+        self.events.append(("move", x, y))
+
+
+@pytest.fixture()
+def xt():
+    x11 = FakeX11()
+    backend = linux_xtest.XTest(x11, FakeXTst(x11), 1)
+    with patch.object(linux_xtest, "get", return_value=backend):
+        yield backend
+
+
+def _events(xt):
+    return xt.xtst.events
+
+
+class TestKeymap:
+    def test_spare_keycode_found(self, xt):
+        assert xt.spare == 8  # First keycode with no keysyms
+        assert xt.keymap[0x41] == (38, True)
+        assert xt.keymap[0x61] == (38, False)
+
+    def test_unmapped_char_bound_to_spare(self, xt):
+        xt.type_text("é", delay=0)
+        assert xt.x11.changes == [(8, 0xE9)]
+        assert ("key", 8, True) in _events(xt)
+
+
+class TestInput:
+    def test_click_with_modifier_no_forks(self, xt):
+        with patch("subprocess.run") as run:
+            body, code = inp.click({"x": 5, "y": 6, "modifiers": ["cmd"], "double": True})
+        assert code == 200 and not run.called
+        assert _events(xt) == [("move", 5, 6), ("key", 37, True),
+                               ("button", 1, True), ("button", 1, False),
+                               ("button", 1, True), ("button", 1, False),
+                               ("key", 37, False)]
+
+    def test_type_shifts_uppercase_and_symbols(self, xt):
+        xt.type_text("A!", delay=0)
+        assert _events(xt) == [("key", 50, True), ("key", 38, True), ("key", 38, False),
+                               ("key", 50, False), ("key", 50, True), ("key", 10, True),
+                               ("key", 10, False), ("key", 50, False)]
+
+    def test_type_lifts_held_modifiers(self, xt):
+        xt.x11.held.add(37)
+        inp.type_input({"text": "a"})
+        assert _events(xt)[0] == ("key", 37, False)
+        assert _events(xt)[-1] == ("key", 37, True)
+
+    def test_key_combo(self, xt):
+        inp.type_input({"key": "return", "modifiers": ["cmd"]})
+        assert _events(xt) == [("key", 37, True), ("key", 36, True),
+                               ("key", 36, False), ("key", 37, False)]
+
+    def test_drag(self, xt):
+        inp.drag({"startX": 0, "startY": 0, "endX": 10, "endY": 10, "steps": 2, "duration": 0})
+        assert _events(xt) == [("move", 0, 0), ("button", 1, True), ("move", 5, 5),
+                               ("move", 10, 10), ("button", 1, False)]
+
+    def test_scroll(self, xt):
+        inp.scroll({"amount": 2})
+        assert [e for e in _events(xt) if e[0] == "button"] == [
+            ("button", 5, True), ("button", 5, False), ("button", 5, True), ("button", 5, False)]
+
+    def test_unknown_key_raises(self, xt):
+        with pytest.raises(ValueError):
+            xt.key("NoSuchKey", True)
+
+
+class TestReleaseAll:
+    def test_releases_only_held(self, xt):
+        held.key_down({"key": "a", "modifiers": ["shift"]})
+        xt.x11.buttons_mask = 1 << 8 | 1 << 10  # Buttons 1 and 3
+        xt.xtst.events.clear()
+        with patch("subprocess.run") as run:
+            body, code = held.release_all({})
+        assert not run.called
+        assert body["count"] == 4
+        assert sorted(_events(xt)) == [("button", 1, False), ("button", 3, False),
+                                       ("key", 38, False), ("key", 50, False)]
+
+
+class TestFallback:
+    def test_get_honours_xdotool_override(self, monkeypatch):
+        monkeypatch.setattr(linux_xtest, "_tried", False)
+        monkeypatch.setattr(linux_xtest, "_backend", None)
+        monkeypatch.setenv("RELAYGENT_INPUT_BACKEND", "xdotool")
+        open_display = MagicMock()
+        monkeypatch.setattr(linux_xtest.linux_xlib, "open_display", open_display)
+        assert linux_xtest.get() is None
+        assert not open_display.called
+
+    def test_missing_extension_falls_back(self, monkeypatch):
+        monkeypatch.setattr(linux_xtest, "_tried", False)
+        monkeypatch.setattr(linux_xtest, "_backend", None)
+        monkeypatch.delenv("RELAYGENT_INPUT_BACKEND")
+        monkeypatch.setattr(linux_xtest.linux_xlib, "open_display", lambda ext: None)
+        assert linux_xtest.get() is None
@@ -42,7 +42,7 @@ const server = http.createServer((_req, res) => {
 await new Promise(r => server.listen(0, '127.0.0.1', r));
 process.env.HAMMERSPOON_PORT = String(server.address().port);
 
-const { readScreenshot, scaleFactor, SCREENSHOT_PATH } = await import('../../computer-use/hammerspoon.mjs');
+const { readScreenshot, scaleFactor, screenshotImage, screenshotRegions, screenshotRequest, SCREENSHOT_PATH } = await import('../../computer-use/hammerspoon.mjs');
 after(() => server.close());
 
 // ── Test fixtures ────────────────────────────────────────────────────────────
@@ -169,3 +169,53 @@ describe('Retina bug regression (PR #506)', () => {
 		assert.equal(scaleFactor(), 1, 'scaleFactor = 1024/1024 = 1 for Retina');
 	});
 });
+
+// ── Server-scaled inline screenshots (linux-server.py) ──────────────────────
+
+describe('screenshotImage inline', () => {
+	const inline = (buf, extra = {}) => ({ width: 2048, height: 1000, image_base64: buf.toString('base64'),
+		mimeType: 'image/png', format: 'png', scale: 2, ...extra });
+
+	it('uses the server image and scale without touching disk', () => {
+		cleanup();
+		const img = screenshotImage(inline(createPng(1024, 500)));
+		assert.equal(img.mimeType, 'image/png');
+		assert.ok(Buffer.from(img.data, 'base64').subarray(0, 8).equals(createPng(1, 1).subarray(0, 8)));
+		assert.equal(scaleFactor(), 2);
+		assert.equal(existsSync(SCALED_PATH), false);
+	});
+
+	it('accepts jpeg by magic bytes', () => {
+		const jpeg = Buffer.from([0xff, 0xd8, 0xff, 0xe0, 0, 0x10]);
+		const img = screenshotImage(inline(jpeg, { mimeType: 'image/jpeg', format: 'jpeg', scale: 1.5 }));
+		assert.equal(img.mimeType, 'image/jpeg');
+		assert.equal(scaleFactor(), 1.5);
+	});
+
+	it('rejects data that does not match its type', () => {
+		assert.equal(screenshotImage(inline(Buffer.from('not an image'))), null);
+		assert.equal(screenshotImage(inline(createPng(4, 4), { mimeType: 'image/gif' })), null);
+	});
+
+	it('asks the Linux server for an inline scaled image', () => {
+		const body = screenshotRequest({ indicator_x: 5, indicator_y: 6 });
+		if (process.platform === 'linux') {
+			assert.equal(body.inline, true);
+			assert.equal(body.max_width, 1024);
+			assert.equal(body.path, undefined);
+		} else assert.equal(body.path, SCREENSHOT_PATH);
+		assert.equal(body.indicator_x, 5);
+	});
+});
+
+describe('screenshotRegions', () => {
+	it('captions each region in screenshot coords', () => {
+		const png = createPng(8, 8).toString('base64');
+		const content = screenshotRegions({ scale: 2, mimeType: 'image/png',
+			regions: [{ x: 64, y: 32, w: 32, h: 32, image_base64: png }] });
+		assert.equal(content.length, 2);
+		assert.equal(content[0].data, png);
+		assert.equal(content[1].text, 'Changed region at (32,16) 16x16');
+		assert.equal(scaleFactor(), 2);
+	});
+});
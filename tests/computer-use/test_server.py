@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import http.client
 import importlib
 import json
 import sys
+import threading
+import time
 from io import BytesIO
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 # The module is named linux-server.py (hyphenated), import via importlib
 spec = importlib.util.spec_from_file_location(
     "linux_server",
@@ -67,6 +72,13 @@ class TestReadBody:
         result = handler._read_body()
         assert result == {}
 
+    def test_non_object_json(self):
+        handler = self._make_handler()
+        for body in ([], 1, "x"):
+            req = MockRequest(body)
+            handler.headers, handler.rfile = req.headers, req.rfile
+            assert handler._read_body() is None
+
     def test_missing_content_length(self):
         handler = self._make_handler()
         handler.headers = {}
@@ -95,7 +107,7 @@ class TestRoutes:
         expected = {
             "/screenshot", "/click", "/type", "/drag", "/scroll",
             "/type_from_file", "/focus", "/launch", "/element_at",
-            "/accessibility", "/ax_press", "/reload",
+            "/accessibility", "/find", "/ax_press", "/reload", "/wait_stable",
         }
         # Verify all expected POST routes exist by checking the source
         import inspect
@@ -137,3 +149,160 @@ class TestRespond:
         handler._respond({"error": "not found"}, 404)
         output = handler.wfile.getvalue()
         assert json.loads(output)["error"] == "not found"
+
+
+class TestQueryParams:
+    def _handler(self, path, body=None):
+        handler = object.__new__(linux_server.Handler)
+        req = MockRequest(body)
+        handler.path, handler.headers, handler.rfile = path, req.headers, req.rfile
+        handler.responses = []
+        handler._respond = lambda body, code=200: handler.responses.append((body, code))
+        return handler
+
+    def test_query_merged_into_post_params(self):
+        handler = self._handler("/screenshot?diff=1&client=a", {"client": "b", "inline": True})
+        with patch.object(linux_server.display, "screenshot", return_value=({}, 200)) as shot:
+            handler.do_POST()
+        shot.assert_called_once_with({"diff": "1", "client": "b", "inline": True})
+        assert handler.responses == [({}, 200)]
+
+    def test_non_object_body_rejected(self):
+        for body in ([], 1, "x"):
+            handler = self._handler("/click", body)
+            with patch.object(linux_server.inp, "click") as click:
+                handler.do_POST()
+            click.assert_not_called()
+            assert handler.responses == [({"error": "request body must be a JSON object"}, 400)]
+
+    def test_query_on_get(self):
+        handler = self._handler("/health?verbose=1")
+        handler.do_GET()
+        assert handler.responses[0][1] == 200
+
+
+@pytest.fixture()
+def live():
+    """Threaded server on an ephemeral port; yields a request helper."""
+    server = linux_server.ThreadingHTTPServer(("127.0.0.1", 0), linux_server.Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def call(method, path, body=None, conn=None):
+        c = conn or http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+        c.request(method, path, json.dumps(body) if body is not None else None,
+                  {"Content-Type": "application/json"})
+        resp = c.getresponse()
+        return json.loads(resp.read()), resp.status
+    yield call, server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def _slow(secs, log=None, name=""):
+    def handler(_params):
+        if log is not None:
+            log.append(("start", name, time.monotonic()))
+        time.sleep(secs)
+        if log is not None:
+            log.append(("end", name, time.monotonic()))
+        return {"ok": name}, 200
+    return handler
+
+
+def _parallel(*calls):
+    threads = [threading.Thread(target=fn) for fn in calls]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+class TestConcurrency:
+    def test_slow_a11y_does_not_block_health_or_screenshot(self, live):
+        call, _ = live
+        with patch.object(linux_server.a11y, "accessibility_tree", _slow(0.5)), \
+                patch.object(linux_server.display, "screenshot", _slow(0)):
+            t = threading.Thread(target=call, args=("POST", "/accessibility", {}))
+            t.start()
+            time.sleep(0.05)
+            start = time.monotonic()
+            assert call("GET", "/health")[1] == 200
+            assert call("POST", "/screenshot", {})[1] == 200
+            assert time.monotonic() - start < 0.3
+            t.join()
+
+    def test_input_serialized_reads_concurrent(self, live):
+        call, _ = live
+        log = []
+        with patch.object(linux_server.inp, "click", _slow(0.1, log, "click")), \
+                patch.object(linux_server.inp, "type_input", _slow(0.1, log, "type")), \
+                patch.object(linux_server.display, "screenshot", _slow(0.1, log, "shot")):
+            _parallel(lambda: call("POST", "/click", {}), lambda: call("POST", "/type", {}),
+                      lambda: call("POST", "/screenshot", {}))
+        spans = {name: [t for kind, n, t in log if n == name] for name in ("click", "type", "shot")}
+        (c0, c1), (t0, t1), (s0, s1) = spans["click"], spans["type"], spans["shot"]
+        assert c1 <= t0 or t1 <= c0, "input requests overlapped"
+        assert s0 < max(c1, t1) and s1 > min(c0, t0), "screenshot waited for input"
+
+    def test_release_all_bypasses_input_lock(self, live):
+        call, _ = live
+        with patch.object(linux_server.inp, "type_input", _slow(0.5)), \
+                patch.object(linux_server.held, "release_all", _slow(0)):
+            t = threading.Thread(target=call, args=("POST", "/type", {}))
+            t.start()
+            time.sleep(0.05)
+            start = time.monotonic()
+            assert call("POST", "/release_all", {})[1] == 200
+            assert time.monotonic() - start < 0.3
+            t.join()
+
+    def test_timeout_returns_504_and_queued_input_never_runs(self, live, monkeypatch):
+        call, _ = live
+        monkeypatch.setattr(linux_server, "REQUEST_TIMEOUT", 0.2)
+        clicked = []
+        with patch.object(linux_server.inp, "type_input", _slow(0.6)), \
+                patch.object(linux_server.inp, "click", lambda p: (clicked.append(p), ({}, 200))[1]):
+            results = []
+            _parallel(lambda: results.append(call("POST", "/type", {})),
+                      lambda: (time.sleep(0.05), results.append(call("POST", "/click", {}))))
+            time.sleep(0.6)
+        assert sorted(code for _, code in results) == [503, 504]
+        assert clicked == []
+
+    def test_queued_sequence_holds_input_lock_until_done(self, live):
+        call, _ = live
+        clicked = []
+        with patch.object(linux_server.held, "_key"), \
+                patch.object(linux_server.inp, "click",
+                             lambda p: (clicked.append(time.monotonic()), ({}, 200))[1]):
+            start = time.monotonic()
+            body, code = call("POST", "/input_sequence", {"actions": [
+                {"action": "key_down", "key": "a"}, {"action": "key_up", "key": "a", "delay": 200}]})
+            assert code == 200 and body["queued"] == 2
+            time.sleep(0.05)
+            assert call("POST", "/click", {})[1] == 200
+        assert clicked[0] - start >= 0.2, "click landed inside the sequence"
+
+    def test_keep_alive_reuses_connection(self, live):
+        call, port = live
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        assert call("GET", "/health", conn=conn)[1] == 200
+        sock = conn.sock
+        assert call("POST", "/nope", {}, conn=conn)[1] == 404
+        assert call("GET", "/health", conn=conn)[1] == 200
+        assert conn.sock is sock
+        conn.close()
+
+    def test_batch_steps_go_through_route_locks(self, live):
+        call, _ = live
+        log = []
+        with patch.object(linux_server.inp, "click", _slow(0.1, log, "click")), \
+                patch.object(linux_server.inp, "type_input", _slow(0.1, log, "type")):
+            results = []
+            _parallel(lambda: results.append(call("POST", "/batch", {"actions": [
+                          {"action": "click"}, {"action": "click"}]})),
+                      lambda: (time.sleep(0.05), results.append(call("POST", "/type", {}))))
+        starts = [t for kind, _, t in log if kind == "start"]
+        ends = [t for kind, _, t in log if kind == "end"]
+        assert all(s >= e - 1e-3 for s, e in zip(starts[1:], ends)), "input steps overlapped"
+        assert sorted(code for _, code in results) == [200, 200]
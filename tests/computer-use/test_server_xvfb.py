@@ -0,0 +1,91 @@
+"""Concurrency test for linux-server.py against a real private Xvfb display.
+
+Requires Xvfb and xdotool (skipped otherwise). Runs the real server with
+its default backends (XTest/XShm when available) on DISPLAY :95.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+SERVER = Path(__file__).resolve().parent.parent.parent / "computer-use" / "linux-server.py"
+DISPLAY = ":95"
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or not shutil.which("Xvfb") or not shutil.which("xdotool"),
+    reason="Requires Linux with Xvfb and xdotool",
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def server():
+    xvfb = subprocess.Popen(["Xvfb", DISPLAY, "-screen", "0", "1280x800x24"],
+                            stderr=subprocess.DEVNULL)
+    port = _free_port()
+    env = {k: v for k, v in os.environ.items() if not k.startswith("RELAYGENT_")}
+    env.update(DISPLAY=DISPLAY, HAMMERSPOON_PORT=str(port))
+    proc = subprocess.Popen([sys.executable, str(SERVER)], env=env, cwd=SERVER.parent,
+                            stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(50):
+            try:
+                http.client.HTTPConnection("127.0.0.1", port, timeout=1).request("GET", "/health")
+                break
+            except OSError:
+                time.sleep(0.1)
+        yield port
+    finally:
+        proc.terminate()
+        proc.wait()
+        xvfb.terminate()
+        xvfb.wait()
+
+
+def _call(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request(method, path, json.dumps(body) if body is not None else None)
+    resp = conn.getresponse()
+    return json.loads(resp.read()), resp.status
+
+
+def test_reads_and_release_stay_responsive_during_long_type(server):
+    typing = threading.Thread(target=_call, args=(server, "POST", "/type", {"text": "x" * 150}))
+    typing.start()
+    time.sleep(0.2)
+    for method, path, body in (("GET", "/health", None),
+                               ("POST", "/screenshot", {"inline": True, "max_width": 320}),
+                               ("POST", "/release_all", {})):
+        start = time.monotonic()
+        result, code = _call(server, method, path, body)
+        assert code == 200, result
+        assert time.monotonic() - start < 1.0, f"{path} blocked behind /type"
+    assert typing.is_alive(), "typing finished too early to prove concurrency"
+    typing.join()
+
+
+def test_concurrent_clicks_all_succeed(server):
+    codes = []
+    threads = [threading.Thread(target=lambda i=i: codes.append(
+        _call(server, "POST", "/click", {"x": 10 + i, "y": 10})[1])) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert codes == [200] * 8
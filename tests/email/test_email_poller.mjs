@@ -7,11 +7,11 @@
  */
 import { test, beforeEach, afterEach } from "node:test";
 import assert from "node:assert/strict";
-import { mkdtempSync, rmSync, readFileSync, existsSync, writeFileSync, mkdirSync } from "fs";
+import { mkdtempSync, rmSync, readFileSync, existsSync, writeFileSync, mkdirSync, renameSync } from "fs";
 import { join } from "path";
 import { tmpdir } from "os";
 
-import { getLastTs, saveTs, cacheFile, writeEmailCache, poll } from "../../email/email-poller.mjs";
+import { getLastTs, saveTs, cacheFile, writeEmailCache, readEmailCache, poll, COMPACT_BYTES, KEEP_RECORDS } from "../../email/email-poller.mjs";
 
 let tmpHome, tmpCache;
 beforeEach(() => {
@@ -64,28 +64,66 @@ test("cacheFile respects RELAYGENT_EMAIL_CACHE env var", () => {
 });
 
 // --- writeEmailCache ---
-test("writeEmailCache creates cache file with emails", () => {
+function cacheLines() { return readFileSync(cacheFile(), "utf-8").split("\n").filter(Boolean).map(l => JSON.parse(l)); }
+
+test("writeEmailCache appends one JSON record per line", () => {
 	const emails = [{ from: "a@b.com", subject: "Hi", received_at: 100 }];
 	writeEmailCache(emails);
-	const data = JSON.parse(readFileSync(cacheFile(), "utf-8"));
-	assert.equal(data.emails.length, 1);
-	assert.equal(data.emails[0].from, "a@b.com");
+	const lines = cacheLines();
+	assert.equal(lines.length, 1);
+	assert.equal(lines[0].from, "a@b.com");
 });
 
-test("writeEmailCache merges with existing entries", () => {
+test("writeEmailCache appends after existing records", () => {
 	writeEmailCache([{ from: "a@b.com", subject: "First", received_at: 100 }]);
+	const size = readFileSync(cacheFile()).length;
 	writeEmailCache([{ from: "c@d.com", subject: "Second", received_at: 200 }]);
-	const data = JSON.parse(readFileSync(cacheFile(), "utf-8"));
-	assert.equal(data.emails.length, 2);
-	assert.equal(data.emails[0].from, "c@d.com"); // newest first
+	assert.ok(readFileSync(cacheFile(), "utf-8").slice(size).includes("Second"));
+	assert.deepEqual(cacheLines().map(e => e.subject), ["First", "Second"]); // oldest first
+});
+
+test("writeEmailCache compacts to newest records past the size limit", () => {
+	const big = "x".repeat(Math.ceil(COMPACT_BYTES / 64));
+	for (let i = 0; i < 100; i++) writeEmailCache([{ from: "x", subject: big, received_at: i }]);
+	const lines = cacheLines();
+	assert.ok(lines.length >= KEEP_RECORDS && lines.length < 100);
+	assert.equal(lines.at(-1).received_at, 99);
+});
+
+test("writeEmailCache migrates a legacy JSON cache", () => {
+	writeFileSync(cacheFile(), JSON.stringify({ last_updated: 1, emails: [
+		{ from: "new", subject: "B", received_at: 2 }, { from: "old", subject: "A", received_at: 1 }] }));
+	writeEmailCache([{ from: "c", subject: "C", received_at: 3 }]);
+	assert.deepEqual(cacheLines().map(e => e.subject), ["A", "B", "C"]);
+});
+
+test("writeEmailCache compacts from memory without re-reading the file", () => {
+	writeEmailCache([{ from: "a", subject: "A", received_at: 1 }]);
+	const size = readFileSync(cacheFile()).length;
+	writeFileSync(cacheFile(), "#".repeat(size)); // Same inode and size: not re-read
+	const big = "x".repeat(COMPACT_BYTES);
+	writeEmailCache([{ from: "b", subject: big, received_at: 2 }]);
+	assert.deepEqual(cacheLines().map(e => e.from), ["a", "b"]);
+});
+
+test("writeEmailCache reloads a file replaced by someone else", () => {
+	writeEmailCache([{ from: "a", subject: "A", received_at: 1 }]);
+	writeFileSync(`${cacheFile()}.new`, '{"from":"z","subject":"Z","received_at":0}\n');
+	renameSync(`${cacheFile()}.new`, cacheFile());
+	writeEmailCache([{ from: "b", subject: "B", received_at: 2 }]);
+	const big = "x".repeat(COMPACT_BYTES);
+	writeEmailCache([{ from: "c", subject: big, received_at: 3 }]);
+	assert.deepEqual(cacheLines().map(e => e.from), ["z", "b", "c"]);
+});
+
+test("readEmailCache reads legacy JSON oldest first", () => {
+	writeFileSync(cacheFile(), JSON.stringify({ emails: [{ subject: "B" }, { subject: "A" }] }));
+	assert.deepEqual(readEmailCache().map(e => e.subject), ["A", "B"]);
 });
 
-test("writeEmailCache caps at 50 entries", () => {
-	const initial = Array.from({ length: 48 }, (_, i) => ({ from: "x", subject: `e${i}`, received_at: i }));
-	writeEmailCache(initial);
-	writeEmailCache([{ from: "a", subject: "new1", received_at: 100 }, { from: "b", subject: "new2", received_at: 101 }, { from: "c", subject: "new3", received_at: 102 }]);
-	const data = JSON.parse(readFileSync(cacheFile(), "utf-8"));
-	assert.equal(data.emails.length, 50);
+test("readEmailCache skips malformed lines", () => {
+	writeFileSync(cacheFile(), '{"subject":"A"}\nnot json\n{"subject":"B"}\n');
+	assert.deepEqual(readEmailCache().map(e => e.subject), ["A", "B"]);
 });
 
 // --- poll ---
@@ -109,10 +147,10 @@ test("poll writes cache with from and subject", async () => {
 		},
 	});
 	await poll(gmail);
-	const data = JSON.parse(readFileSync(cacheFile(), "utf-8"));
-	assert.equal(data.emails.length, 2);
-	assert.ok(data.emails.some(e => e.from.includes("Alice") && e.subject === "Hi"));
-	assert.ok(data.emails.some(e => e.from.includes("Bob") && e.subject === "Yo"));
+	const emails = readEmailCache();
+	assert.equal(emails.length, 2);
+	assert.ok(emails.some(e => e.from.includes("Alice") && e.subject === "Hi"));
+	assert.ok(emails.some(e => e.from.includes("Bob") && e.subject === "Yo"));
 });
 
 test("poll saves timestamp after each run", async () => {
@@ -157,17 +195,17 @@ test("poll keeps real emails alongside automated ones", async () => {
 		},
 	});
 	await poll(gmail);
-	const data = JSON.parse(readFileSync(cacheFile(), "utf-8"));
-	assert.equal(data.emails.length, 1);
-	assert.equal(data.emails[0].subject, "Meeting tomorrow");
+	const emails = readEmailCache();
+	assert.equal(emails.length, 1);
+	assert.equal(emails[0].subject, "Meeting tomorrow");
 });
 
 test("poll handles missing headers gracefully", async () => {
 	const gmail = fakeGmail({ messages: [{ id: "m1" }], headers: { m1: [] } });
 	await poll(gmail);
-	const data = JSON.parse(readFileSync(cacheFile(), "utf-8"));
-	assert.equal(data.emails[0].subject, "(no subject)");
-	assert.equal(data.emails[0].from, "?");
+	const [email] = readEmailCache();
+	assert.equal(email.subject, "(no subject)");
+	assert.equal(email.from, "?");
 });
 
 test("poll with null gmailOverride falls back to real client (no-creds path)", async () => {
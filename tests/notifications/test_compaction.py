@@ -0,0 +1,150 @@
+"""Tests for compaction.py — daily rollups and gzip archives of old history."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+
+os.environ.setdefault("RELAYGENT_DATA_DIR", "/tmp/relaygent-test-compaction")
+
+import pytest
+import notif_config as config
+import db as notif_db
+import compaction
+import history
+import routes  # noqa: F401 — registers /notifications/daily
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DB_PATH", str(tmp_path / "test.db"))
+    notif_db.init_db()
+    return tmp_path
+
+
+def _log(ts, source="general", notif_type="slack", content=None, key=None):
+    with notif_db.get_db() as conn:
+        conn.execute(
+            "INSERT INTO notification_log (timestamp, type, source, summary, content, dedup_key) "
+            "VALUES (?, ?, ?, 'msg', ?, ?)",
+            (ts, notif_type, source, json.dumps(content or {}), key or f"{source}-{ts}"))
+        conn.commit()
+
+
+def _count():
+    with notif_db.get_db() as conn:
+        return conn.execute("SELECT COUNT(*) FROM notification_log").fetchone()[0]
+
+
+class TestCompactHistory:
+    def test_old_rows_rolled_up_archived_and_deleted(self, _isolated):
+        _log("2020-01-05 10:00:00", content={"user_name": "alice"})
+        _log("2020-01-05 11:00:00", content={"user_name": "alice"})
+        _log("2020-01-05 12:00:00", content={"user_name": "bob"})
+        _log("2020-01-05 13:00:00", source="email", notif_type="email", content={"from": "x@y"})
+        assert compaction.compact_history(max_age_days=7) == 4
+        assert _count() == 0
+        with notif_db.get_db() as conn:
+            rows = {(r["source"], r["type"]): r for r in conn.execute(
+                "SELECT * FROM notification_daily WHERE day = '2020-01-05'")}
+        assert rows[("general", "slack")]["count"] == 3
+        assert json.loads(rows[("general", "slack")]["top_senders"]) == [["alice", 2], ["bob", 1]]
+        assert rows[("email", "email")]["count"] == 1
+        archived = list(compaction.read_archive("2020-01-05"))
+        assert len(archived) == 4
+        assert os.path.exists(_isolated / "notification-archive" / "2020" / "01" / "2020-01-05.jsonl.gz")
+
+    def test_recent_rows_untouched(self):
+        _log("2020-01-05 10:00:00")
+        with notif_db.get_db() as conn:
+            conn.execute("INSERT INTO notification_log (type, source, summary, content, dedup_key) "
+                         "VALUES ('slack', 'general', 'now', '{}', 'now')")
+            conn.commit()
+        compaction.compact_history(max_age_days=7)
+        assert _count() == 1
+
+    def test_second_pass_merges_into_existing_rollup(self):
+        _log("2020-01-05 10:00:00", content={"user": "U1"}, key="a")
+        compaction.compact_history()
+        _log("2020-01-05 18:00:00", content={"user": "U1"}, key="b")
+        compaction.compact_history()
+        rollup = [r for r in compaction.daily_rollups(days=100000) if r["day"] == "2020-01-05"]
+        assert rollup[0]["count"] == 2
+        assert rollup[0]["top_senders"] == [["U1", 2]]
+        assert len(list(compaction.read_archive("2020-01-05"))) == 2
+
+    def test_day_compacts_in_bounded_chunks(self, monkeypatch):
+        for hour in range(5):
+            _log(f"2020-01-05 1{hour}:00:00", content={"user_name": "alice"})
+        monkeypatch.setattr(compaction, "CHUNK_ROWS", 2)
+        real, sizes = compaction.transaction, []
+
+        def counting(op):
+            with notif_db.get_db() as conn:
+                sizes.append(conn.execute("SELECT COUNT(*) FROM notification_log").fetchone()[0])
+            return real(op)
+        monkeypatch.setattr(compaction, "transaction", counting)
+        assert compaction.compact_day("2020-01-05") == 5
+        assert sizes == [5, 3, 1]
+        assert _count() == 0
+        rollup = [r for r in compaction.daily_rollups(days=100000) if r["day"] == "2020-01-05"]
+        assert rollup[0]["count"] == 5
+        assert rollup[0]["top_senders"] == [["alice", 5]]
+        assert len(list(compaction.read_archive("2020-01-05"))) == 5
+
+    def test_compacted_rows_leave_fts_index(self):
+        _log("2020-01-05 10:00:00")
+        compaction.compact_history()
+        assert history.search_history("msg") == []
+
+
+class TestDailyRoute:
+    def test_returns_rollups(self):
+        with notif_db.get_db() as conn:
+            conn.execute("INSERT INTO notification_daily VALUES (date('now', '-3 days'), "
+                         "'general', 'slack', 12, '[[\"alice\", 7]]')")
+            conn.commit()
+        config.app.config["TESTING"] = True
+        with config.app.test_client() as c:
+            days = c.get("/notifications/daily?days=7").get_json()["days"]
+        assert days[0]["count"] == 12
+        assert days[0]["top_senders"] == [["alice", 7]]
+
+
+class TestBackgroundCompaction:
+    def test_runs_on_its_own_thread_and_repeats(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(compaction, "compact_history", lambda: calls.append(
+            threading.current_thread().name))
+        compaction.start(interval=0.01)
+        try:
+            deadline = time.time() + 2
+            while len(calls) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            compaction.stop()
+        assert calls[:2] == ["history-compaction"] * 2
+        assert not compaction._thread.is_alive()
+
+    def test_failure_does_not_kill_thread(self, monkeypatch):
+        calls = []
+
+        def boom():
+            calls.append(1)
+            raise RuntimeError("disk full")
+        monkeypatch.setattr(compaction, "compact_history", boom)
+        compaction.start(interval=0.01)
+        try:
+            deadline = time.time() + 2
+            while len(calls) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            assert compaction._thread.is_alive()
+        finally:
+            compaction.stop()
+        assert len(calls) >= 2
+
+    def test_logging_never_compacts_inline(self, monkeypatch):
+        import notif_logger
+        monkeypatch.setattr(compaction, "compact_history", lambda: pytest.fail("inline compaction"))
+        notif_logger.log_notifications([{"type": "reminder", "id": 1, "message": "r"}])
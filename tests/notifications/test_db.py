@@ -1,9 +1,11 @@
 """Tests for db.py — SQLite database helpers and schema init."""
 from __future__ import annotations
 
+import contextlib
 import os
 import sqlite3
 import sys
+import threading
 from pathlib import Path
 
 os.environ.setdefault("RELAYGENT_DATA_DIR", "/tmp/relaygent-test-db")
@@ -34,12 +36,57 @@ class TestGetDb:
             conn.execute("SELECT 1")
         assert deep.exists()
 
-    def test_connection_closed_after_context(self, _isolated):
+    def test_connection_reused_within_thread(self, _isolated):
+        with notif_db.get_db() as a:
+            pass
+        with notif_db.get_db() as b:
+            assert b is a
+
+    def test_connection_shared_across_threads(self, _isolated):
+        with notif_db.get_db() as main_conn:
+            pass
+        seen = []
+
+        def worker():
+            with notif_db.get_db() as conn:
+                seen.append(conn)
+        t = threading.Thread(target=worker)
+        t.start(); t.join()
+        assert seen == [main_conn]
+
+    def test_concurrent_checkouts_get_distinct_connections(self, _isolated):
+        with notif_db.get_db() as a, notif_db.get_db() as b:
+            assert a is not b
+
+    def test_pool_is_bounded(self, _isolated, monkeypatch):
+        monkeypatch.setattr(notif_db, "POOL_SIZE", 2)
+        with contextlib.ExitStack() as stack:
+            conns = [stack.enter_context(notif_db.get_db()) for _ in range(4)]
+        assert notif_db._pool(config.DB_PATH).qsize() == 2
+        closed = 0
+        for conn in conns:
+            try:
+                conn.execute("SELECT 1")
+            except sqlite3.ProgrammingError:
+                closed += 1
+        assert closed == 2
+
+    def test_close_db_closes_connection(self, _isolated):
         with notif_db.get_db() as conn:
             conn.execute("SELECT 1")
+        notif_db.close_db()
         with pytest.raises(Exception):
             conn.execute("SELECT 1")
 
+    def test_open_transaction_rolled_back_on_exit(self, _isolated):
+        notif_db.init_db()
+        with pytest.raises(RuntimeError):
+            with notif_db.get_db() as conn:
+                conn.execute("INSERT INTO reminders (trigger_time, message) VALUES ('t', 'm')")
+                raise RuntimeError
+        with notif_db.get_db() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0] == 0
+
     def test_row_factory_is_row(self, _isolated):
         with notif_db.get_db() as conn:
             assert conn.row_factory is sqlite3.Row
@@ -49,6 +96,29 @@ class TestGetDb:
             mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
             assert mode == "wal"
 
+    def test_tuned_pragmas(self, _isolated):
+        with notif_db.get_db() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -8192
+
+
+class TestTransaction:
+    def test_commits_on_success(self, _isolated):
+        notif_db.init_db()
+        with notif_db.transaction() as conn:
+            conn.execute("INSERT INTO reminders (trigger_time, message) VALUES ('t', 'm')")
+        with notif_db.get_db() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0] == 1
+
+    def test_rolls_back_on_error(self, _isolated):
+        notif_db.init_db()
+        with pytest.raises(ValueError):
+            with notif_db.transaction() as conn:
+                conn.execute("INSERT INTO reminders (trigger_time, message) VALUES ('t', 'm')")
+                raise ValueError
+        with notif_db.get_db() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0] == 0
+
 
 class TestInitDb:
     def test_creates_reminders_table(self, _isolated):
@@ -157,3 +157,80 @@ class TestAckEmailEndpoint:
         assert resp.status_code == 200
         assert resp.get_json()["status"] == "ok"
         assert ec._get_ack_ts() >= before
+
+
+def _append(cache, *records, partial=""):
+    with open(cache, "a") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+        f.write(partial)
+
+
+class TestJsonlCache:
+    def test_collects_appended_records_newest_first(self, _isolated):
+        cache, _ = _isolated
+        _append(cache, {"from": "a@t.com", "subject": "A", "received_at": 100},
+                {"from": "b@t.com", "subject": "B", "received_at": 200})
+        notifications = []
+        ec.collect(notifications)
+        assert notifications[0]["count"] == 2
+        assert notifications[0]["previews"][0]["from"] == "b@t.com"
+
+    def test_reads_only_new_records(self, _isolated, monkeypatch):
+        cache, _ = _isolated
+        _append(cache, {"from": "a@t.com", "subject": "A", "received_at": 100})
+        ec.collect([])
+        offset = ec._load_offset()["offset"]
+        assert offset == cache.stat().st_size
+        _append(cache, {"from": "b@t.com", "subject": "B", "received_at": 200})
+        parsed = []
+        real_loads = json.loads
+        monkeypatch.setattr(ec.json, "loads", lambda s, **kw: parsed.append(s) or real_loads(s, **kw))
+        notifications = []
+        ec.collect(notifications)
+        assert notifications[0]["count"] == 1
+        records = [p for p in parsed if isinstance(p, bytes)]
+        assert records == [b'{"from": "b@t.com", "subject": "B", "received_at": 200}']
+
+    def test_unchanged_file_not_reopened(self, _isolated, monkeypatch):
+        cache, _ = _isolated
+        _append(cache, {"from": "a@t.com", "subject": "A", "received_at": 100})
+        ec.collect([])
+        opened = []
+        real_open = open
+        monkeypatch.setattr("builtins.open", lambda p, *a: opened.append(p) or real_open(p, *a))
+        assert ec._read_new() == []
+        assert str(cache) not in opened
+
+    def test_partial_line_waits_for_next_poll(self, _isolated):
+        cache, _ = _isolated
+        _append(cache, {"from": "a@t.com", "subject": "A", "received_at": 100},
+                partial='{"from": "b@t.com", "subj')
+        first = []
+        ec.collect(first)
+        assert first[0]["count"] == 1
+        _append(cache, partial='ect": "B", "received_at": 200}\n')
+        second = []
+        ec.collect(second)
+        assert second[0]["previews"][0]["subject"] == "B"
+
+    def test_compaction_resets_offset_without_repeats(self, _isolated, tmp_path):
+        cache, _ = _isolated
+        _append(cache, *[{"from": f"u{i}", "subject": "S", "received_at": i + 1}
+                         for i in range(5)])
+        ec.collect([])
+        compacted = tmp_path / "compacted.jsonl"
+        _append(compacted, {"from": "u4", "subject": "S", "received_at": 5},
+                {"from": "new", "subject": "N", "received_at": 9})
+        os.replace(compacted, cache)  # New inode, shorter file
+        notifications = []
+        ec.collect(notifications)
+        assert notifications[0]["count"] == 1
+        assert notifications[0]["previews"][0]["from"] == "new"
+
+    def test_legacy_cache_not_offset_tracked(self, _isolated):
+        cache, _ = _isolated
+        cache.write_text(json.dumps({"emails": [
+            {"from": "a@b.com", "subject": "X", "received_at": 100}]}))
+        ec.collect([])
+        assert ec._load_offset() == {}
@@ -1,10 +1,12 @@
 """Tests for github_collector.py — GitHub notification collector."""
 from __future__ import annotations
 
+import hashlib
 import json
 import os
-import subprocess
-from unittest.mock import patch, MagicMock
+import time
+import urllib.parse
+from unittest.mock import MagicMock, patch
 
 os.environ.setdefault("RELAYGENT_DATA_DIR", "/tmp/relaygent-test-gh-col")
 
@@ -12,6 +14,7 @@ import pytest
 
 import notif_config as config
 import db as notif_db
+import github_auth
 import github_collector as gc
 
 
@@ -21,9 +24,38 @@ def _isolated(tmp_path, monkeypatch):
     notif_db.init_db()
     last_check = tmp_path / ".last_check_ts"
     monkeypatch.setattr(gc, "_LAST_CHECK_FILE", str(last_check))
+    monkeypatch.setattr(gc, "_etag", None)
+    monkeypatch.setattr(gc, "_last_modified", None)
+    monkeypatch.setattr(gc, "_next_poll", 0.0)
+    monkeypatch.setattr(github_auth, "_token", "gho_test")
+    monkeypatch.setattr(github_auth, "_missing_until", 0.0)
     return last_check
 
 
+@pytest.fixture()
+def github(fake_http, monkeypatch):
+    """Local fake GitHub: serves .notifications, honouring conditional headers."""
+    monkeypatch.setattr(gc, "_API_BASE", fake_http.url)
+    fake_http.notifications = []
+    fake_http.extra_headers = {}
+
+    def handler(method, path, headers, body):
+        if method == "PUT":
+            return 205, {}, b""
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query)
+        since = query.get("since", [""])[0]
+        listed = [n for n in fake_http.notifications if n["updated_at"] > since]
+        # Like GitHub's, the ETag covers the whole request: path, query and body
+        etag = '"%s"' % hashlib.sha1((path + json.dumps(listed)).encode()).hexdigest()[:12]
+        if headers.get("If-None-Match") == etag:
+            return 304, {}, b""
+        return 200, {"ETag": etag, "Last-Modified": "Sat, 21 Feb 2026 04:00:00 GMT",
+                     **fake_http.extra_headers}, listed
+
+    fake_http.handler = handler
+    return fake_http
+
+
 @pytest.fixture()
 def client():
     config.app.config["TESTING"] = True
@@ -43,62 +75,82 @@ def _make_notif(reason="review_requested", ntype="PullRequest",
     }
 
 
-class TestGhAvailable:
-    @patch("github_collector.subprocess.run")
-    def test_returns_true_when_auth_ok(self, mock_run):
-        mock_run.return_value = MagicMock(returncode=0)
-        assert gc._gh_available() is True
-
-    @patch("github_collector.subprocess.run")
-    def test_returns_false_when_auth_fails(self, mock_run):
-        mock_run.return_value = MagicMock(returncode=1)
-        assert gc._gh_available() is False
-
-    @patch("github_collector.subprocess.run", side_effect=FileNotFoundError)
-    def test_returns_false_when_gh_missing(self, mock_run):
-        assert gc._gh_available() is False
-
-    @patch("github_collector.subprocess.run", side_effect=subprocess.TimeoutExpired("gh", 5))
-    def test_returns_false_on_timeout(self, mock_run):
-        assert gc._gh_available() is False
-
-
-class TestGhApi:
-    @patch("github_collector.subprocess.run")
-    def test_returns_parsed_json(self, mock_run):
-        mock_run.return_value = MagicMock(
-            returncode=0, stdout='[{"id": 1}]',
-        )
-        result = gc._gh_api("notifications")
-        assert result == [{"id": 1}]
-
-    @patch("github_collector.subprocess.run")
-    def test_passes_params(self, mock_run):
-        mock_run.return_value = MagicMock(
-            returncode=0, stdout="[]",
-        )
-        gc._gh_api("notifications", {"since": "2026-01-01"})
-        cmd = mock_run.call_args[0][0]
-        assert "-f" in cmd
-        assert "since=2026-01-01" in cmd
-
-    @patch("github_collector.subprocess.run")
-    def test_returns_none_on_failure(self, mock_run):
-        mock_run.return_value = MagicMock(
-            returncode=1, stderr="not found",
-        )
-        assert gc._gh_api("notifications") is None
-
-    @patch("github_collector.subprocess.run")
-    def test_returns_none_on_bad_json(self, mock_run):
-        mock_run.return_value = MagicMock(
-            returncode=0, stdout="not json",
-        )
-        assert gc._gh_api("notifications") is None
-
-    @patch("github_collector.subprocess.run", side_effect=subprocess.TimeoutExpired("gh", 10))
-    def test_returns_none_on_timeout(self, mock_run):
-        assert gc._gh_api("notifications") is None
+class TestToken:
+    def test_reads_hosts_file(self, tmp_path):
+        hosts = tmp_path / "hosts.yml"
+        hosts.write_text("gitlab.com:\n    oauth_token: nope\n"
+                         "github.com:\n    user: me\n    oauth_token: gho_abc\n")
+        assert github_auth.hosts_token(str(hosts)) == "gho_abc"
+
+    def test_missing_hosts_file(self, tmp_path):
+        assert github_auth.hosts_token(str(tmp_path / "missing.yml")) is None
+
+    def test_env_wins_and_is_cached(self, monkeypatch):
+        monkeypatch.setattr(github_auth, "_token", None)
+        monkeypatch.setenv("GH_TOKEN", "gho_env")
+        with patch("github_auth.subprocess.run") as mock_run:
+            assert github_auth.token() == "gho_env"
+            monkeypatch.delenv("GH_TOKEN")
+            assert github_auth.token() == "gho_env"
+        mock_run.assert_not_called()
+
+    def test_falls_back_to_gh_auth_token(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(github_auth, "_token", None)
+        monkeypatch.delenv("GH_TOKEN", raising=False)
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        monkeypatch.setenv("GH_CONFIG_DIR", str(tmp_path))
+        with patch("github_auth.subprocess.run",
+                   return_value=MagicMock(returncode=0, stdout="gho_keyring\n")):
+            assert github_auth.token() == "gho_keyring"
+
+    def test_none_when_gh_missing(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(github_auth, "_token", None)
+        monkeypatch.delenv("GH_TOKEN", raising=False)
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        monkeypatch.setenv("GH_CONFIG_DIR", str(tmp_path))
+        with patch("github_auth.subprocess.run", side_effect=FileNotFoundError):
+            assert github_auth.token() is None
+
+    def test_missing_token_cached_for_ttl(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(github_auth, "_token", None)
+        monkeypatch.delenv("GH_TOKEN", raising=False)
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        monkeypatch.setenv("GH_CONFIG_DIR", str(tmp_path))
+        with patch("github_auth.subprocess.run", side_effect=FileNotFoundError) as mock_run:
+            assert github_auth.token() is None
+            assert github_auth.token() is None
+            assert mock_run.call_count == 1
+            now = github_auth.time.monotonic()
+            with patch.object(github_auth.time, "monotonic",
+                              return_value=now + github_auth.MISSING_TTL_SECS + 1):
+                github_auth.token()
+            assert mock_run.call_count == 2
+            github_auth.reset()
+            github_auth.token()
+            assert mock_run.call_count == 3
+
+
+class TestRequest:
+    def test_sends_auth_headers(self, github):
+        gc._request("GET", "notifications", {"since": "2026-01-01T00:00:00Z"})
+        _, path, headers, _ = github.requests[0]
+        assert path == "/notifications?since=2026-01-01T00%3A00%3A00Z"
+        assert headers["Authorization"] == "Bearer gho_test"
+
+    def test_unauthorized_resets_token(self, github):
+        github.handler = lambda *a: (401, {}, {})
+        gc._request("GET", "notifications")
+        assert github_auth._token is None
+
+    def test_network_error_returns_none(self, monkeypatch):
+        monkeypatch.setattr(gc, "_API_BASE", "http://127.0.0.1:9")
+        monkeypatch.setattr(gc.http_client.time, "sleep", lambda s: None)
+        assert gc._request("GET", "notifications") is None
+
+    def test_no_token_skips_request(self, github, monkeypatch):
+        monkeypatch.setattr(github_auth, "token", lambda: None)
+        assert gc._request("GET", "notifications") is None
+        assert github.requests == []
 
 
 class TestLastCheck:
@@ -106,15 +158,13 @@ class TestLastCheck:
         assert gc._load_last_check() is None
 
     def test_save_and_load(self):
-        gc._save_last_check()
-        result = gc._load_last_check()
-        assert result is not None
-        assert "T" in result  # ISO format
+        gc._save_last_check("2026-02-21T04:00:00Z")
+        assert gc._load_last_check() == "2026-02-21T04:00:00Z"
 
     def test_save_creates_dirs(self, tmp_path, monkeypatch):
         deep = tmp_path / "deep" / "nested" / ".last_check_ts"
         monkeypatch.setattr(gc, "_LAST_CHECK_FILE", str(deep))
-        gc._save_last_check()
+        gc._save_last_check("2026-02-21T04:00:00Z")
         assert deep.exists()
 
     def test_load_returns_none_on_empty_file(self, _isolated):
@@ -159,29 +209,30 @@ class TestFormatNotification:
 
 
 class TestCollect:
-    @patch.object(gc, "_gh_available", return_value=False)
-    def test_skips_when_gh_unavailable(self, mock_avail):
+    def test_skips_without_token(self, github, monkeypatch):
+        monkeypatch.setattr(github_auth, "token", lambda: None)
         notifications = []
         gc.collect(notifications)
         assert notifications == []
+        assert github.requests == []
 
-    @patch.object(gc, "_gh_api", return_value=[])
-    @patch.object(gc, "_gh_available", return_value=True)
-    def test_no_notifications(self, mock_avail, mock_api):
+    def test_no_notifications(self, github):
         notifications = []
         gc.collect(notifications)
         assert notifications == []
 
-    @patch.object(gc, "_gh_api", return_value=None)
-    @patch.object(gc, "_gh_available", return_value=True)
-    def test_api_failure_still_saves_last_check(self, mock_avail, mock_api):
+    def test_failures_leave_since_alone(self, github, _isolated, monkeypatch):
+        _isolated.write_text("2026-02-20T00:00:00Z")
+        monkeypatch.setattr(gc.http_client.time, "sleep", lambda s: None)
+        for reply in ((500, {}, {}), (503, {}, {}), (200, {}, b"not json"), (200, {}, {"a": 1})):
+            github.handler = lambda *a, reply=reply: reply
+            gc.collect([])
+        monkeypatch.setattr(gc, "_API_BASE", "http://127.0.0.1:9")
         gc.collect([])
-        assert gc._load_last_check() is not None
+        assert _isolated.read_text() == "2026-02-20T00:00:00Z"
 
-    @patch.object(gc, "_gh_api")
-    @patch.object(gc, "_gh_available", return_value=True)
-    def test_collects_review_requested(self, mock_avail, mock_api):
-        mock_api.return_value = [
+    def test_collects_review_requested(self, github):
+        github.notifications = [
             _make_notif("review_requested", "PullRequest", "org/repo", "PR title"),
         ]
         notifications = []
@@ -191,69 +242,106 @@ class TestCollect:
         assert notifications[0]["count"] == 1
         assert "PR title" in notifications[0]["messages"][0]["content"]
 
-    @patch.object(gc, "_gh_api")
-    @patch.object(gc, "_gh_available", return_value=True)
-    def test_filters_non_wake_reasons(self, mock_avail, mock_api):
-        mock_api.return_value = [
-            _make_notif("subscribed", "PullRequest", "org/repo", "Ignored"),
-        ]
+    def test_filters_non_wake_reasons(self, github):
+        github.notifications = [_make_notif("subscribed", "PullRequest", "org/repo", "Ignored")]
         notifications = []
         gc.collect(notifications)
         assert notifications == []
 
-    @patch.object(gc, "_gh_api")
-    @patch.object(gc, "_gh_available", return_value=True)
-    def test_filters_read_notifications(self, mock_avail, mock_api):
-        mock_api.return_value = [
-            _make_notif("review_requested", unread=False),
-        ]
+    def test_filters_read_notifications(self, github):
+        github.notifications = [_make_notif("review_requested", unread=False)]
         notifications = []
         gc.collect(notifications)
         assert notifications == []
 
-    @patch.object(gc, "_gh_api")
-    @patch.object(gc, "_gh_available", return_value=True)
-    def test_caps_at_10_messages(self, mock_avail, mock_api):
-        mock_api.return_value = [_make_notif() for _ in range(15)]
+    def test_caps_at_10_messages(self, github):
+        github.notifications = [_make_notif() for _ in range(15)]
         notifications = []
         gc.collect(notifications)
         assert len(notifications[0]["messages"]) == 10
         assert notifications[0]["count"] == 15
 
-    @patch.object(gc, "_gh_api")
-    @patch.object(gc, "_gh_available", return_value=True)
-    def test_passes_since_param(self, mock_avail, mock_api, _isolated):
+    def test_passes_since_param(self, github, _isolated):
         _isolated.write_text("2026-02-20T00:00:00Z")
-        mock_api.return_value = []
         gc.collect([])
-        call_params = mock_api.call_args[0][1]
-        assert call_params.get("since") == "2026-02-20T00:00:00Z"
+        assert "since=2026-02-20T00%3A00%3A00Z" in github.requests[0][1]
+
+    def test_since_advances_to_newest_notification(self, github):
+        github.notifications = [_make_notif(updated_at="2026-02-21T04:00:00Z"),
+                                _make_notif(reason="subscribed", updated_at="2026-02-21T05:00:00Z")]
+        gc.collect([])
+        assert gc._load_last_check() == "2026-02-21T05:00:00Z"
+
+    def test_empty_poll_keeps_since(self, github, _isolated):
+        _isolated.write_text("2026-02-20T00:00:00Z")
+        gc.collect([])
+        assert _isolated.read_text() == "2026-02-20T00:00:00Z"
+
+    def test_sequential_polls_reuse_connection(self, github):
+        for _ in range(3):
+            gc.collect([])
+        assert github.connections == 1
+
+
+class TestConditionalPolling:
+    def test_unchanged_poll_gets_304(self, github):
+        github.notifications = [_make_notif()]
+        first, second, third = [], [], []
+        gc.collect(first)
+        gc.collect(second)  # New `since`: one full 200
+        gc.collect(third)
+        assert len(first) == 1 and second == third == []
+        headers = github.requests[2][2]
+        assert headers["If-None-Match"]
+        assert headers["If-Modified-Since"] == "Sat, 21 Feb 2026 04:00:00 GMT"
+
+    def test_polls_after_new_notifications_settle_on_304(self, github, _isolated):
+        _isolated.write_text("2026-02-20T00:00:00Z")
+        github.notifications = [_make_notif()]
+        polls = [[] for _ in range(4)]
+        for notifications in polls:
+            gc.collect(notifications)
+        assert [len(n) for n in polls] == [1, 0, 0, 0]  # Reported once
+        # The new `since` costs one 200; from then on the URL and ETag are stable
+        assert [r[1] for r in github.requests[1:]] == [github.requests[1][1]] * 3
+        assert "If-None-Match" not in github.requests[1][2]
+        assert github.requests[3][2]["If-None-Match"] == github.requests[2][2]["If-None-Match"]
+
+    def test_304_keeps_since_stable(self, github, _isolated):
+        _isolated.write_text("2026-02-20T00:00:00Z")
+        github.notifications = [_make_notif()]
+        gc.collect([])  # 200 advances since
+        since = _isolated.read_text()
+        gc.collect([])  # 304 leaves it
+        assert _isolated.read_text() == since
+
+    def test_honours_poll_interval(self, github):
+        github.extra_headers = {"X-Poll-Interval": "60"}
+        gc.collect([])
+        gc.collect([])
+        assert len(github.requests) == 1
 
-    @patch.object(gc, "_gh_api")
-    @patch.object(gc, "_gh_available", return_value=True)
-    def test_saves_last_check_after_collect(self, mock_avail, mock_api):
-        mock_api.return_value = [_make_notif()]
+    def test_backs_off_when_rate_limited(self, github):
+        github.handler = lambda *a: (403, {"X-RateLimit-Remaining": "0",
+                                           "X-RateLimit-Reset": str(int(time.time()) + 300)}, {})
         gc.collect([])
-        assert gc._load_last_check() is not None
+        assert gc._next_poll - time.monotonic() > 200
 
 
 class TestAckEndpoint:
-    @patch("github_collector.subprocess.run")
-    def test_ack_calls_gh_api(self, mock_run):
-        mock_run.return_value = MagicMock(returncode=0)
+    def test_ack_puts_notifications(self, github):
         gc.ack()
-        cmd = mock_run.call_args[0][0]
-        assert "notifications" in cmd
-        assert "-X" in cmd
-        assert "PUT" in cmd
+        method, path, headers, _ = github.requests[0]
+        assert (method, path) == ("PUT", "/notifications")
+        assert headers["Authorization"] == "Bearer gho_test"
 
-    @patch("github_collector.subprocess.run", side_effect=FileNotFoundError)
-    def test_ack_handles_missing_gh(self, mock_run):
+    def test_ack_handles_missing_token(self, github, monkeypatch):
+        monkeypatch.setattr(github_auth, "token", lambda: None)
         gc.ack()  # Should not raise
+        assert github.requests == []
 
-    @patch("github_collector.subprocess.run")
-    def test_ack_endpoint(self, mock_run, client):
-        mock_run.return_value = MagicMock(returncode=0)
+    def test_ack_endpoint(self, github, client):
         resp = client.post("/notifications/ack-github")
         assert resp.status_code == 200
         assert resp.get_json()["status"] == "ok"
+        assert github.requests[0][0] == "PUT"
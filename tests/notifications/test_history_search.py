@@ -0,0 +1,104 @@
+"""Tests for history.py — FTS search, filters, and keyset-paginated /notifications/history."""
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("RELAYGENT_DATA_DIR", "/tmp/relaygent-test-history")
+
+import pytest
+import notif_config as config
+import db as notif_db
+import history
+import routes  # noqa: F401 — registers /notifications/history
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DB_PATH", str(tmp_path / "test.db"))
+    notif_db.init_db()
+
+
+@pytest.fixture()
+def client():
+    config.app.config["TESTING"] = True
+    with config.app.test_client() as c:
+        yield c
+
+
+def _log(summary, source="general", notif_type="slack", content="{}", ts=None):
+    with notif_db.get_db() as conn:
+        conn.execute(
+            "INSERT INTO notification_log (timestamp, type, source, summary, content, dedup_key) "
+            "VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?)",
+            (ts, notif_type, source, summary, content, f"k-{source}-{summary}-{ts}"))
+        conn.commit()
+
+
+class TestFullText:
+    def test_matches_summary_words(self):
+        _log("deploy finished on staging")
+        _log("lunch order")
+        got = history.search_history("staging deploy")
+        assert [e["summary"] for e in got] == ["deploy finished on staging"]
+
+    def test_matches_content(self):
+        _log("new message", content='{"text": "quarterly invoice attached"}')
+        assert len(history.search_history("invoice")) == 1
+
+    def test_punctuation_does_not_break_query(self):
+        _log('he said "ship it" (finally)')
+        assert len(history.search_history('"ship it" (')) == 1
+
+    def test_deleted_rows_leave_index(self):
+        _log("ephemeral thing")
+        with notif_db.get_db() as conn:
+            conn.execute("DELETE FROM notification_log")
+            conn.commit()
+        assert history.search_history("ephemeral") == []
+
+    def test_existing_rows_backfilled(self):
+        with notif_db.get_db() as conn:
+            conn.execute("DROP TABLE notification_log_fts")
+            for t in ("ai", "ad", "au"):
+                conn.execute(f"DROP TRIGGER notification_log_{t}")
+            conn.commit()
+        _log("logged before upgrade")
+        notif_db.init_db()
+        assert len(history.search_history("upgrade")) == 1
+
+
+class TestFilters:
+    def test_source_and_type(self):
+        _log("a", source="general", notif_type="slack")
+        _log("b", source="random", notif_type="slack")
+        _log("c", source="email", notif_type="email")
+        assert [e["summary"] for e in history.search_history(source="random")] == ["b"]
+        assert [e["summary"] for e in history.search_history(notif_type="email")] == ["c"]
+
+    def test_time_range(self):
+        _log("monday", ts="2026-03-02 10:00:00")
+        _log("tuesday", ts="2026-03-03 15:30:00")
+        _log("wednesday", ts="2026-03-04 09:00:00")
+        got = history.search_history(since="2026-03-03", until="2026-03-04T00:00")
+        assert [e["summary"] for e in got] == ["tuesday"]
+
+
+class TestHistoryRoute:
+    def test_keyset_pagination_walks_all_rows(self, client):
+        for i in range(5):
+            _log(f"msg {i}")
+        seen, before = [], None
+        while True:
+            url = "/notifications/history?limit=2" + (f"&before_id={before}" if before else "")
+            data = client.get(url).get_json()
+            seen += [e["summary"] for e in data["entries"]]
+            before = data["next_before_id"]
+            if before is None:
+                break
+        assert seen == [f"msg {i}" for i in range(4, -1, -1)]
+
+    def test_query_and_source_params(self, client):
+        _log("standup notes", source="eng")
+        _log("standup notes", source="sales")
+        data = client.get("/notifications/history?q=standup&source=eng").get_json()
+        assert [e["source"] for e in data["entries"]] == ["eng"]
@@ -0,0 +1,156 @@
+"""Tests for http_client.py — pooled keep-alive client against a local stand-in server."""
+from __future__ import annotations
+
+import email.utils
+import gzip
+import threading
+import time
+
+import pytest
+import http_client
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    slept = []
+    monkeypatch.setattr(http_client.time, "sleep", slept.append)
+    return slept
+
+
+class TestKeepAlive:
+    def test_sequential_calls_share_connection(self, fake_http):
+        for _ in range(10):
+            assert http_client.get(fake_http.url + "/x").ok
+        assert fake_http.connections == 1
+
+    def test_server_close_opens_new_connection(self, fake_http):
+        fake_http.handler = lambda *a: (200, {"Connection": "close"}, {})
+        http_client.get(fake_http.url)
+        http_client.get(fake_http.url)
+        assert fake_http.connections == 2
+
+    def test_stale_pooled_connection_retried_transparently(self, fake_http):
+        http_client.get(fake_http.url)
+        for conns in http_client._idle.values():
+            for c in conns:
+                c.sock.close()  # Simulate the server dropping an idle socket
+        assert http_client.get(fake_http.url).ok
+
+
+class TestEncoding:
+    def test_gzip_response_decoded(self, fake_http):
+        fake_http.handler = lambda *a: (
+            200, {"Content-Encoding": "gzip"}, gzip.compress(b'{"hello": "world"}'))
+        assert http_client.get(fake_http.url).json() == {"hello": "world"}
+        assert fake_http.requests[0][2]["Accept-Encoding"] == "gzip"
+
+    def test_json_body_posted(self, fake_http):
+        http_client.post(fake_http.url, json_body={"a": 1})
+        method, _, headers, body = fake_http.requests[0]
+        assert method == "POST"
+        assert headers["Content-Type"] == "application/json"
+        assert body == b'{"a": 1}'
+
+
+class TestRetry:
+    def test_honours_retry_after(self, fake_http, _no_sleep):
+        responses = [(429, {"Retry-After": "3"}, {}), (200, {}, {"ok": True})]
+        fake_http.handler = lambda *a: responses.pop(0)
+        assert http_client.get(fake_http.url).json() == {"ok": True}
+        assert _no_sleep == [3.0]
+
+    def test_retry_after_capped(self, fake_http, _no_sleep):
+        responses = [(503, {"Retry-After": "120"}, {}), (200, {}, {})]
+        fake_http.handler = lambda *a: responses.pop(0)
+        http_client.get(fake_http.url, max_retry_delay=10)
+        assert _no_sleep == [10]
+
+    def test_retry_after_http_date(self, fake_http, _no_sleep):
+        when = email.utils.formatdate(time.time() + 5, usegmt=True)
+        responses = [(503, {"Retry-After": when}, {}), (200, {}, {})]
+        fake_http.handler = lambda *a: responses.pop(0)
+        http_client.get(fake_http.url)
+        assert 3 < _no_sleep[0] <= 5
+
+    def test_malformed_retry_after_falls_back_to_backoff(self, fake_http, _no_sleep):
+        responses = [(429, {"Retry-After": "soon-ish"}, {}), (200, {}, {"ok": True})]
+        fake_http.handler = lambda *a: responses.pop(0)
+        assert http_client.get(fake_http.url).json() == {"ok": True}
+        assert _no_sleep == [0.5]
+
+    def test_exponential_backoff_without_header(self, fake_http, _no_sleep):
+        fake_http.handler = lambda *a: (502, {}, {})
+        resp = http_client.get(fake_http.url, retries=2)
+        assert resp.status == 502
+        assert _no_sleep == [0.5, 1.0]
+
+    def test_network_error_raises_after_retries(self, _no_sleep):
+        with pytest.raises(http_client.ERRORS):
+            http_client.get("http://127.0.0.1:9/", retries=1)
+        assert len(_no_sleep) == 1
+
+    def test_writes_not_replayed_after_network_error(self, monkeypatch, _no_sleep):
+        sent = []
+
+        def timeout(*args):
+            sent.append(args[1])
+            raise TimeoutError("read timed out")
+        monkeypatch.setattr(http_client, "_send", timeout)
+        for method in ("POST", "PUT", "PATCH"):
+            with pytest.raises(TimeoutError):
+                http_client.request(method, "http://127.0.0.1:9/")
+        assert sent == ["POST", "PUT", "PATCH"] and _no_sleep == []
+        with pytest.raises(TimeoutError):
+            http_client.post("http://127.0.0.1:9/", retries=1, idempotent=True)
+        assert sent[3:] == ["POST", "POST"]
+
+    def test_writes_not_replayed_after_gateway_error(self, fake_http):
+        fake_http.handler = lambda *a: (504, {}, {})
+        assert http_client.post(fake_http.url, json_body={}).status == 504
+        assert len(fake_http.requests) == 1
+
+    def test_writes_retried_when_rate_limited(self, fake_http, _no_sleep):
+        responses = [(429, {"Retry-After": "1"}, {}), (200, {}, {"ok": True})]
+        fake_http.handler = lambda *a: responses.pop(0)
+        assert http_client.post(fake_http.url, json_body={}).json() == {"ok": True}
+        assert _no_sleep == [1.0]
+
+    def test_client_errors_not_retried(self, fake_http):
+        fake_http.handler = lambda *a: (404, {}, {})
+        assert http_client.get(fake_http.url).status == 404
+        assert len(fake_http.requests) == 1
+
+
+class TestLimitsAndStats:
+    def test_concurrency_capped_per_host(self, fake_http, monkeypatch):
+        monkeypatch.setattr(http_client, "MAX_PER_HOST", 2)
+        monkeypatch.setattr(http_client, "_limits", {})
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def handler(*a):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            threading.Event().wait(0.05)
+            with lock:
+                active[0] -= 1
+            return 200, {}, {}
+
+        fake_http.handler = handler
+        threads = [threading.Thread(target=http_client.get, args=(fake_http.url,))
+                   for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert peak[0] == 2
+
+    def test_stats_count_calls_and_rate_limits(self, fake_http):
+        responses = [(429, {"Retry-After": "0"}, {}), (200, {}, {})]
+        fake_http.handler = lambda *a: responses.pop(0)
+        before = http_client.stats().get("127.0.0.1", {}).get("rate_limited", 0)
+        http_client.get(fake_http.url)
+        s = http_client.stats()["127.0.0.1"]
+        assert s["rate_limited"] == before + 1
+        assert s["calls"] >= 2 and s["total_ms"] > 0
@@ -0,0 +1,218 @@
+"""Tests for hub_chat.py / ws_client.py — live hub chat subscription."""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import pytest
+
+import hub_chat
+import routes as routes_mod
+import ws_client
+
+
+def _frame(payload, opcode=0x1, fin=True):
+    n = len(payload)
+    head = bytes([(0x80 if fin else 0) | opcode])
+    if n < 126:
+        head += bytes([n])
+    else:
+        head += bytes([126]) + struct.pack(">H", n)
+    return head + payload
+
+
+def _read_client_frame(rfile):
+    b0, b1 = rfile.read(2)
+    n, mask = b1 & 0x7F, rfile.read(4)
+    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(rfile.read(n)))
+    return b0 & 0x0F, payload
+
+
+class FakeHub:
+    """One port serving GET /api/chat and the /ws upgrade, like the real hub."""
+
+    def __init__(self):
+        self.unread = []
+        self.sockets = []
+        self.gets = 0
+        self.client_frames = []
+        self.upgraded = threading.Event()
+        hub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                request_line = self.rfile.readline().decode()
+                headers = {}
+                for line in iter(self.rfile.readline, b"\r\n"):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get("upgrade") == "websocket":
+                    key = headers["sec-websocket-key"] + ws_client._WS_GUID
+                    accept = base64.b64encode(hashlib.sha1(key.encode()).digest()).decode()
+                    self.wfile.write((
+                        "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                        f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+                    hub.sockets.append(self.request)
+                    hub.upgraded.set()
+                    try:
+                        while True:
+                            hub.client_frames.append(_read_client_frame(self.rfile))
+                    except (OSError, ValueError):
+                        return
+                assert request_line.startswith("GET /api/chat?mode=unread")
+                hub.gets += 1
+                body = json.dumps({"count": len(hub.unread), "messages": hub.unread}).encode()
+                self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                                 b"Connection: close\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def push(self, event):
+        self.sockets[-1].sendall(_frame(json.dumps(event).encode()))
+
+    def drop(self):
+        self.upgraded.clear()
+        self.sockets[-1].shutdown(socket.SHUT_RDWR)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _wait(cond, timeout=3):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture()
+def hub(monkeypatch):
+    monkeypatch.setattr(hub_chat, "RECONNECT_MIN_SECS", 0.05)
+    server = FakeHub()
+    yield server
+    hub_chat.stop()
+    server.close()
+
+
+HUMAN = {"id": 1, "role": "human", "content": "hi", "created_at": "2026-01-01", "read": 0}
+
+
+class TestApplyEvent:
+    @pytest.fixture(autouse=True)
+    def _subscribed(self, monkeypatch):
+        monkeypatch.setattr(hub_chat, "_unread", [])
+
+    def test_unread_snapshot_replaces_state(self):
+        hub_chat.apply_event({"type": "message", "data": HUMAN})
+        hub_chat.apply_event({"type": "unread", "count": 0, "messages": []})
+        assert hub_chat.unread() == []
+
+    def test_human_message_appended_once(self):
+        hub_chat.apply_event({"type": "message", "data": HUMAN})
+        hub_chat.apply_event({"type": "message", "data": HUMAN})
+        assert hub_chat.unread() == [HUMAN]
+
+    def test_assistant_and_other_events_ignored(self):
+        hub_chat.apply_event({"type": "message", "data": {**HUMAN, "role": "assistant"}})
+        hub_chat.apply_event({"type": "activity", "data": {}})
+        assert hub_chat.unread() == []
+
+    def test_ignored_while_unsubscribed(self, monkeypatch):
+        monkeypatch.setattr(hub_chat, "_unread", None)
+        hub_chat.apply_event({"type": "message", "data": HUMAN})
+        assert hub_chat.unread() is None
+
+
+class TestSubscription:
+    def test_reconciles_on_connect(self, hub):
+        hub.unread = [HUMAN]
+        hub_chat.start(hub.url)
+        assert _wait(lambda: hub_chat.unread() == [HUMAN])
+        assert hub.gets == 1
+
+    def test_pushed_events_update_without_http(self, hub):
+        hub_chat.start(hub.url)
+        assert _wait(lambda: hub_chat.unread() == [])
+        hub.push({"type": "message", "data": HUMAN})
+        assert _wait(lambda: hub_chat.unread() == [HUMAN])
+        hub.push({"type": "unread", "count": 0, "messages": []})
+        assert _wait(lambda: hub_chat.unread() == [])
+        assert hub.gets == 1
+
+    def test_reconnects_and_reconciles_after_drop(self, hub):
+        hub_chat.start(hub.url)
+        assert _wait(lambda: hub_chat.unread() == [])
+        hub.unread = [HUMAN]  # Missed while disconnected
+        hub.drop()
+        assert _wait(lambda: len(hub.sockets) == 2 and hub_chat.unread() == [HUMAN])
+        assert hub.gets == 2
+
+    def test_unreachable_hub_reports_unsubscribed(self, hub):
+        url = hub.url
+        hub.close()
+        hub_chat.start(url)
+        time.sleep(0.1)
+        assert hub_chat.unread() is None
+
+
+class TestWebSocket:
+    def test_fragments_and_ping(self, hub):
+        ws = ws_client.WebSocket(f"{hub.url}/ws")
+        assert hub.upgraded.wait(2)
+        sock = hub.sockets[-1]
+        sock.sendall(_frame(b"he", fin=False) + _frame(b"", opcode=0x9)
+                     + _frame(b"llo", opcode=0x0))
+        assert ws.recv(1) == "hello"
+        assert _wait(lambda: (0xA, b"") in hub.client_frames)
+        ws.close()
+
+    def test_idle_pings_then_raises(self, hub):
+        ws = ws_client.WebSocket(f"{hub.url}/ws")
+        with pytest.raises(ConnectionError):
+            ws.recv(0.05)
+        assert _wait(lambda: (0x9, b"") in hub.client_frames)
+        ws.close()
+
+    def test_close_frame_raises(self, hub):
+        ws = ws_client.WebSocket(f"{hub.url}/ws")
+        assert hub.upgraded.wait(2)
+        hub.sockets[-1].sendall(_frame(b"", opcode=0x8))
+        with pytest.raises(ConnectionError):
+            ws.recv(1)
+        ws.close()
+
+
+class TestRoutesChat:
+    def test_uses_subscription_state(self, monkeypatch):
+        monkeypatch.setattr(hub_chat, "_unread", [HUMAN])
+        monkeypatch.setattr(hub_chat, "fetch_unread", lambda *a: pytest.fail("polled hub"))
+        notifications = []
+        routes_mod._collect_chat_messages(notifications)
+        assert notifications[0]["count"] == 1
+        assert notifications[0]["messages"] == [{"timestamp": "2026-01-01", "content": "hi"}]
+
+    def test_empty_subscription_adds_nothing(self, monkeypatch):
+        monkeypatch.setattr(hub_chat, "_unread", [])
+        notifications = []
+        routes_mod._collect_chat_messages(notifications)
+        assert notifications == []
+
+    def test_falls_back_to_http_when_unsubscribed(self, hub, monkeypatch):
+        monkeypatch.setattr(hub_chat, "_unread", None)
+        monkeypatch.setattr(routes_mod, "HUB_PORT", hub.url.rsplit(":", 1)[1])
+        hub.unread = [HUMAN]
+        notifications = []
+        routes_mod._collect_chat_messages(notifications)
+        assert notifications[0]["count"] == 1 and hub.gets == 1
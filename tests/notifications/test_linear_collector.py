@@ -168,28 +168,120 @@ class TestCollect:
         assert call_vars.get("createdAfter") == "2026-02-20T00:00:00Z"
 
     @patch.object(lc, "_graphql")
-    def test_api_failure_still_saves_last_check(self, mock_gql):
+    def test_api_failure_keeps_last_check(self, mock_gql):
         mock_gql.return_value = None
         lc.collect([])
-        assert lc._load_last_check() is not None
+        assert lc._load_last_check() is None
+
+
+@pytest.fixture()
+def linear(fake_http, monkeypatch):
+    """Local fake Linear GraphQL API serving .pages (lists of nodes) by cursor."""
+    monkeypatch.setattr(lc, "_API_URL", fake_http.url + "/graphql")
+    fake_http.pages = [[]]
+    fake_http.mutations = []
+
+    def handler(method, path, headers, body):
+        req = json.loads(body)
+        if req["query"].lstrip().startswith("mutation"):
+            fake_http.mutations.append(req["variables"])
+            ids = [k for k in req["variables"] if k.startswith("id")]
+            return 200, {}, {"data": {f"m{i}": {"success": True} for i in range(len(ids))}}
+        page = int(req["variables"].get("after") or 0)
+        more = page + 1 < len(fake_http.pages)
+        return 200, {}, {"data": {"notifications": {
+            "nodes": fake_http.pages[page],
+            "pageInfo": {"hasNextPage": more, "endCursor": str(page + 1) if more else None}}}}
+
+    fake_http.handler = handler
+    return fake_http
+
+
+def _page(start, n):
+    return [_make_notif(notif_id=f"n-{i}") for i in range(start, start + n)]
+
+
+class TestPaging:
+    def test_follows_end_cursor(self, linear):
+        linear.pages = [_page(0, 3), _page(3, 2)]
+        notifications = []
+        lc.collect(notifications)
+        assert notifications[0]["count"] == 5
+        assert len(linear.requests) == 2
+
+    def test_resumes_from_saved_cursor(self, linear, monkeypatch, _isolated):
+        monkeypatch.setattr(lc, "MAX_PAGES", 2)
+        _, last_check = _isolated
+        last_check.write_text("2026-02-20T00:00:00Z")
+        linear.pages = [_page(0, 1), _page(1, 1), _page(2, 1)]
+        first, second = [], []
+        lc.collect(first)
+        assert first[0]["count"] == 2
+        assert last_check.read_text() == "2026-02-20T00:00:00Z"  # Held back
+        lc.collect(second)
+        assert second[0]["count"] == 1
+        last_req = json.loads(linear.requests[-1][3])["variables"]
+        assert last_req == {"createdAfter": "2026-02-20T00:00:00Z", "after": "2"}
+        assert last_check.read_text() != "2026-02-20T00:00:00Z"
+        assert lc._read(lc._cursor_file()) is None
+
+    def test_failed_first_page_of_resumed_poll_keeps_backlog(self, linear, monkeypatch, _isolated):
+        monkeypatch.setattr(lc, "MAX_PAGES", 1)
+        _, last_check = _isolated
+        last_check.write_text("2026-02-20T00:00:00Z")
+        linear.pages = [_page(0, 1), _page(1, 1)]
+        lc.collect([])
+        assert lc._read(lc._cursor_file()) == "1"
+        serve = linear.handler
+        linear.handler = lambda *a: (500, {}, {"errors": [{"message": "boom"}]})
+        failed = []
+        lc.collect(failed)
+        assert failed == [] and lc._read(lc._cursor_file()) == "1"
+        assert last_check.read_text() == "2026-02-20T00:00:00Z"
+        linear.handler = serve
+        resumed = []
+        lc.collect(resumed)
+        assert resumed[0]["count"] == 1
+        assert json.loads(linear.requests[-1][3])["variables"]["after"] == "1"
 
 
 class TestAckEndpoint:
-    @patch.object(linear_ack, "_graphql")
-    def test_ack_skips_no_key(self, mock_gql, client, monkeypatch):
+    def test_ack_skips_no_key(self, linear, client, monkeypatch):
         monkeypatch.setattr(lc, "_KEY_PATH", "/nonexistent")
         resp = client.post("/notifications/ack-linear")
         assert resp.status_code == 200
         assert resp.get_json()["status"] == "skipped"
-        mock_gql.assert_not_called()
+        assert linear.requests == []
 
-    @patch.object(linear_ack, "_mark_read_ids")
-    @patch.object(linear_ack, "_graphql")
-    def test_ack_marks_notifications_read(self, mock_gql, mock_mark, client):
-        mock_gql.return_value = _fake_graphql_response([
-            _make_notif(notif_id="n-abc"),
-            _make_notif(notif_id="n-def"),
-        ])
+    def test_ack_marks_all_ids_in_one_request(self, linear, client):
+        linear.pages = [_page(0, 30), _page(30, 5)]
         resp = client.post("/notifications/ack-linear")
         assert resp.status_code == 200
-        mock_mark.assert_called_once_with(["n-abc", "n-def"])
+        assert len(linear.mutations) == 1
+        marked = [v for k, v in linear.mutations[0].items() if k.startswith("id")]
+        assert marked == [f"n-{i}" for i in range(35)]
+        assert len(linear.requests) == 3  # Two id pages + one mutation
+
+    def test_ack_batches_large_backlogs(self, linear, monkeypatch):
+        monkeypatch.setattr(linear_ack, "ACK_BATCH", 2)
+        assert linear_ack._mark_read_ids(["a", "b", "c"])
+        assert [len(m) - 1 for m in linear.mutations] == [2, 1]
+
+    def test_mutation_uses_aliases(self):
+        mutation = linear_ack._mark_read_mutation(2)
+        assert "m0: notificationUpdate(id: $id0" in mutation
+        assert "m1: notificationUpdate(id: $id1" in mutation
+        assert "$readAt: DateTime!" in mutation
+
+    def test_gateway_error_retries_queries_not_mutations(self, linear, monkeypatch):
+        monkeypatch.setattr(lc.http_client.time, "sleep", lambda s: None)
+        serve, failures = linear.handler, [1, 1]
+
+        def flaky(*args):
+            return (502, {}, {}) if failures and failures.pop() else serve(*args)
+        linear.handler = flaky
+        assert lc._graphql("query { viewer { id } }") is not None
+        assert len(linear.requests) == 3  # Two 502s, then served
+        failures.append(1)
+        assert not linear_ack._mark_read_ids(["a"])
+        assert len(linear.requests) == 4 and linear.mutations == []
@@ -0,0 +1,145 @@
+"""Tests for metrics.py — registry, collector instrumentation, /metrics endpoint."""
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("RELAYGENT_DATA_DIR", "/tmp/relaygent-test-metrics")
+
+import pytest
+
+import db as notif_db
+import http_client
+import metrics
+import notif_config as config
+import routes as routes_mod
+import slack_channels
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DB_PATH", str(tmp_path / "reminders.db"))
+    notif_db.init_db()
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.fixture()
+def client():
+    config.app.config["TESTING"] = True
+    with config.app.test_client() as c:
+        yield c
+
+
+def _samples(text):
+    """{series: value} for every non-comment line of an exposition."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, _, value = line.rpartition(" ")
+            out[series] = float(value)
+    return out
+
+
+class TestRegistry:
+    def test_counter_and_gauge(self):
+        metrics.inc("relaygent_collector_calls_total", source="slack")
+        metrics.inc("relaygent_collector_calls_total", 2, source="slack")
+        metrics.set_gauge("relaygent_pending_notifications", 4)
+        samples = _samples(metrics.render())
+        assert samples['relaygent_collector_calls_total{source="slack"}'] == 3
+        assert samples["relaygent_pending_notifications"] == 4
+
+    def test_histogram_buckets_are_cumulative(self):
+        for secs in (0.0005, 0.02, 0.02, 30):
+            metrics.observe("relaygent_collector_duration_seconds", secs, source="x")
+        samples = _samples(metrics.render())
+        name = "relaygent_collector_duration_seconds"
+        assert samples[f'{name}_bucket{{source="x",le="0.001"}}'] == 1
+        assert samples[f'{name}_bucket{{source="x",le="0.025"}}'] == 3
+        assert samples[f'{name}_bucket{{source="x",le="10"}}'] == 3
+        assert samples[f'{name}_bucket{{source="x",le="+Inf"}}'] == 4
+        assert samples[f'{name}_count{{source="x"}}'] == 4
+        assert samples[f'{name}_sum{{source="x"}}'] == pytest.approx(30.0405)
+
+    def test_help_and_type_once_per_family(self):
+        metrics.inc("relaygent_collector_calls_total", source="a")
+        metrics.inc("relaygent_collector_calls_total", source="b")
+        text = metrics.render()
+        assert text.count("# TYPE relaygent_collector_calls_total counter") == 1
+
+    def test_label_values_escaped(self):
+        metrics.inc("relaygent_collector_calls_total", source='we"ird\n')
+        assert 'source="we\\"ird\\n"' in metrics.render()
+
+    def test_upstream_counters_from_http_client(self, monkeypatch):
+        monkeypatch.setattr(http_client, "stats", lambda: {"slack.com": {
+            "calls": 5, "errors": 1, "retries": 2, "rate_limited": 1, "total_ms": 1500.0,
+            "max_ms": 900.0}})
+        samples = _samples(metrics.render())
+        assert samples['relaygent_upstream_requests_total{host="slack.com"}'] == 5
+        assert samples['relaygent_upstream_rate_limited_total{host="slack.com"}'] == 1
+        assert samples['relaygent_upstream_duration_seconds_total{host="slack.com"}'] == 1.5
+
+
+class TestRunCollector:
+    def test_success_records_last_success(self):
+        metrics.run_collector("tasks", lambda n: n.append({}), [])
+        samples = _samples(metrics.render())
+        assert samples['relaygent_collector_calls_total{source="tasks"}'] == 1
+        assert 'relaygent_collector_errors_total{source="tasks"}' not in samples
+        assert 0 <= samples['relaygent_collector_last_success_age_seconds{source="tasks"}'] < 5
+
+    def test_exception_counted_and_reraised(self):
+        def boom(n):
+            raise RuntimeError("nope")
+        with pytest.raises(RuntimeError):
+            metrics.run_collector("github", boom, [])
+        samples = _samples(metrics.render())
+        assert samples['relaygent_collector_errors_total{source="github"}'] == 1
+        assert 'relaygent_collector_last_success_age_seconds{source="github"}' not in samples
+
+    def test_upstream_429_attributed_to_collector(self, fake_http):
+        fake_http.handler = lambda *a: (429, {}, {})
+
+        def collector(n):
+            http_client.get(f"{fake_http.url}/x", retries=0)
+        metrics.run_collector("slack", collector, [])
+        samples = _samples(metrics.render())
+        assert samples['relaygent_collector_rate_limited_total{source="slack"}'] == 1
+
+    def test_429_on_worker_thread_attributed_to_collector(self, fake_http):
+        fake_http.handler = lambda *a: (429, {}, {})
+        channels = [{"id": "C1"}, {"id": "C2"}]
+
+        def api(method, params):
+            return http_client.get(f"{fake_http.url}/x", retries=0).json()
+        metrics.run_collector(
+            "slack", lambda n: slack_channels.new_messages(api, channels, "0", "U1", {}), [])
+        samples = _samples(metrics.render())
+        assert samples['relaygent_collector_rate_limited_total{source="slack"}'] == 2
+
+    def test_swallowed_upstream_error_is_not_success(self, fake_http):
+        fake_http.handler = lambda *a: (503, {}, {})
+        metrics.run_collector("linear", lambda n: http_client.get(f"{fake_http.url}/x", retries=0), [])
+        samples = _samples(metrics.render())
+        assert samples['relaygent_collector_errors_total{source="linear"}'] == 1
+        assert 'relaygent_collector_last_success_age_seconds{source="linear"}' not in samples
+
+
+class TestEndpoint:
+    def test_pending_instruments_collectors_routes_and_sqlite(self, client, monkeypatch):
+        monkeypatch.setattr(routes_mod, "_slow_collectors", [("slack", lambda n: n.append(
+            {"type": "message", "source": "slack", "count": 1, "messages": []}))])
+        monkeypatch.setattr(routes_mod, "_collect_chat_messages", lambda n: None)
+        client.get("/notifications/pending")
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/plain"
+        samples = _samples(resp.get_data(as_text=True))
+        for source in ("reminders", "chat", "tasks", "slack"):
+            assert samples[f'relaygent_collector_calls_total{{source="{source}"}}'] == 1
+        assert samples["relaygent_pending_notifications"] == 1
+        route = 'route="/notifications/pending"'
+        assert samples[f'relaygent_http_request_duration_seconds_count{{method="GET",{route}}}'] == 1
+        assert samples['relaygent_sqlite_op_duration_seconds_count{op="collect_due_reminders"}'] >= 1
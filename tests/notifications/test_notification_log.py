@@ -11,6 +11,7 @@ import notif_config as config
 import db as notif_db
 import routes as routes_mod  # noqa: F401 — ensures routes are registered
 import notif_logger
+from history import search_history
 
 
 @pytest.fixture(autouse=True)
@@ -21,6 +22,10 @@ def _isolated(tmp_path, monkeypatch):
     return tmp_path, db_path
 
 
+def _log(*row):
+    assert notif_db.log_notifications_batch([row])
+
+
 class TestNotificationLogTable:
     def test_table_created(self, _isolated):
         with notif_db.get_db() as conn:
@@ -36,82 +41,6 @@ class TestNotificationLogTable:
             assert {"id", "timestamp", "type", "source", "summary", "content", "dedup_key"} <= col_names
 
 
-class TestLogNotification:
-    def test_inserts_entry(self, _isolated):
-        notif_db.log_notification("reminder", "reminder", "Test msg", '{"id": 1}', "rem-1")
-        entries = notif_db.get_notification_history()
-        assert len(entries) == 1
-        assert entries[0]["type"] == "reminder"
-        assert entries[0]["source"] == "reminder"
-        assert entries[0]["summary"] == "Test msg"
-
-    def test_dedup_key_prevents_duplicates(self, _isolated):
-        notif_db.log_notification("slack", "general", "Hi", "{}", "slack-123")
-        notif_db.log_notification("slack", "general", "Hi", "{}", "slack-123")
-        entries = notif_db.get_notification_history()
-        assert len(entries) == 1
-
-    def test_different_dedup_keys_both_stored(self, _isolated):
-        notif_db.log_notification("slack", "general", "Msg 1", "{}", "slack-1")
-        notif_db.log_notification("slack", "general", "Msg 2", "{}", "slack-2")
-        entries = notif_db.get_notification_history()
-        assert len(entries) == 2
-
-    def test_content_stored_as_json(self, _isolated):
-        payload = {"id": 42, "text": "hello"}
-        notif_db.log_notification("email", "email", "hello", json.dumps(payload), "email-42")
-        entries = notif_db.get_notification_history()
-        parsed = json.loads(entries[0]["content"])
-        assert parsed["id"] == 42
-
-
-class TestGetNotificationHistory:
-    def test_returns_newest_first(self, _isolated):
-        notif_db.log_notification("a", "a", "first", "{}", "k-1")
-        notif_db.log_notification("b", "b", "second", "{}", "k-2")
-        entries = notif_db.get_notification_history()
-        assert entries[0]["summary"] == "second"
-        assert entries[1]["summary"] == "first"
-
-    def test_limit(self, _isolated):
-        for i in range(10):
-            notif_db.log_notification("t", "s", f"msg-{i}", "{}", f"k-{i}")
-        entries = notif_db.get_notification_history(limit=3)
-        assert len(entries) == 3
-
-    def test_offset(self, _isolated):
-        for i in range(5):
-            notif_db.log_notification("t", "s", f"msg-{i}", "{}", f"k-{i}")
-        entries = notif_db.get_notification_history(limit=2, offset=2)
-        assert len(entries) == 2
-        assert entries[0]["summary"] == "msg-2"
-
-    def test_empty_when_no_entries(self, _isolated):
-        entries = notif_db.get_notification_history()
-        assert entries == []
-
-
-class TestPruneNotificationLog:
-    def test_prune_removes_old_entries(self, _isolated):
-        with notif_db.get_db() as conn:
-            conn.execute(
-                "INSERT INTO notification_log (timestamp, type, source, summary, content, dedup_key) "
-                "VALUES (datetime('now', '-10 days'), 'old', 'old', 'old', '{}', 'old-1')"
-            )
-            conn.commit()
-        notif_db.log_notification("new", "new", "new", "{}", "new-1")
-        notif_db.prune_notification_log(max_age_days=7)
-        entries = notif_db.get_notification_history()
-        assert len(entries) == 1
-        assert entries[0]["summary"] == "new"
-
-    def test_prune_keeps_recent_entries(self, _isolated):
-        notif_db.log_notification("recent", "recent", "recent", "{}", "r-1")
-        notif_db.prune_notification_log(max_age_days=7)
-        entries = notif_db.get_notification_history()
-        assert len(entries) == 1
-
-
 class TestLogNotificationsTaskType:
     """Test log_notifications properly formats task-type notifications."""
 
@@ -124,7 +53,7 @@ class TestLogNotificationsTaskType:
             "last": "2026-02-20",
         }]
         notif_logger.log_notifications(notifications)
-        entries = notif_db.get_notification_history()
+        entries = search_history()
         assert len(entries) == 1
         assert entries[0]["type"] == "task"
         assert entries[0]["source"] == "task"
@@ -140,7 +69,7 @@ class TestLogNotificationsTaskType:
             "last": "never",
         }]
         notif_logger.log_notifications(notifications)
-        entries = notif_db.get_notification_history()
+        entries = search_history()
         assert entries[0]["summary"] == "Run tests"
 
     def test_task_notification_no_raw_dict(self, _isolated):
@@ -152,7 +81,113 @@ class TestLogNotificationsTaskType:
             "last": "2026-02-14",
         }]
         notif_logger.log_notifications(notifications)
-        entries = notif_db.get_notification_history()
+        entries = search_history()
         # Must NOT contain raw dict markers
         assert "{'type'" not in entries[0]["summary"]
         assert "{\"type\"" not in entries[0]["summary"]
+
+
+class TestBatchedLogging:
+    def test_batch_inserts_all_rows(self, _isolated):
+        notif_db.log_notifications_batch([
+            ("slack", "general", f"m{i}", "{}", f"slack-{i}") for i in range(5)
+        ])
+        assert len(search_history()) == 5
+
+    def test_batch_skips_duplicates(self, _isolated):
+        row = ("slack", "general", "m", "{}", "slack-1")
+        notif_db.log_notifications_batch([row, row])
+        notif_db.log_notifications_batch([row])
+        assert len(search_history()) == 1
+
+    def test_log_notifications_uses_one_batch(self, _isolated, monkeypatch):
+        calls = []
+        monkeypatch.setattr(notif_logger, "log_notifications_batch",
+                            lambda rows: calls.append(rows) or True)
+        notif_logger.log_notifications([
+            {"type": "message", "source": "chat",
+             "messages": [{"content": "a", "timestamp": "1"}, {"content": "b", "timestamp": "2"}]},
+            {"type": "reminder", "id": 3, "message": "r"},
+        ])
+        assert len(calls) == 1
+        assert [r[4] for r in calls[0]] == ["chat-1", "chat-2", "reminder-3"]
+
+    def test_content_stored_as_json(self, _isolated):
+        _log("email", "email", "hello", json.dumps({"id": 42, "text": "hello"}), "email-42")
+        entries = search_history()
+        assert json.loads(entries[0]["content"])["id"] == 42
+
+    def test_indexes_created(self, _isolated):
+        with notif_db.get_db() as conn:
+            names = {r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='notification_log'")}
+        assert {"idx_notification_log_timestamp", "idx_notification_log_source_type"} <= names
+
+
+class TestStableDedupKeys:
+    def test_task_key_stable_across_processes(self, _isolated):
+        import subprocess
+        import sys
+        code = ("import notif_logger; print(next(notif_logger._entries("
+                "{'type': 'task', 'description': 'Run tests'}))[4])")
+        keys = {
+            subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                           cwd=os.path.dirname(notif_logger.__file__),
+                           env={**os.environ, "PYTHONHASHSEED": seed}).stdout.strip()
+            for seed in ("1", "2")
+        }
+        assert len(keys) == 1
+        assert keys.pop().startswith("task-")
+
+    def test_task_key_differs_per_occurrence(self, monkeypatch):
+        task = {"type": "task", "description": "Run tests", "freq": "daily", "last": "2026-02-20"}
+        day = notif_logger.task_model.freq_secs("daily")
+        monkeypatch.setattr(notif_logger.time, "time", lambda: 100 * day + 10)
+        first = next(notif_logger._entries(task))[4]
+        assert next(notif_logger._entries(task))[4] == first  # Same occurrence
+        assert next(notif_logger._entries({**task, "last": "2026-02-21"}))[4] != first
+        monkeypatch.setattr(notif_logger.time, "time", lambda: 101 * day + 10)
+        assert next(notif_logger._entries(task))[4] != first  # Re-notified a period later
+
+    def test_recent_cache_safe_across_threads(self, _isolated, monkeypatch):
+        import threading
+        monkeypatch.setattr(notif_logger, "RECENT_KEYS_MAX", 8)
+        monkeypatch.setattr(notif_logger, "log_notifications_batch", lambda rows: True)
+        errors = []
+
+        def worker(base):
+            try:
+                for i in range(300):
+                    notif_logger.log_notifications(
+                        [{"type": "reminder", "id": base + i % 20, "message": "r"}])
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+        threads = [threading.Thread(target=worker, args=(k * 10,)) for k in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == [] and len(notif_logger._recent) <= 8
+
+    def test_unknown_key_ignores_dict_order(self):
+        a = next(notif_logger._entries({"type": "x", "a": 1, "b": 2}))[4]
+        b = next(notif_logger._entries({"b": 2, "a": 1, "type": "x"}))[4]
+        assert a == b
+
+    def test_recent_keys_skip_db(self, _isolated, monkeypatch):
+        calls = []
+        monkeypatch.setattr(notif_logger, "log_notifications_batch",
+                            lambda rows: calls.append(rows) or True)
+        notif = [{"type": "reminder", "id": 7, "message": "r"}]
+        notif_logger.log_notifications(notif)
+        notif_logger.log_notifications(notif)
+        assert len(calls) == 1
+
+    def test_failed_write_not_cached(self, _isolated, monkeypatch):
+        calls = []
+        monkeypatch.setattr(notif_logger, "log_notifications_batch",
+                            lambda rows: calls.append(rows) and False)
+        notif = [{"type": "reminder", "id": 8, "message": "r"}]
+        notif_logger.log_notifications(notif)
+        notif_logger.log_notifications(notif)
+        assert len(calls) == 2
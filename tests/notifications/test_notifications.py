@@ -141,11 +141,11 @@ class TestSlackCollectorHelpers:
 
 class TestTasksCollector:
     def test_parse_recurring(self):
-        t = tc_mod._parse_task_line("- [ ] Check it | type: recurring | freq: daily | last: 2026-02-01 00:00")
+        t = tc_mod.task_model.parse_line("- [ ] Check it | type: recurring | freq: daily | last: 2026-02-01 00:00")
         assert t["description"] == "Check it" and t["freq"] == "daily"
 
     def test_parse_invalid(self):
-        assert tc_mod._parse_task_line("## Section header") is None
+        assert tc_mod.task_model.parse_line("## Section header") is None
 
     def test_collect_overdue(self, tmp_path, monkeypatch):
         monkeypatch.setattr(tc_mod, "NOTIFIED_FILE", tmp_path / "n.json")
@@ -0,0 +1,187 @@
+"""Tests for reminder_dispatch.py — deadline heap, dispatcher thread, long-poll."""
+from __future__ import annotations
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("RELAYGENT_DATA_DIR", "/tmp/relaygent-test-dispatch")
+
+import pytest
+import notif_config as config
+import db as notif_db
+import reminder_dispatch as dispatch
+import routes as routes_mod
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DB_PATH", str(tmp_path / "reminders.db"))
+    notif_db.init_db()
+    dispatch._heap.clear()
+    dispatch._deadlines.clear()
+    dispatch._pending.clear()
+    dispatch._events.clear()
+    yield
+    dispatch.stop()
+
+
+@pytest.fixture()
+def client():
+    config.app.config["TESTING"] = True
+    with config.app.test_client() as c:
+        yield c
+
+
+def _insert(trigger_time, message="hi", recurrence=None):
+    with notif_db.get_db() as conn:
+        cur = conn.execute(
+            "INSERT INTO reminders (trigger_time, message, recurrence) VALUES (?, ?, ?)",
+            (trigger_time, message, recurrence),
+        )
+        conn.commit()
+        return cur.lastrowid
+
+
+class TestNextDeadline:
+    def test_oneoff_is_trigger_time(self):
+        assert dispatch.next_deadline("2099-01-01T09:00:00") == datetime(2099, 1, 1, 9)
+
+    def test_recurring_is_next_cron_occurrence(self):
+        got = dispatch.next_deadline("2026-03-01T09:00:00", "0 9 * * *")
+        assert got == datetime(2026, 3, 2, 9)
+
+    def test_invalid_returns_none(self):
+        assert dispatch.next_deadline("nope") is None
+
+    def test_offset_converted_to_naive_local(self):
+        aware = datetime(2099, 1, 1, 9, tzinfo=timezone.utc)
+        got = dispatch.next_deadline(aware.isoformat())
+        assert got.tzinfo is None
+        assert got == aware.astimezone().replace(tzinfo=None)
+
+
+class TestHeap:
+    def test_pop_due_orders_by_deadline(self):
+        now = datetime.now()
+        dispatch.schedule(2, (now - timedelta(seconds=1)).isoformat())
+        dispatch.schedule(1, (now - timedelta(seconds=2)).isoformat())
+        dispatch.schedule(3, (now + timedelta(hours=1)).isoformat())
+        due, delay = dispatch._pop_due(now)
+        assert due == [1, 2]
+        assert 3590 < delay <= 3600
+
+    def test_cancelled_entries_skipped(self):
+        now = datetime.now()
+        dispatch.schedule(1, (now - timedelta(seconds=1)).isoformat())
+        dispatch.cancel(1)
+        assert dispatch._pop_due(now)[0] == []
+
+    def test_reschedule_keeps_latest_deadline(self):
+        now = datetime.now()
+        dispatch.schedule(1, (now - timedelta(seconds=1)).isoformat())
+        dispatch.schedule(1, (now + timedelta(hours=1)).isoformat())
+        assert dispatch._pop_due(now)[0] == []
+
+    def test_mixed_aware_and_naive_deadlines(self, client):
+        now = datetime.now()
+        _insert((now + timedelta(hours=1)).isoformat(), "naive")
+        dispatch.load()
+        aware = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+        resp = client.post("/reminder", json={"trigger_time": aware, "message": "aware"})
+        assert resp.status_code == 201
+        due, delay = dispatch._pop_due(datetime.now())
+        assert due == [resp.get_json()["id"]]
+        assert 3500 < delay <= 3600
+
+    def test_load_reads_unfired_rows(self):
+        _insert("2099-01-01T09:00:00")
+        with notif_db.get_db() as conn:
+            conn.execute("INSERT INTO reminders (trigger_time, message, fired) "
+                         "VALUES ('2099-01-01T09:00:00', 'done', 1)")
+            conn.commit()
+        dispatch.load()
+        assert list(dispatch._deadlines) == [1]
+
+
+class TestDispatcherThread:
+    def test_fires_at_deadline_without_polling(self, client):
+        dispatch.start()
+        soon = (datetime.now() + timedelta(milliseconds=300)).isoformat()
+        client.post("/reminder", json={"trigger_time": soon, "message": "ping"})
+        seq, fired, _ = dispatch.wait(dispatch._seq, timeout=3)
+        assert [n["message"] for n in fired] == ["ping"]
+        assert datetime.now() - datetime.fromisoformat(soon) < timedelta(seconds=1)
+
+    def test_pending_drains_fired_buffer(self, client, monkeypatch):
+        monkeypatch.setattr(routes_mod, "_collect_chat_messages", lambda n: None)
+        monkeypatch.setattr(routes_mod.tasks_collector, "collect", lambda n: None)
+        _insert((datetime.now() - timedelta(minutes=5)).isoformat(), "missed")
+        since = dispatch._seq
+        dispatch.start()
+        dispatch.wait(since, timeout=3)
+        first = client.get("/notifications/pending?fast=1").get_json()
+        assert [n["message"] for n in first] == ["missed"]
+        assert client.get("/notifications/pending?fast=1").get_json() == []
+
+    def test_stale_on_restart_marked_fired_not_published(self):
+        rid = _insert((datetime.now() - timedelta(hours=2)).isoformat(), "stale")
+        dispatch.start()
+        deadline = time.time() + 3
+        while time.time() < deadline:
+            with notif_db.get_db() as conn:
+                if conn.execute("SELECT fired FROM reminders WHERE id=?", (rid,)).fetchone()[0]:
+                    break
+            time.sleep(0.02)
+        assert dispatch.drain() == []
+
+    def test_deleted_reminder_does_not_fire(self, client):
+        dispatch.start()
+        soon = (datetime.now() + timedelta(milliseconds=200)).isoformat()
+        rid = client.post("/reminder", json={"trigger_time": soon, "message": "x"}).get_json()["id"]
+        client.delete(f"/reminder/{rid}")
+        _, fired, _ = dispatch.wait(dispatch._seq, timeout=0.5)
+        assert fired == []
+
+    def test_aware_reminder_fires_alongside_naive(self, client):
+        _insert((datetime.now() + timedelta(hours=1)).isoformat(), "later")
+        dispatch.start()
+        soon = (datetime.now(timezone.utc) + timedelta(milliseconds=200)).isoformat()
+        client.post("/reminder", json={"trigger_time": soon, "message": "utc"})
+        _, fired, _ = dispatch.wait(dispatch._seq, timeout=3)
+        assert [n["message"] for n in fired] == ["utc"]
+        assert dispatch.running()
+
+
+class TestWaitEndpoint:
+    def test_times_out_empty(self, client):
+        resp = client.get(f"/notifications/reminders/wait?since={dispatch._seq}&timeout=0.05")
+        assert resp.status_code == 200
+        assert resp.get_json()["reminders"] == []
+
+    def test_bad_params_rejected(self, client):
+        for query in ("since=abc", "epoch=x", "timeout=soon", "timeout=-1", "timeout=nan"):
+            resp = client.get(f"/notifications/reminders/wait?{query}")
+            assert resp.status_code == 400, query
+
+    def test_gap_when_replay_window_overflows(self, client):
+        since = dispatch._seq
+        burst = dispatch._events.maxlen + 5
+        dispatch._publish([{"message": str(i)} for i in range(burst)])
+        body = client.get(f"/notifications/reminders/wait?since={since}&timeout=0").get_json()
+        assert body["gap"] is True and len(body["reminders"]) == dispatch._events.maxlen
+        latest = client.get(f"/notifications/reminders/wait?since={body['seq'] - 1}&timeout=0")
+        assert latest.get_json()["gap"] is False
+        assert len(dispatch.drain()) == burst  # The /pending path loses nothing
+
+    def test_epoch_mismatch_after_restart_reports_gap(self, client):
+        dispatch._publish([{"message": "after restart"}])
+        start = time.time()
+        stale = f"since={dispatch._seq + 100}&epoch={dispatch.EPOCH - 1}&timeout=5"
+        body = client.get(f"/notifications/reminders/wait?{stale}").get_json()
+        assert time.time() - start < 1
+        assert body["gap"] is True and body["epoch"] == dispatch.EPOCH
+        assert body["seq"] == dispatch._seq
+        assert {"message": "after restart"} in body["reminders"]
+        current = f"since={body['seq']}&epoch={body['epoch']}&timeout=0"
+        assert client.get(f"/notifications/reminders/wait?{current}").get_json()["gap"] is False
@@ -0,0 +1,151 @@
+"""Tests for slack_channels.py — incremental, paginated, rate-limited channel scans."""
+from __future__ import annotations
+
+import json
+import os
+import time
+from unittest.mock import patch
+
+os.environ.setdefault("RELAYGENT_DATA_DIR", "/tmp/relaygent-test-slack-channels")
+
+import pytest
+import slack_channels
+import slack_collector as sc
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    token_dir = tmp_path / ".relaygent" / "slack"
+    token_dir.mkdir(parents=True)
+    (token_dir / "token.json").write_text(json.dumps({"access_token": "xoxp-test"}))
+    monkeypatch.setattr(sc, "SLACK_TOKEN_PATH", str(token_dir / "token.json"))
+    monkeypatch.setattr(sc, "_LAST_CHECK_FILE", str(token_dir / ".last_check_ts"))
+    monkeypatch.setattr(sc, "_SELF_UID", "U_SELF")
+    monkeypatch.setattr(sc, "_USER_CACHE", {})
+    monkeypatch.setattr(slack_channels, "history_bucket", slack_channels.TokenBucket(1000, 1000))
+    return token_dir
+
+
+class FakeSlack:
+    def __init__(self, channels, history):
+        self.channels = channels  # list of pages
+        self.history = history  # channel id -> list of pages
+        self.calls = []
+
+    def __call__(self, token, method, params=None, _retries=2):
+        self.calls.append((method, dict(params or {})))
+        if method == "users.info":
+            return None
+        page = int((params or {}).get("cursor") or 0)
+        if method == "conversations.list":
+            return {"ok": True, "channels": self.channels[page],
+                    "response_metadata": {"next_cursor": str(page + 1)
+                                          if page + 1 < len(self.channels) else ""}}
+        if method == "conversations.history":
+            pages = self.history[params["channel"]]
+            more = page + 1 < len(pages)
+            return {"ok": True, "messages": pages[page], "has_more": more,
+                    "response_metadata": {"next_cursor": str(page + 1) if more else ""}}
+        return None
+
+    def history_calls(self):
+        return [p["channel"] for m, p in self.calls if m == "conversations.history"]
+
+
+def _msg(ts, user="U_A"):
+    return {"user": user, "text": f"m{ts}", "ts": ts}
+
+
+def _collect(fake):
+    notifs = []
+    with patch.object(sc, "_slack_api", fake):
+        sc.collect(notifs)
+    return notifs
+
+
+class TestIncremental:
+    def test_unchanged_channel_served_from_state(self):
+        fake = FakeSlack([[{"id": "C1", "name": "g", "latest": {"ts": "10.000000"}}]],
+                         {"C1": [[_msg("10.000000")]]})
+        assert _collect(fake)[0]["count"] == 1
+        assert _collect(fake)[0]["count"] == 1  # Still unread, but no new history call
+        assert fake.history_calls() == ["C1"]
+
+    def test_changed_signal_refetches(self):
+        fake = FakeSlack([[{"id": "C1", "name": "g", "latest": {"ts": "10.000000"}}]],
+                         {"C1": [[_msg("10.000000")]]})
+        _collect(fake)
+        fake.channels = [[{"id": "C1", "name": "g", "latest": {"ts": "20.000000"}}]]
+        fake.history = {"C1": [[_msg("20.000000"), _msg("10.000000")]]}
+        assert _collect(fake)[0]["count"] == 2
+        assert fake.history_calls() == ["C1", "C1"]
+
+    def test_ack_hides_cached_messages(self, _isolated):
+        fake = FakeSlack([[{"id": "C1", "name": "g", "latest": {"ts": "10.000000"}}]],
+                         {"C1": [[_msg("10.000000")]]})
+        _collect(fake)
+        (_isolated / ".last_check_ts").write_text("15.000000")
+        assert _collect(fake) == []
+
+    def test_no_signal_always_fetches(self):
+        fake = FakeSlack([[{"id": "C1", "name": "g"}]], {"C1": [[_msg("10.000000")]]})
+        _collect(fake)
+        _collect(fake)
+        assert fake.history_calls() == ["C1", "C1"]
+
+    def test_updated_is_not_a_signal(self):
+        for ch in ({"id": "C1", "name": "g", "updated": 1000},
+                   {"id": "D1", "is_im": True, "user": "U_A", "updated": 1000}):
+            fake = FakeSlack([[ch]], {ch["id"]: [[]]})
+            _collect(fake)
+            fake.history = {ch["id"]: [[_msg("20.000000")]]}
+            assert _collect(fake)[0]["count"] == 1  # `updated` unchanged, still seen at once
+            assert fake.history_calls() == [ch["id"]] * 2
+
+    def test_state_persisted_across_restarts(self, _isolated):
+        fake = FakeSlack([[{"id": "C1", "name": "g", "latest": {"ts": "1.0"}}]],
+                         {"C1": [[_msg("1.0")]]})
+        _collect(fake)
+        state = json.loads((_isolated / ".channel_state.json").read_text())
+        assert state["C1"]["signal"] == "1.0"
+
+
+class TestPagination:
+    def test_list_follows_cursor(self):
+        fake = FakeSlack([[{"id": "C1", "name": "a"}], [{"id": "C2", "name": "b"}]],
+                         {"C1": [[_msg("1.0")]], "C2": [[_msg("2.0")]]})
+        notifs = _collect(fake)
+        assert [c["id"] for c in notifs[0]["channels"]] == ["C1", "C2"]
+
+    def test_history_follows_cursor(self):
+        fake = FakeSlack([[{"id": "C1", "name": "a"}]],
+                         {"C1": [[_msg("3.0"), _msg("2.0")], [_msg("1.0")]]})
+        notifs = _collect(fake)
+        assert notifs[0]["count"] == 3
+
+
+class TestTokenBucket:
+    def test_burst_then_deadline(self):
+        bucket = slack_channels.TokenBucket(rate=1, burst=2)
+        deadline = time.monotonic() + 0.1
+        assert bucket.acquire(deadline) and bucket.acquire(deadline)
+        assert not bucket.acquire(deadline)
+
+    def test_out_of_budget_channels_left_for_next_poll(self, monkeypatch):
+        monkeypatch.setattr(slack_channels, "history_bucket",
+                            slack_channels.TokenBucket(rate=0.001, burst=1))
+        fake = FakeSlack([[{"id": "C1", "name": "a"}, {"id": "C2", "name": "b"}]],
+                         {"C1": [[_msg("1.0")]], "C2": [[_msg("2.0")]]})
+        notifs = _collect(fake)
+        assert len(fake.history_calls()) == 1
+        assert notifs[0]["count"] == 1
+
+    def test_least_recently_fetched_go_first(self, monkeypatch):
+        fake = FakeSlack([[{"id": f"C{i}", "name": f"c{i}"} for i in range(1, 4)]],
+                         {f"C{i}": [[]] for i in range(1, 4)})
+        for _ in range(4):  # One token per poll
+            monkeypatch.setattr(slack_channels, "history_bucket",
+                                slack_channels.TokenBucket(rate=0.001, burst=1))
+            _collect(fake)
+            time.sleep(0.01)
+        assert fake.history_calls() == ["C1", "C2", "C3", "C1"]
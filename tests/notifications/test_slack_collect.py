@@ -26,6 +26,8 @@ def _isolated(tmp_path, monkeypatch):
     monkeypatch.setattr(sc, "SLACK_TOKEN_PATH", str(token_file))
     monkeypatch.setattr(sc, "_LAST_CHECK_FILE", str(last_check))
     monkeypatch.setattr(sc, "_SELF_UID", None)
+    monkeypatch.setattr(sc.slack_channels, "history_bucket",
+                        sc.slack_channels.TokenBucket(1000, 1000))
     token_file.write_text(json.dumps({"access_token": "xoxp-test"}))
     return token_file, last_check
 
@@ -6,7 +6,7 @@ import os
 import sys
 import time
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 os.environ.setdefault("RELAYGENT_DATA_DIR", "/tmp/relaygent-test-slack-col")
 
@@ -92,16 +92,15 @@ class TestAckSlackEndpoint:
 
 
 class TestResolveUsername:
-    def test_resolves_display_name(self, _isolated, monkeypatch):
+    def test_resolves_display_name(self, _isolated, monkeypatch, fake_http):
         monkeypatch.setattr(sc, "_USER_CACHE", {})
-        fake_resp = {"ok": True, "user": {"real_name": "Test User", "name": "testuser"}}
-        with patch.object(sc.urllib.request, "urlopen") as mock_open:
-            resp = MagicMock()
-            resp.read.return_value = json.dumps(fake_resp).encode()
-            resp.__enter__ = lambda s: s
-            resp.__exit__ = lambda s, *a: None
-            mock_open.return_value = resp
-            assert sc._resolve_username("token", "U0TEST12345") == "Test User"
+        monkeypatch.setattr(sc, "_API_BASE", fake_http.url)
+        fake_http.handler = lambda *a: (200, {}, {
+            "ok": True, "user": {"real_name": "Test User", "name": "testuser"}})
+        assert sc._resolve_username("token", "U0TEST12345") == "Test User"
+        method, path, headers, _ = fake_http.requests[0]
+        assert path == "/users.info?user=U0TEST12345"
+        assert headers["Authorization"] == "Bearer token"
 
     def test_caches_result(self, _isolated, monkeypatch):
         monkeypatch.setattr(sc, "_USER_CACHE", {"UCACHED": "Cached Name"})
@@ -109,9 +108,9 @@ class TestResolveUsername:
 
     def test_returns_uid_on_api_failure(self, _isolated, monkeypatch):
         monkeypatch.setattr(sc, "_USER_CACHE", {})
-        with patch.object(sc.urllib.request, "urlopen",
-                          side_effect=sc.urllib.error.URLError("fail")):
-            assert sc._resolve_username("token", "UFAIL123") == "UFAIL123"
+        monkeypatch.setattr(sc, "_API_BASE", "http://127.0.0.1:9")  # Connection refused
+        monkeypatch.setattr(sc.http_client.time, "sleep", lambda s: None)
+        assert sc._resolve_username("token", "UFAIL123") == "UFAIL123"
 
     def test_returns_uid_for_non_user_id(self, _isolated, monkeypatch):
         monkeypatch.setattr(sc, "_USER_CACHE", {})
@@ -120,28 +119,21 @@ class TestResolveUsername:
 
 
 class TestSlackApi:
-    def test_rate_limit_retry(self):
-        call_count = 0
-
-        def fake_urlopen(req, timeout=None):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                raise sc.urllib.error.HTTPError(
-                    req.full_url, 429, "Rate Limited", {"Retry-After": "0"}, None
-                )
-            resp = MagicMock()
-            resp.read.return_value = json.dumps({"ok": True, "val": "ok"}).encode()
-            resp.__enter__ = lambda s: s
-            resp.__exit__ = lambda s, *a: None
-            return resp
-
-        with patch.object(sc.urllib.request, "urlopen", fake_urlopen):
-            result = sc._slack_api("token", "auth.test")
-            assert result is not None and result["val"] == "ok"
-            assert call_count == 2
-
-    def test_network_error_returns_none(self):
-        with patch.object(sc.urllib.request, "urlopen",
-                          side_effect=sc.urllib.error.URLError("refused")):
-            assert sc._slack_api("token", "auth.test") is None
+    def test_rate_limit_retry(self, monkeypatch, fake_http):
+        monkeypatch.setattr(sc, "_API_BASE", fake_http.url)
+        responses = [(429, {"Retry-After": "0"}, {}), (200, {}, {"ok": True, "val": "ok"})]
+        fake_http.handler = lambda *a: responses.pop(0)
+        result = sc._slack_api("token", "auth.test")
+        assert result is not None and result["val"] == "ok"
+        assert len(fake_http.requests) == 2
+
+    def test_network_error_returns_none(self, monkeypatch):
+        monkeypatch.setattr(sc, "_API_BASE", "http://127.0.0.1:9")
+        assert sc._slack_api("token", "auth.test", _retries=0) is None
+
+    def test_calls_reuse_one_connection(self, monkeypatch, fake_http):
+        monkeypatch.setattr(sc, "_API_BASE", fake_http.url)
+        fake_http.handler = lambda *a: (200, {}, {"ok": True})
+        for _ in range(5):
+            assert sc._slack_api("token", "auth.test")
+        assert fake_http.connections == 1
@@ -0,0 +1,126 @@
+"""Tests for slack_users.py — persistent bulk Slack user directory."""
+from __future__ import annotations
+
+import json
+import os
+import time
+
+os.environ.setdefault("RELAYGENT_DATA_DIR", "/tmp/relaygent-test-slack-users")
+
+import pytest
+import slack_users
+
+
+@pytest.fixture(autouse=True)
+def _isolated(monkeypatch):
+    monkeypatch.setattr(slack_users, "_loaded", {})
+    monkeypatch.setattr(slack_users, "_attempted", {})
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / ".user_directory.json")
+
+
+class FakeApi:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def __call__(self, method, params=None):
+        self.calls.append((method, dict(params or {})))
+        if self.pages is None:
+            return None
+        page = int((params or {}).get("cursor") or 0)
+        more = page + 1 < len(self.pages)
+        return {"ok": True, "members": self.pages[page],
+                "response_metadata": {"next_cursor": str(page + 1) if more else ""}}
+
+
+def _member(uid, real_name=None, name=None):
+    return {"id": uid, "real_name": real_name, "name": name or uid.lower()}
+
+
+class TestFetch:
+    def test_follows_cursor(self):
+        api = FakeApi([[_member("U1", "Alice")], [_member("U2", name="bob")]])
+        assert slack_users.fetch_directory(api) == {"U1": "Alice", "U2": "bob"}
+        assert [p.get("cursor") for _, p in api.calls] == [None, "1"]
+
+    def test_failure_returns_none(self):
+        assert slack_users.fetch_directory(FakeApi(None)) is None
+
+
+class TestWarm:
+    def test_first_run_fetches_and_persists(self, path):
+        cache = {}
+        slack_users.warm(FakeApi([[_member("U1", "Alice")]]), path, cache)
+        assert cache == {"U1": "Alice"}
+        assert json.load(open(path))["users"] == {"U1": "Alice"}
+
+    def test_restart_loads_file_without_api_calls(self, path):
+        slack_users.warm(FakeApi([[_member("U1", "Alice")]]), path, {})
+        slack_users._loaded.clear()
+        api, cache = FakeApi([[_member("U1", "Other")]]), {}
+        slack_users.warm(api, path, cache)
+        assert cache == {"U1": "Alice"}
+        assert api.calls == []
+
+    def test_stale_directory_refreshed_in_background(self, path, monkeypatch):
+        slack_users._update(path, fetched_at=time.time() - slack_users.TTL_SECS - 1,
+                            users={"U1": "Old"})
+        started = []
+        monkeypatch.setattr(slack_users, "_refresh_in_background",
+                            lambda api, p, cache: started.append(p))
+        cache = {}
+        slack_users.warm(FakeApi([[_member("U1", "New")]]), path, cache)
+        assert cache == {"U1": "Old"}  # Stale copy keeps serving
+        assert started == [path]
+
+    def test_background_refresh_updates_cache(self, path):
+        cache = {"U1": "Old"}
+        slack_users._refresh_in_background(FakeApi([[_member("U1", "New")]]), path, cache)
+        deadline = time.time() + 2
+        while cache["U1"] != "New" and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache["U1"] == "New"
+
+    def test_failed_fetch_not_retried_every_poll(self, path):
+        api = FakeApi(None)
+        slack_users.warm(api, path, {})
+        slack_users.warm(api, path, {})
+        assert len(api.calls) == 1
+
+    def test_failures_back_off(self, path, monkeypatch):
+        api, now = FakeApi(None), time.time()
+        for minutes in (0, 11, 22, 33, 44):  # Retries after 10m, then 20m
+            monkeypatch.setattr(slack_users.time, "time", lambda: now + minutes * 60)
+            slack_users.warm(api, path, {})
+        assert len(api.calls) == 3
+
+    def test_failed_background_refresh_not_restarted_every_poll(self, path):
+        slack_users._update(path, fetched_at=time.time() - slack_users.TTL_SECS - 1,
+                            users={"U1": "Old"})
+        api, cache = FakeApi(None), {}
+        slack_users.warm(api, path, cache)
+        deadline = time.time() + 2
+        while slack_users._refreshing and time.time() < deadline:
+            time.sleep(0.01)
+        slack_users.warm(api, path, cache)
+        assert len(api.calls) == 1 and cache == {"U1": "Old"}
+
+
+class TestSelfUid:
+    def test_saved_per_token(self, path):
+        slack_users.save_self_uid(path, "xoxp-a", "U_ME")
+        assert slack_users.cached_self_uid(path, "xoxp-a") == "U_ME"
+        assert slack_users.cached_self_uid(path, "xoxp-b") is None
+
+    def test_token_not_stored_in_plain_text(self, path):
+        slack_users.save_self_uid(path, "xoxp-secret", "U_ME")
+        assert "xoxp-secret" not in open(path).read()
+
+    def test_kept_alongside_directory(self, path):
+        slack_users.save_self_uid(path, "xoxp-a", "U_ME")
+        slack_users.refresh(FakeApi([[_member("U1", "Alice")]]), path, {})
+        assert slack_users.cached_self_uid(path, "xoxp-a") == "U_ME"
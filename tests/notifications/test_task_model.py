@@ -0,0 +1,118 @@
+"""Tests for task_model.py — canonical tasks.md parser and cached next-due index."""
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+import task_model as tm
+
+
+class TestFreqSecs:
+    def test_known_frequencies(self):
+        assert tm.freq_secs("6h") == 6 * 3600
+        assert tm.freq_secs("12h") == 12 * 3600
+        assert tm.freq_secs("daily") == 24 * 3600
+        assert tm.freq_secs("2d") == 48 * 3600
+        assert tm.freq_secs("weekly") == 168 * 3600
+        assert tm.freq_secs("monthly") == 720 * 3600
+
+    def test_unknown_freq_defaults_to_daily(self):
+        assert tm.freq_secs("bogus") == 24 * 3600
+        assert tm.freq_secs("") == 24 * 3600
+
+
+class TestParseLine:
+    def test_unchecked_oneoff(self):
+        r = tm.parse_line("- [ ] Fix the bug")
+        assert r is not None and r["description"] == "Fix the bug"
+        assert r["type"] == "one-off"
+
+    def test_checked_oneoff(self):
+        r = tm.parse_line("- [x] Done task")
+        assert r is not None and r["description"] == "Done task"
+
+    def test_recurring_with_meta(self):
+        line = "- [ ] Check logs | type: recurring | freq: daily | last: 2026-02-01T10:00:00"
+        r = tm.parse_line(line)
+        assert r["description"] == "Check logs"
+        assert r["type"] == "recurring" and r["freq"] == "daily"
+        assert r["last"] == "2026-02-01T10:00:00"
+
+    def test_non_task_line_returns_none(self):
+        assert tm.parse_line("## Section header") is None
+        assert tm.parse_line("some random text") is None
+        assert tm.parse_line("") is None
+
+    def test_missing_meta_defaults(self):
+        r = tm.parse_line("- [ ] Simple task")
+        assert r["type"] == "one-off" and r["freq"] == "" and r["last"] == ""
+
+    def test_uppercase_x(self):
+        assert tm.parse_line("- [X] Done task") is not None
+
+
+class TestParseLineDue:
+    def test_never_is_due_immediately(self):
+        assert tm.parse_line("- [ ] T | type: recurring | freq: daily | last: never")["next_due"] == 0
+
+    def test_next_due_from_last(self):
+        t = tm.parse_line("- [ ] T | type: recurring | freq: 12h | last: 2026-02-25 12:00")
+        assert t["next_due"] == datetime(2026, 2, 26, 0, 0).timestamp()
+
+    def test_bad_last_has_no_due(self):
+        t = tm.parse_line("- [ ] T | type: recurring | freq: daily | last: not-a-date")
+        assert t is not None and t["next_due"] is None
+
+    def test_one_off_has_no_due(self):
+        assert tm.parse_line("- [ ] T | type: one-off")["next_due"] is None
+
+    def test_overdue_label(self):
+        assert tm.overdue_label(30 * 60) == "30m overdue"
+        assert tm.overdue_label(5 * 3600) == "5h overdue"
+        assert tm.overdue_label(3 * 86400) == "3d overdue"
+
+
+@pytest.fixture()
+def task_file(tmp_path):
+    path = tmp_path / "tasks.md"
+    path.write_text("- [ ] Late | type: recurring | freq: daily | last: 2026-01-01 00:00\n"
+                    "- [ ] Never | type: recurring | freq: daily | last: never\n"
+                    "- [ ] Later | type: recurring | freq: weekly | last: 2026-01-05 00:00\n"
+                    "- [ ] Chore | type: one-off\n")
+    return path
+
+
+class TestTaskFile:
+    def test_due_in_next_due_order(self, task_file):
+        tf = tm.TaskFile(task_file)
+        tf.refresh()
+        assert tf.next_due() == 0
+        assert [t["description"] for t in tf.due(datetime(2026, 1, 3).timestamp())] == ["Never", "Late"]
+        assert len(tf.due(datetime(2026, 2, 1).timestamp())) == 3
+
+    def test_unchanged_file_not_reparsed(self, task_file, monkeypatch):
+        tf = tm.TaskFile(task_file)
+        assert tf.refresh()
+        monkeypatch.setattr(tm, "parse_file", None)  # Re-parsing would raise
+        assert not tf.refresh()
+
+    def test_change_reparsed(self, task_file):
+        tf = tm.TaskFile(task_file)
+        tf.refresh()
+        task_file.write_text("- [ ] Only | type: recurring | freq: daily | last: never\n")
+        assert tf.refresh() and tf.version == 2
+        assert [t["description"] for t in tf.tasks] == ["Only"]
+
+    def test_stat_throttled(self, task_file, monkeypatch):
+        tf = tm.TaskFile(task_file, stat_interval=10)
+        tf.refresh(now=100)
+        monkeypatch.setattr(tm.os, "stat", None)
+        assert not tf.refresh(now=105)
+
+    def test_missing_file(self, tmp_path):
+        tf = tm.TaskFile(tmp_path / "missing.md")
+        tf.refresh()
+        assert tf.tasks == [] and tf.next_due() is None
+
+    def test_load_shares_instances(self, task_file):
+        assert tm.load(task_file) is tm.load(str(task_file))
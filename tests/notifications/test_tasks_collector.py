@@ -1,7 +1,7 @@
 """Tests for tasks_collector.py — overdue recurring task notifications."""
 from __future__ import annotations
 
-import json, os, sys
+import json, os, sys, time
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -16,6 +16,7 @@ import tasks_collector as tc
 def _isolated(tmp_path, monkeypatch):
     monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
     monkeypatch.setattr(tc, "NOTIFIED_FILE", tmp_path / "task-notified.json")
+    monkeypatch.setattr(tc, "STAT_INTERVAL_SECS", 0.0)
     monkeypatch.setenv("RELAYGENT_KB_DIR", str(tmp_path / "kb"))
     (tmp_path / "kb").mkdir()
     return tmp_path
@@ -33,50 +34,6 @@ def _collect(tmp_path=None, lines=None):
     return notifs
 
 
-class TestFreqMs:
-    def test_known_frequencies(self):
-        assert tc._freq_ms("6h") == 6 * 3600000
-        assert tc._freq_ms("12h") == 12 * 3600000
-        assert tc._freq_ms("daily") == 24 * 3600000
-        assert tc._freq_ms("2d") == 48 * 3600000
-        assert tc._freq_ms("weekly") == 168 * 3600000
-        assert tc._freq_ms("monthly") == 720 * 3600000
-
-    def test_unknown_freq_defaults_to_daily(self):
-        assert tc._freq_ms("bogus") == 24 * 3600000
-        assert tc._freq_ms("") == 24 * 3600000
-
-
-class TestParseTaskLine:
-    def test_unchecked_oneoff(self):
-        r = tc._parse_task_line("- [ ] Fix the bug")
-        assert r is not None and r["description"] == "Fix the bug"
-        assert r["type"] == "one-off"
-
-    def test_checked_oneoff(self):
-        r = tc._parse_task_line("- [x] Done task")
-        assert r is not None and r["description"] == "Done task"
-
-    def test_recurring_with_meta(self):
-        line = "- [ ] Check logs | type: recurring | freq: daily | last: 2026-02-01T10:00:00"
-        r = tc._parse_task_line(line)
-        assert r["description"] == "Check logs"
-        assert r["type"] == "recurring" and r["freq"] == "daily"
-        assert r["last"] == "2026-02-01T10:00:00"
-
-    def test_non_task_line_returns_none(self):
-        assert tc._parse_task_line("## Section header") is None
-        assert tc._parse_task_line("some random text") is None
-        assert tc._parse_task_line("") is None
-
-    def test_missing_meta_defaults(self):
-        r = tc._parse_task_line("- [ ] Simple task")
-        assert r["type"] == "one-off" and r["freq"] == "" and r["last"] == ""
-
-    def test_uppercase_x(self):
-        assert tc._parse_task_line("- [X] Done task") is not None
-
-
 class TestNotifiedPersistence:
     def test_load_returns_empty_when_no_file(self):
         assert tc._load_notified() == {}
@@ -183,3 +140,32 @@ class TestCollect:
 
     def test_empty_tasks_file(self, _isolated):
         assert _collect(_isolated, [""]) == []
+
+
+class TestPollCost:
+    def test_no_file_io_while_nothing_due(self, _isolated, monkeypatch):
+        recent = (datetime.now() - timedelta(hours=1)).isoformat()
+        _write_tasks(_isolated, [f"- [ ] Backup | type: recurring | freq: daily | last: {recent}"])
+        monkeypatch.setattr(tc, "STAT_INTERVAL_SECS", 60.0)
+        monkeypatch.setattr(tc.task_model, "_files", {})
+        assert _collect() == []
+        monkeypatch.setattr(tc.task_model.os, "stat", None)  # Any stat would raise
+        monkeypatch.setattr("builtins.open", None)  # So would any open
+        for _ in range(3):
+            assert _collect() == []
+
+    def test_edit_picked_up(self, _isolated):
+        recent = (datetime.now() - timedelta(hours=1)).isoformat()
+        _write_tasks(_isolated, [f"- [ ] Backup | type: recurring | freq: daily | last: {recent}"])
+        assert _collect() == []
+        _write_tasks(_isolated, ["- [ ] Backup | type: recurring | freq: daily | last: never"])
+        assert len(_collect()) == 1
+
+    def test_fires_once_deadline_passes(self, _isolated, monkeypatch):
+        _write_tasks(_isolated, ["- [ ] Backup | type: recurring | freq: 6h | last: 2026-01-01 00:00"])
+        start = time.time()
+        assert len(_collect()) == 1
+        monkeypatch.setattr(tc.time, "time", lambda: start + 5 * 3600)
+        assert _collect() == []  # Within the dedup period
+        monkeypatch.setattr(tc.time, "time", lambda: start + 6 * 3600 + 1)
+        assert len(_collect()) == 1